@@ -1,36 +1,46 @@
-from typing import List
-
-from azure.mgmt.datafactory.models import (  # type: ignore
-    ActivityDependency,
-    ExecutePipelineActivity,
-    Expression,
-    ForEachActivity,
-    IfConditionActivity,
-    PipelineReference,
-    SetVariableActivity,
-)
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 from adfpy.activity import AdfActivity
 from adfpy.pipeline import AdfPipeline
+from adfpy.serialize import expression, reference, serialize_object
+
+if TYPE_CHECKING:
+    from azure.mgmt.datafactory.models import (  # type: ignore
+        ExecutePipelineActivity,
+        ForEachActivity,
+        IfConditionActivity,
+        SetVariableActivity,
+    )
 
 
 class AdfExecutePipelineActivity(AdfActivity):
+    __slots__ = ("pipeline_name",)
+
     def __init__(self, name: str, pipeline_name: str, pipeline=None):
         super(AdfExecutePipelineActivity, self).__init__(name, pipeline)
         self.pipeline_name = pipeline_name
 
-    def to_adf(self) -> ExecutePipelineActivity:
+    def to_adf(self) -> "ExecutePipelineActivity":
+        from azure.mgmt.datafactory.models import ExecutePipelineActivity, PipelineReference  # type: ignore
+
         return ExecutePipelineActivity(
             name=self.name,
             pipeline=PipelineReference(reference_name=self.pipeline_name),
-            depends_on=[
-                ActivityDependency(activity=dep_name, dependency_conditions=dep_conditions)
-                for dep_name, dep_conditions in self.depends_on.items()
-            ],
+            depends_on=self.dependencies_to_adf(),
         )
 
+    def _to_adf_json(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "type": "ExecutePipeline",
+            "dependsOn": self.dependencies_to_adf_json(),
+            "typeProperties": {"pipeline": reference("PipelineReference", self.pipeline_name)},
+        }
+
 
 class AdfIfConditionActivity(AdfActivity):
+    __slots__ = ("expression", "if_false_activities", "if_true_activities")
+
     def __init__(
         self,
         name: str,
@@ -44,59 +54,135 @@ class AdfIfConditionActivity(AdfActivity):
         self.if_false_activities = if_false_activities
         self.if_true_activities = if_true_activities
 
-    def to_adf(self) -> IfConditionActivity:
+    def child_activities(self) -> Dict[str, List[AdfActivity]]:
+        return {"ifTrueActivities": self.if_true_activities, "ifFalseActivities": self.if_false_activities}
+
+    def to_adf(self) -> "IfConditionActivity":
+        from azure.mgmt.datafactory.models import Expression, IfConditionActivity  # type: ignore
+
         return IfConditionActivity(
             name=self.name,
             expression=Expression(value=self.expression),
             if_true_activities=[activity.to_adf() for activity in self.if_true_activities],
             if_false_activities=[activity.to_adf() for activity in self.if_false_activities],
-            depends_on=[
-                ActivityDependency(activity=dep_name, dependency_conditions=dep_conditions)
-                for dep_name, dep_conditions in self.depends_on.items()
-            ],
+            depends_on=self.dependencies_to_adf(),
         )
 
+    def _to_adf_json(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "type": "IfCondition",
+            "dependsOn": self.dependencies_to_adf_json(),
+            "typeProperties": {
+                "expression": expression(self.expression),
+                "ifTrueActivities": [activity.to_adf_json() for activity in self.if_true_activities],
+                "ifFalseActivities": [activity.to_adf_json() for activity in self.if_false_activities],
+            },
+        }
+
 
 class AdfForEachActivity(AdfActivity):
+    """Run activities for every item of a collection
+
+    The activities can depend on each other like the activities of a pipeline, using `>>` and `<<`. Unlike in earlier
+    versions, they are not chained in the order they are passed, so activities without dependencies run in parallel.
+    By default, ADF runs up to `DEFAULT_BATCH_COUNT` iterations in parallel.
+
+    Args:
+        name: name of the activity
+        items: ADF expression resulting in the collection to iterate over
+        activities: activities to run for every item
+        is_sequential: run the iterations one by one, rather than in parallel. Defaults to False.
+        batch_count: maximum number of iterations to run in parallel, at most `MAX_BATCH_COUNT`. Can not be combined
+            with `is_sequential`.
+        pipeline: pipeline to add this activity to
+
+    Raises: ValueError if the batch count is out of range, or combined with `is_sequential`
+    """
+    __slots__ = ("items", "activities", "is_sequential", "batch_count")
+
+    DEFAULT_BATCH_COUNT = 20
+    MAX_BATCH_COUNT = 50
+
     def __init__(
         self,
         name: str,
         items: str,
         activities: List[AdfActivity],
         pipeline: AdfPipeline = None,
+        is_sequential: bool = False,
+        batch_count: Optional[int] = None,
     ):
         super(AdfForEachActivity, self).__init__(name, pipeline)
+        if batch_count is not None:
+            if is_sequential:
+                raise ValueError(f"ForEach activity {name} can not have a batch count, as it is sequential")
+            if not 1 <= batch_count <= self.MAX_BATCH_COUNT:
+                raise ValueError(f"The batch count of ForEach activity {name} should be between 1 and "
+                                 f"{self.MAX_BATCH_COUNT}, got {batch_count}")
         self.items = items  # TODO: this now has to be an ADF expression. Probably want to revisit this
         self.activities = activities
+        self.is_sequential = is_sequential
+        self.batch_count = batch_count
+
+    @property
+    def parallelism(self) -> int:
+        """Maximum number of iterations that run at the same time"""
+        if self.is_sequential:
+            return 1
+        return self.batch_count or self.DEFAULT_BATCH_COUNT
+
+    def child_activities(self) -> Dict[str, List[AdfActivity]]:
+        return {"activities": self.activities}
 
-        # WARNING This is a workaround that means activities within a foreachactivity may only have a single linear
-        # line of dependency
-        for i in range(1, len(self.activities)):
-            self.activities[i].add_dependency(self.activities[i - 1].name)
+    def to_adf(self) -> "ForEachActivity":
+        from azure.mgmt.datafactory.models import Expression, ForEachActivity  # type: ignore
 
-    def to_adf(self) -> ForEachActivity:
         return ForEachActivity(
             name=self.name,
             items=Expression(value=self.items),
             activities=[activity.to_adf() for activity in self.activities],
-            depends_on=[
-                ActivityDependency(activity=dep_name, dependency_conditions=dep_conditions)
-                for dep_name, dep_conditions in self.depends_on.items()
-            ],
+            is_sequential=self.is_sequential or None,
+            batch_count=self.batch_count,
+            depends_on=self.dependencies_to_adf(),
         )
 
+    def _to_adf_json(self) -> Dict[str, Any]:
+        type_properties: Dict[str, Any] = {}
+        if self.is_sequential:
+            type_properties["isSequential"] = True
+        if self.batch_count is not None:
+            type_properties["batchCount"] = int(self.batch_count)
+        type_properties["items"] = expression(self.items)
+        type_properties["activities"] = [activity.to_adf_json() for activity in self.activities]
+        return {
+            "name": self.name,
+            "type": "ForEach",
+            "dependsOn": self.dependencies_to_adf_json(),
+            "typeProperties": type_properties,
+        }
+
 
 class AdfSetVariableActivity(AdfActivity):
+    __slots__ = ("value",)
+
     def __init__(self, name: str, value: str, pipeline: AdfPipeline = None):
         super(AdfSetVariableActivity, self).__init__(name, pipeline)
         self.value = value
 
-    def to_adf(self) -> SetVariableActivity:
+    def to_adf(self) -> "SetVariableActivity":
+        from azure.mgmt.datafactory.models import SetVariableActivity  # type: ignore
+
         return SetVariableActivity(
             name=self.name,
             value=self.value,
-            depends_on=[
-                ActivityDependency(activity=dep_name, dependency_conditions=dep_conditions)
-                for dep_name, dep_conditions in self.depends_on.items()
-            ],
+            depends_on=self.dependencies_to_adf(),
         )
+
+    def _to_adf_json(self) -> Dict[str, Any]:
+        serialized: Dict[str, Any] = {
+            "name": self.name, "type": "SetVariable", "dependsOn": self.dependencies_to_adf_json()
+        }
+        if self.value is not None:
+            serialized["typeProperties"] = {"value": serialize_object(self.value)}
+        return serialized
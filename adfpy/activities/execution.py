@@ -1,54 +1,161 @@
-from typing import Any, List, Optional
-
-from azure.mgmt.datafactory.models import (  # type: ignore
-    ActivityDependency,
-    AzureBlobStorageReadSettings,
-    CopySource,
-    CopySink,
-    CopyActivity,
-    DatabricksSparkPythonActivity,
-    DatasetReference,
-    DeleteActivity,
-    LinkedServiceReference,
-    LookupActivity,
-    SqlServerStoredProcedureActivity,
-)
+import copy
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 from adfpy.activity import AdfActivity
 from adfpy.pipeline import AdfPipeline
+from adfpy.serialize import reference, serialize_object, serialize_value, without_none
+from adfpy.throughput import CopyThroughputSettings, resolve_copy_throughput
+
+if TYPE_CHECKING:
+    from azure.mgmt.datafactory.models import (  # type: ignore
+        CopySource,
+        CopySink,
+        CopyActivity,
+        DatabricksSparkPythonActivity,
+        DatasetReference,
+        DeleteActivity,
+        LinkedServiceReference,
+        LookupActivity,
+        SqlServerStoredProcedureActivity,
+    )
 
 
 class AdfCopyActivity(AdfActivity):
+    """Copy data from one dataset to another
+
+    Args:
+        name: name of the activity
+        input_dataset_name: name of the dataset to copy from
+        output_dataset_name: name of the dataset to copy to
+        source_type: SDK CopySource object describing how to read from the input dataset
+        sink_type: SDK CopySink object describing how to write to the output dataset
+        pipeline: pipeline to add this activity to
+        throughput: settings determining the throughput of the copy. Settings that are not set are inherited from the
+            pipeline and the factory.
+        input_dataset_parameters: values for the parameters of the input dataset
+        output_dataset_parameters: values for the parameters of the output dataset
+    """
+    __slots__ = ("input_dataset_name", "output_dataset_name", "source_type", "sink_type", "throughput",
+                 "input_dataset_parameters", "output_dataset_parameters")
+
     def __init__(
             self,
             name: str,
             input_dataset_name: str,
             output_dataset_name: str,
-            source_type: CopySource,
-            sink_type: CopySink,
-            pipeline: AdfPipeline = None
+            source_type: "CopySource",
+            sink_type: "CopySink",
+            pipeline: AdfPipeline = None,
+            throughput: Optional[CopyThroughputSettings] = None,
+            input_dataset_parameters: Optional[Dict[str, Any]] = None,
+            output_dataset_parameters: Optional[Dict[str, Any]] = None,
     ):
         super(AdfCopyActivity, self).__init__(name, pipeline)
-        self.input_dataset = DatasetReference(reference_name=input_dataset_name)
-        self.output_dataset = DatasetReference(reference_name=output_dataset_name)
+        self.input_dataset_name = input_dataset_name
+        self.output_dataset_name = output_dataset_name
         self.source_type = source_type
         self.sink_type = sink_type
+        self.throughput = throughput
+        self.input_dataset_parameters = input_dataset_parameters
+        self.output_dataset_parameters = output_dataset_parameters
+
+    @property
+    def input_dataset(self) -> "DatasetReference":
+        from azure.mgmt.datafactory.models import DatasetReference  # type: ignore
+
+        return DatasetReference(reference_name=self.input_dataset_name, parameters=self.input_dataset_parameters)
+
+    @input_dataset.setter
+    def input_dataset(self, dataset: "DatasetReference"):
+        self.input_dataset_name = dataset.reference_name
+        self.input_dataset_parameters = dataset.parameters
+
+    @property
+    def output_dataset(self) -> "DatasetReference":
+        from azure.mgmt.datafactory.models import DatasetReference  # type: ignore
+
+        return DatasetReference(reference_name=self.output_dataset_name, parameters=self.output_dataset_parameters)
 
-    def to_adf(self) -> CopyActivity:
+    @output_dataset.setter
+    def output_dataset(self, dataset: "DatasetReference"):
+        self.output_dataset_name = dataset.reference_name
+        self.output_dataset_parameters = dataset.parameters
+
+    def _sink(self, settings: CopyThroughputSettings) -> "CopySink":
+        """The sink of this activity, with the sink settings of the resolved throughput settings applied"""
+        sink = self.sink_type
+        if settings.write_batch_size is not None or settings.max_concurrent_connections is not None:
+            # The sink may be shared between activities, so it is not modified
+            sink = copy.copy(sink)
+            if settings.write_batch_size is not None:
+                sink.write_batch_size = settings.write_batch_size
+            if settings.max_concurrent_connections is not None:
+                sink.max_concurrent_connections = settings.max_concurrent_connections
+        return sink
+
+    def to_adf(self) -> "CopyActivity":
+        from azure.mgmt.datafactory.models import (  # type: ignore
+            CopyActivity,
+            LinkedServiceReference,
+            StagingSettings,
+        )
+
+        settings = resolve_copy_throughput(self.throughput)
+        staging_settings = None
+        if settings.enable_staging and settings.staging:
+            staging_settings = StagingSettings(
+                linked_service_name=LinkedServiceReference(reference_name=settings.staging.linked_service),
+                path=settings.staging.path,
+                enable_compression=settings.staging.enable_compression,
+            )
         return CopyActivity(
             name=self.name,
             inputs=[self.input_dataset],
             outputs=[self.output_dataset],
             source=self.source_type,
-            sink=self.sink_type,
-            depends_on=[
-                ActivityDependency(activity=dep_name, dependency_conditions=dep_conditions)
-                for dep_name, dep_conditions in self.depends_on.items()
-            ],
+            sink=self._sink(settings),
+            parallel_copies=settings.parallel_copies,
+            data_integration_units=settings.data_integration_units,
+            enable_staging=settings.enable_staging,
+            staging_settings=staging_settings,
+            enable_skip_incompatible_row=settings.enable_skip_incompatible_row,
+            depends_on=self.dependencies_to_adf(),
         )
 
+    def _to_adf_json(self) -> Dict[str, Any]:
+        settings = resolve_copy_throughput(self.throughput)
+        staging_settings = None
+        if settings.enable_staging and settings.staging:
+            staging_settings = without_none({
+                "linkedServiceName": reference("LinkedServiceReference", settings.staging.linked_service),
+                "path": serialize_object(settings.staging.path),
+                "enableCompression": serialize_object(settings.staging.enable_compression),
+            })
+        sink = self._sink(settings)
+        serialized: Dict[str, Any] = {
+            "name": self.name,
+            "type": "Copy",
+            "dependsOn": self.dependencies_to_adf_json(),
+            "inputs": [reference("DatasetReference", self.input_dataset_name, self.input_dataset_parameters)],
+            "outputs": [reference("DatasetReference", self.output_dataset_name, self.output_dataset_parameters)],
+        }
+        type_properties = without_none({
+            "source": None if self.source_type is None else serialize_value(self.source_type, "CopySource"),
+            "sink": None if sink is None else serialize_value(sink, "CopySink"),
+            "enableStaging": serialize_object(settings.enable_staging),
+            "stagingSettings": staging_settings,
+            "parallelCopies": serialize_object(settings.parallel_copies),
+            "dataIntegrationUnits": serialize_object(settings.data_integration_units),
+            "enableSkipIncompatibleRow": serialize_object(settings.enable_skip_incompatible_row),
+        })
+        if type_properties:
+            serialized["typeProperties"] = type_properties
+        return serialized
+
 
 class AdfDeleteActivity(AdfActivity):
+    __slots__ = ("dataset_name", "recursive", "wildcard")
+
     def __init__(
         self, name: str, dataset_name: str, recursive: bool = False, wildcard: str = None, pipeline: AdfPipeline = None
     ):
@@ -60,21 +167,41 @@ class AdfDeleteActivity(AdfActivity):
         self.recursive = recursive
         self.wildcard = wildcard
 
-    def to_adf(self) -> DeleteActivity:
+    def to_adf(self) -> "DeleteActivity":
+        from azure.mgmt.datafactory.models import (  # type: ignore
+            AzureBlobStorageReadSettings,
+            DatasetReference,
+            DeleteActivity,
+        )
+
         return DeleteActivity(
             name=self.name,
             dataset=DatasetReference(reference_name=self.dataset_name),
             store_settings=AzureBlobStorageReadSettings(
                 wildcard_file_name=self.wildcard, recursive=self.recursive
             ),
-            depends_on=[
-                ActivityDependency(activity=dep_name, dependency_conditions=dep_conditions)
-                for dep_name, dep_conditions in self.depends_on.items()
-            ],
+            depends_on=self.dependencies_to_adf(),
         )
 
+    def _to_adf_json(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "type": "Delete",
+            "dependsOn": self.dependencies_to_adf_json(),
+            "typeProperties": {
+                "dataset": reference("DatasetReference", self.dataset_name),
+                "storeSettings": without_none({
+                    "type": "AzureBlobStorageReadSettings",
+                    "recursive": serialize_object(self.recursive),
+                    "wildcardFileName": serialize_object(self.wildcard),
+                }),
+            },
+        }
+
 
 class AdfDatabricksSparkPythonActivity(AdfActivity):
+    __slots__ = ("python_file", "parameters")
+
     def __init__(self, name: str,
                  python_file: str,
                  parameters: Optional[List[Any]] = None,
@@ -83,45 +210,108 @@ class AdfDatabricksSparkPythonActivity(AdfActivity):
         self.python_file = python_file
         self.parameters = parameters
 
-    def to_adf(self) -> DatabricksSparkPythonActivity:
+    def to_adf(self) -> "DatabricksSparkPythonActivity":
+        from azure.mgmt.datafactory.models import DatabricksSparkPythonActivity  # type: ignore
+
         return DatabricksSparkPythonActivity(
             name=self.name,
             python_file=self.python_file,
             parameters=self.parameters,
-            depends_on=[
-                ActivityDependency(activity=dep_name, dependency_conditions=dep_conditions)
-                for dep_name, dep_conditions in self.depends_on.items()
-            ],
+            depends_on=self.dependencies_to_adf(),
         )
 
+    def _to_adf_json(self) -> Dict[str, Any]:
+        serialized: Dict[str, Any] = {
+            "name": self.name, "type": "DatabricksSparkPython", "dependsOn": self.dependencies_to_adf_json()
+        }
+        type_properties = without_none({
+            "pythonFile": serialize_object(self.python_file),
+            "parameters": None if self.parameters is None else serialize_value(self.parameters, "[object]"),
+        })
+        if type_properties:
+            serialized["typeProperties"] = type_properties
+        return serialized
+
 
 class AdfLookupActivity(AdfActivity):
-    def __init__(self, name: str, dataset: str, source: CopySource, pipeline: AdfPipeline = None):
+    __slots__ = ("dataset_name", "source", "dataset_parameters")
+
+    def __init__(self, name: str, dataset: str, source: "CopySource", pipeline: AdfPipeline = None):
         super(AdfLookupActivity, self).__init__(name, pipeline)
-        self.dataset = DatasetReference(reference_name=dataset)
+        self.dataset_name = dataset
         self.source = source
+        self.dataset_parameters: Optional[Dict[str, Any]] = None
+
+    @property
+    def dataset(self) -> "DatasetReference":
+        from azure.mgmt.datafactory.models import DatasetReference  # type: ignore
+
+        return DatasetReference(reference_name=self.dataset_name, parameters=self.dataset_parameters)
+
+    @dataset.setter
+    def dataset(self, dataset: "DatasetReference"):
+        self.dataset_name = dataset.reference_name
+        self.dataset_parameters = dataset.parameters
+
+    def to_adf(self) -> "LookupActivity":
+        from azure.mgmt.datafactory.models import LookupActivity  # type: ignore
 
-    def to_adf(self) -> LookupActivity:
         return LookupActivity(
             name=self.name,
             dataset=self.dataset,
             source=self.source,
-            depends_on=[
-                ActivityDependency(activity=dep_name, dependency_conditions=dep_conditions)
-                for dep_name, dep_conditions in self.depends_on.items()
-            ],
+            depends_on=self.dependencies_to_adf(),
         )
 
+    def _to_adf_json(self) -> Dict[str, Any]:
+        type_properties = {"dataset": reference("DatasetReference", self.dataset_name, self.dataset_parameters)}
+        if self.source is not None:
+            type_properties = {"source": serialize_value(self.source, "CopySource"), **type_properties}
+        return {
+            "name": self.name,
+            "type": "Lookup",
+            "dependsOn": self.dependencies_to_adf_json(),
+            "typeProperties": type_properties,
+        }
+
 
 class AdfSqlServerStoredProcedureActivity(AdfActivity):
+    __slots__ = ("stored_procedure_name", "linked_service_name", "linked_service_parameters")
+
     def __init__(self, name: str, stored_procedure_name: str, linked_service: str, pipeline: AdfPipeline = None):
         super(AdfSqlServerStoredProcedureActivity, self).__init__(name, pipeline)
         self.stored_procedure_name = stored_procedure_name
-        self.linked_service = LinkedServiceReference(reference_name=linked_service)
+        self.linked_service_name = linked_service
+        self.linked_service_parameters: Optional[Dict[str, Any]] = None
+
+    @property
+    def linked_service(self) -> "LinkedServiceReference":
+        from azure.mgmt.datafactory.models import LinkedServiceReference  # type: ignore
+
+        return LinkedServiceReference(reference_name=self.linked_service_name,
+                                      parameters=self.linked_service_parameters)
+
+    @linked_service.setter
+    def linked_service(self, linked_service: "LinkedServiceReference"):
+        self.linked_service_name = linked_service.reference_name
+        self.linked_service_parameters = linked_service.parameters
+
+    def to_adf(self) -> "SqlServerStoredProcedureActivity":
+        from azure.mgmt.datafactory.models import SqlServerStoredProcedureActivity  # type: ignore
 
-    def to_adf(self) -> SqlServerStoredProcedureActivity:
         return SqlServerStoredProcedureActivity(
             name=self.name,
             stored_procedure_name=self.stored_procedure_name,
             linked_service_name=self.linked_service,
         )
+
+    def _to_adf_json(self) -> Dict[str, Any]:
+        serialized = {
+            "name": self.name,
+            "type": "SqlServerStoredProcedure",
+            "linkedServiceName": reference("LinkedServiceReference", self.linked_service_name,
+                                           self.linked_service_parameters),
+        }
+        if self.stored_procedure_name is not None:
+            serialized["typeProperties"] = {"storedProcedureName": serialize_object(self.stored_procedure_name)}
+        return serialized
@@ -0,0 +1,220 @@
+import copy
+import json
+from dataclasses import dataclass
+from enum import Enum
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from adfpy.activities.control import AdfForEachActivity
+from adfpy.activities.execution import AdfCopyActivity
+from adfpy.activity import AdfActivity
+from adfpy.pipeline import AdfPipeline
+from adfpy.throughput import CopyThroughputSettings
+
+if TYPE_CHECKING:
+    from azure.mgmt.datafactory.models import CopySink, CopySource  # type: ignore
+
+Bound = Union[int, str]
+
+# Placeholders ADF substitutes with the range of each partition when using its native dynamic range partitioning, see
+# https://learn.microsoft.com/en-us/azure/data-factory/connector-oracle#parallel-copy-from-oracle
+ORACLE_DYNAMIC_RANGE_CONDITION = ("?AdfRangePartitionColumnName >= ?AdfRangePartitionLowbound AND "
+                                  "?AdfRangePartitionColumnName <= ?AdfRangePartitionUpbound")
+SQL_DYNAMIC_RANGE_CONDITION = "?AdfDynamicRangePartitionCondition"
+
+
+class PartitionStrategy(str, Enum):
+    """How a partitioned copy reads its partitions
+
+    NATIVE uses the dynamic range partitioning of the source connector, within a single copy activity. FOR_EACH runs a
+    copy activity per partition in a ForEach activity, which also supports explicit (e.g. uneven, or non-numeric)
+    ranges, and writes every partition to its own sink path.
+    """
+    NATIVE = "Native"
+    FOR_EACH = "ForEach"
+
+
+@dataclass(frozen=True)
+class PartitionRange:
+    """A range of values of the partition column, including both bounds"""
+    lower: Bound
+    upper: Bound
+
+
+def split_range(lower_bound: int, upper_bound: int, partition_count: int) -> List[PartitionRange]:
+    """Split a range of integers into (at most) `partition_count` consecutive ranges of (almost) equal size
+
+    Raises: ValueError if the bounds or partition count are invalid
+
+    Returns:
+        List of PartitionRange, covering all values from lower_bound up to and including upper_bound
+    """
+    if partition_count < 1:
+        raise ValueError(f"partition_count should be at least 1, got {partition_count}")
+    if lower_bound > upper_bound:
+        raise ValueError(f"lower_bound {lower_bound} is larger than upper_bound {upper_bound}")
+    size, remainder = divmod(upper_bound - lower_bound + 1, partition_count)
+    ranges = []
+    lower = lower_bound
+    for index in range(min(partition_count, upper_bound - lower_bound + 1)):
+        upper = lower + size + (1 if index < remainder else 0) - 1
+        ranges.append(PartitionRange(lower, upper))
+        lower = upper + 1
+    return ranges
+
+
+def _check_ranges(ranges: Sequence[PartitionRange]):
+    if not ranges:
+        raise ValueError("At least one partition range is required")
+    for current, following in zip(ranges, ranges[1:]):
+        if type(current.upper) is not type(following.lower):
+            raise ValueError(f"Partition ranges {current} and {following} have bounds of different types")
+        if current.upper >= following.lower:  # type: ignore
+            raise ValueError(f"Partition ranges should be sorted and should not overlap, got {current} and {following}")
+    for partition in ranges:
+        if partition.lower > partition.upper:  # type: ignore
+            raise ValueError(f"Partition range {partition} has a lower bound larger than its upper bound")
+
+
+def _reader_settings(source: "CopySource") -> Tuple[str, Any, str]:
+    """The name of the reader query attribute, partition settings class and dynamic range condition of a source"""
+    from azure.mgmt.datafactory.models import (  # type: ignore
+        OraclePartitionSettings,
+        OracleSource,
+        SqlPartitionSettings,
+    )
+
+    if isinstance(source, OracleSource):
+        return "oracle_reader_query", OraclePartitionSettings, ORACLE_DYNAMIC_RANGE_CONDITION
+    if hasattr(source, "sql_reader_query") and hasattr(source, "partition_settings"):
+        return "sql_reader_query", SqlPartitionSettings, SQL_DYNAMIC_RANGE_CONDITION
+    raise ValueError(f"Partitioned copies are only supported for Oracle and SQL sources, got "
+                     f"{type(source).__name__}")
+
+
+def _expression(value: str) -> Dict[str, str]:
+    return {"value": value, "type": "Expression"}
+
+
+def build_partitioned_copy(
+        name: str,
+        table: str,
+        partition_column: str,
+        input_dataset_name: str,
+        output_dataset_name: str,
+        source_type: "CopySource",
+        sink_type: "CopySink",
+        partition_count: Optional[int] = None,
+        lower_bound: Optional[int] = None,
+        upper_bound: Optional[int] = None,
+        ranges: Optional[Sequence[Tuple[Bound, Bound]]] = None,
+        strategy: PartitionStrategy = PartitionStrategy.FOR_EACH,
+        sink_path: Optional[str] = None,
+        sink_path_parameter: str = "path",
+        batch_count: Optional[int] = None,
+        throughput: Optional[CopyThroughputSettings] = None,
+        pipeline: AdfPipeline = None,
+) -> AdfActivity:
+    """Build an activity copying a table from an Oracle or SQL source over multiple connections
+
+    The table is split on `partition_column`, either into `partition_count` ranges of equal size between `lower_bound`
+    and `upper_bound`, or into the explicit `ranges`. With the NATIVE strategy, the partitions are read by the source
+    connector within a single AdfCopyActivity, using `partition_count` parallel copies. With the FOR_EACH strategy,
+    an AdfForEachActivity runs a copy of every range, running at most `batch_count` copies at the same time. Every
+    range is then written to `<sink_path>/partition=<index>`, passed to the output dataset using its
+    `sink_path_parameter` parameter.
+
+    Args:
+        name: name of the resulting activity
+        table: (qualified) name of the table to copy
+        partition_column: column to partition the table on
+        input_dataset_name: name of the dataset to copy from
+        output_dataset_name: name of the dataset to copy to
+        source_type: SDK CopySource object for an Oracle or SQL source
+        sink_type: SDK CopySink object describing how to write to the output dataset
+        partition_count: number of partitions to split the range between lower_bound and upper_bound into
+        lower_bound: smallest value of the partition column (inclusive)
+        upper_bound: largest value of the partition column (inclusive)
+        ranges: explicit (lower, upper) ranges of the partition column, both bounds inclusive. Only supported by the
+            FOR_EACH strategy.
+        strategy: how the partitions are read
+        sink_path: path to write the partitions to, required by the FOR_EACH strategy
+        sink_path_parameter: name of the parameter of the output dataset that sets the path to write to
+        batch_count: maximum number of partitions to copy in parallel with the FOR_EACH strategy. Defaults to the
+            number of partitions, at most `AdfForEachActivity.MAX_BATCH_COUNT`.
+        throughput: throughput settings of the copy activity
+        pipeline: pipeline to add the resulting activity to
+
+    Raises: ValueError if the partitioning is not valid for the source or strategy
+
+    Returns:
+        An AdfCopyActivity (NATIVE) or AdfForEachActivity (FOR_EACH)
+    """
+    query_attribute, partition_settings_type, dynamic_range_condition = _reader_settings(source_type)
+    if (partition_count is None) == (ranges is None):
+        raise ValueError("Either partition_count or ranges should be provided")
+
+    source = copy.copy(source_type)
+    if strategy == PartitionStrategy.NATIVE:
+        if ranges is not None:
+            raise ValueError("Explicit ranges are not supported by the native partitioning of the source")
+        assert partition_count is not None
+        if partition_count < 1:
+            raise ValueError(f"partition_count should be at least 1, got {partition_count}")
+        # Only the sources supported by `_reader_settings` have these attributes, rather than every CopySource
+        setattr(source, "partition_option", "DynamicRange")
+        setattr(source, "partition_settings", partition_settings_type(
+            partition_column_name=partition_column,
+            partition_lower_bound=None if lower_bound is None else str(lower_bound),
+            partition_upper_bound=None if upper_bound is None else str(upper_bound),
+        ))
+        setattr(source, query_attribute, f"SELECT * FROM {table} WHERE {dynamic_range_condition}")
+        return AdfCopyActivity(
+            name=name,
+            input_dataset_name=input_dataset_name,
+            output_dataset_name=output_dataset_name,
+            source_type=source,
+            sink_type=sink_type,
+            pipeline=pipeline,
+            throughput=(throughput or CopyThroughputSettings()).inherit(
+                CopyThroughputSettings(parallel_copies=partition_count)),
+        )
+
+    if ranges is not None:
+        partitions = [PartitionRange(lower, upper) for lower, upper in ranges]
+        _check_ranges(partitions)
+    else:
+        assert partition_count is not None
+        if lower_bound is None or upper_bound is None:
+            raise ValueError("lower_bound and upper_bound are required to split a table into partitions")
+        partitions = split_range(lower_bound, upper_bound, partition_count)
+    if sink_path is None:
+        raise ValueError("sink_path is required to write every partition to its own path")
+
+    items = json.dumps([
+        {"index": index, "lower": partition.lower, "upper": partition.upper}
+        for index, partition in enumerate(partitions)
+    ], separators=(",", ":")).replace("'", "''")
+    quote = "" if isinstance(partitions[0].lower, int) else "'"
+    condition = (f"{partition_column} >= {quote}@{{item().lower}}{quote} AND "
+                 f"{partition_column} <= {quote}@{{item().upper}}{quote}")
+    escaped_sink_path = sink_path.rstrip("/").replace("'", "''")
+    setattr(source, "partition_option", None)
+    setattr(source, query_attribute, _expression(f"SELECT * FROM {table} WHERE {condition}"))
+    partition_copy = AdfCopyActivity(
+        name=f"{name} partition",
+        input_dataset_name=input_dataset_name,
+        output_dataset_name=output_dataset_name,
+        source_type=source,
+        sink_type=sink_type,
+        throughput=throughput,
+        output_dataset_parameters={
+            sink_path_parameter: _expression(f"@concat('{escaped_sink_path}/partition=', string(item().index))"),
+        },
+    )
+    return AdfForEachActivity(
+        name=name,
+        items=f"@json('{items}')",
+        activities=[partition_copy],
+        batch_count=batch_count or min(len(partitions), AdfForEachActivity.MAX_BATCH_COUNT),
+        pipeline=pipeline,
+    )
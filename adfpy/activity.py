@@ -1,26 +1,97 @@
 import abc
-from typing import List, Union, Dict
+from enum import Enum
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+from adfpy.serialize import serialize_model
+
+if TYPE_CHECKING:
+    from azure.mgmt.datafactory.models import ActivityDependency  # type: ignore
+
+
+class DependencyCondition(str, Enum):
+    """Conditions under which an activity runs, based on the outcome of an activity it depends on"""
+    SUCCEEDED = "Succeeded"
+    FAILED = "Failed"
+    SKIPPED = "Skipped"
+    COMPLETED = "Completed"
+
+
+DependencyConditions = Tuple[DependencyCondition, ...]
+
+# Every distinct combination of conditions is stored once, and shared by all dependencies using it
+_interned_conditions: Dict[DependencyConditions, DependencyConditions] = {}
+
+
+def intern_conditions(conditions: Iterable[Union[str, DependencyCondition]]) -> DependencyConditions:
+    """Convert dependency conditions to a shared tuple of DependencyConditions
+
+    Raises: ValueError if any of the conditions is not a valid DependencyCondition
+    """
+    key = tuple(DependencyCondition(c) for c in conditions)
+    return _interned_conditions.setdefault(key, key)
+
+
+SUCCEEDED = intern_conditions([DependencyCondition.SUCCEEDED])
+
+# Whether each activity class serialized so far is serialized by its own `_to_adf_json`
+_serialized_directly: Dict[type, bool] = {}
 
 
 class AdfActivity:
-    depends_on: Dict
+    __slots__ = ("name", "_depends_on", "_adf_depends_on")
 
     # String as type hint to avoid a circular import
     def __init__(self, name: str, pipeline: "AdfPipeline" = None):  # type: ignore # noqa: F821
         self.name = name
-        self.depends_on = dict()
+        self._depends_on: Dict[str, DependencyConditions] = {}
+        self._adf_depends_on: Optional[List["ActivityDependency"]] = None
         if pipeline:
             pipeline.activities.append(self)
 
+    @property
+    def depends_on(self) -> Mapping[str, DependencyConditions]:
+        """Read-only mapping of the names of the activities this activity depends on, to the dependency conditions"""
+        return MappingProxyType(self._depends_on)
+
     def add_dependency(self, activity_name: str, dependency_conditions: List[str] = None):
-        if not dependency_conditions:
-            dependency_conditions = ["Succeeded"]
-        self.depends_on[activity_name] = dependency_conditions
+        conditions = intern_conditions(dependency_conditions) if dependency_conditions else SUCCEEDED
+        self._depends_on[activity_name] = conditions
+        self._adf_depends_on = None
 
     def add_dependencies(self, activities: Dict[str, List[str]]):
         for activity_name, dependency_conditions in activities.items():
             self.add_dependency(activity_name, dependency_conditions)
 
+    def dependencies_to_adf(self) -> List["ActivityDependency"]:
+        """Convert the dependencies of this activity to ADF objects
+
+        The converted dependencies are cached until a dependency is added.
+        """
+        if self._adf_depends_on is None:
+            from azure.mgmt.datafactory.models import ActivityDependency  # type: ignore
+
+            self._adf_depends_on = [
+                ActivityDependency(activity=dep_name, dependency_conditions=[c.value for c in dep_conditions])
+                for dep_name, dep_conditions in self._depends_on.items()
+            ]
+        return list(self._adf_depends_on)
+
+    def dependencies_to_adf_json(self) -> List[Dict[str, Any]]:
+        """Serialize the dependencies of this activity, as `dependencies_to_adf` would be serialized by the SDK"""
+        return [
+            {"activity": dep_name, "dependencyConditions": [c.value for c in dep_conditions]}
+            for dep_name, dep_conditions in self._depends_on.items()
+        ]
+
+    def child_activities(self) -> Dict[str, List["AdfActivity"]]:
+        """The activities nested in this activity, by the name of the property containing them in ADF
+
+        Container activities (e.g. ForEach) override this, so the activities nested in them are part of the activity
+        graph of the pipeline.
+        """
+        return {}
+
     def __rshift__(self, other: Union["AdfActivity", List["AdfActivity"]]):
         """Implements Activity >> Activity"""
         if isinstance(other, List):
@@ -52,3 +123,25 @@ class AdfActivity:
     @abc.abstractmethod
     def to_adf(self):
         pass
+
+    def to_adf_json(self) -> Dict[str, Any]:
+        """Serialize this activity directly, producing the same JSON as serializing `to_adf()` with the SDK
+
+        Activities implementing `_to_adf_json` are serialized without building SDK models. Other activities, and
+        subclasses overriding `to_adf` of such an activity, are serialized from the result of `to_adf()`.
+        """
+        activity_class = type(self)
+        serializes_directly = _serialized_directly.get(activity_class)
+        if serializes_directly is None:
+            serializes_directly = _serialized_directly[activity_class] = _serializes_directly(activity_class)
+        if serializes_directly:
+            return self._to_adf_json()  # type: ignore
+        return serialize_model(self.to_adf())
+
+
+def _serializes_directly(activity_class: type) -> bool:
+    """Whether `_to_adf_json` of an activity class is implemented by the class that also implements its `to_adf`"""
+    for cls in activity_class.__mro__:
+        if "to_adf" in vars(cls):
+            return "_to_adf_json" in vars(cls)
+    return False
@@ -0,0 +1,374 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Dict, FrozenSet, Optional, Set, Tuple, Union
+
+from adfpy.error import InvalidCronExpressionError, NotSupportedError
+from adfpy.serialize import serialize_datetime, serialize_str, without_none
+
+if TYPE_CHECKING:
+    from azure.mgmt.datafactory.models import ScheduleTriggerRecurrence  # type: ignore
+
+PRESETS = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+}
+
+# ADF names of the days of the week, indexed by their number in cron
+WEEK_DAYS = ("Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday")
+
+
+@dataclass(frozen=True)
+class CronField:
+    """Description of one of the 5 fields of a cron expression
+
+    Attributes:
+        name: name of the field, as used in error messages and by AdfCronExpression
+        attribute: name of the AdfCronExpression attribute holding the parsed values of the field
+        minimum: smallest value of the field
+        maximum: largest value of the field
+        names: (upper case) names that can be used instead of numbers, e.g. `JAN` or `MON`
+        modulo: values are taken modulo this number, used to map day of week 7 to Sunday
+    """
+    name: str
+    attribute: str
+    minimum: int
+    maximum: int
+    names: Tuple[str, ...] = ()
+    modulo: Optional[int] = None
+
+    def _value(self, text: str, expression: str) -> int:
+        if text.upper() in self.names:
+            value = self.names.index(text.upper()) + self.minimum
+        elif text.isdigit():
+            value = int(text)
+        else:
+            raise InvalidCronExpressionError(f"Invalid {self.name} '{text}' in cron expression '{expression}'")
+        if not self.minimum <= value <= self.maximum:
+            raise InvalidCronExpressionError(f"Invalid {self.name} {value} in cron expression '{expression}'. Please "
+                                             f"set {self.name} in the range {self.minimum}-{self.maximum}")
+        return value
+
+    def parse(self, text: str, expression: str) -> FrozenSet[int]:
+        """Parse a field consisting of a comma-separated list of `*`, values, ranges (`1-5`) and steps (`*/15`,
+        `0-30/10` or `5/15`)
+
+        Raises: InvalidCronExpressionError if the field can not be parsed, or contains values out of range
+
+        Returns:
+            The set of values the field matches
+        """
+        values: Set[int] = set()
+        for part in text.split(","):
+            range_text, has_step, step_text = part.partition("/")
+            step = 1
+            if has_step:
+                if not step_text.isdigit() or int(step_text) == 0:
+                    raise InvalidCronExpressionError(f"Invalid step '{step_text}' for {self.name} in cron expression "
+                                                     f"'{expression}'")
+                step = int(step_text)
+            if range_text == "*":
+                start, end = self.minimum, self.maximum
+            elif "-" in range_text:
+                start_text, _, end_text = range_text.partition("-")
+                start, end = self._value(start_text, expression), self._value(end_text, expression)
+                if start > end:
+                    raise InvalidCronExpressionError(f"Invalid range '{range_text}' for {self.name} in cron expression "
+                                                     f"'{expression}': the start of a range can not be after its end")
+            else:
+                start = self._value(range_text, expression)
+                end = self.maximum if has_step else start
+            values.update(range(start, end + 1, step))
+        if self.modulo:
+            return frozenset(value % self.modulo for value in values)
+        return frozenset(values)
+
+
+FIELDS = (
+    CronField("minute", "minutes", 0, 59),
+    CronField("hour", "hours", 0, 23),
+    CronField("day_of_month", "days_of_month", 1, 31),
+    CronField("month", "months", 1, 12,
+              names=("JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC")),
+    CronField("day_of_week", "days_of_week", 0, 7, names=("SUN", "MON", "TUE", "WED", "THU", "FRI", "SAT"), modulo=7),
+)
+ALL_VALUES = {f.attribute: frozenset(range(f.minimum, (f.modulo or f.maximum + 1))) for f in FIELDS}
+
+
+@dataclass
+class AdfCronExpression:
+    """A parsed 5-field cron expression
+
+    Every field is parsed into the set of values it matches. As in cron, if both the day of the month and the day of
+    the week are restricted (i.e. do not start with `*`), a day matches if either of them matches.
+
+    Raises: InvalidCronExpressionError if any of the fields can not be parsed
+    """
+    minute: Union[str, int]
+    hour: Union[str, int]
+    day_of_month: Union[str, int]
+    month: Union[str, int]
+    day_of_week: Union[str, int]
+
+    minutes: FrozenSet[int] = field(init=False)
+    hours: FrozenSet[int] = field(init=False)
+    days_of_month: FrozenSet[int] = field(init=False)
+    months: FrozenSet[int] = field(init=False)
+    days_of_week: FrozenSet[int] = field(init=False)
+
+    def __post_init__(self):
+        for cron_field in FIELDS:
+            setattr(self, cron_field.attribute, cron_field.parse(str(getattr(self, cron_field.name)), str(self)))
+
+    def __str__(self) -> str:
+        return f"{self.minute} {self.hour} {self.day_of_month} {self.month} {self.day_of_week}"
+
+    @classmethod
+    def parse(cls, expression: str) -> "AdfCronExpression":
+        """Parse a cron expression consisting of 5 fields separated by whitespace, or a preset like `@daily`
+
+        Raises: InvalidCronExpressionError if the expression can not be parsed
+        """
+        components = PRESETS.get(expression.strip(), expression).split()
+        if len(components) != 5:
+            raise InvalidCronExpressionError(f"The provided cron expression: {expression} has the wrong number of "
+                                             f"components. There should be 5")
+        return cls(*components)
+
+    def is_full(self, attribute: str) -> bool:
+        return getattr(self, attribute) == ALL_VALUES[attribute]
+
+    @property
+    def day_of_month_restricted(self) -> bool:
+        return not str(self.day_of_month).startswith("*")
+
+    @property
+    def day_of_week_restricted(self) -> bool:
+        return not str(self.day_of_week).startswith("*")
+
+    def matches(self, moment: datetime) -> bool:
+        """Whether this expression fires at the (minute of the) given moment"""
+        if moment.minute not in self.minutes or moment.hour not in self.hours or moment.month not in self.months:
+            return False
+        day_of_month = moment.day in self.days_of_month
+        day_of_week = (moment.weekday() + 1) % 7 in self.days_of_week
+        if self.day_of_month_restricted and self.day_of_week_restricted:
+            return day_of_month or day_of_week
+        return day_of_month and day_of_week
+
+
+def _cyclic_step(values: FrozenSet[int], size: int) -> Optional[int]:
+    """The step between the values, if they are evenly spaced across a cycle of the given size (e.g. `*/15` or `5/20`
+    for minutes), otherwise None
+    """
+    if size % len(values):
+        return None
+    step = size // len(values)
+    first = min(values)
+    return step if all(first + i * step in values for i in range(len(values))) else None
+
+
+@dataclass(frozen=True)
+class CompiledSchedule:
+    """The most compact ADF recurrence equivalent to a cron expression, independent of start time and time zone
+
+    Use `to_recurrence` to create the SDK object. For interval-based recurrences (every N minutes, hours or months),
+    ADF counts from the start time, so the start time is moved forward to the first moment the cron expression fires.
+    """
+    expression: AdfCronExpression
+    frequency: str
+    interval: int = 1
+    minutes: Optional[Tuple[int, ...]] = None
+    hours: Optional[Tuple[int, ...]] = None
+    week_days: Optional[Tuple[str, ...]] = None
+    month_days: Optional[Tuple[int, ...]] = None
+    monthly_occurrences: Optional[Tuple[Tuple[str, int], ...]] = None
+
+    def align_start_time(self, start_time: datetime) -> datetime:
+        """The first moment on or after start_time from which the recurrence matches the cron expression"""
+        if self.frequency in ("Minute", "Hour"):
+            moment = start_time.replace(second=0, microsecond=0)
+            if moment < start_time:
+                moment += timedelta(minutes=1)
+            # Minute and hour recurrences repeat within a day
+            for _ in range(24 * 60):
+                if self.expression.matches(moment):
+                    return moment
+                moment += timedelta(minutes=1)
+        if self.frequency == "Month" and self.interval > 1 and start_time.month not in self.expression.months:
+            year, month = start_time.year, start_time.month
+            while month not in self.expression.months:
+                year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+            return start_time.replace(year=year, month=month, day=1, hour=0, minute=0, second=0, microsecond=0)
+        return start_time
+
+    def to_recurrence(self, start_time: datetime, time_zone: str = "UTC") -> "ScheduleTriggerRecurrence":
+        from azure.mgmt.datafactory.models import (  # type: ignore
+            RecurrenceSchedule,
+            RecurrenceScheduleOccurrence,
+            ScheduleTriggerRecurrence,
+        )
+
+        schedule = None
+        if self.hours is not None:
+            schedule = RecurrenceSchedule(
+                minutes=list(self.minutes or ()),
+                hours=list(self.hours),
+                week_days=list(self.week_days) if self.week_days else None,
+                month_days=list(self.month_days) if self.month_days else None,
+                monthly_occurrences=[
+                    RecurrenceScheduleOccurrence(day=day, occurrence=occurrence)
+                    for day, occurrence in self.monthly_occurrences
+                ] if self.monthly_occurrences else None,
+            )
+        return ScheduleTriggerRecurrence(frequency=self.frequency,
+                                         interval=self.interval,
+                                         start_time=self.align_start_time(start_time),
+                                         time_zone=time_zone,
+                                         schedule=schedule)
+
+    def to_recurrence_json(self, start_time: datetime, time_zone: str = "UTC") -> Dict[str, Any]:
+        """Serialize the recurrence directly, producing the same JSON as serializing `to_recurrence()` with the SDK"""
+        schedule = None
+        if self.hours is not None:
+            schedule = without_none({
+                "minutes": [int(minute) for minute in self.minutes or ()],
+                "hours": [int(hour) for hour in self.hours],
+                "weekDays": [serialize_str(day) for day in self.week_days] if self.week_days else None,
+                "monthDays": [int(day) for day in self.month_days] if self.month_days else None,
+                "monthlyOccurrences": [
+                    without_none({"day": serialize_str(day), "occurrence": occurrence})
+                    for day, occurrence in self.monthly_occurrences
+                ] if self.monthly_occurrences else None,
+            })
+        return without_none({
+            "frequency": serialize_str(self.frequency),
+            "interval": int(self.interval),
+            "startTime": serialize_datetime(self.align_start_time(start_time)),
+            "timeZone": time_zone,
+            "schedule": schedule,
+        })
+
+
+def _every_n_minutes(cron: AdfCronExpression) -> Optional[CompiledSchedule]:
+    # e.g. `* * * * *` or `*/15 * * * *`
+    step = _cyclic_step(cron.minutes, 60)
+    if cron.is_full("hours") and step is not None and step < 60:
+        return CompiledSchedule(cron, "Minute", step)
+    return None
+
+
+def _every_n_hours(cron: AdfCronExpression) -> Optional[CompiledSchedule]:
+    # e.g. `5 * * * *` or `0 */6 * * *`
+    step = _cyclic_step(cron.hours, 24)
+    if len(cron.minutes) == 1 and step is not None and step < 24:
+        return CompiledSchedule(cron, "Hour", step)
+    return None
+
+
+def _daily(cron: AdfCronExpression) -> Optional[CompiledSchedule]:
+    # e.g. `30 6,18 * * *`
+    return CompiledSchedule(cron, "Day", 1, tuple(sorted(cron.minutes)), tuple(sorted(cron.hours)))
+
+
+def _weekly(cron: AdfCronExpression) -> Optional[CompiledSchedule]:
+    # e.g. `0 8 * * MON-FRI`
+    return CompiledSchedule(cron, "Week", 1, tuple(sorted(cron.minutes)), tuple(sorted(cron.hours)),
+                            week_days=tuple(WEEK_DAYS[day] for day in sorted(cron.days_of_week)))
+
+
+def _month_interval(cron: AdfCronExpression) -> int:
+    if cron.is_full("months"):
+        return 1
+    step = _cyclic_step(cron.months, 12)
+    if step is None:
+        raise NotSupportedError(f"The cron expression '{cron}' can not be represented in ADF: ADF can only skip months "
+                                f"using a monthly interval, so the months should be evenly spaced across the year "
+                                f"(e.g. */3), got {sorted(cron.months)}")
+    return step
+
+
+def _monthly(cron: AdfCronExpression) -> Optional[CompiledSchedule]:
+    # e.g. `0 0 1,15 * *` or `0 0 1 */3 *`
+    return CompiledSchedule(cron, "Month", _month_interval(cron), tuple(sorted(cron.minutes)),
+                            tuple(sorted(cron.hours)), month_days=tuple(sorted(cron.days_of_month)))
+
+
+def _every_day_of_some_months(cron: AdfCronExpression) -> Optional[CompiledSchedule]:
+    # e.g. `0 0 * */6 *`. ADF skips month days that do not exist in a month, like cron does.
+    return CompiledSchedule(cron, "Month", _month_interval(cron), tuple(sorted(cron.minutes)),
+                            tuple(sorted(cron.hours)), month_days=tuple(range(1, 32)))
+
+
+def _monthly_by_week_day(cron: AdfCronExpression) -> Optional[CompiledSchedule]:
+    # e.g. `0 0 * JAN,JUL MON`: every occurrence of the week days within the selected months
+    return CompiledSchedule(cron, "Month", _month_interval(cron), tuple(sorted(cron.minutes)),
+                            tuple(sorted(cron.hours)), monthly_occurrences=tuple(
+                                (WEEK_DAYS[day], occurrence)
+                                for day in sorted(cron.days_of_week) for occurrence in range(1, 6)))
+
+
+Rule = Callable[[AdfCronExpression], Optional[CompiledSchedule]]
+
+# Rules to try, in order, per kind of day selection and whether all months are selected. The first rule that returns
+# a schedule wins, so more compact recurrences come first.
+RULES: Dict[Tuple[str, bool], Tuple[Rule, ...]] = {
+    ("every_day", True): (_every_n_minutes, _every_n_hours, _daily),
+    ("every_day", False): (_every_day_of_some_months,),
+    ("week_days", True): (_weekly,),
+    ("week_days", False): (_monthly_by_week_day,),
+    ("month_days", True): (_monthly,),
+    ("month_days", False): (_monthly,),
+}
+
+
+def _day_selection(cron: AdfCronExpression) -> str:
+    week_days = not cron.is_full("days_of_week")
+    month_days = not cron.is_full("days_of_month")
+    if cron.day_of_month_restricted and cron.day_of_week_restricted:
+        # A day matches if either field matches
+        if week_days and month_days:
+            raise NotSupportedError(f"The cron expression '{cron}' can not be represented in ADF: cron runs on days "
+                                    f"that match either the day of the month or the day of the week, while ADF "
+                                    f"schedules can not combine days of the month with days of the week")
+        return "every_day"
+    if week_days and month_days:
+        # e.g. `0 0 */2 * */2`, as a field starting with `*` means a day has to match both fields
+        raise NotSupportedError(f"The cron expression '{cron}' can not be represented in ADF: cron runs on days that "
+                                f"match both the day of the month and the day of the week, while ADF schedules can "
+                                f"not combine days of the month with days of the week")
+    if week_days:
+        return "week_days"
+    if month_days:
+        return "month_days"
+    return "every_day"
+
+
+@lru_cache(maxsize=None)
+def _compile(expression: str) -> CompiledSchedule:
+    cron = AdfCronExpression.parse(expression)
+    for rule in RULES[(_day_selection(cron), cron.is_full("months"))]:
+        compiled = rule(cron)
+        if compiled is not None:
+            return compiled
+    raise NotSupportedError(f"The cron expression '{expression}' can not be represented in ADF")  # pragma: no cover
+
+
+def compile_cron(expression: str) -> CompiledSchedule:
+    """Compile a cron expression (or preset like `@daily`) into the most compact equivalent ADF recurrence
+
+    Every distinct expression is compiled once per process, as many pipelines typically share a few schedules.
+
+    Raises:
+        InvalidCronExpressionError if the expression can not be parsed
+        NotSupportedError if the expression can not be represented by an ADF schedule, explaining why
+
+    Returns:
+        The CompiledSchedule
+    """
+    return _compile(" ".join(expression.split()))
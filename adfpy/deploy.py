@@ -1,19 +1,40 @@
-import importlib.util
+import json
 import logging
 import os
 import sys
 
 import click
 
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
-from typing import Set, List
-
-from azure.identity import ClientSecretCredential
-from azure.mgmt.datafactory import DataFactoryManagementClient  # type: ignore
-
-from adfpy.error import PipelineModuleParseException
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from adfpy.diff import (
+    ChangeSet,
+    LocalHashes,
+    RemoteDefinitions,
+    RemoteResource,
+    compute_change_set,
+    compute_local_hashes,
+    definition_hash,
+    trigger_definition_hash,
+)
+from adfpy.error import DeploymentError, InvalidPipelineError, PipelineDependencyError
+from adfpy.load_profile import LoadProfiler
+from adfpy.loader import load_pipelines_by_file, load_pipelines_from_file, load_pipelines_from_path  # noqa: F401
+from adfpy.manifest import DeployManifest, build_manifest, load_manifest, save_manifest
 from adfpy.pipeline import AdfPipeline
+from adfpy.selection import PipelineSelection
+from adfpy.serialize import accept_json_payloads, request_body
+from adfpy.telemetry import DeployTelemetry, deploy_phase
+from adfpy.throttling import AsyncRequestScheduler, RequestScheduler, RetryPolicy, ScheduledClient, subscription_budget
+from adfpy.throughput import CopyThroughputSettings, set_factory_copy_throughput
+from adfpy.trigger_control import TriggerController
+
+if TYPE_CHECKING:
+    from azure.mgmt.datafactory import DataFactoryManagementClient  # type: ignore
 
 stdout_handler = logging.StreamHandler(stream=sys.stdout)
 handlers = [stdout_handler]
@@ -25,12 +46,19 @@ logging.basicConfig(
 logger = logging.getLogger("adfPy")
 logger.setLevel(os.getenv("LOG_LEVEL", logging.INFO))
 
+DEFAULT_CONCURRENCY = 8
+
 
 @dataclass
 class ConfiguredDataFactory:
     resource_group: str
     name: str
-    client: DataFactoryManagementClient
+    client: "DataFactoryManagementClient"
+    credential: Any = None
+
+    @property
+    def identifier(self) -> str:
+        return f"{self.resource_group}/{self.name}"
 
 
 # global variable to store which pipelines have been processed
@@ -48,99 +76,415 @@ def fetch_existing_pipelines(adf: ConfiguredDataFactory) -> List[str]:
     Returns:
         List of pipeline names found in the configured Azure Data Factory
     """
+    # The SDK annotates `list_by_factory` as returning list responses, but it iterates the resources in them
     return [
-        x.name for x in adf.client.pipelines.list_by_factory(resource_group_name=adf.resource_group,
-                                                             factory_name=adf.name)
+        x.name for x in adf.client.pipelines.list_by_factory(  # type: ignore[attr-defined]
+            resource_group_name=adf.resource_group, factory_name=adf.name)
     ]
 
 
-def load_pipelines_from_file(file_path: Path) -> Set[AdfPipeline]:
-    """Load all AdfPipeline objects from a file
+def fetch_remote_definitions(adf: ConfiguredDataFactory) -> RemoteDefinitions:
+    """Fetch the definitions of all existing pipelines and triggers from the Azure Data Factory instance
 
-    This function only works with single files. Raises IsADirectoryError if the provided path is a directory
+    The `list_by_factory` operations already return the full resources, so a single (paged) listing per resource type
+    is sufficient. Only the canonical hashes of the definitions are kept.
 
     Args:
-        file_path:
+        adf: authorized data factory client
+
+    Returns:
+        RemoteDefinitions with the hashed pipelines and triggers found in the configured Azure Data Factory
+    """
+    remote = RemoteDefinitions()
+    # The SDK annotates `list_by_factory` as returning list responses, but it iterates the resources in them
+    for pipeline in adf.client.pipelines.list_by_factory(resource_group_name=adf.resource_group,
+                                                         factory_name=adf.name):
+        remote.pipelines[pipeline.name] = RemoteResource(  # type: ignore[attr-defined]
+            hash=definition_hash(pipeline), etag=pipeline.etag)  # type: ignore[attr-defined]
+    for trigger in adf.client.triggers.list_by_factory(resource_group_name=adf.resource_group,
+                                                       factory_name=adf.name):
+        remote.triggers[trigger.name] = RemoteResource(  # type: ignore[attr-defined]
+            hash=trigger_definition_hash(trigger),
+            etag=trigger.etag,  # type: ignore[attr-defined]
+            hash_without_start_time=trigger_definition_hash(trigger, ignore_start_time=True),
+        )
+    return remote
+
+
+def compute_change_set_from_manifest(pipelines: Iterable[AdfPipeline],
+                                     adf: ConfiguredDataFactory,
+                                     manifest: DeployManifest,
+                                     local: Optional[LocalHashes] = None,
+                                     concurrency: int = DEFAULT_CONCURRENCY
+                                     ) -> Tuple[ChangeSet, Dict[str, Optional[str]], Dict[str, Optional[str]]]:
+    """Determine which pipelines and triggers have to be written, based on a manifest of the previous deployment
+
+    Resources whose local hash matches the manifest are considered unchanged, without reading anything from ADF.
+    Only the remaining "suspect" resources are re-checked with the factory: if the ETag in the manifest is still
+    current, the resource has not changed in ADF since the previous deployment, and has to be written. Otherwise, the
+    current definition in ADF is compared with the local definition.
 
-    Raises: IsADirectoryError if the provided path is a directory
+    Args:
+        pipelines: AdfPipeline objects to compare
+        adf: ConfiguredDataFactory object
+        manifest: DeployManifest of the previous deployment
+        local: precomputed hashes of the pipelines. Computed if not provided.
+        concurrency: maximum number of resources re-checked at the same time
 
     Returns:
-        Set of AdfPipeline objects found in the provided file
-    """
-    if file_path.is_dir():
-        raise IsADirectoryError("load_pipelines_from_file is not intended to load pipelines from a directory."
-                                "Please use load_pipelines_from_path instead")
-    mod_spec = importlib.util.spec_from_file_location(
-        "main",
-        file_path,
-    )
-    if mod_spec:
-        module = importlib.util.module_from_spec(mod_spec)
-        mod_spec.loader.exec_module(module)  # type: ignore
-        return set(var for var in vars(module).values() if isinstance(var, AdfPipeline))
-    else:
-        raise PipelineModuleParseException(f"Could not parse module spec from path {file_path}")
+        Tuple of the ChangeSet, and the known ETags of the unchanged pipelines and triggers
+    """
+    pipelines = list(pipelines)
+    if local is None:
+        local = compute_local_hashes(pipelines)
+    changes = ChangeSet()
+    pipeline_etags: Dict[str, Optional[str]] = {}
+    trigger_etags: Dict[str, Optional[str]] = {}
+    suspects: List[Tuple[Any, ...]] = []
+    for pipeline in pipelines:
+        entry = manifest.pipelines.get(pipeline.name)
+        if entry and entry.hash == local.pipelines[pipeline.name]:
+            pipeline_etags[pipeline.name] = entry.etag
+        else:
+            suspects.append((adf.client.pipelines, pipeline.name, entry, local.pipelines[pipeline.name],
+                             changes.pipelines, pipeline_etags, definition_hash))
+        if pipeline.schedule:
+            trigger_name = pipeline.schedule.name
+            entry = manifest.triggers.get(trigger_name)
+            if entry and entry.hash == local.triggers[trigger_name]:
+                trigger_etags[trigger_name] = entry.etag
+            else:
+                trigger_hash = partial(trigger_definition_hash, ignore_start_time=not pipeline.explicit_start_time)
+                suspects.append((adf.client.triggers, trigger_name, entry, local.triggers[trigger_name],
+                                 changes.triggers, trigger_etags, trigger_hash))
+
+    from azure.core.exceptions import ResourceNotFoundError
+
+    def recheck(operations, name, entry, local_hash, changed, etags, hash_function):
+        try:
+            remote = operations.get(adf.resource_group, adf.name, name, if_none_match=entry.etag if entry else None)
+        except ResourceNotFoundError:
+            changed.add(name)
+            return
+        if remote is not None and hash_function(remote) == local_hash:
+            etags[name] = remote.etag
+        else:
+            changed.add(name)
+
+    logger.info(f"Re-checking {len(suspects)} changed resources with the factory")
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="adfpy-recheck") as executor:
+        for future in [executor.submit(recheck, *suspect) for suspect in suspects]:
+            future.result()
+    return changes, pipeline_etags, trigger_etags
 
 
-def load_pipelines_from_path(path: Path, pipelines: Set[AdfPipeline] = None) -> Set[AdfPipeline]:
-    """Load all AdfPipeline objects from a given path.
+@dataclass
+class DeploymentResult:
+    """Outcome of deploying a set of pipelines
+
+    Attributes:
+        deployed: names of the pipelines that were created/updated (or would have been, in a dry-run)
+        failed: mapping of pipeline name to the exception raised while deploying it
+        blocked: names of the pipelines that were not deployed because a pipeline they depend on failed
+        pipeline_etags: ETags ADF returned for the written pipelines, indexed by name
+        trigger_etags: ETags ADF returned for the written triggers, indexed by name
+        failed_triggers: mapping of trigger name to the exception raised while stopping or starting it
+        trigger_downtime: number of seconds every trigger stopped for the deployment was stopped, indexed by name
+    """
+    deployed: List[str] = field(default_factory=list)
+    failed: Dict[str, BaseException] = field(default_factory=dict)
+    blocked: List[str] = field(default_factory=list)
+    pipeline_etags: Dict[str, Optional[str]] = field(default_factory=dict)
+    trigger_etags: Dict[str, Optional[str]] = field(default_factory=dict)
+    failed_triggers: Dict[str, BaseException] = field(default_factory=dict)
+    trigger_downtime: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def succeeded(self) -> bool:
+        return not self.failed and not self.blocked and not self.failed_triggers
 
-    The path can be either a directory or a file. If it's a directory, the function will recursively step through
-    the directory structure and look for all `.py` files. The pipelines parameter of this function is used for this
-    recursion.
+
+def collect_pipelines(pipelines: Iterable[AdfPipeline]) -> Dict[str, AdfPipeline]:
+    """Collect the provided pipelines and all pipelines they (transitively) depend on, indexed by name
 
     Args:
-        path: Path to scan for AdfPipeline objects
-        pipelines: Set of AdfPipelines found. Used for recursively adding pipelines as they are found
+        pipelines: AdfPipeline objects to start from
 
     Returns:
-        The final set of AdfPipelines found in the path
-    """
-    if not pipelines:
-        pipelines = set()
-    child_elements = path.glob("**/*.py")
-    for el in child_elements:
-        if el.is_dir():
-            load_pipelines_from_path(el, pipelines)
-        else:
-            pipelines = pipelines.union(load_pipelines_from_file(el))
-    return pipelines
+        Dictionary mapping pipeline name to AdfPipeline object. Pipelines passed in directly take precedence over
+        pipelines that are only reachable through `depends_on_pipelines`.
+    """
+    collected = {p.name: p for p in pipelines}
+    to_visit = list(collected.values())
+    while to_visit:
+        pipeline = to_visit.pop()
+        for required_pipeline in pipeline.depends_on_pipelines:
+            if required_pipeline.name not in collected:
+                collected[required_pipeline.name] = required_pipeline
+                to_visit.append(required_pipeline)
+    return collected
+
+
+def compute_deployment_waves(pipelines: Iterable[AdfPipeline]) -> List[List[AdfPipeline]]:
+    """Sort pipelines into dependency "waves"
+
+    Every pipeline in a wave only depends on pipelines in earlier waves, so all pipelines within a single wave can
+    be deployed concurrently. Pipelines that are only reachable through `depends_on_pipelines` are included.
+
+    Args:
+        pipelines: AdfPipeline objects to sort
+
+    Raises: PipelineDependencyError if the dependencies between the pipelines contain a cycle
+
+    Returns:
+        List of waves, each wave being a list of AdfPipeline objects sorted by name
+    """
+    collected = collect_pipelines(pipelines)
+    remaining_dependencies = {
+        name: {p.name for p in pipeline.depends_on_pipelines} for name, pipeline in collected.items()
+    }
+    dependents: Dict[str, List[str]] = {name: [] for name in collected}
+    for name, required_names in remaining_dependencies.items():
+        for required_name in required_names:
+            dependents[required_name].append(name)
+
+    waves = []
+    current_wave = sorted(name for name, required_names in remaining_dependencies.items() if not required_names)
+    while current_wave:
+        waves.append([collected[name] for name in current_wave])
+        next_wave = []
+        for name in current_wave:
+            for dependent in dependents[name]:
+                remaining_dependencies[dependent].discard(name)
+                if not remaining_dependencies[dependent]:
+                    next_wave.append(dependent)
+        current_wave = sorted(next_wave)
+
+    unresolved = sorted(name for name, required_names in remaining_dependencies.items() if required_names)
+    if unresolved:
+        raise PipelineDependencyError(f"Could not determine a deployment order, the following pipelines have cyclic "
+                                      f"dependencies: {unresolved}")
+    return waves
+
+
+def validate_pipelines(pipelines: Iterable[AdfPipeline]):
+    """Validate the activities of pipelines, using `AdfPipeline.validate`
+
+    Args:
+        pipelines: AdfPipeline objects to validate
+
+    Raises: InvalidPipelineError describing the problems of all invalid pipelines
+    """
+    problems = []
+    for pipeline in sorted(pipelines, key=lambda p: p.name):
+        try:
+            pipeline.validate()
+        except InvalidPipelineError as e:
+            problems.append(str(e))
+    if problems:
+        raise InvalidPipelineError("\n".join(problems))
+
+
+def write_pipeline(adf: ConfiguredDataFactory,
+                   pipeline: AdfPipeline,
+                   dry_run: bool = False,
+                   write_definition: bool = True,
+                   write_trigger: bool = True):
+    """Create or update a single pipeline, and its trigger if it has one, in Azure Data Factory
+
+    The trigger is only written after the pipeline itself has been written, as ADF rejects triggers that reference
+    pipelines that do not exist (yet).
+
+    Args:
+        adf: ConfiguredDataFactory object
+        pipeline: AdfPipeline object based on provided configuration
+        dry_run: boolean indicating whether the actions are to be executed as a dry-run. Defaults to False.
+        write_definition: whether to write the pipeline definition itself. Defaults to True.
+        write_trigger: whether to write the trigger of the pipeline, if it has one. Defaults to True.
+
+    Returns:
+        Tuple of the pipeline and trigger resources returned by ADF. Either is None if it was not written.
+    """
+    written_pipeline = written_trigger = None
+    if write_definition:
+        logger.info(f"Creating/updating pipeline {pipeline.name}")
+        if not dry_run:
+            with deploy_phase("serialize", pipeline=pipeline.name):
+                definition = request_body(pipeline, adf.client.pipelines)
+            written_pipeline = adf.client.pipelines.create_or_update(adf.resource_group,
+                                                                     adf.name,
+                                                                     pipeline.name,
+                                                                     definition)
+    if pipeline.schedule and write_trigger:
+        logger.info(f"Creating/updating trigger for {pipeline.name}")
+        if not dry_run:
+            with deploy_phase("serialize", trigger=pipeline.schedule.name):
+                trigger = request_body(pipeline.schedule, adf.client.triggers)
+            written_trigger = adf.client.triggers.create_or_update(adf.resource_group,
+                                                                   adf.name,
+                                                                   pipeline.schedule.name,
+                                                                   trigger)
+    return written_pipeline, written_trigger
+
+
+def pending_writes(pipeline: AdfPipeline, changes: Optional[ChangeSet]) -> Tuple[bool, bool]:
+    """Determine whether the definition and the trigger of a pipeline have to be written
+
+    Args:
+        pipeline: AdfPipeline object
+        changes: ChangeSet of the deployment, or None if everything has to be written
+
+    Returns:
+        Tuple of booleans indicating whether the pipeline definition and its trigger have to be written
+    """
+    if changes is None:
+        return True, pipeline.schedule is not None
+    return (pipeline.name in changes.pipelines,
+            pipeline.schedule is not None and pipeline.schedule.name in changes.triggers)
+
+
+def deploy_pipelines(pipelines: Iterable[AdfPipeline],
+                     adf: ConfiguredDataFactory,
+                     dry_run: bool = False,
+                     concurrency: int = DEFAULT_CONCURRENCY,
+                     skip_pipelines_names: Iterable[str] = (),
+                     changes: Optional[ChangeSet] = None,
+                     manage_triggers: bool = False) -> DeploymentResult:
+    """Deploy pipelines wave by wave, using a bounded pool of workers
+
+    The pipelines (and the pipelines they depend on) are sorted into dependency waves using
+    `compute_deployment_waves`. The pipelines of a single wave are deployed concurrently, using at most `concurrency`
+    workers. A wave is only started once the previous wave has finished. If deploying a pipeline fails, only the
+    pipelines that (transitively) depend on it are blocked; all other pipelines are still deployed.
+
+    Every successfully deployed pipeline is added to the global `processed_pipelines_names`.
+
+    Args:
+        pipelines: Set of AdfPipeline objects to deploy
+        adf: ConfiguredDataFactory object
+        dry_run: boolean indicating whether the actions are to be executed as a dry-run. Defaults to False.
+        concurrency: maximum number of pipelines deployed at the same time
+        skip_pipelines_names: names of pipelines that have already been processed. These are taken into account
+            for the ordering, but are not written again.
+        changes: if provided, only the pipelines and triggers in this ChangeSet are written. All other pipelines are
+            considered to be up-to-date in ADF already. If not provided, all pipelines and triggers are written.
+        manage_triggers: stop the running triggers that are about to be written before the first wave, and start
+            them (and the newly created triggers) again after the last wave, using a `TriggerController`. Defaults to
+            False.
+
+    Raises: InvalidPipelineError if the activities of any of the pipelines are invalid. Nothing is deployed in that
+        case.
+
+    Returns:
+        DeploymentResult describing which pipelines were deployed, failed, or blocked. Pipelines that were already
+        up-to-date are not part of `deployed`.
+    """
+    if concurrency < 1:
+        raise ValueError(f"Concurrency should be at least 1, got {concurrency}")
+    skip_pipelines_names = set(skip_pipelines_names)
+    waves = compute_deployment_waves(pipelines)
+    validate_pipelines(p for wave in waves for p in wave if p.name not in skip_pipelines_names)
+    result = DeploymentResult()
+    unavailable: Set[str] = set()
+    affected_triggers = {
+        p.schedule.name: p.name for wave in waves for p in wave
+        if p.name not in skip_pipelines_names and pending_writes(p, changes)[1]
+    }
+    controller = TriggerController(adf, dry_run, concurrency) if manage_triggers else None
+    if controller:
+        with deploy_phase("trigger", action="stop"):
+            controller.stop(affected_triggers)
+    try:
+        with deploy_phase("write"):
+            _deploy_waves(waves, adf, dry_run, concurrency, skip_pipelines_names, changes, result, unavailable)
+    finally:
+        if controller:
+            deployed = set(result.deployed)
+            with deploy_phase("trigger", action="start"):
+                controller.start(name for name, pipeline_name in affected_triggers.items()
+                                 if pipeline_name in deployed)
+            result.failed_triggers.update(controller.failed)
+            result.trigger_downtime.update(controller.downtime)
+    return result
+
+
+def _deploy_waves(waves: List[List[AdfPipeline]],
+                  adf: ConfiguredDataFactory,
+                  dry_run: bool,
+                  concurrency: int,
+                  skip_pipelines_names: Set[str],
+                  changes: Optional[ChangeSet],
+                  result: DeploymentResult,
+                  unavailable: Set[str]):
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="adfpy-deploy") as executor:
+        for wave in waves:
+            futures = {}
+            for pipeline in wave:
+                blocking_pipelines = [p.name for p in pipeline.depends_on_pipelines if p.name in unavailable]
+                if blocking_pipelines:
+                    logger.error(f"Not deploying pipeline {pipeline.name}, because the pipelines it depends on "
+                                 f"were not deployed: {blocking_pipelines}")
+                    result.blocked.append(pipeline.name)
+                    unavailable.add(pipeline.name)
+                elif pipeline.name in skip_pipelines_names:
+                    if pipeline.name not in processed_pipelines_names:
+                        processed_pipelines_names.append(pipeline.name)
+                else:
+                    write_definition, write_trigger = pending_writes(pipeline, changes)
+                    if write_definition or write_trigger:
+                        futures[executor.submit(write_pipeline, adf, pipeline, dry_run, write_definition,
+                                                write_trigger)] = pipeline.name
+                    else:
+                        logger.debug(f"Pipeline {pipeline.name} is up-to-date")
+                        if pipeline.name not in processed_pipelines_names:
+                            processed_pipelines_names.append(pipeline.name)
+
+            for future in as_completed(futures):
+                name = futures[future]
+                error = future.exception()
+                if error:
+                    logger.error(f"Failed to deploy pipeline {name}: {error}")
+                    result.failed[name] = error
+                    unavailable.add(name)
+                else:
+                    written_pipeline, written_trigger = future.result()
+                    if written_pipeline is not None:
+                        result.pipeline_etags[name] = written_pipeline.etag
+                    if written_trigger is not None:
+                        result.trigger_etags[written_trigger.name] = written_trigger.etag
+                    result.deployed.append(name)
+                    if name not in processed_pipelines_names:
+                        processed_pipelines_names.append(name)
 
 
 def create_or_update_pipeline(adf: ConfiguredDataFactory,
                               pipeline: AdfPipeline,
-                              dry_run: bool = False):
+                              dry_run: bool = False,
+                              concurrency: int = DEFAULT_CONCURRENCY):
     """Create or update a pipeline in Azure Data Factory based on the provided pipeline definition
 
-    This function will also ensure that any pipelines that the provided pipeline depends on are created first. To
-    achieve this, it makes use of the `processed_pipelines_names` global variable. After creating/updating a pipeline,
-    this function will ensure that pipeline is added to this global, so it will not be created/updated again.
+    This function will also ensure that any pipelines that the provided pipeline depends on are created first. Any
+    pipeline already in the `processed_pipelines_names` global variable is not created/updated again.
 
     Args:
         adf: ConfiguredDataFactory object
         pipeline: AdfPipeline object based on provided configuration
         dry_run: boolean indicating whether the actions are to be executed as a dry-run. Defaults to False.
+        concurrency: maximum number of pipelines deployed at the same time
+
+    Raises: DeploymentError if the pipeline, or any of the pipelines it depends on, could not be deployed
     """
-    for required_pipeline in pipeline.depends_on_pipelines:
-        # We only process a required pipeline if it hasn't been processed before
-        if required_pipeline.name not in processed_pipelines_names:
-            create_or_update_pipeline(adf, required_pipeline, dry_run)
-    logger.info(f"Creating/updating pipeline {pipeline.name}")
-    if not dry_run:
-        adf.client.pipelines.create_or_update(adf.resource_group, adf.name, pipeline.name, pipeline.to_adf())
-    if pipeline.schedule:
-        logger.info(f"Creating/updating trigger for {pipeline.name}")
-        if not dry_run:
-            adf.client.triggers.create_or_update(adf.resource_group,
-                                                 adf.name,
-                                                 pipeline.schedule.name,
-                                                 pipeline.schedule.to_adf())
-    processed_pipelines_names.append(pipeline.name)
+    already_processed = set(processed_pipelines_names) - {pipeline.name}
+    result = deploy_pipelines([pipeline], adf, dry_run, concurrency, skip_pipelines_names=already_processed)
+    _raise_for_result(result)
 
 
 def ensure_all_pipelines_up_to_date(pipelines: Set[AdfPipeline],
                                     adf: ConfiguredDataFactory,
-                                    dry_run: bool = False):
+                                    dry_run: bool = False,
+                                    concurrency: int = DEFAULT_CONCURRENCY,
+                                    changes: Optional[ChangeSet] = None,
+                                    manage_triggers: bool = False) -> DeploymentResult:
     """Create or update pipelines in ADF based on a provided set of pipelines.
 
     This function checks with the global `processed_pipelines_names` variable to avoid duplicate processing.
@@ -151,13 +495,33 @@ def ensure_all_pipelines_up_to_date(pipelines: Set[AdfPipeline],
         pipelines: Set of AdfPipeline objects retrieved from the local path
         adf: ConfiguredDataFactory object
         dry_run: boolean indicating whether the actions are to be executed as a dry-run. Defaults to False.
+        concurrency: maximum number of pipelines deployed at the same time
+        changes: if provided, only the pipelines and triggers in this ChangeSet are written
+        manage_triggers: stop the affected triggers during the deployment, see `deploy_pipelines`
+
+    Raises: DeploymentError if any of the pipelines could not be deployed, or any of the triggers could not be
+        stopped or started
+
+    Returns:
+        DeploymentResult of the deployment
     """
-    for p in pipelines:
-        if p.name not in processed_pipelines_names:
-            create_or_update_pipeline(adf, p, dry_run)
+    result = deploy_pipelines(pipelines, adf, dry_run, concurrency, skip_pipelines_names=processed_pipelines_names,
+                              changes=changes, manage_triggers=manage_triggers)
+    _raise_for_result(result)
+    return result
+
+
+def _raise_for_result(result: DeploymentResult):
+    if not result.succeeded:
+        raise DeploymentError(f"Deployment failed. Failed pipelines: {sorted(result.failed)}. "
+                              f"Pipelines not deployed because of failed dependencies: {sorted(result.blocked)}. "
+                              f"Triggers that could not be stopped or started: {sorted(result.failed_triggers)}")
 
 
-def remove_stale_pipelines(adf: ConfiguredDataFactory, dry_run: bool = False):
+def remove_stale_pipelines(adf: ConfiguredDataFactory,
+                           dry_run: bool = False,
+                           existing_pipelines: Optional[Iterable[str]] = None,
+                           keep_pipelines_names: Optional[Iterable[str]] = None):
     """Removes any pipelines that are (no longer) available in the configured (local) pipeline path
 
     This function is destructive, as any pipeline not managed by adfPy will be removed.
@@ -165,10 +529,15 @@ def remove_stale_pipelines(adf: ConfiguredDataFactory, dry_run: bool = False):
     Args:
         adf: ConfiguredDataFactory object
         dry_run: boolean indicating whether the actions are to be executed as a dry-run. Defaults to False.
+        existing_pipelines: names of the pipelines that exist in ADF. Fetched from ADF if not provided.
+        keep_pipelines_names: names of the pipelines that should not be removed. Defaults to the global
+            `processed_pipelines_names`.
     """
-    existing_pipelines = fetch_existing_pipelines(adf)
+    if existing_pipelines is None:
+        existing_pipelines = fetch_existing_pipelines(adf)
+    keep = set(processed_pipelines_names if keep_pipelines_names is None else keep_pipelines_names)
     for p in existing_pipelines:
-        if p not in processed_pipelines_names:
+        if p not in keep:
             logger.info(f"Deleting pipeline {p} from ADF. Pipeline {p} no longer exists in path")
             if not dry_run:
                 adf.client.pipelines.delete(resource_group_name=adf.resource_group,
@@ -176,12 +545,34 @@ def remove_stale_pipelines(adf: ConfiguredDataFactory, dry_run: bool = False):
                                             pipeline_name=p)
 
 
-def configure_data_factory() -> ConfiguredDataFactory:
+def _client_options() -> Dict[str, Any]:
+    """Options of the ADF client, pointing it at the endpoint in ADFPY_ARM_ENDPOINT (e.g. a LocalDataFactory) if set"""
+    options: Dict[str, Any] = {}
+    endpoint = os.getenv("ADFPY_ARM_ENDPOINT")
+    if endpoint:
+        options["base_url"] = endpoint
+        if endpoint.startswith("http://"):
+            from azure.core.pipeline.policies import SansIOHTTPPolicy
+
+            # Bearer tokens are never sent over plain HTTP, which is only used by local stand-ins of ADF
+            options["authentication_policy"] = SansIOHTTPPolicy()
+    return options
+
+
+def configure_data_factory(scheduler: Optional[RequestScheduler] = None) -> ConfiguredDataFactory:
     """Configure your data factory, based mostly on environment variables
 
+    Args:
+        scheduler: if provided, all requests of the client are sent through this RequestScheduler, which then takes
+            over retrying requests from the client. A scheduler without a RequestBudget is given the budget of the
+            subscription.
+
     Returns:
         A ConfiguredDataFactory object, with all required fields for interacting with ADF
     """
+    from azure.identity import ClientSecretCredential
+    from azure.mgmt.datafactory import DataFactoryManagementClient  # type: ignore
+
     subscription_id = os.environ["AZURE_SUBSCRIPTION_ID"]
     resource_group = os.environ["AZURE_RESOURCE_GROUP_NAME"]
     data_factory = os.environ["AZURE_DATA_FACTORY_NAME"]
@@ -190,9 +581,18 @@ def configure_data_factory() -> ConfiguredDataFactory:
         client_secret=os.environ["AZURE_SERVICE_PRINCIPAL_SECRET"],
         tenant_id=os.environ["AZURE_TENANT_ID"],
     )
-    adf_client = DataFactoryManagementClient(credentials, subscription_id)
+    client_options = _client_options()
+    if scheduler is None:
+        adf_client = accept_json_payloads(DataFactoryManagementClient(credentials, subscription_id,
+                                                                      **client_options))
+    else:
+        if scheduler.budget is None:
+            scheduler.budget = subscription_budget(subscription_id)
+        adf_client = ScheduledClient(accept_json_payloads(DataFactoryManagementClient(credentials, subscription_id,
+                                                                                      **client_options)),
+                                     scheduler)
 
-    return ConfiguredDataFactory(resource_group, data_factory, adf_client)
+    return ConfiguredDataFactory(resource_group, data_factory, adf_client, credentials)
 
 
 @click.command()
@@ -204,7 +604,65 @@ def configure_data_factory() -> ConfiguredDataFactory:
                                                                         "enabled, the deploy script will only output "
                                                                         "what will be changed rather than actually "
                                                                         "executing the required action")
-def run_deployment(path, delete_stale_resources, dry_run):
+@click.option("--concurrency", type=click.IntRange(min=1), default=DEFAULT_CONCURRENCY, show_default=True,
+              help="Maximum number of pipelines that are deployed at the same time")
+@click.option("--diff", is_flag=True, default=False,
+              help="Compare the local resources with the resources in ADF, and only create/update the resources that "
+                   "differ")
+@click.option("--manifest", type=str, default=None,
+              help="Local path or blob storage URL of a deploy manifest. The manifest records the state of the "
+                   "previous successful deployment, so that unchanged resources can be skipped without reading them "
+                   "from ADF. It is updated after every successful deployment")
+@click.option("--refresh", is_flag=True, default=False,
+              help="Ignore the deploy manifest and compare all local resources with the resources in ADF")
+@click.option("--async", "use_async", is_flag=True, default=False,
+              help="Deploy using the asynchronous ADF client. Every pipeline is deployed as soon as the pipelines it "
+                   "depends on have been deployed, with at most --concurrency requests in flight")
+@click.option("--load-processes", type=click.IntRange(min=1), default=1, show_default=True,
+              help="Number of worker processes used to load the pipeline definitions from the path")
+@click.option("--cache-dir", type=Path, default=None,
+              help="Directory of the discovery cache. Pipeline definition files that did not change since the "
+                   "previous run are loaded from this cache, rather than executed")
+@click.option("--watch", is_flag=True, default=False,
+              help="Keep running after the deployment, and redeploy the pipelines whose definition changes. Only "
+                   "changed pipelines, and the pipelines depending on them, are redeployed")
+@click.option("--watch-interval", type=click.FloatRange(min=0.1), default=1.0, show_default=True,
+              help="Number of seconds between checks for changes in --watch mode")
+@click.option("--select", "select_patterns", multiple=True,
+              help="Only deploy the pipelines with this name or matching this glob pattern (e.g. 'ingest_*'). Can be "
+                   "provided multiple times")
+@click.option("--tag", "select_tags", multiple=True,
+              help="Only deploy the pipelines with this tag. Can be provided multiple times")
+@click.option("--changed-since", type=str, default=None,
+              help="Only deploy the pipelines defined in files that changed since this git reference, and in files "
+                   "importing those")
+@click.option("--copy-throughput", "copy_throughput_file", type=Path, default=None,
+              help="JSON file with the copy throughput settings (e.g. data_integration_units) inherited by all copy "
+                   "activities")
+@click.option("--manage-triggers/--no-manage-triggers", default=True, show_default=True,
+              help="Stop the running triggers that are updated before the deployment, and start them (and new "
+                   "triggers) again afterwards")
+@click.option("--max-retries", type=click.IntRange(min=0), default=RetryPolicy.max_attempts - 1, show_default=True,
+              help="Maximum number of times a throttled (429) or failed (5xx) request to ADF is retried. The number of "
+                   "concurrent requests is lowered automatically while requests are being throttled")
+@click.option("--profile-load", is_flag=True, default=False,
+              help="Profile the execution of every module while loading the pipeline definitions, and log the "
+                   "definition files and imports that took the longest")
+@click.option("--profile-load-dir", type=Path, default=None,
+              help="Directory to dump the cProfile statistics of every definition file to. Implies --profile-load")
+@click.option("--telemetry-json", type=Path, default=None,
+              help="Write a JSON summary of the time spent in every phase of the deployment, and of the requests sent "
+                   "to ADF, to this file")
+@click.option("--telemetry-prometheus", type=Path, default=None,
+              help="Write the deployment metrics to this file in the Prometheus text format, e.g. for the textfile "
+                   "collector of the node exporter")
+@click.option("--telemetry-otel", is_flag=True, default=False,
+              help="Export the phases of the deployment and the requests sent to ADF as OpenTelemetry spans. "
+                   "Requires the opentelemetry-api package")
+def run_deployment(path, delete_stale_resources, dry_run, concurrency, diff, manifest, refresh, use_async,
+                   load_processes, cache_dir, watch, watch_interval, select_patterns, select_tags, changed_since,
+                   copy_throughput_file, manage_triggers, max_retries, profile_load, profile_load_dir, telemetry_json,
+                   telemetry_prometheus, telemetry_otel):
     """Deploy your adfPy resources to ADF
 
     This tool deploys your adfPy resources. For authentication, you should set a number of
@@ -217,20 +675,264 @@ def run_deployment(path, delete_stale_resources, dry_run):
     AZURE_SERVICE_PRINCIPAL_CLIENT_ID
     AZURE_SERVICE_PRINCIPAL_SECRET
     AZURE_TENANT_ID
+
+    The pipelines to deploy can be limited with --select, --tag and --changed-since. Pipelines that the selected
+    pipelines depend on are always deployed as well. With a selection, only pipelines matching a --select pattern
+    are considered for removal as stale resources.
+
+    The time spent in every phase of the deployment (config, load, diff, serialize, write, trigger, delete), and the
+    latency of the requests sent to ADF, are logged at the end of the deployment. Use the --telemetry-* options to
+    export them.
     """
-    configured_adf = configure_data_factory()
+    selection = PipelineSelection(list(select_patterns), list(select_tags), changed_since)
+    if copy_throughput_file:
+        try:
+            set_factory_copy_throughput(CopyThroughputSettings.from_dict(json.loads(copy_throughput_file.read_text())))
+        except (TypeError, ValueError) as e:
+            raise click.BadParameter(str(e), param_hint="--copy-throughput")
+    if watch and (use_async or manifest or selection.active):
+        raise click.UsageError("--watch is not supported in combination with --async, --manifest or selectors")
+    if use_async and manifest:
+        raise click.UsageError("--manifest is not supported in combination with --async")
+    profile_load = profile_load or profile_load_dir is not None
+    if watch and profile_load:
+        raise click.UsageError("--profile-load is not supported in combination with --watch")
+    load = partial(load_pipelines_profiled, profile=profile_load, cprofile_dir=profile_load_dir)
+    if telemetry_otel:
+        try:
+            import opentelemetry  # type: ignore # noqa: F401
+        except ImportError:
+            raise click.UsageError("--telemetry-otel requires the opentelemetry-api package. Install it with "
+                                   "`pip install opentelemetry-api opentelemetry-sdk`")
+
+    telemetry = DeployTelemetry()
+    succeeded = False
+    try:
+        with telemetry.activate():
+            if use_async:
+                import asyncio
+
+                asyncio.run(_run_deployment_async(path, delete_stale_resources, dry_run, concurrency, diff,
+                                                  load_processes, cache_dir, selection, manage_triggers, telemetry,
+                                                  load, max_retries))
+            else:
+                _run_deployment(path, delete_stale_resources, dry_run, concurrency, diff, manifest, refresh,
+                                load_processes, cache_dir, watch, watch_interval, selection, manage_triggers,
+                                max_retries, telemetry, load)
+        succeeded = True
+    finally:
+        telemetry.finish(succeeded)
+        telemetry.log_summary()
+        export_telemetry(telemetry, telemetry_json, telemetry_prometheus, telemetry_otel)
+
+
+def load_pipelines_profiled(path: Path,
+                            processes: int = 1,
+                            cache_dir: Optional[Path] = None,
+                            profile: bool = False,
+                            cprofile_dir: Optional[Path] = None) -> Dict[Path, Set[AdfPipeline]]:
+    """Load the pipelines from a path using `load_pipelines_by_file`, optionally profiling the modules executed
+
+    Args:
+        path: Path to scan for AdfPipeline objects
+        processes: number of worker processes used to load the files. Ignored when profiling, as only the modules
+            executed in the current process can be profiled.
+        cache_dir: directory of the discovery cache
+        profile: profile the modules executed using a LoadProfiler, and log the slowest ones
+        cprofile_dir: directory to dump the cProfile statistics of every definition file to
+
+    Returns:
+        Dictionary mapping every file found to the set of AdfPipelines found in it
+    """
+    if not profile:
+        return load_pipelines_by_file(path, processes, cache_dir)
+    if processes > 1:
+        logger.warning("Loading the pipeline definitions in a single process, to profile them")
+    with LoadProfiler(path, cprofile_dir=cprofile_dir) as profiler:
+        pipelines_by_file = load_pipelines_by_file(path, 1, cache_dir)
+    profiler.log_report()
+    return pipelines_by_file
+
+
+def export_telemetry(telemetry: DeployTelemetry,
+                     json_path: Optional[Path] = None,
+                     prometheus_path: Optional[Path] = None,
+                     opentelemetry: bool = False):
+    """Export the telemetry of a deployment. Failing exports are logged, rather than failing the deployment.
+
+    Args:
+        telemetry: DeployTelemetry of the deployment
+        json_path: file to write the JSON summary to
+        prometheus_path: file to write the metrics to, in the Prometheus text format
+        opentelemetry: whether to export the deployment as OpenTelemetry spans
+    """
+    exports = [(json_path, telemetry.write_json), (prometheus_path, telemetry.write_prometheus)]
+    for destination, export in exports:
+        if destination:
+            try:
+                export(destination)
+            except OSError as e:
+                logger.error(f"Failed to write deploy telemetry to {destination}: {e}")
+            else:
+                logger.info(f"Wrote deploy telemetry to {destination}")
+    if opentelemetry:
+        try:
+            telemetry.export_opentelemetry()
+        except ImportError as e:
+            logger.error(str(e))
+
+
+def _run_deployment(path: Path,
+                    delete_stale_resources: bool,
+                    dry_run: bool,
+                    concurrency: int,
+                    diff: bool,
+                    manifest: Optional[str],
+                    refresh: bool,
+                    load_processes: int,
+                    cache_dir: Optional[Path],
+                    watch: bool,
+                    watch_interval: float,
+                    selection: PipelineSelection,
+                    manage_triggers: bool,
+                    max_retries: int,
+                    telemetry: DeployTelemetry,
+                    load: Callable[..., Dict[Path, Set[AdfPipeline]]] = load_pipelines_by_file):
+    scheduler = RequestScheduler(concurrency, RetryPolicy(max_attempts=max_retries + 1), telemetry=telemetry)
+    with telemetry.phase("config"):
+        configured_adf = configure_data_factory(scheduler)
+    telemetry.factory = configured_adf.identifier
     logger.info("Welcome to adfPy!")
     logger.info(f"Starting up deployment to factory: {configured_adf.name}")
     if dry_run:
         logger.info("Dry run enabled. All changes below will not be executed")
 
-    pipelines = load_pipelines_from_path(path)
-    logger.info(f"Loaded {len(pipelines)} pipelines")
-
-    ensure_all_pipelines_up_to_date(pipelines, configured_adf, dry_run)
+    if watch:
+        from adfpy.watch import PipelineWatcher
+
+        PipelineWatcher(path, configured_adf, dry_run, concurrency, delete_stale_resources, load_processes,
+                        cache_dir, manage_triggers).run(watch_interval)
+        return
+
+    with telemetry.phase("load"):
+        pipelines_by_file = load(path, load_processes, cache_dir)
+        local_pipelines_names = set(collect_pipelines(p for ps in pipelines_by_file.values() for p in ps))
+        logger.info(f"Loaded {len(local_pipelines_names)} pipelines")
+        pipelines = selection.apply(pipelines_by_file, path)
+
+    all_pipelines = list(collect_pipelines(pipelines).values())
+    changes = None
+    existing_pipelines = None
+    local = None
+    pipeline_etags: Dict[str, Optional[str]] = {}
+    trigger_etags: Dict[str, Optional[str]] = {}
+    previous_manifest = None
+    with telemetry.phase("diff"):
+        if manifest:
+            local = compute_local_hashes(all_pipelines)
+            if not refresh:
+                previous_manifest = load_manifest(manifest, configured_adf.credential)
+                if previous_manifest and previous_manifest.factory != configured_adf.identifier:
+                    logger.warning(f"Ignoring deploy manifest {manifest}, as it belongs to factory "
+                                   f"{previous_manifest.factory}")
+                    previous_manifest = None
+                if not previous_manifest:
+                    logger.info("No usable deploy manifest found, comparing all resources with the factory")
+
+        if previous_manifest:
+            # The pipelines in the factory are not listed, so stale pipeline removal lists them itself: the
+            # manifest does not contain the pipelines created outside adfPy
+            changes, pipeline_etags, trigger_etags = compute_change_set_from_manifest(
+                all_pipelines, configured_adf, previous_manifest, local, concurrency)
+        elif diff or manifest:
+            remote = fetch_remote_definitions(configured_adf)
+            changes = compute_change_set(all_pipelines, remote, local)
+            existing_pipelines = list(remote.pipelines)
+            pipeline_etags = {name: r.etag for name, r in remote.pipelines.items()}
+            trigger_etags = {name: r.etag for name, r in remote.triggers.items()}
+        if changes is not None:
+            logger.info(f"Found {len(changes.pipelines)} changed pipelines and {len(changes.triggers)} changed "
+                        f"triggers")
+
+    result = ensure_all_pipelines_up_to_date(pipelines, configured_adf, dry_run, concurrency, changes, manage_triggers)
 
     if delete_stale_resources:
-        remove_stale_pipelines(configured_adf, dry_run)
+        with telemetry.phase("delete"):
+            if existing_pipelines is None:
+                existing_pipelines = fetch_existing_pipelines(configured_adf)
+            remove_stale_pipelines(configured_adf,
+                                   dry_run,
+                                   selection.stale_candidates(existing_pipelines, local_pipelines_names),
+                                   local_pipelines_names)
+
+    if manifest and local is not None and not dry_run:
+        pipeline_etags.update(result.pipeline_etags)
+        trigger_etags.update(result.trigger_etags)
+        new_manifest = build_manifest(configured_adf.identifier, local, pipeline_etags, trigger_etags)
+        if selection.active and previous_manifest:
+            # Keep the state of the pipelines that were out of scope of this deployment
+            new_manifest.pipelines = {**{name: entry for name, entry in previous_manifest.pipelines.items()
+                                         if name in local_pipelines_names},
+                                      **new_manifest.pipelines}
+            new_manifest.triggers = {**previous_manifest.triggers, **new_manifest.triggers}
+        with telemetry.phase("manifest"):
+            save_manifest(new_manifest, manifest, configured_adf.credential)
+    logger.info(f"Sent {scheduler.requests} requests to ADF, of which {scheduler.retries} were retries. "
+                f"{scheduler.throttled} requests were throttled")
+
+
+async def _run_deployment_async(path: Path,
+                                delete_stale_resources: bool,
+                                dry_run: bool,
+                                concurrency: int,
+                                diff: bool,
+                                load_processes: int,
+                                cache_dir: Optional[Path],
+                                selection: PipelineSelection,
+                                manage_triggers: bool = False,
+                                telemetry: Optional[DeployTelemetry] = None,
+                                load: Callable[..., Dict[Path, Set[AdfPipeline]]] = load_pipelines_by_file,
+                                max_retries: int = RetryPolicy.max_attempts - 1):
+    from adfpy.deploy_async import (
+        close_data_factory_async,
+        configure_data_factory_async,
+        deploy_async,
+        fetch_existing_pipelines_async,
+        remove_stale_pipelines_async,
+    )
+
+    scheduler = AsyncRequestScheduler(concurrency, RetryPolicy(max_attempts=max_retries + 1), telemetry=telemetry)
+    with deploy_phase("config"):
+        configured_adf = configure_data_factory_async(concurrency, scheduler)
+    if telemetry is not None:
+        telemetry.factory = configured_adf.identifier
+    try:
+        logger.info("Welcome to adfPy!")
+        logger.info(f"Starting up asynchronous deployment to factory: {configured_adf.name}")
+        if dry_run:
+            logger.info("Dry run enabled. All changes below will not be executed")
+
+        with deploy_phase("load"):
+            pipelines_by_file = load(path, load_processes, cache_dir)
+            local_pipelines_names = set(collect_pipelines(p for ps in pipelines_by_file.values() for p in ps))
+            logger.info(f"Loaded {len(local_pipelines_names)} pipelines")
+            pipelines = selection.apply(pipelines_by_file, path)
+
+        await deploy_async(pipelines, configured_adf, dry_run, concurrency, diff, manage_triggers=manage_triggers)
+
+        if delete_stale_resources:
+            with deploy_phase("delete"):
+                existing_pipelines = await fetch_existing_pipelines_async(configured_adf)
+                await remove_stale_pipelines_async(configured_adf,
+                                                   local_pipelines_names,
+                                                   dry_run,
+                                                   selection.stale_candidates(existing_pipelines,
+                                                                              local_pipelines_names),
+                                                   concurrency)
+        logger.info(f"Sent {scheduler.requests} requests to ADF, of which {scheduler.retries} were retries. "
+                    f"{scheduler.throttled} requests were throttled")
+    finally:
+        await close_data_factory_async(configured_adf)
 
 
 if __name__ == "__main__":
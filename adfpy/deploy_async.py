@@ -0,0 +1,335 @@
+import asyncio
+import os
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Tuple
+
+from adfpy.deploy import (
+    DEFAULT_CONCURRENCY,
+    ConfiguredDataFactory,
+    DeploymentResult,
+    _client_options,
+    _raise_for_result,
+    collect_pipelines,
+    compute_deployment_waves,
+    logger,
+    pending_writes,
+    validate_pipelines,
+)
+from adfpy.diff import (
+    ChangeSet,
+    RemoteDefinitions,
+    RemoteResource,
+    compute_change_set,
+    definition_hash,
+    trigger_definition_hash,
+)
+from adfpy.pipeline import AdfPipeline
+from adfpy.serialize import accept_json_payloads, request_body
+from adfpy.telemetry import deploy_phase
+from adfpy.throttling import AsyncRequestScheduler, ScheduledClient, subscription_budget
+from adfpy.trigger_control import AsyncTriggerController
+
+if TYPE_CHECKING:
+    from azure.mgmt.datafactory.aio import DataFactoryManagementClient as AsyncDataFactoryManagementClient
+
+
+def configure_data_factory_async(concurrency: int = DEFAULT_CONCURRENCY,
+                                 scheduler: Optional[AsyncRequestScheduler] = None) -> ConfiguredDataFactory:
+    """Configure your data factory for asynchronous usage, based mostly on environment variables
+
+    The client uses a single aiohttp session, of which the connection pool is limited to `concurrency` connections.
+    This function has to be called from within a running event loop. The client should be closed with
+    `close_data_factory_async` when it is no longer needed.
+
+    Args:
+        concurrency: maximum number of connections in the connection pool
+        scheduler: if provided, all requests of the client are sent through this AsyncRequestScheduler, see
+            `adfpy.deploy.configure_data_factory`
+
+    Returns:
+        A ConfiguredDataFactory object, with an asynchronous client
+    """
+    try:
+        import aiohttp
+    except ImportError as e:
+        raise ImportError("The asynchronous client requires the aiohttp package. Install it with "
+                          "`pip install adfpy[async]`") from e
+    from azure.core.pipeline.transport import AioHttpTransport
+    from azure.identity.aio import ClientSecretCredential
+    from azure.mgmt.datafactory.aio import DataFactoryManagementClient  # type: ignore
+
+    subscription_id = os.environ["AZURE_SUBSCRIPTION_ID"]
+    credentials = ClientSecretCredential(
+        client_id=os.environ["AZURE_SERVICE_PRINCIPAL_CLIENT_ID"],
+        client_secret=os.environ["AZURE_SERVICE_PRINCIPAL_SECRET"],
+        tenant_id=os.environ["AZURE_TENANT_ID"],
+    )
+    session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=concurrency),
+        cookie_jar=aiohttp.DummyCookieJar(),
+        auto_decompress=False,
+        trust_env=True,
+    )
+    adf_client = accept_json_payloads(DataFactoryManagementClient(
+        credentials,
+        subscription_id,
+        transport=AioHttpTransport(session=session, session_owner=True),
+        **_client_options()))
+    if scheduler is not None:
+        if scheduler.budget is None:
+            scheduler.budget = subscription_budget(subscription_id)
+        adf_client = ScheduledClient(adf_client, scheduler)
+    return ConfiguredDataFactory(os.environ["AZURE_RESOURCE_GROUP_NAME"],
+                                 os.environ["AZURE_DATA_FACTORY_NAME"],
+                                 adf_client,
+                                 credentials)
+
+
+def _async_client(adf: ConfiguredDataFactory) -> "AsyncDataFactoryManagementClient":
+    """The asynchronous client of a data factory configured with `configure_data_factory_async`"""
+    return adf.client  # type: ignore[return-value]
+
+
+async def close_data_factory_async(adf: ConfiguredDataFactory):
+    """Close the asynchronous client (and its connection pool) and credential of a data factory
+
+    Args:
+        adf: ConfiguredDataFactory object created with `configure_data_factory_async`
+    """
+    await _async_client(adf).close()
+    if adf.credential is not None:
+        await adf.credential.close()
+
+
+async def fetch_existing_pipelines_async(adf: ConfiguredDataFactory) -> List[str]:
+    """Asynchronous version of `adfpy.deploy.fetch_existing_pipelines`"""
+    # The SDK annotates `list_by_factory` as returning list responses, but it iterates the resources in them
+    return [
+        x.name async for x in _async_client(adf).pipelines.list_by_factory(  # type: ignore[attr-defined]
+            resource_group_name=adf.resource_group, factory_name=adf.name)
+    ]
+
+
+async def fetch_remote_definitions_async(adf: ConfiguredDataFactory) -> RemoteDefinitions:
+    """Asynchronous version of `adfpy.deploy.fetch_remote_definitions`
+
+    Pipelines and triggers are listed concurrently.
+    """
+    remote = RemoteDefinitions()
+
+    async def fetch_pipelines():
+        async for pipeline in adf.client.pipelines.list_by_factory(resource_group_name=adf.resource_group,
+                                                                   factory_name=adf.name):
+            remote.pipelines[pipeline.name] = RemoteResource(hash=definition_hash(pipeline), etag=pipeline.etag)
+
+    async def fetch_triggers():
+        async for trigger in adf.client.triggers.list_by_factory(resource_group_name=adf.resource_group,
+                                                                 factory_name=adf.name):
+            remote.triggers[trigger.name] = RemoteResource(
+                hash=trigger_definition_hash(trigger),
+                etag=trigger.etag,
+                hash_without_start_time=trigger_definition_hash(trigger, ignore_start_time=True),
+            )
+
+    await asyncio.gather(fetch_pipelines(), fetch_triggers())
+    return remote
+
+
+async def write_pipeline_async(adf: ConfiguredDataFactory,
+                               pipeline: AdfPipeline,
+                               semaphore: asyncio.Semaphore,
+                               dry_run: bool = False,
+                               write_definition: bool = True,
+                               write_trigger: bool = True) -> Tuple[Optional[str], Optional[str]]:
+    """Asynchronous version of `adfpy.deploy.write_pipeline`
+
+    Every request is only sent once the semaphore has been acquired.
+
+    Returns:
+        Tuple of the ETags of the written pipeline and trigger. Either is None if it was not written.
+    """
+    client = _async_client(adf)
+    pipeline_etag = trigger_etag = None
+    if write_definition:
+        logger.info(f"Creating/updating pipeline {pipeline.name}")
+        if not dry_run:
+            with deploy_phase("serialize", pipeline=pipeline.name):
+                definition = request_body(pipeline, client.pipelines)
+            async with semaphore:
+                written_pipeline = await client.pipelines.create_or_update(adf.resource_group,
+                                                                           adf.name,
+                                                                           pipeline.name,
+                                                                           definition)
+            pipeline_etag = written_pipeline.etag
+    if pipeline.schedule and write_trigger:
+        logger.info(f"Creating/updating trigger for {pipeline.name}")
+        if not dry_run:
+            with deploy_phase("serialize", trigger=pipeline.schedule.name):
+                trigger = request_body(pipeline.schedule, client.triggers)
+            async with semaphore:
+                written_trigger = await client.triggers.create_or_update(adf.resource_group,
+                                                                         adf.name,
+                                                                         pipeline.schedule.name,
+                                                                         trigger)
+            trigger_etag = written_trigger.etag
+    return pipeline_etag, trigger_etag
+
+
+async def deploy_pipelines_async(pipelines: Iterable[AdfPipeline],
+                                 adf: ConfiguredDataFactory,
+                                 dry_run: bool = False,
+                                 concurrency: int = DEFAULT_CONCURRENCY,
+                                 changes: Optional[ChangeSet] = None,
+                                 manage_triggers: bool = False) -> DeploymentResult:
+    """Asynchronous version of `adfpy.deploy.deploy_pipelines`
+
+    Rather than deploying wave by wave, every pipeline is deployed as soon as all pipelines it depends on have been
+    deployed. At most `concurrency` requests are in flight at the same time. If deploying a pipeline fails, only the
+    pipelines that (transitively) depend on it are blocked.
+
+    Args:
+        pipelines: Set of AdfPipeline objects to deploy
+        adf: ConfiguredDataFactory object with an asynchronous client
+        dry_run: boolean indicating whether the actions are to be executed as a dry-run. Defaults to False.
+        concurrency: maximum number of requests in flight at the same time
+        changes: if provided, only the pipelines and triggers in this ChangeSet are written
+        manage_triggers: stop the running triggers that are about to be written before deploying, and start them (and
+            the newly created triggers) again afterwards, using an `AsyncTriggerController`. Defaults to False.
+
+    Raises: InvalidPipelineError if the activities of any of the pipelines are invalid. Nothing is deployed in that
+        case.
+
+    Returns:
+        DeploymentResult describing which pipelines were deployed, failed, or blocked
+    """
+    if concurrency < 1:
+        raise ValueError(f"Concurrency should be at least 1, got {concurrency}")
+    waves = compute_deployment_waves(pipelines)
+    validate_pipelines(p for wave in waves for p in wave)
+    semaphore = asyncio.Semaphore(concurrency)
+    result = DeploymentResult()
+    # tasks resolve to True if the pipeline is available in ADF after the deployment
+    tasks: Dict[str, "asyncio.Task[bool]"] = {}
+
+    async def deploy(pipeline: AdfPipeline) -> bool:
+        required = [tasks[p.name] for p in pipeline.depends_on_pipelines]
+        available = await asyncio.gather(*required)
+        if not all(available):
+            blocking_pipelines = [p.name for p, ok in zip(pipeline.depends_on_pipelines, available) if not ok]
+            logger.error(f"Not deploying pipeline {pipeline.name}, because the pipelines it depends on "
+                         f"were not deployed: {blocking_pipelines}")
+            result.blocked.append(pipeline.name)
+            return False
+        write_definition, write_trigger = pending_writes(pipeline, changes)
+        if not write_definition and not write_trigger:
+            logger.debug(f"Pipeline {pipeline.name} is up-to-date")
+            return True
+        try:
+            pipeline_etag, trigger_etag = await write_pipeline_async(adf, pipeline, semaphore, dry_run,
+                                                                     write_definition, write_trigger)
+        except Exception as e:
+            logger.error(f"Failed to deploy pipeline {pipeline.name}: {e}")
+            result.failed[pipeline.name] = e
+            return False
+        if pipeline_etag is not None:
+            result.pipeline_etags[pipeline.name] = pipeline_etag
+        if trigger_etag is not None:
+            result.trigger_etags[pipeline.schedule.name] = trigger_etag
+        result.deployed.append(pipeline.name)
+        return True
+
+    affected_triggers = {p.schedule.name: p.name for wave in waves for p in wave if pending_writes(p, changes)[1]}
+    controller = AsyncTriggerController(adf, dry_run, concurrency) if manage_triggers else None
+    if controller:
+        with deploy_phase("trigger", action="stop"):
+            await controller.stop(affected_triggers)
+    try:
+        with deploy_phase("write"):
+            # Creating the tasks in wave order ensures the tasks of required pipelines exist before they are awaited
+            for wave in waves:
+                for pipeline in wave:
+                    tasks[pipeline.name] = asyncio.ensure_future(deploy(pipeline))
+            await asyncio.gather(*tasks.values())
+    finally:
+        if controller:
+            deployed = set(result.deployed)
+            with deploy_phase("trigger", action="start"):
+                await controller.start(name for name, pipeline_name in affected_triggers.items()
+                                       if pipeline_name in deployed)
+            result.failed_triggers.update(controller.failed)
+            result.trigger_downtime.update(controller.downtime)
+    return result
+
+
+async def remove_stale_pipelines_async(adf: ConfiguredDataFactory,
+                                       keep_pipelines_names: Set[str],
+                                       dry_run: bool = False,
+                                       existing_pipelines: Optional[Iterable[str]] = None,
+                                       concurrency: int = DEFAULT_CONCURRENCY):
+    """Asynchronous version of `adfpy.deploy.remove_stale_pipelines`
+
+    Args:
+        adf: ConfiguredDataFactory object with an asynchronous client
+        keep_pipelines_names: names of the pipelines that should not be removed
+        dry_run: boolean indicating whether the actions are to be executed as a dry-run. Defaults to False.
+        existing_pipelines: names of the pipelines that exist in ADF. Fetched from ADF if not provided.
+        concurrency: maximum number of requests in flight at the same time
+    """
+    if existing_pipelines is None:
+        existing_pipelines = await fetch_existing_pipelines_async(adf)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def delete(name: str):
+        logger.info(f"Deleting pipeline {name} from ADF. Pipeline {name} no longer exists in path")
+        if not dry_run:
+            async with semaphore:
+                await _async_client(adf).pipelines.delete(resource_group_name=adf.resource_group,
+                                                          factory_name=adf.name,
+                                                          pipeline_name=name)
+
+    await asyncio.gather(*[delete(p) for p in existing_pipelines if p not in keep_pipelines_names])
+
+
+async def deploy_async(pipelines: Iterable[AdfPipeline],
+                       adf: ConfiguredDataFactory,
+                       dry_run: bool = False,
+                       concurrency: int = DEFAULT_CONCURRENCY,
+                       diff: bool = False,
+                       delete_stale_resources: bool = False,
+                       manage_triggers: bool = False) -> DeploymentResult:
+    """Deploy pipelines (and their triggers) to ADF using an asynchronous client
+
+    This coroutine can be embedded in other asyncio applications, e.g. `await deploy_async(pipelines, adf)`.
+
+    Args:
+        pipelines: Set of AdfPipeline objects to deploy
+        adf: ConfiguredDataFactory object with an asynchronous client, e.g. from `configure_data_factory_async`
+        dry_run: boolean indicating whether the actions are to be executed as a dry-run. Defaults to False.
+        concurrency: maximum number of requests in flight at the same time
+        diff: only write the pipelines and triggers that differ from their counterparts in ADF. Defaults to False.
+        delete_stale_resources: remove pipelines from ADF that are not part of the deployed pipelines. Defaults to
+            False.
+        manage_triggers: stop the affected triggers during the deployment, see `deploy_pipelines_async`
+
+    Raises: DeploymentError if any of the pipelines could not be deployed, or any of the triggers could not be stopped
+        or started. Stale pipelines are not removed in that case.
+
+    Returns:
+        DeploymentResult of the deployment
+    """
+    all_pipelines = collect_pipelines(pipelines)
+    changes = None
+    existing_pipelines = None
+    if diff:
+        with deploy_phase("diff"):
+            remote = await fetch_remote_definitions_async(adf)
+            changes = compute_change_set(all_pipelines.values(), remote)
+            existing_pipelines = list(remote.pipelines)
+        logger.info(f"Found {len(changes.pipelines)} changed pipelines and {len(changes.triggers)} changed triggers")
+
+    result = await deploy_pipelines_async(all_pipelines.values(), adf, dry_run, concurrency, changes, manage_triggers)
+    _raise_for_result(result)
+
+    if delete_stale_resources:
+        with deploy_phase("delete"):
+            await remove_stale_pipelines_async(adf, set(all_pipelines), dry_run, existing_pipelines, concurrency)
+    return result
@@ -0,0 +1,194 @@
+import hashlib
+import json
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Set
+
+from adfpy.pipeline import AdfPipeline
+
+# Fractional seconds and UTC designator of ISO 8601 timestamps, which `datetime.fromisoformat` does not accept before
+# Python 3.11 unless the fraction has 3 or 6 digits and the offset is numeric
+_FRACTION = re.compile(r"\.(\d+)")
+_UTC_DESIGNATOR = re.compile(r"[zZ]$")
+
+
+@dataclass
+class RemoteResource:
+    """Definition hash of a resource as it currently exists in ADF
+
+    Attributes:
+        hash: canonical hash of the resource definition
+        etag: ETag of the resource, as reported by ADF
+        hash_without_start_time: for triggers, the canonical hash of the definition without its start time
+    """
+    hash: str
+    etag: Optional[str] = None
+    hash_without_start_time: Optional[str] = None
+
+
+@dataclass
+class RemoteDefinitions:
+    """Hashed definitions of the pipelines and triggers that currently exist in ADF, indexed by name"""
+    pipelines: Dict[str, RemoteResource] = field(default_factory=dict)
+    triggers: Dict[str, RemoteResource] = field(default_factory=dict)
+
+
+@dataclass
+class LocalHashes:
+    """Hashed definitions of the local pipelines and triggers, indexed by name"""
+    pipelines: Dict[str, str] = field(default_factory=dict)
+    triggers: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class ChangeSet:
+    """Names of the pipelines and triggers whose definition differs from what is in ADF"""
+    pipelines: Set[str] = field(default_factory=set)
+    triggers: Set[str] = field(default_factory=set)
+
+
+def normalize_definition(definition: Any) -> Any:
+    """Normalize a serialized (JSON-like) resource definition
+
+    Keys with a `None` value and empty lists or dictionaries are removed, as ADF treats these the same as an absent
+    key, and does not always return them.
+
+    Args:
+        definition: serialized resource definition
+
+    Returns:
+        The normalized definition
+    """
+    if isinstance(definition, dict):
+        normalized = {}
+        for key, value in definition.items():
+            value = normalize_definition(value)
+            if value is not None and value != [] and value != {}:
+                normalized[key] = value
+        return normalized
+    if isinstance(definition, list):
+        return [normalize_definition(value) for value in definition]
+    return definition
+
+
+def definition_hash(definition: Any) -> str:
+    """Compute a canonical hash of a resource definition
+
+    Args:
+        definition: either an azure SDK model (e.g. the result of `AdfPipeline.to_adf()`) or its serialized form
+
+    Returns:
+        Hex digest of the SHA-256 hash of the normalized definition
+    """
+    if hasattr(definition, "serialize"):
+        definition = definition.serialize()
+    canonical = json.dumps(normalize_definition(definition), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _parse_datetime(value: str) -> datetime:
+    """Parse an ISO 8601 timestamp as returned by ADF, e.g. `2022-01-01T00:00:00.1234567Z`
+
+    Timestamps without a timezone are considered to be in UTC, as `serialize_datetime` does.
+    """
+    value = _UTC_DESIGNATOR.sub("+00:00", value)
+    value = _FRACTION.sub(lambda match: "." + match.group(1)[:6].ljust(6, "0"), value, count=1)
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=timezone.utc)
+
+
+def _normalize_times(properties: Dict[str, Any], ignore_start_time: bool) -> Dict[str, Any]:
+    properties = dict(properties)
+    for key in ("startTime", "endTime"):
+        if properties.get(key):
+            properties[key] = _parse_datetime(properties[key]).astimezone(timezone.utc).isoformat()
+    if ignore_start_time:
+        properties.pop("startTime", None)
+    return properties
+
+
+def trigger_definition_hash(definition: Any, ignore_start_time: bool = False) -> str:
+    """Compute a canonical hash of a trigger definition
+
+    Start and end times are normalized to UTC, as ADF does not necessarily return them in the format they were sent.
+
+    Args:
+        definition: either an azure SDK TriggerResource model or its serialized form
+        ignore_start_time: leave the start time out of the hash. Useful for triggers without an explicitly
+            configured start time, which would otherwise differ on every run.
+
+    Returns:
+        Hex digest of the SHA-256 hash of the normalized definition
+    """
+    if hasattr(definition, "serialize"):
+        definition = definition.serialize()
+    type_properties = definition.get("properties", {}).get("typeProperties", {})
+    # Schedule triggers keep their start and end times in their recurrence, tumbling window triggers directly in their
+    # type properties
+    recurrence = type_properties.get("recurrence")
+    if recurrence:
+        type_properties = {**type_properties, "recurrence": _normalize_times(recurrence, ignore_start_time)}
+    elif type_properties.get("startTime"):
+        type_properties = _normalize_times(type_properties, ignore_start_time)
+    else:
+        return definition_hash(definition)
+    definition = {
+        **definition,
+        "properties": {**definition["properties"], "typeProperties": type_properties},
+    }
+    return definition_hash(definition)
+
+
+def local_trigger_hash(pipeline: AdfPipeline) -> str:
+    """Compute the canonical hash of the trigger of a pipeline, leaving out implicit start times"""
+    return trigger_definition_hash(pipeline.schedule.to_adf_json(), ignore_start_time=not pipeline.explicit_start_time)
+
+
+def compute_local_hashes(pipelines: Iterable[AdfPipeline]) -> LocalHashes:
+    """Compute the canonical hashes of a set of pipelines and their triggers
+
+    Args:
+        pipelines: AdfPipeline objects to hash
+
+    Returns:
+        LocalHashes with the hashes of the pipelines and their triggers
+    """
+    hashes = LocalHashes()
+    for pipeline in pipelines:
+        hashes.pipelines[pipeline.name] = definition_hash(pipeline.to_adf_json())
+        if pipeline.schedule:
+            hashes.triggers[pipeline.schedule.name] = local_trigger_hash(pipeline)
+    return hashes
+
+
+def compute_change_set(pipelines: Iterable[AdfPipeline],
+                       remote: RemoteDefinitions,
+                       local: Optional[LocalHashes] = None) -> ChangeSet:
+    """Determine which pipelines and triggers differ from their counterparts in ADF
+
+    Args:
+        pipelines: AdfPipeline objects to compare
+        remote: hashed definitions of the resources currently in ADF
+        local: precomputed hashes of the pipelines. Computed if not provided.
+
+    Returns:
+        ChangeSet with the names of the pipelines and triggers that have to be written
+    """
+    pipelines = list(pipelines)
+    if local is None:
+        local = compute_local_hashes(pipelines)
+    changes = ChangeSet()
+    for pipeline in pipelines:
+        remote_pipeline = remote.pipelines.get(pipeline.name)
+        if not remote_pipeline or remote_pipeline.hash != local.pipelines[pipeline.name]:
+            changes.pipelines.add(pipeline.name)
+        if pipeline.schedule:
+            remote_trigger = remote.triggers.get(pipeline.schedule.name)
+            if pipeline.explicit_start_time:
+                remote_hash = remote_trigger.hash if remote_trigger else None
+            else:
+                remote_hash = remote_trigger.hash_without_start_time if remote_trigger else None
+            if remote_hash != local.triggers[pipeline.schedule.name]:
+                changes.triggers.add(pipeline.schedule.name)
+    return changes
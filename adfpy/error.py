@@ -15,3 +15,23 @@ class InvalidCronExpressionError(AdfPyException):
 
 class PipelineModuleParseException(AdfPyException):
     pass
+
+
+class PipelineDependencyError(AdfPyException):
+    pass
+
+
+class DeploymentError(AdfPyException):
+    pass
+
+
+class InvalidSelectionError(AdfPyException):
+    pass
+
+
+class InvalidPipelineError(AdfPyException):
+    pass
+
+
+class ScheduleMismatchError(AdfPyException):
+    pass
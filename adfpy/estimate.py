@@ -0,0 +1,368 @@
+import json
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Set, Tuple, Union
+
+import click
+
+from adfpy.activities.control import AdfExecutePipelineActivity, AdfForEachActivity
+from adfpy.activity import AdfActivity
+from adfpy.error import PipelineDependencyError
+from adfpy.graph import ActivityGraph, ActivityScope
+from adfpy.loader import load_pipelines_from_path
+from adfpy.pipeline import AdfPipeline
+
+# Either a fixed number of seconds, or historical durations (in seconds) that are summarized using a quantile
+DurationEstimate = Union[float, Sequence[float]]
+
+# Tolerance when comparing (sums of) floating point durations
+_EPSILON = 1e-9
+
+
+def summarize_samples(samples: Sequence[float], quantile: float = 0.5) -> float:
+    """Summarize historical durations using a quantile, interpolating linearly between samples
+
+    Args:
+        samples: historical durations
+        quantile: quantile to use, between 0 and 1. Defaults to the median.
+
+    Raises: ValueError if there are no samples, or the quantile is out of range
+
+    Returns:
+        The quantile of the samples
+    """
+    if not samples:
+        raise ValueError("At least one sample is required")
+    if not 0 <= quantile <= 1:
+        raise ValueError(f"Quantile should be between 0 and 1, got {quantile}")
+    ordered = sorted(samples)
+    position = quantile * (len(ordered) - 1)
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+@dataclass
+class ActivityEstimate:
+    """Estimated schedule of a single activity, relative to the start of its scope
+
+    Attributes:
+        name: name of the activity
+        scope: path of the scope of the activity (see `ActivityScope.path`)
+        duration: estimated duration of the activity
+        earliest_start: earliest moment the activity can start, given the activities it depends on
+        latest_start: latest moment the activity can start without delaying its scope
+    """
+    name: str
+    scope: str
+    duration: float
+    earliest_start: float
+    latest_start: float
+
+    @property
+    def earliest_finish(self) -> float:
+        return self.earliest_start + self.duration
+
+    @property
+    def latest_finish(self) -> float:
+        return self.latest_start + self.duration
+
+    @property
+    def slack(self) -> float:
+        """How much the activity can be delayed without delaying its scope"""
+        return self.latest_start - self.earliest_start
+
+
+@dataclass
+class RuntimeEstimate:
+    """Estimated runtime of a pipeline
+
+    Attributes:
+        pipeline: name of the pipeline
+        makespan: estimated time from the start of the pipeline until all of its activities have finished
+        critical_path: the longest chain of activities. Activities of container activities on the path follow the
+            container. Activities of pipelines executed by an AdfExecutePipelineActivity are prefixed with the name of
+            the pipeline, e.g. `child.activity`.
+        activities: estimated schedule of every activity of the pipeline, including nested activities
+        max_parallelism: maximum number of activities (with a non-zero duration) running at the same time
+        speedup_candidates: the activities on every critical path, mapped to the part of the makespan they account
+            for. Only speeding up these activities shortens the makespan.
+    """
+    pipeline: str
+    makespan: float
+    critical_path: List[str] = field(default_factory=list)
+    activities: Dict[str, ActivityEstimate] = field(default_factory=dict)
+    max_parallelism: int = 0
+    speedup_candidates: Dict[str, float] = field(default_factory=dict)
+
+    def bottlenecks(self, top: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Rank the activities that, if sped up, would shorten the makespan
+
+        Args:
+            top: maximum number of activities to return. Defaults to all.
+
+        Returns:
+            List of activity names and the part of the makespan they account for, largest first
+        """
+        ranked = sorted(self.speedup_candidates.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:top] if top is not None else ranked
+
+
+@dataclass
+class _ScopeEstimate:
+    makespan: float = 0.0
+    critical_path: List[str] = field(default_factory=list)
+    max_parallelism: int = 0
+    speedup_candidates: Dict[str, float] = field(default_factory=dict)
+
+
+class _Estimator:
+    def __init__(self,
+                 root: AdfPipeline,
+                 durations: Mapping[str, DurationEstimate],
+                 iterations: Mapping[str, int],
+                 default_duration: float,
+                 quantile: float):
+        self.root = root
+        self.durations = durations
+        self.iterations = iterations
+        self.default_duration = default_duration
+        self.quantile = quantile
+        self.estimates: Dict[str, RuntimeEstimate] = {}
+        self.in_progress: Set[str] = set()
+
+    def _lookup(self, values: Mapping, pipeline: AdfPipeline, name: str):
+        # Activity names can not contain dots in ADF, so qualified names are unambiguous
+        value = values.get(f"{pipeline.name}.{name}")
+        if value is None and pipeline is self.root:
+            value = values.get(name)
+        return value
+
+    def _explicit_duration(self, pipeline: AdfPipeline, name: str) -> Optional[float]:
+        value = self._lookup(self.durations, pipeline, name)
+        if value is None or isinstance(value, (int, float)):
+            return value
+        return summarize_samples(value, self.quantile)
+
+    def estimate_pipeline(self, pipeline: AdfPipeline) -> RuntimeEstimate:
+        if pipeline.name in self.estimates:
+            return self.estimates[pipeline.name]
+        if pipeline.name in self.in_progress:
+            raise PipelineDependencyError(f"Pipeline {pipeline.name} (indirectly) executes itself")
+        self.in_progress.add(pipeline.name)
+        try:
+            graph = pipeline.validate()
+            estimate = RuntimeEstimate(pipeline.name, 0.0)
+            scope_estimate = self._estimate_scope(pipeline, graph, graph.top_level, estimate.activities)
+        finally:
+            self.in_progress.discard(pipeline.name)
+        estimate.makespan = scope_estimate.makespan
+        estimate.critical_path = scope_estimate.critical_path
+        estimate.max_parallelism = scope_estimate.max_parallelism
+        estimate.speedup_candidates = scope_estimate.speedup_candidates
+        self.estimates[pipeline.name] = estimate
+        return estimate
+
+    def _estimate_activity(self,
+                           pipeline: AdfPipeline,
+                           graph: ActivityGraph,
+                           activity: AdfActivity,
+                           activities: Dict[str, ActivityEstimate]) -> Tuple[float, _ScopeEstimate]:
+        """Estimate the duration of an activity, and what happens within it"""
+        explicit = self._explicit_duration(pipeline, activity.name)
+        if explicit is not None:
+            return explicit, _ScopeEstimate(explicit, [], 1, {activity.name: explicit})
+
+        child_scopes = graph.child_scopes.get(activity.name, [])
+        if isinstance(activity, AdfForEachActivity) and child_scopes:
+            inner = self._estimate_scope(pipeline, graph, child_scopes[0], activities)
+            iterations = self._lookup(self.iterations, pipeline, activity.name)
+            iterations = 1 if iterations is None else iterations
+            parallel = max(1, min(activity.parallelism, iterations))
+            rounds = math.ceil(iterations / parallel)
+            return rounds * inner.makespan, _ScopeEstimate(
+                rounds * inner.makespan,
+                inner.critical_path,
+                inner.max_parallelism * parallel if iterations else 0,
+                {name: contribution * rounds for name, contribution in inner.speedup_candidates.items()},
+            )
+        if child_scopes:
+            # Only one of the branches of e.g. an IfCondition activity runs; assume the longest one does
+            branches = sorted((self._estimate_scope(pipeline, graph, scope, activities) for scope in child_scopes),
+                              key=lambda branch: branch.makespan, reverse=True)
+            longest = branches[0]
+            decisive = len(branches) == 1 or longest.makespan > branches[1].makespan + _EPSILON
+            return longest.makespan, _ScopeEstimate(
+                longest.makespan,
+                longest.critical_path,
+                max(branch.max_parallelism for branch in branches),
+                longest.speedup_candidates if decisive else {},
+            )
+        if isinstance(activity, AdfExecutePipelineActivity):
+            child = next((p for p in pipeline.depends_on_pipelines if p.name == activity.pipeline_name), None)
+            if child is not None:
+                child_estimate = self.estimate_pipeline(child)
+                return child_estimate.makespan, _ScopeEstimate(
+                    child_estimate.makespan,
+                    [f"{child.name}.{name}" for name in child_estimate.critical_path],
+                    child_estimate.max_parallelism,
+                    {f"{child.name}.{name}": contribution
+                     for name, contribution in child_estimate.speedup_candidates.items()},
+                )
+        return self.default_duration, _ScopeEstimate(self.default_duration, [], 1,
+                                                     {activity.name: self.default_duration})
+
+    def _estimate_scope(self,
+                        pipeline: AdfPipeline,
+                        graph: ActivityGraph,
+                        scope: ActivityScope,
+                        activities: Dict[str, ActivityEstimate]) -> _ScopeEstimate:
+        order = scope.topological_order()
+        duration: Dict[str, float] = {}
+        inner: Dict[str, _ScopeEstimate] = {}
+        for name in order:
+            duration[name], inner[name] = self._estimate_activity(pipeline, graph, scope.activities[name], activities)
+
+        # Forward pass: earliest start; backward pass: latest start
+        earliest: Dict[str, float] = {}
+        for name in order:
+            earliest[name] = max((earliest[u] + duration[u] for u in scope.upstream[name]), default=0.0)
+        makespan = max((earliest[name] + duration[name] for name in order), default=0.0)
+        latest: Dict[str, float] = {}
+        for name in reversed(order):
+            latest[name] = min((latest[d] for d in scope.downstream[name]), default=makespan) - duration[name]
+        for name in order:
+            activities[name] = ActivityEstimate(name, scope.path, duration[name], earliest[name], latest[name])
+
+        # An activity is on every critical path if the number of critical paths through it equals the total number
+        critical = [name for name in order if latest[name] - earliest[name] <= _EPSILON]
+        critical_set = set(critical)
+
+        def critical_edge(upstream: str, downstream: str) -> bool:
+            return upstream in critical_set and abs(earliest[upstream] + duration[upstream] - earliest[downstream]) \
+                <= _EPSILON
+
+        sinks = [name for name in critical if makespan - earliest[name] - duration[name] <= _EPSILON]
+        paths_to: Dict[str, int] = {}
+        for name in critical:
+            paths_to[name] = (1 if earliest[name] <= _EPSILON else 0) + sum(
+                paths_to[u] for u in scope.upstream[name] if critical_edge(u, name))
+        paths_from: Dict[str, int] = {}
+        for name in reversed(critical):
+            paths_from[name] = (1 if name in sinks else 0) + sum(
+                paths_from[d] for d in scope.downstream[name] if d in critical_set and critical_edge(name, d))
+        total = sum(paths_to[name] for name in sinks)
+
+        speedup_candidates: Dict[str, float] = {}
+        for name in critical:
+            if paths_to[name] * paths_from[name] == total:
+                for candidate, contribution in inner[name].speedup_candidates.items():
+                    if contribution > _EPSILON:
+                        speedup_candidates[candidate] = contribution
+
+        critical_path: List[str] = []
+        current = next((name for name in sinks if paths_to[name]), None)
+        while current is not None:
+            critical_path[:0] = [current] + inner[current].critical_path
+            current = next((u for u in scope.upstream[current] if critical_edge(u, current) and paths_to[u]), None)
+
+        # Sweep over the start and end of every activity, ends before starts at the same moment
+        events = sorted(
+            [(earliest[name], 1, inner[name].max_parallelism) for name in order if duration[name] > _EPSILON]
+            + [(earliest[name] + duration[name], 0, -inner[name].max_parallelism)
+               for name in order if duration[name] > _EPSILON]
+        )
+        running = max_parallelism = 0
+        for _, _, change in events:
+            running += change
+            max_parallelism = max(max_parallelism, running)
+
+        return _ScopeEstimate(makespan, critical_path, max_parallelism, speedup_candidates)
+
+
+def estimate_runtime(pipeline: AdfPipeline,
+                     durations: Optional[Mapping[str, DurationEstimate]] = None,
+                     iterations: Optional[Mapping[str, int]] = None,
+                     default_duration: float = 0.0,
+                     quantile: float = 0.5) -> RuntimeEstimate:
+    """Estimate the runtime of a pipeline, based on estimates of the duration of its activities
+
+    Activities are assumed to start as soon as the activities they depend on have finished. The duration of a
+    container activity follows from the activities in it, unless an explicit duration is provided for it:
+
+    - AdfForEachActivity: the iterations run in rounds of at most `AdfForEachActivity.parallelism` iterations
+    - AdfIfConditionActivity: the longest branch
+    - AdfExecutePipelineActivity: the runtime of the executed pipeline, if it is one of the `depends_on_pipelines`
+
+    Args:
+        pipeline: the pipeline to estimate
+        durations: estimated duration of activities in seconds, either as a number or as a list of historical
+            durations. Activities are identified by their name, or by `<pipeline>.<activity>` (required for the
+            activities of executed pipelines).
+        iterations: estimated number of iterations of ForEach activities, identified like `durations`. Defaults to 1.
+        default_duration: duration of activities without an estimate
+        quantile: quantile used to summarize historical durations. Defaults to the median.
+
+    Raises:
+        InvalidPipelineError if the activities of any of the pipelines are invalid
+        PipelineDependencyError if pipelines (indirectly) execute themselves
+
+    Returns:
+        RuntimeEstimate of the pipeline
+    """
+    return _Estimator(pipeline, durations or {}, iterations or {}, default_duration, quantile).estimate_pipeline(
+        pipeline)
+
+
+def _format_seconds(seconds: float) -> str:
+    minutes, seconds = divmod(round(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+
+@click.command()
+@click.option("--path", type=Path, required=True, help="Path containing the pipeline definitions")
+@click.option("--pipeline", "pipeline_names", multiple=True,
+              help="Name of the pipeline to estimate. Can be provided multiple times. Defaults to all pipelines")
+@click.option("--durations", "durations_file", type=Path, default=None,
+              help="JSON file with 'durations' (in seconds, or lists of historical durations) and 'iterations' of "
+                   "ForEach activities, both keyed by '<pipeline>.<activity>'")
+@click.option("--default-duration", type=float, default=0.0, show_default=True,
+              help="Duration in seconds of activities without an estimate")
+@click.option("--quantile", type=click.FloatRange(0, 1), default=0.5, show_default=True,
+              help="Quantile used to summarize historical durations")
+@click.option("--top", type=int, default=10, show_default=True,
+              help="Number of activities to list that would shorten the runtime if sped up")
+def run_estimate(path, pipeline_names, durations_file, default_duration, quantile, top):
+    """Estimate the runtime of your adfPy pipelines
+
+    For every pipeline, this reports the estimated end-to-end runtime, the critical path, and the activities that
+    would actually shorten the runtime if they were sped up.
+    """
+    estimates = json.loads(durations_file.read_text()) if durations_file else {}
+    pipelines = {p.name: p for p in load_pipelines_from_path(path)}
+    unknown = sorted(set(pipeline_names) - set(pipelines))
+    if unknown:
+        raise click.UsageError(f"Unknown pipelines: {unknown}")
+    for name in sorted(pipeline_names or pipelines):
+        estimate = estimate_runtime(pipelines[name],
+                                    estimates.get("durations", {}),
+                                    estimates.get("iterations", {}),
+                                    default_duration,
+                                    quantile)
+        click.echo(f"Pipeline {name}")
+        click.echo(f"  estimated runtime: {_format_seconds(estimate.makespan)}")
+        click.echo(f"  max parallelism:   {estimate.max_parallelism}")
+        click.echo(f"  critical path:     {' > '.join(estimate.critical_path) or '-'}")
+        bottlenecks = estimate.bottlenecks(top)
+        if bottlenecks:
+            click.echo("  speed up to shorten the runtime:")
+            for activity_name, contribution in bottlenecks:
+                share = contribution / estimate.makespan if estimate.makespan else 0
+                click.echo(f"    {_format_seconds(contribution):>10} {share:>6.1%}  {activity_name}")
+        click.echo()
+
+
+if __name__ == "__main__":
+    run_estimate()
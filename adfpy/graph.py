@@ -0,0 +1,196 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from adfpy.activity import AdfActivity
+from adfpy.error import InvalidPipelineError
+
+TOP_LEVEL_SCOPE = ""
+
+
+@dataclass
+class ActivityScope:
+    """A list of sibling activities, i.e. the activities of a pipeline or of a single branch of a container activity
+
+    Dependencies between activities are only valid within a scope.
+
+    Attributes:
+        path: path of the scope in the pipeline, e.g. `""` for the pipeline itself, or `"loop.activities"` for the
+            activities of the container activity `loop`
+        container: the container activity this scope belongs to, or None for the pipeline itself
+        activities: the activities in this scope, by name
+        upstream: names of the activities (in this scope) each activity depends on
+        downstream: names of the activities (in this scope) that depend on each activity
+    """
+    path: str
+    container: Optional[AdfActivity] = None
+    activities: Dict[str, AdfActivity] = field(default_factory=dict)
+    upstream: Dict[str, List[str]] = field(default_factory=dict)
+    downstream: Dict[str, List[str]] = field(default_factory=dict)
+
+    def levels(self) -> List[List[str]]:
+        """Group the activities in this scope by the length of the longest dependency chain leading up to them
+
+        All activities in a level can run in parallel once the previous levels have finished. This is a topological
+        order of the scope (Kahn's algorithm), taking time linear in the number of activities and dependencies.
+
+        Raises: InvalidPipelineError if the dependencies in this scope contain a cycle
+
+        Returns:
+            List of levels, each level being a list of activity names in definition order
+        """
+        remaining = {name: len(upstream) for name, upstream in self.upstream.items()}
+        levels = []
+        current = [name for name, count in remaining.items() if count == 0]
+        while current:
+            levels.append(current)
+            next_level = []
+            for name in current:
+                for dependent in self.downstream[name]:
+                    remaining[dependent] -= 1
+                    if remaining[dependent] == 0:
+                        next_level.append(dependent)
+            current = next_level
+        if sum(len(level) for level in levels) != len(self.activities):
+            cyclic = [name for name, count in remaining.items() if count > 0]
+            raise InvalidPipelineError(f"The dependencies between activities {cyclic} in scope "
+                                       f"'{self.path or '<pipeline>'}' contain a cycle")
+        return levels
+
+    def topological_order(self) -> List[str]:
+        """Order the activities in this scope, such that every activity comes after the activities it depends on"""
+        return [name for level in self.levels() for name in level]
+
+
+class ActivityGraph:
+    """Index of the activities of a pipeline, including those nested in container activities
+
+    Looking up an activity by name, and the activities it depends on or that depend on it, takes constant time.
+    Building the graph takes time linear in the number of activities and dependencies. Problems found while building
+    the graph (duplicate names and dependencies on activities that are not in the same scope) are collected in
+    `problems`, and are raised by `validate`.
+
+    Args:
+        activities: the (top-level) activities of a pipeline
+    """
+    def __init__(self, activities: List[AdfActivity]):
+        self.activities: Dict[str, AdfActivity] = {}
+        self.scope_of: Dict[str, ActivityScope] = {}
+        self.scopes: List[ActivityScope] = []
+        self.child_scopes: Dict[str, List[ActivityScope]] = {}
+        self.problems: List[str] = []
+
+        pending: List[Tuple[str, Optional[AdfActivity], List[AdfActivity]]] = [(TOP_LEVEL_SCOPE, None, activities)]
+        while pending:
+            path, container, scope_activities = pending.pop()
+            scope = ActivityScope(path, container)
+            self.scopes.append(scope)
+            if container is not None:
+                self.child_scopes.setdefault(container.name, []).append(scope)
+            for activity in scope_activities:
+                if activity.name in self.activities:
+                    self.problems.append(f"Activity name '{activity.name}' is used more than once")
+                    continue
+                self.activities[activity.name] = activity
+                self.scope_of[activity.name] = scope
+                scope.activities[activity.name] = activity
+                scope.upstream[activity.name] = []
+                scope.downstream[activity.name] = []
+                for label, children in activity.child_activities().items():
+                    pending.append((f"{path}.{activity.name}.{label}".lstrip("."), activity, children))
+
+        for scope in self.scopes:
+            for name, activity in scope.activities.items():
+                for required_name in activity.depends_on:
+                    if required_name == name:
+                        self.problems.append(f"Activity '{name}' depends on itself")
+                    elif required_name in scope.activities:
+                        scope.upstream[name].append(required_name)
+                        scope.downstream[required_name].append(name)
+                    elif required_name in self.activities:
+                        self.problems.append(f"Activity '{name}' depends on activity '{required_name}', which is not "
+                                             f"in the same scope")
+                    else:
+                        self.problems.append(f"Activity '{name}' depends on activity '{required_name}', which does "
+                                             f"not exist")
+
+    @property
+    def top_level(self) -> ActivityScope:
+        return self.scopes[0]
+
+    def __getitem__(self, name: str) -> AdfActivity:
+        return self.activities[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.activities
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.activities)
+
+    def __len__(self) -> int:
+        return len(self.activities)
+
+    def upstream(self, name: str) -> List[AdfActivity]:
+        """The activities the named activity depends on"""
+        scope = self.scope_of[name]
+        return [scope.activities[n] for n in scope.upstream[name]]
+
+    def downstream(self, name: str) -> List[AdfActivity]:
+        """The activities that depend on the named activity"""
+        scope = self.scope_of[name]
+        return [scope.activities[n] for n in scope.downstream[name]]
+
+    def find_cycles(self) -> List[str]:
+        """Check every scope for cyclic dependencies
+
+        Returns:
+            List describing every cycle found, empty if there are none
+        """
+        cycles = []
+        for scope in self.scopes:
+            try:
+                scope.levels()
+            except InvalidPipelineError as e:
+                cycles.append(str(e))
+        return cycles
+
+    def topological_order(self) -> List[str]:
+        """Order the top-level activities, such that every activity comes after the activities it depends on
+
+        Raises: InvalidPipelineError if the dependencies contain a cycle
+        """
+        return self.top_level.topological_order()
+
+    @property
+    def depth(self) -> int:
+        """Number of activities on the longest dependency chain, where a container activity counts as the longest
+        chain within it
+
+        Raises: InvalidPipelineError if the dependencies contain a cycle
+        """
+        return self._depth(self.top_level)
+
+    @property
+    def width(self) -> int:
+        """Maximum number of activities in any scope that can run at the same time, based on their dependencies
+
+        Raises: InvalidPipelineError if the dependencies contain a cycle
+        """
+        return max((len(level) for scope in self.scopes for level in scope.levels()), default=0)
+
+    def _depth(self, scope: ActivityScope) -> int:
+        # Longest chain ending in every activity, in topological order
+        longest: Dict[str, int] = {}
+        for name in scope.topological_order():
+            own = max((self._depth(child) for child in self.child_scopes.get(name, [])), default=1)
+            longest[name] = own + max((longest[n] for n in scope.upstream[name]), default=0)
+        return max(longest.values(), default=0)
+
+    def validate(self):
+        """Check the graph for duplicate activity names, dependencies on activities that do not exist in the same
+        scope, and cyclic dependencies
+
+        Raises: InvalidPipelineError describing all problems found
+        """
+        problems = self.problems + self.find_cycles()
+        if problems:
+            raise InvalidPipelineError("\n".join(problems))
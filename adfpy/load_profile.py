@@ -0,0 +1,340 @@
+import importlib.abc
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from adfpy.activity import AdfActivity
+from adfpy.pipeline import AdfPipeline
+
+logger = logging.getLogger("adfPy")
+
+DEFAULT_TOP = 10
+
+
+@dataclass
+class ModuleProfile:
+    """Measurements of the execution of a single module
+
+    Attributes:
+        name: name of the module
+        file: path of the file the module was executed from, if any
+        parent: name of the module that was executing when this module was imported, if any
+        definition: whether the module is a pipeline definition file in the profiled path
+        seconds: wall time spent executing the module, including the modules it imported
+        self_seconds: wall time spent executing the module, excluding the modules it imported
+        allocated_bytes: memory allocated while executing the module (including the modules it imported) that was
+            still in use afterwards. Only measured when memory is traced.
+        self_allocated_bytes: `allocated_bytes`, excluding the modules it imported
+        pipelines: number of AdfPipeline objects found at the top level of the module, that were not found in any
+            module executed before
+        activities: number of activities (including nested activities) of those pipelines
+        failed: whether executing the module raised an exception
+        cprofile_file: file the cProfile statistics of the module were dumped to, if any
+    """
+    name: str
+    file: Optional[Path] = None
+    parent: Optional[str] = None
+    definition: bool = False
+    seconds: float = 0.0
+    self_seconds: float = 0.0
+    allocated_bytes: int = 0
+    self_allocated_bytes: int = 0
+    pipelines: int = 0
+    activities: int = 0
+    failed: bool = False
+    cprofile_file: Optional[Path] = None
+    _child_seconds: float = field(default=0.0, repr=False)
+    _child_allocated_bytes: int = field(default=0, repr=False)
+
+
+def count_activities(activities: List[AdfActivity]) -> int:
+    """Count activities, including the activities nested in container activities"""
+    count = 0
+    pending = list(activities)
+    while pending:
+        activity = pending.pop()
+        count += 1
+        for children in activity.child_activities().values():
+            pending.extend(children)
+    return count
+
+
+class _ProfilingLoader:
+    """Wraps the loader of a module, to profile its execution. All other attributes are taken from the loader."""
+
+    def __init__(self, loader: Any, profiler: "LoadProfiler"):
+        self._loader = loader
+        self._profiler = profiler
+
+    def create_module(self, spec):
+        create_module = getattr(self._loader, "create_module", None)
+        return create_module(spec) if create_module else None
+
+    def exec_module(self, module: ModuleType):
+        try:
+            with self._profiler.profile(module):
+                self._loader.exec_module(module)
+        finally:
+            # The module only refers to this wrapper while it is being executed
+            module.__loader__ = self._loader
+            spec = getattr(module, "__spec__", None)
+            if spec is not None:
+                spec.loader = self._loader
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._loader, name)
+
+
+class _ProfilingFinder(importlib.abc.MetaPathFinder):
+    """Finds modules using the other finders in `sys.meta_path`, and wraps the loaders of modules loaded from files"""
+
+    def __init__(self, profiler: "LoadProfiler"):
+        self._profiler = profiler
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            find_spec = getattr(finder, "find_spec", None)
+            if finder is self or find_spec is None:
+                continue
+            spec = find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.has_location and hasattr(spec.loader, "exec_module"):
+                spec.loader = _ProfilingLoader(spec.loader, self._profiler)
+            return spec
+        return None
+
+
+class LoadProfiler:
+    """Profile the modules executed while loading pipeline definitions
+
+    Every module executed while the profiler is active is timed, whether it is a definition file in the profiled path
+    or a module imported by one (e.g. a library, or a shared helper module). The time spent in a module excludes the
+    time spent in the modules it imports, which is reported separately. This separates definition files that are slow
+    themselves (e.g. reading a large YAML file, or generating many pipelines) from definition files that import slow
+    modules.
+
+    Only modules executed in the current process are profiled, so load the definitions in a single process. Modules
+    that were already imported before the profiler was started, and definition files served from the discovery cache,
+    are not executed, and therefore not profiled. Tracing memory slows down the execution of Python code, so all times
+    are inflated when `trace_memory` is enabled.
+
+        with LoadProfiler(path) as profiler:
+            load_pipelines_from_path(path)
+        profiler.log_report()
+
+    Args:
+        path: the path the pipeline definitions are loaded from
+        trace_memory: measure the memory allocated by every module, using tracemalloc. Defaults to True.
+        cprofile_dir: if provided, the cProfile statistics of every definition file are dumped to this directory, in
+            a `<module name>.prof` file. Definition files executed while another definition file is being profiled
+            are part of the statistics of that file.
+    """
+
+    def __init__(self, path: Path, trace_memory: bool = True, cprofile_dir: Optional[Path] = None):
+        self.path = Path(path).resolve()
+        self.trace_memory = trace_memory
+        self.cprofile_dir = cprofile_dir
+        self.modules: List[ModuleProfile] = []
+        self.seconds = 0.0
+        self._stack: List[ModuleProfile] = []
+        self._cprofile_active = False
+        self._seen_pipelines: Set[int] = set()
+        self._finder = _ProfilingFinder(self)
+        self._thread: Optional[int] = None
+        self._started_tracing = False
+        self._start = 0.0
+
+    def __enter__(self) -> "LoadProfiler":
+        import tracemalloc
+
+        global _active
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        if self.cprofile_dir is not None:
+            Path(self.cprofile_dir).mkdir(parents=True, exist_ok=True)
+        self._thread = threading.get_ident()
+        sys.meta_path.insert(0, self._finder)
+        _active = self
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        global _active
+        self.seconds += time.perf_counter() - self._start
+        _active = None
+        sys.meta_path.remove(self._finder)
+        if self._started_tracing:
+            import tracemalloc
+
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def _is_definition(self, file: Optional[Path]) -> bool:
+        if file is None:
+            return False
+        try:
+            file.relative_to(self.path)
+        except ValueError:
+            return file == self.path
+        return True
+
+    def _traced_memory(self) -> int:
+        import tracemalloc
+
+        return tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+
+    @contextmanager
+    def profile(self, module: ModuleType) -> Iterator[Optional[ModuleProfile]]:
+        """Profile the execution of a module within the context. Modules executed in other threads are ignored."""
+        if threading.get_ident() != self._thread:
+            yield None
+            return
+        module_file = getattr(module, "__file__", None)
+        file = Path(module_file).resolve() if module_file else None
+        entry = ModuleProfile(module.__name__, file, self._stack[-1].name if self._stack else None,
+                              self._is_definition(file))
+        profiler = None
+        if self.cprofile_dir is not None and entry.definition and not self._cprofile_active:
+            import cProfile
+
+            profiler = cProfile.Profile()
+            self._cprofile_active = True
+        self._stack.append(entry)
+        allocated_before = self._traced_memory()
+        start = time.perf_counter()
+        if profiler:
+            profiler.enable()
+        try:
+            yield entry
+        except BaseException:
+            entry.failed = True
+            raise
+        finally:
+            if profiler:
+                profiler.disable()
+            entry.seconds = time.perf_counter() - start
+            entry.allocated_bytes = self._traced_memory() - allocated_before
+            self._stack.pop()
+            entry.self_seconds = entry.seconds - entry._child_seconds
+            entry.self_allocated_bytes = entry.allocated_bytes - entry._child_allocated_bytes
+            if self._stack:
+                self._stack[-1]._child_seconds += entry.seconds
+                self._stack[-1]._child_allocated_bytes += entry.allocated_bytes
+            if profiler:
+                self._cprofile_active = False
+                entry.cprofile_file = Path(self.cprofile_dir) / f"{entry.name}.prof"  # type: ignore
+                profiler.dump_stats(entry.cprofile_file)
+            self._count_pipelines(entry, module)
+            self.modules.append(entry)
+
+    def _count_pipelines(self, entry: ModuleProfile, module: ModuleType):
+        for value in list(vars(module).values()):
+            if isinstance(value, AdfPipeline) and id(value) not in self._seen_pipelines:
+                self._seen_pipelines.add(id(value))
+                entry.pipelines += 1
+                entry.activities += count_activities(value.activities)
+
+    def import_seconds(self, entry: ModuleProfile) -> float:
+        """Time spent executing the modules that are not definition files, imported directly by a module"""
+        return sum(m.seconds for m in self.modules if m.parent == entry.name and not m.definition)
+
+    def top(self, count: int = DEFAULT_TOP, definitions: bool = True) -> List[ModuleProfile]:
+        """The modules that took the longest to execute themselves
+
+        Args:
+            count: maximum number of modules to return
+            definitions: return the slowest definition files if True, otherwise the slowest other modules (including
+                the modules they imported)
+        """
+        if definitions:
+            return sorted((m for m in self.modules if m.definition), key=lambda m: m.self_seconds,
+                          reverse=True)[:count]
+        # Modules imported by other modules that are not definition files are part of the time of those
+        definition_names = {m.name for m in self.modules if m.definition}
+        imports = [m for m in self.modules if not m.definition and (m.parent is None or m.parent in definition_names)]
+        return sorted(imports, key=lambda m: m.seconds, reverse=True)[:count]
+
+    def to_dict(self) -> Dict[str, Any]:
+        definitions = [m for m in self.modules if m.definition]
+        return {
+            "seconds": self.seconds,
+            "definition_files": len(definitions),
+            "pipelines": sum(m.pipelines for m in definitions),
+            "activities": sum(m.activities for m in definitions),
+            "modules": [
+                {
+                    "name": m.name,
+                    "file": str(m.file) if m.file else None,
+                    "parent": m.parent,
+                    "definition": m.definition,
+                    "seconds": m.seconds,
+                    "self_seconds": m.self_seconds,
+                    "import_seconds": self.import_seconds(m),
+                    "allocated_bytes": m.allocated_bytes,
+                    "self_allocated_bytes": m.self_allocated_bytes,
+                    "pipelines": m.pipelines,
+                    "activities": m.activities,
+                    "failed": m.failed,
+                    "cprofile_file": str(m.cprofile_file) if m.cprofile_file else None,
+                }
+                for m in self.modules
+            ],
+        }
+
+    def format_report(self, count: int = DEFAULT_TOP) -> str:
+        """Tables of the slowest definition files, and of the slowest modules imported by them"""
+        definitions = [m for m in self.modules if m.definition]
+        lines = [f"Loaded {len(definitions)} definition files in {self.seconds:.2f}s, producing "
+                 f"{sum(m.pipelines for m in definitions)} pipelines with {sum(m.activities for m in definitions)} "
+                 f"activities. Slowest definition files:",
+                 f"{'self':>9} {'imports':>9} {'memory':>10} {'pipelines':>9} {'activities':>10}  file"]
+        for m in self.top(count):
+            lines.append(f"{m.self_seconds:>8.3f}s {self.import_seconds(m):>8.3f}s "
+                         f"{_format_bytes(m.self_allocated_bytes):>10} {m.pipelines:>9} {m.activities:>10}  "
+                         f"{_display_path(m.file, self.path)}")
+        imports = self.top(count, definitions=False)
+        if imports:
+            lines.append("Slowest imports:")
+            lines.append(f"{'total':>9} {'memory':>10}  module (imported by)")
+            for m in imports:
+                lines.append(f"{m.seconds:>8.3f}s {_format_bytes(m.allocated_bytes):>10}  {m.name} ({m.parent})")
+        return "\n".join(lines)
+
+    def log_report(self, count: int = DEFAULT_TOP):
+        for line in self.format_report(count).splitlines():
+            logger.info(line)
+
+
+_active: Optional[LoadProfiler] = None
+
+
+def profile_module(module: ModuleType):
+    """Profile the execution of a module within the context in the active LoadProfiler, if any
+
+    Modules imported through the import system are profiled automatically. This is only needed for modules that are
+    executed directly, using the loader of a module spec.
+    """
+    return _active.profile(module) if _active is not None else nullcontext()
+
+
+def _format_bytes(size: int) -> str:
+    if abs(size) < 1024 * 1024:
+        return f"{size / 1024:.1f}KiB"
+    return f"{size / 1024 / 1024:.1f}MiB"
+
+
+def _display_path(file: Optional[Path], root: Path) -> str:
+    if file is None:
+        return "?"
+    try:
+        return str(file.relative_to(root if root.is_dir() else root.parent))
+    except ValueError:
+        return str(file)
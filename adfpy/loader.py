@@ -0,0 +1,366 @@
+import ast
+import hashlib
+import importlib
+import importlib.util
+import logging
+import os
+import pickle
+import sys
+from pathlib import Path
+from types import ModuleType
+from typing import Dict, List, Optional, Set
+
+from adfpy.error import PipelineModuleParseException
+from adfpy.load_profile import profile_module
+from adfpy.pipeline import AdfPipeline
+
+logger = logging.getLogger("adfPy")
+
+# Prefix of the module names under which definition files are executed if they are not importable from sys.path
+UNIQUE_MODULE_PREFIX = "adfpy_definitions"
+
+# Bump this whenever the pickled representation of AdfPipeline objects changes, to invalidate existing caches
+CACHE_VERSION = 6
+
+
+def find_definition_files(path: Path) -> List[Path]:
+    """Find all Python files in a path
+
+    Args:
+        path: either a single `.py` file, or a directory that is searched recursively
+
+    Returns:
+        Sorted list of the Python files found
+    """
+    if path.is_file():
+        return [path]
+    return sorted(el for el in path.glob("**/*.py") if el.is_file())
+
+
+def importable_module_name(file_path: Path) -> Optional[str]:
+    """Determine the name under which a file can be imported using the current `sys.path`
+
+    Args:
+        file_path: path of a Python file
+
+    Returns:
+        The dotted module name, or None if the file is not importable from any `sys.path` entry
+    """
+    resolved = file_path.resolve()
+    for entry in sys.path:
+        try:
+            relative = resolved.relative_to(Path(entry or os.getcwd()).resolve())
+        except (ValueError, OSError):
+            continue
+        parts = list(relative.with_suffix("").parts)
+        if parts and parts[-1] == "__init__":
+            parts = parts[:-1]
+        if parts and all(part.isidentifier() for part in parts):
+            return ".".join(parts)
+    return None
+
+
+def unique_module_name(file_path: Path) -> str:
+    """Generate a module name for a file that is unique to its (resolved) location"""
+    digest = hashlib.sha1(str(file_path.resolve()).encode("utf-8")).hexdigest()[:12]
+    stem = "".join(c if c.isalnum() else "_" for c in file_path.stem)
+    return f"{UNIQUE_MODULE_PREFIX}_{stem}_{digest}"
+
+
+def _is_module_of(module: ModuleType, file_path: Path) -> bool:
+    module_file = getattr(module, "__file__", None)
+    return module_file is not None and Path(module_file).resolve() == file_path.resolve()
+
+
+def import_definition_module(file_path: Path) -> ModuleType:
+    """Import a pipeline definition file exactly once
+
+    If the file is importable from `sys.path`, it is imported through the regular import system under its dotted
+    module name. That way, definition files that import each other (e.g. a parent pipeline importing the pipelines it
+    depends on) are executed only once, and share the same objects. Other files are executed under a module name that
+    is unique to their location. In both cases, the module is registered in `sys.modules`, so importing the same file
+    again returns the already executed module.
+
+    Args:
+        file_path: path of the Python file to import
+
+    Raises: PipelineModuleParseException if no module spec can be created for the file
+
+    Returns:
+        The imported module
+    """
+    module_name = importable_module_name(file_path)
+    if module_name:
+        module = sys.modules.get(module_name)
+        if module is None:
+            try:
+                module = importlib.import_module(module_name)
+            except ModuleNotFoundError as e:
+                # The file is not importable after all, e.g. because one of its parent directories is shadowed
+                if e.name is None or not (module_name == e.name or module_name.startswith(e.name + ".")):
+                    raise
+        if module is not None and _is_module_of(module, file_path):
+            return module
+
+    module_name = unique_module_name(file_path)
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    mod_spec = importlib.util.spec_from_file_location(module_name, file_path)
+    if not mod_spec or not mod_spec.loader:
+        raise PipelineModuleParseException(f"Could not parse module spec from path {file_path}")
+    module = importlib.util.module_from_spec(mod_spec)
+    sys.modules[module_name] = module
+    try:
+        with profile_module(module):
+            mod_spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[module_name]
+        raise
+    return module
+
+
+def pipelines_in_module(module: ModuleType) -> Set[AdfPipeline]:
+    """Collect the AdfPipeline objects defined at the top level of a module"""
+    return set(var for var in vars(module).values() if isinstance(var, AdfPipeline))
+
+
+def load_pipelines_from_file(file_path: Path) -> Set[AdfPipeline]:
+    """Load all AdfPipeline objects from a file
+
+    This function only works with single files. Raises IsADirectoryError if the provided path is a directory
+
+    Args:
+        file_path: path of the Python file to load
+
+    Raises: IsADirectoryError if the provided path is a directory
+
+    Returns:
+        Set of AdfPipeline objects found in the provided file
+    """
+    if file_path.is_dir():
+        raise IsADirectoryError("load_pipelines_from_file is not intended to load pipelines from a directory."
+                                "Please use load_pipelines_from_path instead")
+    return pipelines_in_module(import_definition_module(file_path))
+
+
+def _load_files(file_paths: List[Path]) -> Dict[Path, Set[AdfPipeline]]:
+    return {file_path: load_pipelines_from_file(file_path) for file_path in file_paths}
+
+
+def load_files(file_paths: List[Path], processes: int = 1) -> Dict[Path, Set[AdfPipeline]]:
+    """Load all AdfPipeline objects from a list of files
+
+    Args:
+        file_paths: Python files to load
+        processes: number of worker processes used to load the files. With a single process (the default), all files
+            are loaded in the current process. With more processes, the files are divided over a process pool. Every
+            worker process imports each module at most once, but modules imported by files in different workers are
+            executed once per worker.
+
+    Returns:
+        Dictionary mapping every file to the set of AdfPipelines found in it
+    """
+    if processes <= 1 or len(file_paths) <= 1:
+        return _load_files(file_paths)
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Small chunks balance the load over the workers, while limiting the number of round trips
+    chunk_size = max(1, len(file_paths) // (processes * 4))
+    chunks = [file_paths[i:i + chunk_size] for i in range(0, len(file_paths), chunk_size)]
+    pipelines_by_file: Dict[Path, Set[AdfPipeline]] = {}
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        for loaded in executor.map(_load_files, chunks):
+            pipelines_by_file.update(loaded)
+    return pipelines_by_file
+
+
+def _imported_module_names(file_path: Path, module_name: Optional[str]) -> Set[str]:
+    """Collect the names of all modules (possibly) imported by a file, including relative imports"""
+    tree = ast.parse(file_path.read_bytes(), filename=str(file_path))
+    names: Set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if node.level:
+                if not module_name:
+                    continue
+                package_parts = module_name.split(".")
+                if file_path.name != "__init__.py":
+                    package_parts = package_parts[:-1]
+                if node.level > 1:
+                    package_parts = package_parts[:-(node.level - 1)]
+                base = ".".join(part for part in package_parts + [base] if part)
+            names.add(base)
+            # `from package import module` imports a module, rather than an attribute
+            names.update(f"{base}.{alias.name}" for alias in node.names)
+    return names
+
+
+def compute_local_imports(file_paths: List[Path]) -> Dict[Path, Set[Path]]:
+    """Determine which of the provided files each file directly imports
+
+    Args:
+        file_paths: Python files to analyse
+
+    Returns:
+        Dictionary mapping every file to the set of files (out of `file_paths`) it imports
+    """
+    module_names = {f: importable_module_name(f) for f in file_paths}
+    files_by_module = {name: f for f, name in module_names.items() if name}
+    local_imports = {}
+    for f in file_paths:
+        try:
+            imported = _imported_module_names(f, module_names[f])
+        except SyntaxError:
+            imported = set()
+        local_imports[f] = {files_by_module[name] for name in imported if name in files_by_module} - {f}
+    return local_imports
+
+
+def _reachable(start: Path, edges: Dict[Path, Set[Path]]) -> Set[Path]:
+    reachable = {start}
+    to_visit = [start]
+    while to_visit:
+        for neighbour in edges.get(to_visit.pop(), ()):
+            if neighbour not in reachable:
+                reachable.add(neighbour)
+                to_visit.append(neighbour)
+    return reachable
+
+
+def importing_files(changed: Set[Path], local_imports: Dict[Path, Set[Path]]) -> Set[Path]:
+    """Determine the files that (transitively) import any of the changed files, including the changed files
+
+    Args:
+        changed: files that changed
+        local_imports: result of `compute_local_imports`
+
+    Returns:
+        Set of the changed files and all files that (transitively) import them
+    """
+    imported_by: Dict[Path, Set[Path]] = {}
+    for f, imported in local_imports.items():
+        for imported_file in imported:
+            imported_by.setdefault(imported_file, set()).add(f)
+    affected: Set[Path] = set()
+    for f in changed:
+        affected |= _reachable(f, imported_by)
+    return affected
+
+
+def unload_definition_module(file_path: Path):
+    """Remove a definition file from `sys.modules`, so `import_definition_module` executes it again"""
+    for module_name in (importable_module_name(file_path), unique_module_name(file_path)):
+        module = sys.modules.get(module_name) if module_name else None
+        if module is not None and _is_module_of(module, file_path):
+            del sys.modules[module_name]  # type: ignore
+
+
+def compute_cache_keys(file_paths: List[Path]) -> Dict[Path, str]:
+    """Compute the discovery cache key of every file
+
+    The key of a file is the hash of its own content, combined with the content of all other files in `file_paths`
+    it (transitively) imports. Changing a file therefore changes its own key, and the key of every file importing it.
+
+    Args:
+        file_paths: Python files to compute the keys for
+
+    Returns:
+        Dictionary mapping every file to its cache key
+    """
+    content_hashes = {f: hashlib.sha256(f.read_bytes()).hexdigest() for f in file_paths}
+    local_imports = compute_local_imports(file_paths)
+
+    keys = {}
+    for f in file_paths:
+        closure = _reachable(f, local_imports)
+        key = hashlib.sha256(f"{CACHE_VERSION}:{sys.version_info[0]}.{sys.version_info[1]}".encode("utf-8"))
+        key.update(content_hashes[f].encode("utf-8"))
+        for dependency_hash in sorted(content_hashes[d] for d in closure - {f}):
+            key.update(dependency_hash.encode("utf-8"))
+        keys[f] = key.hexdigest()
+    return keys
+
+
+def _load_files_cached(file_paths: List[Path], cache_dir: Path, processes: int) -> Dict[Path, Set[AdfPipeline]]:
+    keys = compute_cache_keys(file_paths)
+    pipelines_by_file: Dict[Path, Set[AdfPipeline]] = {}
+    misses = []
+    for file_path in file_paths:
+        cache_file = cache_dir / f"{keys[file_path]}.pickle"
+        try:
+            with cache_file.open("rb") as f:
+                pipelines_by_file[file_path] = pickle.load(f)
+        except FileNotFoundError:
+            misses.append(file_path)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable discovery cache entry for {file_path}: {e}")
+            misses.append(file_path)
+    logger.info(f"Discovery cache: {len(file_paths) - len(misses)} hits, {len(misses)} misses")
+
+    loaded = load_files(misses, processes)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    for file_path, pipelines in loaded.items():
+        cache_file = cache_dir / f"{keys[file_path]}.pickle"
+        temporary_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        try:
+            with temporary_file.open("wb") as f:
+                pickle.dump(pipelines, f, protocol=pickle.HIGHEST_PROTOCOL)
+            temporary_file.replace(cache_file)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            temporary_file.unlink()
+            logger.warning(f"Could not cache the pipelines of {file_path}: {e}")
+    pipelines_by_file.update(loaded)
+    return pipelines_by_file
+
+
+def load_pipelines_by_file(path: Path,
+                           processes: int = 1,
+                           cache_dir: Optional[Path] = None) -> Dict[Path, Set[AdfPipeline]]:
+    """Load all AdfPipeline objects from a given path, grouped by the file they were found in
+
+    If a cache directory is provided, the pipelines each file produced are stored (pickled) in that directory. Files
+    that did not change since, and do not (transitively) import any file in the path that changed since, are served
+    from the cache without executing them. Note that only Python files in the path are taken into account; changes to
+    other inputs of a file (e.g. a YAML configuration file it reads) are not detected.
+
+    Args:
+        path: Path to scan for AdfPipeline objects. Either a directory, which is scanned recursively, or a single file.
+        processes: number of worker processes used to load the files, see `load_files`. Defaults to 1.
+        cache_dir: directory of the discovery cache. Defaults to None, i.e. no caching.
+
+    Returns:
+        Dictionary mapping every file found to the set of AdfPipelines found in it
+    """
+    file_paths = find_definition_files(path)
+    if cache_dir is not None:
+        return _load_files_cached(file_paths, cache_dir, processes)
+    return load_files(file_paths, processes)
+
+
+def load_pipelines_from_path(path: Path,
+                             pipelines: Optional[Set[AdfPipeline]] = None,
+                             processes: int = 1,
+                             cache_dir: Optional[Path] = None) -> Set[AdfPipeline]:
+    """Load all AdfPipeline objects from a given path.
+
+    The path can be either a directory or a file. If it's a directory, the function will recursively step through
+    the directory structure and look for all `.py` files. Each file is executed at most once, see
+    `import_definition_module`.
+
+    Args:
+        path: Path to scan for AdfPipeline objects
+        pipelines: Set of AdfPipelines to add the pipelines found to
+        processes: number of worker processes used to load the files. Defaults to 1.
+        cache_dir: directory of the discovery cache, see `load_pipelines_by_file`. Defaults to None, i.e. no caching.
+
+    Returns:
+        The final set of AdfPipelines found in the path
+    """
+    if pipelines is None:
+        pipelines = set()
+    for found in load_pipelines_by_file(path, processes, cache_dir).values():
+        pipelines.update(found)
+    return pipelines
@@ -0,0 +1,130 @@
+import json
+import logging
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from adfpy.diff import LocalHashes
+
+logger = logging.getLogger("adfPy")
+
+MANIFEST_VERSION = 1
+
+
+@dataclass
+class ManifestEntry:
+    """State of a single deployed resource
+
+    Attributes:
+        hash: canonical hash of the resource definition that was deployed
+        etag: ETag ADF reported for the resource after it was deployed
+    """
+    hash: str
+    etag: Optional[str] = None
+
+
+@dataclass
+class DeployManifest:
+    """State of the resources adfPy deployed to a data factory, as recorded after a successful deployment
+
+    Attributes:
+        factory: identifier of the data factory the manifest belongs to
+        pipelines: manifest entries of the deployed pipelines, indexed by name
+        triggers: manifest entries of the deployed triggers, indexed by name
+    """
+    factory: str
+    pipelines: Dict[str, ManifestEntry] = field(default_factory=dict)
+    triggers: Dict[str, ManifestEntry] = field(default_factory=dict)
+
+    def to_json(self) -> str:
+        return json.dumps({"version": MANIFEST_VERSION, **asdict(self)}, indent=2, sort_keys=True)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "DeployManifest":
+        content = json.loads(raw)
+        if content.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported manifest version: {content.get('version')}")
+        return cls(
+            factory=content["factory"],
+            pipelines={name: ManifestEntry(**entry) for name, entry in content["pipelines"].items()},
+            triggers={name: ManifestEntry(**entry) for name, entry in content["triggers"].items()},
+        )
+
+
+def build_manifest(factory: str,
+                   local: LocalHashes,
+                   pipeline_etags: Dict[str, Optional[str]],
+                   trigger_etags: Dict[str, Optional[str]]) -> DeployManifest:
+    """Build a manifest from the hashes of the deployed resources and their ETags
+
+    Args:
+        factory: identifier of the data factory the resources were deployed to
+        local: hashes of the deployed pipelines and triggers
+        pipeline_etags: ETags of the deployed pipelines, indexed by name
+        trigger_etags: ETags of the deployed triggers, indexed by name
+
+    Returns:
+        DeployManifest describing the deployed resources
+    """
+    return DeployManifest(
+        factory=factory,
+        pipelines={name: ManifestEntry(h, pipeline_etags.get(name)) for name, h in local.pipelines.items()},
+        triggers={name: ManifestEntry(h, trigger_etags.get(name)) for name, h in local.triggers.items()},
+    )
+
+
+def _is_blob_url(location: str) -> bool:
+    return location.startswith("https://")
+
+
+def _blob_client(location: str, credential: Any):
+    try:
+        from azure.storage.blob import BlobClient  # type: ignore
+    except ImportError as e:
+        raise ImportError("Storing the deploy manifest in blob storage requires the azure-storage-blob package. "
+                          "Install it with `pip install azure-storage-blob`") from e
+    return BlobClient.from_blob_url(location, credential=credential)
+
+
+def load_manifest(location: str, credential: Any = None) -> Optional[DeployManifest]:
+    """Load a deploy manifest from a local path or a blob storage URL
+
+    Args:
+        location: local file path, or `https://` URL of a blob
+        credential: credential used to access blob storage. Ignored for local paths.
+
+    Returns:
+        The DeployManifest, or None if no manifest exists at the location yet
+    """
+    if _is_blob_url(location):
+        from azure.core.exceptions import ResourceNotFoundError
+
+        try:
+            raw = _blob_client(location, credential).download_blob().readall()
+        except ResourceNotFoundError:
+            return None
+    else:
+        path = Path(location)
+        if not path.exists():
+            return None
+        raw = path.read_text()
+    return DeployManifest.from_json(raw)
+
+
+def save_manifest(manifest: DeployManifest, location: str, credential: Any = None):
+    """Store a deploy manifest at a local path or a blob storage URL
+
+    Args:
+        manifest: DeployManifest to store
+        location: local file path, or `https://` URL of a blob
+        credential: credential used to access blob storage. Ignored for local paths.
+    """
+    if _is_blob_url(location):
+        _blob_client(location, credential).upload_blob(manifest.to_json(), overwrite=True)
+    else:
+        path = Path(location)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = path.with_name(path.name + ".tmp")
+        temporary_path.write_text(manifest.to_json())
+        temporary_path.replace(path)
+    logger.info(f"Stored deploy manifest at {location}")
@@ -1,10 +1,17 @@
 from datetime import datetime, timezone
-from typing import List
-
-from azure.mgmt.datafactory.models import PipelineResource  # type: ignore
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional
 
 from adfpy.activity import AdfActivity
-from adfpy.trigger import AdfScheduleTrigger
+from adfpy.error import InvalidPipelineError
+from adfpy.graph import ActivityGraph
+from adfpy.serialize import serialize_object
+from adfpy.throughput import CopyThroughputSettings, pipeline_copy_throughput
+from adfpy.trigger import AdfScheduleTrigger, AdfTumblingWindowTrigger, TumblingWindow
+
+if TYPE_CHECKING:
+    from azure.mgmt.datafactory.models import PipelineResource  # type: ignore
+
+    from adfpy.estimate import DurationEstimate, RuntimeEstimate
 
 
 class AdfPipeline:
@@ -13,17 +20,34 @@ class AdfPipeline:
                  activities: List[AdfActivity] = None,
                  depends_on_pipelines={},
                  schedule=None,
-                 start_time=None):
+                 start_time=None,
+                 tags: List[str] = None,
+                 copy_throughput: Optional[CopyThroughputSettings] = None):
         self.name = name
         self.activities = activities
         self.schedule = schedule
         self.start_time = start_time
+        self.explicit_start_time = start_time is not None
+        self.tags = tags or []
+        self.copy_throughput = copy_throughput
         if not activities:
             self.activities = []
 
         self.depends_on_pipelines = depends_on_pipelines
 
-        if schedule:
+        if isinstance(schedule, TumblingWindow):
+            if not self.start_time:
+                raise ValueError(f"Pipeline {self.name} has a tumbling window schedule, which requires an explicit "
+                                 f"start_time")
+            self.schedule = AdfTumblingWindowTrigger(name=f"{self.name}-trigger",
+                                                     window=schedule,
+                                                     start_time=self.start_time,
+                                                     pipeline=self.name)
+            # The triggers depended on have to be deployed first
+            missing = [p for p in schedule.upstream_pipelines if p not in depends_on_pipelines]
+            if missing:
+                self.depends_on_pipelines = list(depends_on_pipelines) + missing
+        elif schedule:
             if not self.start_time:
                 self.start_time = datetime.now(tz=timezone.utc)
             self.schedule = AdfScheduleTrigger(name=f"{self.name}-trigger",
@@ -32,8 +56,67 @@ class AdfPipeline:
                                                pipelines=[self.name]
                                                )
 
-    def to_adf(self):
-        return PipelineResource(activities=[act.to_adf() for act in self.activities])
+    @property
+    def graph(self) -> ActivityGraph:
+        """Index of the activities of this pipeline, including nested activities
+
+        The graph is built from the current activities on every access, in linear time. Keep a reference to it when
+        querying it repeatedly.
+        """
+        return ActivityGraph(self.activities)
+
+    def validate(self) -> ActivityGraph:
+        """Check the activities of this pipeline for duplicate names, dangling dependencies and cycles
+
+        Raises: InvalidPipelineError describing all problems found
+
+        Returns:
+            The validated ActivityGraph of this pipeline
+        """
+        graph = self.graph
+        try:
+            graph.validate()
+        except InvalidPipelineError as e:
+            raise InvalidPipelineError(f"Pipeline {self.name} is invalid:\n{e}") from None
+        return graph
+
+    def estimate_runtime(self,
+                         durations: Optional[Mapping[str, "DurationEstimate"]] = None,
+                         iterations: Optional[Mapping[str, int]] = None,
+                         default_duration: float = 0.0,
+                         quantile: float = 0.5) -> "RuntimeEstimate":
+        """Estimate the runtime, critical path and bottlenecks of this pipeline
+
+        See `adfpy.estimate.estimate_runtime` for the arguments.
+        """
+        from adfpy.estimate import estimate_runtime
+
+        return estimate_runtime(self, durations, iterations, default_duration, quantile)
+
+    def to_adf(self) -> "PipelineResource":
+        from azure.mgmt.datafactory.models import PipelineResource  # type: ignore
+
+        # Copy activities (also nested ones) inherit the copy throughput settings of this pipeline
+        token = pipeline_copy_throughput.set(self.copy_throughput)
+        try:
+            activities = [act.to_adf() for act in self.activities]
+        finally:
+            pipeline_copy_throughput.reset(token)
+        return PipelineResource(activities=activities, annotations=self.tags or None)
+
+    def to_adf_json(self) -> Dict[str, Any]:
+        """Serialize this pipeline directly, producing the same JSON as serializing `to_adf()` with the SDK
+
+        See `adfpy.serialize` for sending the result to ADF.
+        """
+        token = pipeline_copy_throughput.set(self.copy_throughput)
+        try:
+            properties: Dict[str, Any] = {"activities": [act.to_adf_json() for act in self.activities]}
+        finally:
+            pipeline_copy_throughput.reset(token)
+        if self.tags:
+            properties["annotations"] = [serialize_object(tag) for tag in self.tags]
+        return {"properties": properties}
 
     def __eq__(self, other):
         # This is debatable
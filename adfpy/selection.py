@@ -0,0 +1,131 @@
+import fnmatch
+import logging
+import subprocess
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from adfpy.error import InvalidSelectionError
+from adfpy.loader import compute_local_imports, find_definition_files, importing_files
+from adfpy.pipeline import AdfPipeline
+
+logger = logging.getLogger("adfPy")
+
+
+def _git(args: List[str], cwd: Path) -> str:
+    try:
+        return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout
+    except FileNotFoundError as e:
+        raise InvalidSelectionError("Selecting pipelines by git changes requires git to be installed") from e
+    except subprocess.CalledProcessError as e:
+        raise InvalidSelectionError(f"git {' '.join(args)} failed: {e.stderr.strip()}") from e
+
+
+def changed_files_since(ref: str, path: Path) -> Set[Path]:
+    """Determine which files in a path changed since a git reference
+
+    Both committed and uncommitted changes are taken into account, as well as untracked files.
+
+    Args:
+        ref: git reference (e.g. a branch, tag or commit) to compare with
+        path: path in a git repository
+
+    Raises: InvalidSelectionError if git is not available, or the reference does not exist
+
+    Returns:
+        Set of resolved paths of the changed files that still exist
+    """
+    directory = path if path.is_dir() else path.parent
+    root = Path(_git(["rev-parse", "--show-toplevel"], directory).strip())
+    changed = _git(["diff", "--name-only", ref, "--", str(path.resolve())], directory).splitlines()
+    changed += _git(["ls-files", "--others", "--exclude-standard", "--full-name", "--", str(path.resolve())],
+                    directory).splitlines()
+    return {(root / f).resolve() for f in changed if (root / f).exists()}
+
+
+def dependency_closure(pipelines: Iterable[AdfPipeline]) -> Set[AdfPipeline]:
+    """Expand a set of pipelines with all pipelines they (transitively) depend on"""
+    closure: Dict[str, AdfPipeline] = {}
+    to_visit = list(pipelines)
+    while to_visit:
+        pipeline = to_visit.pop()
+        if pipeline.name not in closure:
+            closure[pipeline.name] = pipeline
+            to_visit.extend(pipeline.depends_on_pipelines)
+    return set(closure.values())
+
+
+@dataclass
+class PipelineSelection:
+    """Selection of the pipelines to deploy
+
+    A pipeline is selected if it matches any of the selectors. The selection is always expanded with the pipelines
+    the selected pipelines (transitively) depend on. Without any selectors, all pipelines are selected.
+
+    Attributes:
+        patterns: pipeline names or glob patterns (e.g. `ingest_*`)
+        tags: tags of which a pipeline should have at least one
+        changed_since: git reference. Pipelines defined in files that changed since this reference are selected, as
+            well as pipelines defined in files that (transitively) import any of the changed files.
+    """
+    patterns: List[str] = field(default_factory=list)
+    tags: List[str] = field(default_factory=list)
+    changed_since: Optional[str] = None
+
+    @property
+    def active(self) -> bool:
+        return bool(self.patterns or self.tags or self.changed_since)
+
+    def matches_name(self, name: str) -> bool:
+        return any(fnmatch.fnmatchcase(name, pattern) for pattern in self.patterns)
+
+    def apply(self, pipelines_by_file: Dict[Path, Set[AdfPipeline]], path: Path) -> Set[AdfPipeline]:
+        """Select pipelines
+
+        Args:
+            pipelines_by_file: loaded pipelines, grouped by the file they were found in
+            path: path the pipelines were loaded from
+
+        Returns:
+            Set of the selected pipelines, including the pipelines they depend on
+        """
+        if not self.active:
+            return dependency_closure(p for pipelines in pipelines_by_file.values() for p in pipelines)
+
+        selected_files: Set[Path] = set()
+        if self.changed_since:
+            changed = changed_files_since(self.changed_since, path)
+            file_paths = {f.resolve(): f for f in find_definition_files(path)}
+            changed_files = {file_paths[f] for f in changed if f in file_paths}
+            selected_files = importing_files(changed_files, compute_local_imports(list(file_paths.values())))
+
+        selected = []
+        for file_path, pipelines in pipelines_by_file.items():
+            for pipeline in pipelines:
+                if (file_path in selected_files
+                        or self.matches_name(pipeline.name)
+                        or set(self.tags) & set(pipeline.tags)):
+                    selected.append(pipeline)
+        closure = dependency_closure(selected)
+        logger.info(f"Selected {len(selected)} pipelines, {len(closure)} including the pipelines they depend on")
+        return closure
+
+    def stale_candidates(self, existing_pipelines: Iterable[str], local_pipelines_names: Set[str]) -> List[str]:
+        """Determine which existing pipelines may be removed as stale
+
+        Without selectors, every existing pipeline that is not defined locally is stale. With selectors, only
+        pipelines matching the name patterns are in scope: a partial deployment never removes pipelines outside its
+        scope. Tag and git based selectors can not be matched against pipelines that no longer exist locally, so
+        they never make a pipeline a candidate for removal.
+
+        Args:
+            existing_pipelines: names of the pipelines that exist in ADF
+            local_pipelines_names: names of all locally defined pipelines, selected or not
+
+        Returns:
+            List of names of pipelines that may be removed
+        """
+        candidates = [name for name in existing_pipelines if name not in local_pipelines_names]
+        if self.active:
+            candidates = [name for name in candidates if self.matches_name(name)]
+        return candidates
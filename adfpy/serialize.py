@@ -0,0 +1,226 @@
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+# Same as the flattening pattern of msrest: keys are split on dots, unless escaped
+_FLATTEN = re.compile(r"(?<!\\)\.")
+
+_BASIC_TYPES = (str, int, bool, float)
+_BASIC_CONVERTERS = {"int": int, "bool": bool, "float": float}
+
+# Attribute name, flattened JSON keys (empty for additional properties) and type of every serialized model attribute
+_SerializationPlan = List[Tuple[str, Tuple[str, ...], str]]
+
+# The serialization plan of every model class serialized so far
+_serialization_plans: Dict[type, _SerializationPlan] = {}
+
+
+@dataclass
+class JsonPayload:
+    """A resource definition that has already been serialized to the JSON payload sent to ADF
+
+    Operations of clients passed to `accept_json_payloads` send the payload as-is, rather than serializing an SDK
+    model.
+
+    Attributes:
+        data: the serialized (JSON-compatible) resource definition
+    """
+    data: Dict[str, Any]
+
+
+class PayloadSerializer:
+    """Wraps the serializer of an SDK operation group, passing JsonPayload bodies through as-is"""
+
+    def __init__(self, serializer: Any):
+        self._serializer = serializer
+
+    def body(self, data: Any, data_type: str, **kwargs) -> Any:
+        if isinstance(data, JsonPayload):
+            return data.data
+        return self._serializer.body(data, data_type, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._serializer, name)
+
+
+def accept_json_payloads(client: Any) -> Any:
+    """Let the pipeline and trigger operations of an SDK client accept JsonPayload definitions
+
+    The SDK serializes a resource by first deserializing it into (a copy of) its models, and then walking all of them,
+    so sending a JsonPayload skips two passes over the definition. Everything else about the request (e.g. its URL,
+    headers, policies and the deserialization of the response) is unchanged. Operation groups without an SDK serializer
+    are left alone. Works for both the synchronous and asynchronous clients.
+
+    Args:
+        client: DataFactoryManagementClient to modify
+
+    Returns:
+        The client
+    """
+    # The operation groups of azure-mgmt-datafactory serialize request bodies with `self._serialize.body`, which was
+    # verified for versions 2.2.1 up to and including 2.6.0, of both the synchronous and asynchronous clients
+    for group in ("pipelines", "triggers"):
+        operations = getattr(client, group)
+        serializer = getattr(operations, "_serialize", None)
+        if not isinstance(serializer, PayloadSerializer):
+            if not callable(getattr(serializer, "body", None)):
+                continue
+            operations._serialize = PayloadSerializer(serializer)
+        operations.accepts_json_payloads = True
+    return client
+
+
+def accepts_json_payloads(operations: Any) -> bool:
+    """Whether an operation group (e.g. `client.pipelines`) accepts JsonPayload definitions"""
+    return getattr(operations, "accepts_json_payloads", False) is True
+
+
+def request_body(resource: Any, operations: Any) -> Any:
+    """The definition of a pipeline or trigger to pass to `create_or_update` of an operation group
+
+    Returns:
+        JsonPayload of `resource.to_adf_json()` if the operation group accepts it, otherwise `resource.to_adf()`
+    """
+    if accepts_json_payloads(operations):
+        return JsonPayload(resource.to_adf_json())
+    return resource.to_adf()
+
+
+def serialize_datetime(value: Any) -> str:
+    """Serialize a datetime like the SDK does: in UTC with millisecond precision, e.g. `2022-01-01T00:00:00.000Z`
+
+    Datetimes without a timezone are considered to be in UTC.
+    """
+    if not isinstance(value, datetime):
+        return _sdk_serializer().serialize_iso(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    if not 1 <= value.year <= 9999:
+        return _sdk_serializer().serialize_iso(value)
+    microseconds = str(value.microsecond).rjust(6, "0").rstrip("0").ljust(3, "0")
+    return (f"{value.year:04}-{value.month:02}-{value.day:02}T{value.hour:02}:{value.minute:02}:{value.second:02}"
+            f".{microseconds}Z")
+
+
+def serialize_str(value: Any) -> str:
+    """Serialize a value of an attribute of type `str`, like the SDK does: enums are serialized as their value"""
+    if type(value) is str:
+        return value
+    try:
+        return value.value
+    except AttributeError:
+        return str(value)
+
+
+def serialize_object(value: Any) -> Any:
+    """Serialize a value of an attribute of type `object`, like the SDK does"""
+    value_type = type(value)
+    if value_type in _BASIC_TYPES or value is None:
+        return value
+    if value_type is dict:
+        return {serialize_str(k): serialize_object(v) for k, v in value.items()}
+    if value_type is list:
+        return [serialize_object(v) for v in value]
+    if hasattr(value, "_attribute_map"):
+        return serialize_model(value)
+    if value_type is datetime:
+        return serialize_datetime(value)
+    return _sdk_serializer().serialize_object(value)
+
+
+def serialize_value(value: Any, data_type: str) -> Any:
+    """Serialize a (non-None) value of a model attribute, given the type in the attribute map of the model"""
+    if data_type == "str":
+        return serialize_str(value)
+    if data_type == "object":
+        return serialize_object(value)
+    if data_type in ("int", "bool", "float"):
+        return _BASIC_CONVERTERS[data_type](value)
+    if data_type == "iso-8601":
+        return serialize_datetime(value)
+    if data_type[0] == "[" and data_type[-1] == "]" and not isinstance(value, str):
+        item_type = data_type[1:-1]
+        return [None if item is None else serialize_value(item, item_type) for item in value]
+    if data_type[0] == "{" and data_type[-1] == "}":
+        item_type = data_type[1:-1]
+        return {serialize_str(k): None if v is None else serialize_value(v, item_type) for k, v in value.items()}
+    if hasattr(value, "_attribute_map"):
+        return serialize_model(value)
+    return _sdk_serializer().serialize_data(value, data_type)
+
+
+def _serialization_plan(model_class: type) -> _SerializationPlan:
+    plan = _serialization_plans.get(model_class)
+    if plan is None:
+        plan = _serialization_plans[model_class] = _build_serialization_plan(model_class)
+    return plan
+
+
+def _build_serialization_plan(model_class: Any) -> _SerializationPlan:
+    plan: _SerializationPlan = []
+    for attribute, description in model_class._attribute_map.items():
+        if model_class._validation.get(attribute, {}).get("readonly", False):
+            continue
+        if attribute == "additional_properties" and description["key"] == "":
+            plan.append((attribute, (), description["type"]))
+            continue
+        keys = tuple(key.replace("\\.", ".") for key in _FLATTEN.split(description["key"]))
+        plan.append((attribute, keys, description["type"]))
+    return plan
+
+
+def serialize_model(model: Any) -> Dict[str, Any]:
+    """Serialize an SDK model, producing the same result as `model.serialize()`
+
+    Rather than interpreting the attribute map of every model on every serialization, the attributes to serialize
+    and their (flattened) keys are determined once per model class.
+
+    Args:
+        model: azure SDK model, e.g. a CopySource
+
+    Returns:
+        The serialized model
+    """
+    serialized: Dict[str, Any] = {}
+    for attribute, keys, data_type in _serialization_plan(type(model)):
+        value = getattr(model, attribute)
+        if value is None:
+            continue
+        if not keys:
+            serialized.update(value)
+            continue
+        value = serialize_value(value, data_type)
+        target = serialized
+        for key in keys[:-1]:
+            target = target.setdefault(key, {})
+        target.setdefault(keys[-1], value)
+    return serialized
+
+
+def without_none(serialized: Dict[str, Any]) -> Dict[str, Any]:
+    """Leave the keys without a value out of a serialized definition, as the SDK does"""
+    return {key: value for key, value in serialized.items() if value is not None}
+
+
+def reference(reference_type: str, name: str, parameters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Serialize a reference to another resource, e.g. a DatasetReference"""
+    serialized = {"type": reference_type, "referenceName": name}
+    if parameters is not None:
+        serialized["parameters"] = serialize_value(parameters, "{object}")
+    return serialized
+
+
+def expression(value: Optional[str]) -> Dict[str, Any]:
+    """Serialize an ADF Expression"""
+    return {"type": "Expression"} if value is None else {"type": "Expression", "value": serialize_str(value)}
+
+
+@lru_cache(maxsize=None)
+def _sdk_serializer() -> Any:
+    """Serializer of the SDK, for the (rarely used) types that are not serialized by this module itself"""
+    from azure.mgmt.datafactory import models  # type: ignore
+    from msrest import Serializer
+
+    return Serializer({k: v for k, v in vars(models).items() if isinstance(v, type)})
@@ -0,0 +1,293 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, List, Optional
+
+from adfpy.cron import WEEK_DAYS, AdfCronExpression
+
+if TYPE_CHECKING:
+    import numpy as np  # type: ignore
+    from azure.mgmt.datafactory.models import ScheduleTriggerRecurrence  # type: ignore
+
+# Number of differences kept in a SimulationReport, to keep reports of badly mismatching schedules readable
+MAX_REPORTED_DIFFERENCES = 10
+
+
+def _numpy() -> Any:
+    try:
+        import numpy  # type: ignore
+    except ImportError as e:
+        raise ImportError("Simulating schedules requires the numpy package. Install it with "
+                          "`pip install adfpy[simulate]`") from e
+    return numpy
+
+
+@dataclass
+class Calendar:
+    """The days covered by a window of minutes, with their calendar fields as NumPy arrays
+
+    Both cron expressions and ADF recurrences select minutes by a combination of days and times of day. Masks over the
+    window are therefore computed as a grid of days by minutes of the day, which is flattened and cut to the window.
+    This limits the work done per minute of the window to combining boolean arrays.
+
+    Attributes:
+        start: first minute of the window
+        length: number of minutes in the window
+        first_minute: minute of the day of `start`, i.e. the index of `start` within the flattened grid
+        day: day of the month (1-31) of every day
+        month: month of the year (1-12)
+        week_day: day of the week, 0 being Sunday as in cron
+        days_in_month: number of days in the month
+        day_index: number of days since the epoch
+        week_index: number of (Sunday to Saturday) weeks since the epoch
+        month_index: number of months since the epoch
+    """
+    start: datetime
+    length: int
+    first_minute: int
+    day: "np.ndarray"
+    month: "np.ndarray"
+    week_day: "np.ndarray"
+    days_in_month: "np.ndarray"
+    day_index: "np.ndarray"
+    week_index: "np.ndarray"
+    month_index: "np.ndarray"
+
+    @classmethod
+    def build(cls, start: datetime, end: datetime) -> "Calendar":
+        """Build the calendar of every minute from start (inclusive) to end (exclusive)"""
+        np = _numpy()
+        start, end = _naive_minute(start), _naive_minute(end)
+        length = max(0, (end - start) // timedelta(minutes=1))
+        first_minute = start.hour * 60 + start.minute
+        first_day = np.datetime64(start.date(), "D")
+        days = np.arange(first_day, first_day + (first_minute + length + MINUTES_PER_DAY - 1) // MINUTES_PER_DAY)
+        months = days.astype("datetime64[M]")
+        day_index = days.astype("int64")
+        month_index = months.astype("int64")
+        return cls(
+            start=start,
+            length=length,
+            first_minute=first_minute,
+            day=(days - months).astype("int64") + 1,
+            month=month_index % 12 + 1,
+            # 1970-01-01 was a Thursday
+            week_day=(day_index + 4) % 7,
+            days_in_month=((months + 1).astype("datetime64[D]") - months.astype("datetime64[D]")).astype("int64"),
+            day_index=day_index,
+            week_index=(day_index + 4) // 7,
+            month_index=month_index,
+        )
+
+    def index_of(self, moment: datetime) -> int:
+        """Index of the minute of the given moment within the window, which may be outside of it"""
+        return (_naive_minute(moment) - self.start) // timedelta(minutes=1)
+
+    def grid(self, days: "np.ndarray", times: "np.ndarray") -> "np.ndarray":
+        """Combine a mask of days and a mask of minutes of the day into a mask of the minutes in the window"""
+        np = _numpy()
+        return np.outer(days, times).ravel()[self.first_minute:self.first_minute + self.length]
+
+    def to_datetimes(self, mask: "np.ndarray", limit: Optional[int] = None) -> List[datetime]:
+        return [self.start + timedelta(minutes=int(i)) for i in _numpy().flatnonzero(mask)[:limit]]
+
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def _naive_minute(moment: datetime) -> datetime:
+    # Times are compared as wall clock times in the time zone of the schedule, without daylight saving transitions
+    return moment.replace(tzinfo=None, second=0, microsecond=0)
+
+
+def _lookup(values: Any, size: int) -> "np.ndarray":
+    table = _numpy().zeros(size, dtype=bool)
+    table[list(values)] = True
+    return table
+
+
+def _times_of_day(minutes: Any, hours: Any) -> "np.ndarray":
+    """Mask of the minutes of the day matching any of the minutes and hours"""
+    return (_lookup(hours, 24)[:, None] & _lookup(minutes, 60)[None, :]).ravel()
+
+
+def cron_mask(expression: AdfCronExpression, calendar: Calendar) -> "np.ndarray":
+    """The minutes of the calendar at which a cron expression fires
+
+    Returns:
+        Boolean array with an element for every minute in the window of the calendar
+    """
+    months = _lookup(expression.months, 13)[calendar.month]
+    day_of_month = _lookup(expression.days_of_month, 32)[calendar.day]
+    day_of_week = _lookup(expression.days_of_week, 7)[calendar.week_day]
+    if expression.day_of_month_restricted and expression.day_of_week_restricted:
+        days = months & (day_of_month | day_of_week)
+    else:
+        days = months & day_of_month & day_of_week
+    return calendar.grid(days, _times_of_day(expression.minutes, expression.hours))
+
+
+def _start_time(recurrence: "ScheduleTriggerRecurrence") -> datetime:
+    if recurrence.start_time is None:
+        raise ValueError("Simulating recurrences without a start time is not supported")
+    return recurrence.start_time
+
+
+def recurrence_mask(recurrence: "ScheduleTriggerRecurrence", calendar: Calendar) -> "np.ndarray":
+    """The minutes of the calendar at which an ADF schedule trigger recurrence fires
+
+    Without a schedule, the trigger fires every `interval` minutes, hours, days, weeks or months from its start time.
+    With a schedule, it fires at the scheduled times within every `interval`-th day, week or month, counting from the
+    one containing the start time. Parts of the schedule that are not set default to the start time (e.g. its minute,
+    if only hours are scheduled).
+
+    Returns:
+        Boolean array with an element for every minute in the window of the calendar
+    """
+    np = _numpy()
+    start = _naive_minute(_start_time(recurrence))
+    first = calendar.index_of(start)
+    frequency, interval = str(recurrence.frequency), recurrence.interval or 1
+    start_day_index = (start.date() - datetime(1970, 1, 1).date()).days
+    start_month_index = (start.year - 1970) * 12 + start.month - 1
+
+    if frequency in ("Minute", "Hour"):
+        period = interval * (60 if frequency == "Hour" else 1)
+        mask = np.zeros(calendar.length, dtype=bool)
+        mask[first if first >= 0 else first % period::period] = True
+    else:
+        if frequency == "Day":
+            days = (calendar.day_index - start_day_index) % interval == 0
+        elif frequency == "Week":
+            days = (calendar.week_index - (start_day_index + 4) // 7) % interval == 0
+        elif frequency == "Month":
+            days = (calendar.month_index - start_month_index) % interval == 0
+        else:
+            raise ValueError(f"Simulating recurrences with frequency {frequency} is not supported")
+
+        schedule = recurrence.schedule
+        if frequency == "Week":
+            week_days = [WEEK_DAYS.index(str(day)) for day in schedule.week_days] if schedule and schedule.week_days \
+                else [(start.weekday() + 1) % 7]
+            days &= _lookup(week_days, 7)[calendar.week_day]
+        elif frequency == "Month" and schedule and schedule.monthly_occurrences:
+            occurrence = (calendar.day - 1) // 7 + 1
+            occurrence_from_end = -((calendar.days_in_month - calendar.day) // 7 + 1)
+            scheduled_days = np.zeros(len(calendar.day), dtype=bool)
+            for scheduled in schedule.monthly_occurrences:
+                matches_occurrence = True
+                if scheduled.occurrence is not None:
+                    matches_occurrence = (occurrence == scheduled.occurrence) | (
+                        occurrence_from_end == scheduled.occurrence)
+                scheduled_days |= (calendar.week_day == WEEK_DAYS.index(str(scheduled.day))) & matches_occurrence
+            days &= scheduled_days
+        elif frequency == "Month":
+            month_days = schedule.month_days if schedule and schedule.month_days else [start.day]
+            scheduled_days = np.zeros(len(calendar.day), dtype=bool)
+            for month_day in month_days:
+                # Negative days count from the end of the month, -1 being the last day
+                scheduled_days |= calendar.day == (month_day if month_day > 0 else
+                                                   calendar.days_in_month + month_day + 1)
+            days &= scheduled_days
+        elif schedule and (schedule.week_days or schedule.month_days or schedule.monthly_occurrences):
+            raise ValueError("Daily recurrences can not be scheduled on specific days of the week or month")
+        mask = calendar.grid(days, _times_of_day(schedule.minutes if schedule and schedule.minutes else [start.minute],
+                                                 schedule.hours if schedule and schedule.hours else [start.hour]))
+        mask[:max(first, 0)] = False
+    if recurrence.end_time is not None:
+        mask[max(calendar.index_of(recurrence.end_time) + 1, 0):] = False
+    return mask
+
+
+@dataclass
+class SimulationReport:
+    """Comparison of the fire times of a cron expression and an ADF recurrence within a window
+
+    Attributes:
+        expression: the cron expression
+        window_start: start of the simulated window (inclusive)
+        window_end: end of the simulated window (exclusive)
+        cron_fire_count: number of times the cron expression fires within the window
+        recurrence_fire_count: number of times the recurrence fires within the window
+        missing: (up to MAX_REPORTED_DIFFERENCES) times at which cron fires, but the recurrence does not
+        extra: (up to MAX_REPORTED_DIFFERENCES) times at which the recurrence fires, but cron does not
+        missing_count: total number of times at which cron fires, but the recurrence does not
+        extra_count: total number of times at which the recurrence fires, but cron does not
+    """
+    expression: str
+    window_start: datetime
+    window_end: datetime
+    cron_fire_count: int
+    recurrence_fire_count: int
+    missing: List[datetime] = field(default_factory=list)
+    extra: List[datetime] = field(default_factory=list)
+    missing_count: int = 0
+    extra_count: int = 0
+
+    @property
+    def equivalent(self) -> bool:
+        return self.missing_count == 0 and self.extra_count == 0
+
+    def __str__(self) -> str:
+        summary = (f"Cron expression '{self.expression}' fires {self.cron_fire_count} times and its ADF recurrence "
+                   f"{self.recurrence_fire_count} times between {self.window_start} and {self.window_end}")
+        if self.equivalent:
+            return summary
+        lines = [summary]
+        if self.missing_count:
+            lines.append(f"Not fired by the recurrence ({self.missing_count}): "
+                         f"{', '.join(str(moment) for moment in self.missing)}")
+        if self.extra_count:
+            lines.append(f"Only fired by the recurrence ({self.extra_count}): "
+                         f"{', '.join(str(moment) for moment in self.extra)}")
+        return "\n".join(lines)
+
+
+def simulate(
+        expression: str,
+        recurrence: "ScheduleTriggerRecurrence",
+        window_start: Optional[datetime] = None,
+        window_end: Optional[datetime] = None,
+        days: int = 366,
+) -> SimulationReport:
+    """Compare the fire times of a cron expression and an ADF recurrence at minute resolution
+
+    Both are expanded into boolean masks over every minute of the window using NumPy, so simulating a year takes in
+    the order of milliseconds. The cron expression only fires from the start time of the recurrence onwards, like the
+    trigger it is translated into.
+
+    Args:
+        expression: the cron expression (or preset)
+        recurrence: the SDK ScheduleTriggerRecurrence
+        window_start: start of the window to simulate. Defaults to the start time of the recurrence.
+        window_end: end of the window to simulate. Defaults to `days` days after the start of the window.
+        days: length of the window, if window_end is not set
+
+    Returns:
+        SimulationReport listing the differences
+    """
+    start_time = _start_time(recurrence)
+    window_start = window_start or start_time
+    window_end = window_end or window_start + timedelta(days=days)
+    calendar = _calendar(_naive_minute(window_start), _naive_minute(window_end))
+    cron = cron_mask(AdfCronExpression.parse(expression), calendar)
+    cron[:max(calendar.index_of(start_time), 0)] = False
+    adf = recurrence_mask(recurrence, calendar)
+    missing, extra = cron & ~adf, adf & ~cron
+    return SimulationReport(
+        expression=expression,
+        window_start=calendar.start,
+        window_end=_naive_minute(window_end),
+        cron_fire_count=int(cron.sum()),
+        recurrence_fire_count=int(adf.sum()),
+        missing=calendar.to_datetimes(missing, MAX_REPORTED_DIFFERENCES),
+        extra=calendar.to_datetimes(extra, MAX_REPORTED_DIFFERENCES),
+        missing_count=int(missing.sum()),
+        extra_count=int(extra.sum()),
+    )
+
+
+@lru_cache(maxsize=4)
+def _calendar(start: datetime, end: datetime) -> Calendar:
+    # Triggers of the same factory typically share their start time, so recent calendars are reused
+    return Calendar.build(start, end)
@@ -0,0 +1,367 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("adfPy")
+
+# Upper bounds (in seconds) of the buckets of the request latency histograms
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PROMETHEUS_PREFIX = "adfpy_deploy"
+
+
+class LatencyHistogram:
+    """Histogram of request latencies, with fixed bucket boundaries like a Prometheus histogram
+
+    Args:
+        buckets: sorted upper bounds (in seconds) of the buckets. A last bucket without upper bound is always added.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> float:
+        """Estimate of the q-quantile: the upper bound of the bucket containing it (or the maximum latency observed,
+        if that is lower)"""
+        if not self.count:
+            return 0.0
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            if cumulative >= q * self.count:
+                return min(bound, self.max)
+        return self.max
+
+    def cumulative_counts(self) -> List[Tuple[str, int]]:
+        """Number of observations up to every upper bound, including "+Inf\""""
+        cumulative = 0
+        result = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            result.append(("+Inf" if bound == float("inf") else repr(bound), cumulative))
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "buckets": dict(self.cumulative_counts()),
+        }
+
+
+@dataclass
+class OperationStats:
+    """Requests sent for a single SDK operation (e.g. `pipelines.create_or_update`)
+
+    Attributes:
+        latency: histogram of the duration of every request, including failed requests
+        requests: number of requests sent, including retries
+        retries: number of requests that were retries
+        throttled: number of requests that were throttled (429)
+        errors: number of requests that failed, whether or not they were retried
+        bytes_sent: total size of the request bodies
+    """
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    requests: int = 0
+    retries: int = 0
+    throttled: int = 0
+    errors: int = 0
+    bytes_sent: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "errors": self.errors,
+            "bytes_sent": self.bytes_sent,
+            "latency": self.latency.to_dict(),
+        }
+
+
+@dataclass
+class Span:
+    """A timed part of a deployment. Times are taken from `time.perf_counter`"""
+    name: str
+    start: float
+    end: float
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def seconds(self) -> float:
+        return self.end - self.start
+
+
+class DeployTelemetry:
+    """Timings of the phases of a deployment, and statistics of the requests it sent to ADF
+
+    Phases (e.g. "load" or "write") are timed with `phase`. Phases may overlap: "serialize" is timed for every
+    pipeline within "write", on the workers deploying the pipelines, so its time is the total over all workers. Requests
+    are recorded by a RequestScheduler that was given this object.
+
+    The results can be written as a JSON summary (`write_json`), as a Prometheus textfile (`write_prometheus`), and
+    exported as OpenTelemetry spans (`export_opentelemetry`).
+
+    Args:
+        factory: identifier of the factory that is deployed to, added to all exported metrics
+        buckets: upper bounds (in seconds) of the buckets of the request latency histograms
+    """
+
+    def __init__(self, factory: Optional[str] = None, buckets: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS):
+        self.factory = factory
+        self.buckets = buckets
+        self.spans: List[Span] = []
+        self.operations: Dict[str, OperationStats] = {}
+        self.succeeded: Optional[bool] = None
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self._end: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def duration(self) -> float:
+        return (self._end if self._end is not None else time.perf_counter()) - self._start
+
+    @contextmanager
+    def phase(self, name: str, **attributes) -> Iterator[None]:
+        """Time the code within the context as a phase of the deployment"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            span = Span(name, start, time.perf_counter(), attributes)
+            with self._lock:
+                self.spans.append(span)
+
+    def _operation(self, operation: str) -> OperationStats:
+        if operation not in self.operations:
+            self.operations[operation] = OperationStats(LatencyHistogram(self.buckets))
+        return self.operations[operation]
+
+    def record_request(self, operation: str, start: float, end: float, retry: bool = False, throttled: bool = False,
+                       error: bool = False):
+        """Record a request sent for an SDK operation
+
+        Args:
+            operation: name of the operation, e.g. `pipelines.create_or_update`
+            start: `time.perf_counter` when the request was sent
+            end: `time.perf_counter` when the response was received
+            retry: whether the request was a retry of an earlier request
+            throttled: whether the request was throttled (429)
+            error: whether the request failed
+        """
+        with self._lock:
+            stats = self._operation(operation)
+            stats.latency.observe(end - start)
+            stats.requests += 1
+            stats.retries += retry
+            stats.throttled += throttled
+            stats.errors += error
+            self.spans.append(Span("request", start, end, {"operation": operation, "retry": retry,
+                                                           "throttled": throttled, "error": error}))
+
+    def record_bytes_sent(self, operation: str, size: int):
+        with self._lock:
+            self._operation(operation).bytes_sent += size
+
+    def finish(self, succeeded: Optional[bool] = None):
+        """Mark the end of the deployment, and whether it succeeded"""
+        self._end = time.perf_counter()
+        self.succeeded = succeeded
+
+    def phase_seconds(self) -> Dict[str, float]:
+        """Total time spent in every phase, in the order the phases were first entered"""
+        seconds: Dict[str, float] = {}
+        for span in sorted(self.spans, key=lambda s: s.start):
+            if span.name != "request":
+                seconds[span.name] = seconds.get(span.name, 0.0) + span.seconds
+        return seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable summary of the deployment"""
+        phases: Dict[str, Dict[str, Any]] = {}
+        for span in sorted(self.spans, key=lambda s: s.start):
+            if span.name != "request":
+                phase = phases.setdefault(span.name, {"seconds": 0.0, "count": 0})
+                phase["seconds"] += span.seconds
+                phase["count"] += 1
+        operations = {name: stats.to_dict() for name, stats in sorted(self.operations.items())}
+        return {
+            "factory": self.factory,
+            "started_at": datetime.fromtimestamp(self.started_at, timezone.utc).isoformat(timespec="seconds"),
+            "duration_seconds": self.duration,
+            "succeeded": self.succeeded,
+            "phases": phases,
+            "requests": {
+                key: sum(operation[key] for operation in operations.values())
+                for key in ("requests", "retries", "throttled", "errors", "bytes_sent")
+            },
+            "operations": operations,
+        }
+
+    def write_json(self, path: Path):
+        """Write the summary of `to_dict` to a file"""
+        _write_atomically(Path(path), json.dumps(self.to_dict(), indent=2))
+
+    def prometheus_text(self) -> str:
+        """The metrics of the deployment, in the Prometheus text exposition format"""
+        base = {"factory": self.factory} if self.factory else {}
+        lines: List[str] = []
+
+        def metric(name: str, kind: str, description: str, samples: List[Tuple[str, Dict[str, str], float]]):
+            lines.append(f"# HELP {PROMETHEUS_PREFIX}_{name} {description}")
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{name} {kind}")
+            for suffix, labels, value in samples:
+                lines.append(f"{PROMETHEUS_PREFIX}_{name}{suffix}{_prometheus_labels({**base, **labels})} "
+                             f"{_prometheus_value(value)}")
+
+        metric("last_run_timestamp_seconds", "gauge", "Time the last deployment was started, in seconds since the "
+               "epoch", [("", {}, self.started_at)])
+        metric("duration_seconds", "gauge", "Duration of the last deployment", [("", {}, self.duration)])
+        if self.succeeded is not None:
+            metric("success", "gauge", "Whether the last deployment succeeded", [("", {}, float(self.succeeded))])
+        metric("phase_seconds", "gauge", "Time spent in every phase of the last deployment",
+               [("", {"phase": name}, seconds) for name, seconds in self.phase_seconds().items()])
+        operations = sorted(self.operations.items())
+        for name, attribute, description in (("requests_total", "requests", "Requests sent to ADF"),
+                                             ("retries_total", "retries", "Requests to ADF that were retries"),
+                                             ("throttled_total", "throttled", "Requests to ADF that were throttled"),
+                                             ("errors_total", "errors", "Requests to ADF that failed"),
+                                             ("bytes_sent_total", "bytes_sent", "Size of the request bodies sent to "
+                                                                                "ADF")):
+            metric(name, "counter", f"{description}, by operation",
+                   [("", {"operation": operation}, getattr(stats, attribute)) for operation, stats in operations])
+        samples: List[Tuple[str, Dict[str, str], float]] = []
+        for operation, stats in operations:
+            samples += [("_bucket", {"operation": operation, "le": le}, count)
+                        for le, count in stats.latency.cumulative_counts()]
+            samples += [("_sum", {"operation": operation}, stats.latency.sum),
+                        ("_count", {"operation": operation}, stats.latency.count)]
+        metric("request_duration_seconds", "histogram", "Latency of the requests sent to ADF, by operation", samples)
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Path):
+        """Write the metrics of `prometheus_text` to a file, e.g. for the textfile collector of the node exporter
+
+        The file is replaced atomically, so the collector never reads a partially written file.
+        """
+        _write_atomically(Path(path), self.prometheus_text())
+
+    def export_opentelemetry(self, tracer: Any = None):
+        """Export the deployment as OpenTelemetry spans: a root span, with a child span for every phase and request
+
+        Requires the opentelemetry-api package. The spans are only sent somewhere if the OpenTelemetry SDK is
+        configured with an exporter, e.g. by running the deployment with `opentelemetry-instrument`.
+
+        Args:
+            tracer: tracer to create the spans with. Defaults to the tracer of the global tracer provider.
+        """
+        try:
+            from opentelemetry import trace  # type: ignore
+        except ImportError as e:
+            raise ImportError("Exporting deploy telemetry to OpenTelemetry requires the opentelemetry-api package. "
+                              "Install it with `pip install opentelemetry-api opentelemetry-sdk`") from e
+        tracer = tracer or trace.get_tracer("adfpy")
+        summary = self.to_dict()
+
+        def epoch_ns(moment: float) -> int:
+            return int((self.started_at + moment - self._start) * 1e9)
+
+        attributes = {f"adfpy.{key}": value for key, value in summary["requests"].items()}
+        if self.factory:
+            attributes["adfpy.factory"] = self.factory
+        if self.succeeded is not None:
+            attributes["adfpy.succeeded"] = self.succeeded
+        root = tracer.start_span("adfpy.deploy", start_time=epoch_ns(self._start), attributes=attributes)
+        context = trace.set_span_in_context(root)
+        for span in sorted(self.spans, key=lambda s: s.start):
+            name = f"adfpy.request {span.attributes['operation']}" if span.name == "request" else f"adfpy.{span.name}"
+            child = tracer.start_span(name, context=context, start_time=epoch_ns(span.start),
+                                      attributes={f"adfpy.{key}": value for key, value in span.attributes.items()})
+            child.end(end_time=epoch_ns(span.end))
+        root.end(end_time=epoch_ns(self._start + self.duration))
+
+    def log_summary(self):
+        phases = ", ".join(f"{name} {seconds:.1f}s" for name, seconds in self.phase_seconds().items())
+        logger.info(f"Deployment took {self.duration:.1f}s ({phases})")
+        for operation, stats in sorted(self.operations.items()):
+            logger.info(f"{operation}: {stats.requests} requests, p50 {stats.latency.quantile(0.5) * 1000:.0f}ms, "
+                        f"p99 {stats.latency.quantile(0.99) * 1000:.0f}ms")
+
+    @contextmanager
+    def activate(self) -> Iterator["DeployTelemetry"]:
+        """Make this the telemetry that `deploy_phase` records phases in, within the context"""
+        global _active
+        previous, _active = _active, self
+        try:
+            yield self
+        finally:
+            _active = previous
+
+
+_active: Optional[DeployTelemetry] = None
+
+
+def deploy_phase(name: str, **attributes):
+    """Time the code within the context as a phase of the active DeployTelemetry, if any (see
+    `DeployTelemetry.activate`)"""
+    return _active.phase(name, **attributes) if _active is not None else nullcontext()
+
+
+def request_size(http_request: Any) -> int:
+    """Size (in bytes) of the body of an azure-core HTTP request"""
+    length = http_request.headers.get("Content-Length")
+    if length is not None:
+        return int(length)
+    body = http_request.body
+    if body is None:
+        return 0
+    return len(body.encode() if isinstance(body, str) else body)
+
+
+def _prometheus_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for value in labels.values())
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + "}"
+
+
+def _prometheus_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _write_atomically(path: Path, content: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(descriptor, "w") as f:
+            f.write(content)
+        # Readable by collectors running as another user, like files written without mkstemp
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
@@ -0,0 +1,136 @@
+import json
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from adfpy.serialize import JsonPayload
+
+
+class _DonePoller:
+    """Poller of a long-running operation that has already finished"""
+
+    def result(self, timeout: Optional[float] = None) -> None:
+        return None
+
+    def done(self) -> bool:
+        return True
+
+    def wait(self, timeout: Optional[float] = None):
+        pass
+
+
+class _InMemoryOperations:
+    """Operations on the pipelines or triggers of an InMemoryDataFactoryClient
+
+    Resources are stored in their serialized form, and are encoded to and decoded from JSON when they are written and
+    returned, like the SDK does for the requests and responses of ADF. Definitions can be written as SDK models or as
+    JsonPayload objects.
+    """
+    accepts_json_payloads = True
+
+    def __init__(self, client: "InMemoryDataFactoryClient", model: str):
+        self._client = client
+        self._model = model
+        self.resources: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    def _collection(self, resource_group_name: str, factory_name: str) -> Dict[str, Dict[str, Any]]:
+        return self.resources.setdefault(f"{resource_group_name}/{factory_name}", {})
+
+    def _deserialize(self, data: Dict[str, Any]) -> Any:
+        from azure.mgmt.datafactory import models  # type: ignore
+
+        # Deserializing modifies the data, so a decoded copy is deserialized, like a response of ADF would be
+        return getattr(models, self._model).deserialize(json.loads(json.dumps(data)))
+
+    def _not_found(self, name: str) -> Exception:
+        from azure.core.exceptions import ResourceNotFoundError
+
+        return ResourceNotFoundError(f"{self._model[:-len('Resource')]} {name} does not exist")
+
+    def create_or_update(self, resource_group_name: str, factory_name: str, name: str, resource: Any,
+                         if_match: Optional[str] = None, **kwargs) -> Any:
+        data = json.loads(json.dumps(resource.data if isinstance(resource, JsonPayload) else resource.serialize()))
+        self._client.wait()
+        with self._client.lock:
+            collection = self._collection(resource_group_name, factory_name)
+            existing = collection.get(name)
+            if if_match not in (None, "*") and (existing is None or existing["etag"] != if_match):
+                from azure.core.exceptions import ResourceModifiedError
+
+                raise ResourceModifiedError(f"The ETag of {name} does not match")
+            if self._model == "TriggerResource":
+                runtime_state = existing["properties"].get("runtimeState") if existing else "Stopped"
+                if runtime_state == "Started":
+                    from azure.core.exceptions import HttpResponseError
+
+                    raise HttpResponseError(f"Cannot update enabled Trigger {name}; it needs to be stopped first")
+                data["properties"]["runtimeState"] = runtime_state
+            data.update(name=name, etag=f'"{uuid.uuid4()}"')
+            collection[name] = data
+        return self._deserialize(data)
+
+    def get(self, resource_group_name: str, factory_name: str, name: str, if_none_match: Optional[str] = None,
+            **kwargs) -> Any:
+        self._client.wait()
+        with self._client.lock:
+            data = self._collection(resource_group_name, factory_name).get(name)
+        if data is None:
+            raise self._not_found(name)
+        if if_none_match == data["etag"]:
+            return None
+        return self._deserialize(data)
+
+    def delete(self, resource_group_name: str, factory_name: str, name: str, **kwargs) -> None:
+        self._client.wait()
+        with self._client.lock:
+            self._collection(resource_group_name, factory_name).pop(name, None)
+
+    def list_by_factory(self, resource_group_name: str, factory_name: str, **kwargs) -> List[Any]:
+        self._client.wait()
+        with self._client.lock:
+            collection = self._collection(resource_group_name, factory_name)
+            data = [collection[name] for name in sorted(collection)]
+        return [self._deserialize(d) for d in data]
+
+    def _set_runtime_state(self, resource_group_name: str, factory_name: str, name: str, state: str) -> _DonePoller:
+        self._client.wait()
+        with self._client.lock:
+            data = self._collection(resource_group_name, factory_name).get(name)
+            if data is None:
+                raise self._not_found(name)
+            data["properties"]["runtimeState"] = state
+        return _DonePoller()
+
+
+class _InMemoryTriggerOperations(_InMemoryOperations):
+    def begin_start(self, resource_group_name: str, factory_name: str, name: str, **kwargs) -> _DonePoller:
+        return self._set_runtime_state(resource_group_name, factory_name, name, "Started")
+
+    def begin_stop(self, resource_group_name: str, factory_name: str, name: str, **kwargs) -> _DonePoller:
+        return self._set_runtime_state(resource_group_name, factory_name, name, "Stopped")
+
+
+class InMemoryDataFactoryClient:
+    """In-process stand-in for the DataFactoryManagementClient, for the operations used by adfPy deployments
+
+    Unlike `LocalDataFactory`, no HTTP requests are sent, so deployments against it measure the work done by adfPy
+    and the SDK models, rather than networking. Every operation waits `latency` seconds, to simulate the round trip
+    to ADF.
+
+    Args:
+        latency: number of seconds every operation takes at least
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.pipelines = _InMemoryOperations(self, "PipelineResource")
+        self.triggers = _InMemoryTriggerOperations(self, "TriggerResource")
+
+    def wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def close(self):
+        pass
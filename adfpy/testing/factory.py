@@ -0,0 +1,402 @@
+import copy
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import click
+
+from adfpy.serialize import accept_json_payloads
+
+if TYPE_CHECKING:
+    from azure.mgmt.datafactory import DataFactoryManagementClient  # type: ignore
+    from adfpy.deploy import ConfiguredDataFactory
+
+RESOURCE_PATH = re.compile(
+    r"^/subscriptions/(?P<subscription>[^/]+)/resourceGroups/(?P<resource_group>[^/]+)"
+    r"/providers/Microsoft\.DataFactory/factories/(?P<factory>[^/]+)"
+    r"/(?P<kind>pipelines|triggers)(?:/(?P<name>[^/]+)(?:/(?P<action>start|stop))?)?/?$",
+    re.IGNORECASE,
+)
+RESOURCE_TYPES = {
+    "pipelines": "Microsoft.DataFactory/factories/pipelines",
+    "triggers": "Microsoft.DataFactory/factories/triggers",
+}
+
+
+@dataclass(frozen=True)
+class RecordedRequest:
+    """A request handled by a LocalDataFactory
+
+    Attributes:
+        method: HTTP method of the request
+        path: path of the request, without the query string
+        status: HTTP status code of the response
+        started_at: `time.monotonic()` at which the request was received
+        duration: number of seconds it took to respond, including the injected latency
+    """
+    method: str
+    path: str
+    status: int
+    started_at: float
+    duration: float
+
+
+class _Response(Exception):
+    """Raised by the handlers of a LocalDataFactory to respond with an error"""
+
+    def __init__(self, status: int, code: Optional[str] = None, message: str = "", headers: Optional[Dict] = None):
+        super().__init__(message)
+        self.status = status
+        self.body = {"error": {"code": code, "message": message}} if code else None
+        self.headers = headers or {}
+
+
+class _AnonymousCredential:
+    """Credential of clients of a LocalDataFactory, which does not authenticate requests"""
+
+    def get_token(self, *scopes, **kwargs):
+        from azure.core.credentials import AccessToken
+
+        return AccessToken("local", int(time.time()) + 3600)
+
+
+class _AsyncAnonymousCredential:
+    """Asynchronous version of `_AnonymousCredential`, for asynchronous clients of a LocalDataFactory"""
+
+    async def get_token(self, *scopes, **kwargs):
+        return _AnonymousCredential().get_token(*scopes, **kwargs)
+
+    async def close(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+
+class LocalDataFactory:
+    """In-memory stand-in for the ARM endpoints of Azure Data Factory used by adfPy deployments
+
+    Pipelines and triggers can be created, updated, fetched (honouring `If-None-Match`), listed page by page and
+    deleted, and triggers can be started and stopped, like they can in ADF. Every write returns a new ETag. Like ADF,
+    started triggers can not be updated. The real (synchronous or asynchronous) DataFactoryManagementClient can be
+    pointed at the stand-in using `client`, `async_client` or `configured_data_factory`.
+
+    Latency, throttling and failures can be injected to benchmark deployments:
+    requests wait `latency` (plus up to `latency_jitter`) seconds before they are handled, requests beyond
+    `max_concurrent_requests` in flight or `requests_per_second` are throttled with a `429` response and a
+    `Retry-After` header, and a fraction `error_rate` of the requests fails with a `503` response.
+
+    The stand-in runs in a background thread, e.g.
+    ```
+    with LocalDataFactory(latency=0.05, max_concurrent_requests=16) as factory:
+        deploy_pipelines(pipelines, factory.configured_data_factory())
+    ```
+
+    Args:
+        latency: number of seconds every request takes at least
+        latency_jitter: maximum number of seconds randomly added to the latency
+        page_size: maximum number of resources per page of a listing
+        max_concurrent_requests: number of requests in flight beyond which requests are throttled
+        requests_per_second: sustained number of requests per second beyond which requests are throttled. Bursts of
+            up to this many requests are allowed.
+        retry_after: number of seconds in the `Retry-After` header of throttled responses
+        error_rate: fraction of the requests that fails with a `503` response
+        state: resources to start with, as returned by `snapshot`
+        seed: seed of the random latency jitter and errors
+        host: host to listen on
+        port: port to listen on. Defaults to a free port.
+
+    Attributes:
+        requests: every handled request, in the order in which they were answered
+    """
+
+    def __init__(self,
+                 latency: float = 0.0,
+                 latency_jitter: float = 0.0,
+                 page_size: int = 50,
+                 max_concurrent_requests: Optional[int] = None,
+                 requests_per_second: Optional[float] = None,
+                 retry_after: float = 1.0,
+                 error_rate: float = 0.0,
+                 state: Optional[Dict[str, Any]] = None,
+                 seed: Optional[int] = None,
+                 host: str = "127.0.0.1",
+                 port: int = 0):
+        if page_size < 1:
+            raise ValueError(f"page_size should be at least 1, got {page_size}")
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.page_size = page_size
+        self.max_concurrent_requests = max_concurrent_requests
+        self.requests_per_second = requests_per_second
+        self.retry_after = retry_after
+        self.error_rate = error_rate
+        self.subscription_id = "00000000-0000-0000-0000-000000000000"
+        self.requests: List[RecordedRequest] = []
+        self.in_flight = 0
+        self._resources: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._random = random.Random(seed)
+        self._tokens = float(requests_per_second or 0)
+        self._tokens_updated_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+        if state:
+            self.restore(state)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.socket.getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "LocalDataFactory":
+        """Start handling requests in a background thread"""
+        if self._thread is None:
+            # A short poll interval keeps stopping the stand-in fast, e.g. between tests
+            self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,),
+                                            name="adfpy-local-factory", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop handling requests, and release the port"""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self) -> "LocalDataFactory":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def client(self, **kwargs) -> "DataFactoryManagementClient":
+        """A DataFactoryManagementClient sending its requests to this stand-in
+
+        Like the client of `configure_data_factory`, it accepts JsonPayload definitions (see `adfpy.serialize`).
+
+        Args:
+            kwargs: additional arguments of the client, e.g. `retry_total=0`
+        """
+        from azure.core.pipeline.policies import SansIOHTTPPolicy
+        from azure.mgmt.datafactory import DataFactoryManagementClient  # type: ignore
+
+        kwargs.setdefault("authentication_policy", SansIOHTTPPolicy())
+        return accept_json_payloads(DataFactoryManagementClient(_AnonymousCredential(), self.subscription_id,
+                                                                base_url=self.url, **kwargs))
+
+    def async_client(self, **kwargs) -> Any:
+        """An asynchronous DataFactoryManagementClient sending its requests to this stand-in"""
+        from azure.core.pipeline.policies import SansIOHTTPPolicy
+        from azure.mgmt.datafactory.aio import DataFactoryManagementClient  # type: ignore
+
+        kwargs.setdefault("authentication_policy", SansIOHTTPPolicy())
+        return accept_json_payloads(DataFactoryManagementClient(_AsyncAnonymousCredential(), self.subscription_id,
+                                                                base_url=self.url, **kwargs))
+
+    def configured_data_factory(self, resource_group: str = "adfpy", name: str = "local",
+                                **kwargs) -> "ConfiguredDataFactory":
+        """A ConfiguredDataFactory with a client of this stand-in, to deploy to"""
+        from adfpy.deploy import ConfiguredDataFactory
+
+        return ConfiguredDataFactory(resource_group, name, self.client(**kwargs))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Copy of all resources in the stand-in, which can be serialized to JSON and passed as `state` later"""
+        with self._lock:
+            return copy.deepcopy(self._resources)
+
+    def restore(self, state: Dict[str, Any]):
+        """Replace all resources in the stand-in with a `snapshot`"""
+        with self._lock:
+            self._resources = copy.deepcopy(state)
+
+    def resources(self, kind: str, resource_group: str = "adfpy", factory: str = "local") -> Dict[str, Dict]:
+        """The resources ("pipelines" or "triggers") of a factory, indexed by name"""
+        with self._lock:
+            return copy.deepcopy(self._resources.get(f"{resource_group}/{factory}/{kind}", {}))
+
+    def _throttle(self):
+        """Raise a 429 response if the request exceeds the configured limits. Called while holding the lock."""
+        if self.max_concurrent_requests is not None and self.in_flight >= self.max_concurrent_requests:
+            raise _Response(429, "TooManyRequests", "Too many concurrent requests",
+                            {"Retry-After": f"{self.retry_after:g}"})
+        if self.requests_per_second:
+            now = time.monotonic()
+            self._tokens = min(self.requests_per_second,
+                               self._tokens + (now - self._tokens_updated_at) * self.requests_per_second)
+            self._tokens_updated_at = now
+            if self._tokens < 1:
+                wait = max(self.retry_after, (1 - self._tokens) / self.requests_per_second)
+                raise _Response(429, "TooManyRequests", "Request rate exceeded", {"Retry-After": f"{wait:g}"})
+            self._tokens -= 1
+
+    def handle(self, method: str, url: str, headers: Mapping[str, str], body: Optional[Dict]) -> Tuple[int, Any, Dict]:
+        """Handle a single request
+
+        Returns:
+            Tuple of the status code, (JSON) body and headers of the response
+        """
+        with self._lock:
+            self._throttle()
+            self.in_flight += 1
+            delay = self.latency + self._random.uniform(0, self.latency_jitter)
+            fail = self._random.random() < self.error_rate
+        try:
+            if delay:
+                time.sleep(delay)
+            if fail:
+                raise _Response(503, "ServiceUnavailable", "Injected failure")
+            parts = urlsplit(url)
+            match = RESOURCE_PATH.match(parts.path)
+            if not match:
+                raise _Response(404, "NotFound", f"No such endpoint: {parts.path}")
+            with self._lock:
+                return self._dispatch(method, parts, match, headers, body)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _dispatch(self, method, parts, match, headers, body) -> Tuple[int, Any, Dict]:
+        kind, name, action = match["kind"].lower(), match["name"], match["action"]
+        collection = self._resources.setdefault(f"{match['resource_group']}/{match['factory']}/{kind}", {})
+        path = parts.path.rstrip("/")
+        if name is None:
+            if method != "GET":
+                raise _Response(405, "MethodNotAllowed", f"{method} is not supported on {kind}")
+            skip = int(parse_qs(parts.query).get("$skiptoken", ["0"])[0])
+            names = sorted(collection)
+            page: Dict[str, Any] = {"value": [collection[n] for n in names[skip:skip + self.page_size]]}
+            if skip + self.page_size < len(names):
+                page["nextLink"] = f"{self.url}{path}?api-version=2018-06-01&$skiptoken={skip + self.page_size}"
+            return 200, page, {}
+
+        resource = collection.get(name)
+        if action is not None:
+            if method != "POST":
+                raise _Response(405, "MethodNotAllowed", f"{method} is not supported on {action}")
+            if resource is None:
+                raise _Response(404, "TriggerNotFound", f"Trigger {name} does not exist")
+            resource["properties"]["runtimeState"] = "Started" if action == "start" else "Stopped"
+            return 200, None, {}
+        if method == "GET":
+            if resource is None:
+                raise _Response(404, "NotFound", f"{kind[:-1].capitalize()} {name} does not exist")
+            if headers.get("If-None-Match") == resource["etag"]:
+                return 304, None, {}
+            return 200, resource, {"ETag": resource["etag"]}
+        if method == "PUT":
+            if_match = headers.get("If-Match")
+            if if_match not in (None, "*") and (resource is None or if_match != resource["etag"]):
+                raise _Response(412, "PreconditionFailed", f"The ETag of {name} does not match")
+            properties = dict((body or {}).get("properties") or {})
+            if kind == "triggers":
+                runtime_state = resource["properties"].get("runtimeState") if resource else "Stopped"
+                if runtime_state == "Started":
+                    raise _Response(400, "TriggerEnabledCannotUpdate",
+                                    f"Cannot update enabled Trigger {name}; it needs to be stopped first")
+                properties["runtimeState"] = runtime_state
+            resource = {
+                "id": path,
+                "name": name,
+                "type": RESOURCE_TYPES[kind],
+                "etag": f'"{uuid.uuid4()}"',
+                "properties": properties,
+            }
+            collection[name] = resource
+            return 200, resource, {"ETag": resource["etag"]}
+        if method == "DELETE":
+            if collection.pop(name, None) is None:
+                return 204, None, {}
+            return 200, None, {}
+        raise _Response(405, "MethodNotAllowed", f"{method} is not supported on {kind[:-1]} {name}")
+
+    def _record(self, method: str, url: str, status: int, started_at: float):
+        with self._lock:
+            self.requests.append(RecordedRequest(method, urlsplit(url).path, status, started_at,
+                                                 time.monotonic() - started_at))
+
+    def _handler_class(self):
+        factory = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Send the headers and body of every response at once, without waiting for acknowledgements in between
+            wbufsize = -1
+            disable_nagle_algorithm = True
+
+            def _handle(self):
+                started_at = time.monotonic()
+                length = int(self.headers.get("Content-Length") or 0)
+                raw_body = self.rfile.read(length) if length else b""
+                try:
+                    status, body, headers = factory.handle(self.command, self.path, self.headers,
+                                                           json.loads(raw_body) if raw_body else None)
+                except _Response as response:
+                    status, body, headers = response.status, response.body, response.headers
+                payload = json.dumps(body).encode() if body is not None else b""
+                self.send_response(status)
+                for header, value in headers.items():
+                    self.send_header(header, value)
+                if payload:
+                    self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                factory._record(self.command, self.path, status, started_at)
+
+            do_GET = do_PUT = do_POST = do_DELETE = _handle
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+@click.command()
+@click.option("--host", default="127.0.0.1", show_default=True, help="Host to listen on")
+@click.option("--port", type=int, default=8080, show_default=True, help="Port to listen on")
+@click.option("--latency", type=float, default=0.0, show_default=True,
+              help="Number of seconds every request takes at least")
+@click.option("--latency-jitter", type=float, default=0.0, show_default=True,
+              help="Maximum number of seconds randomly added to the latency")
+@click.option("--page-size", type=click.IntRange(min=1), default=50, show_default=True,
+              help="Maximum number of resources per page of a listing")
+@click.option("--max-concurrent-requests", type=click.IntRange(min=1), default=None,
+              help="Number of requests in flight beyond which requests are throttled")
+@click.option("--requests-per-second", type=click.FloatRange(min=0, min_open=True), default=None,
+              help="Sustained number of requests per second beyond which requests are throttled")
+@click.option("--error-rate", type=click.FloatRange(0, 1), default=0.0, show_default=True,
+              help="Fraction of the requests that fails with a 503 response")
+def run_local_factory(host, port, latency, latency_jitter, page_size, max_concurrent_requests, requests_per_second,
+                      error_rate):
+    """Run a local stand-in for Azure Data Factory until interrupted
+
+    Point adfpy-deploy at it by setting ADFPY_ARM_ENDPOINT to the URL it prints.
+    """
+    factory = LocalDataFactory(latency, latency_jitter, page_size, max_concurrent_requests, requests_per_second,
+                               error_rate=error_rate, host=host, port=port)
+    click.echo(f"Serving a local data factory at {factory.url}")
+    try:
+        factory._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        factory._server.server_close()
+
+
+if __name__ == "__main__":
+    run_local_factory()
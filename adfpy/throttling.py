@@ -0,0 +1,510 @@
+import asyncio
+import email.utils
+import inspect
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from adfpy.telemetry import DeployTelemetry
+
+logger = logging.getLogger("adfPy")
+
+# Status codes of responses that may succeed when the request is retried
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+# Default request budgets of a subscription (per region), as (bucket size, refill rate per second), see
+# https://learn.microsoft.com/en-us/azure/azure-resource-manager/management/request-limits-and-throttling
+DEFAULT_BUDGETS = {
+    "reads": (250, 25.0),
+    "writes": (200, 10.0),
+    "deletes": (200, 10.0),
+}
+# Headers in which ARM reports the remaining requests of a subscription
+REMAINING_REQUESTS_HEADERS = {
+    "reads": "x-ms-ratelimit-remaining-subscription-reads",
+    "writes": "x-ms-ratelimit-remaining-subscription-writes",
+    "deletes": "x-ms-ratelimit-remaining-subscription-deletes",
+}
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """When and how long to wait before retrying throttled or failed requests
+
+    The delay before every retry is drawn uniformly between 0 and an exponentially growing maximum ("full jitter"),
+    so that concurrent requests that were throttled at the same time do not all retry at the same time. If the response
+    contains a `Retry-After` header, the delay is at least that long.
+
+    Attributes:
+        max_attempts: maximum number of times a request is sent, including the first attempt
+        initial_backoff: maximum delay (in seconds) before the first retry
+        max_backoff: maximum delay (in seconds) before any retry, unless `Retry-After` requires a longer delay
+    """
+    max_attempts: int = 6
+    initial_backoff: float = 1.0
+    max_backoff: float = 60.0
+
+    def __post_init__(self):
+        if self.max_attempts < 1:
+            raise ValueError(f"max_attempts should be at least 1, got {self.max_attempts}")
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None,
+                uniform: Callable[[float, float], float] = random.uniform) -> float:
+        """Number of seconds to wait before retrying, after the given (zero-based) attempt failed"""
+        delay = uniform(0, min(self.max_backoff, self.initial_backoff * 2 ** attempt))
+        return max(delay, retry_after or 0)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether a request that failed with the given error may succeed when it is retried"""
+    from azure.core.exceptions import HttpResponseError, ServiceRequestError, ServiceResponseError
+
+    if isinstance(error, (ServiceRequestError, ServiceResponseError)):
+        return True
+    return isinstance(error, HttpResponseError) and error.status_code in RETRYABLE_STATUS_CODES
+
+
+def retry_after(error: BaseException, now: Optional[datetime] = None) -> Optional[float]:
+    """The number of seconds to wait according to the `Retry-After` header of the response of a failed request"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        moment = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (moment - (now or datetime.now(timezone.utc))).total_seconds())
+
+
+class AdaptiveConcurrencyLimit:
+    """Limits the number of requests in flight, adapting the limit to the throttling observed (AIMD)
+
+    The limit grows additively by one for every `limit` successful requests, and is halved when a request is
+    throttled. Requests that were sent before the limit was last decreased do not decrease it again, so a burst of
+    throttled responses only halves the limit once.
+
+    Args:
+        maximum: highest allowed limit, which is also the initial limit
+        minimum: lowest allowed limit
+        decrease_factor: factor the limit is multiplied with when a request is throttled
+    """
+
+    def __init__(self, maximum: int, minimum: int = 1, decrease_factor: float = 0.5,
+                 clock: Callable[[], float] = time.monotonic):
+        if not 1 <= minimum <= maximum:
+            raise ValueError(f"Expected 1 <= minimum <= maximum, got minimum {minimum} and maximum {maximum}")
+        self.maximum = maximum
+        self.minimum = minimum
+        self.decrease_factor = decrease_factor
+        self.limit = float(maximum)
+        self.in_flight = 0
+        self._clock = clock
+        self._last_decrease = float("-inf")
+        self._condition = threading.Condition()
+
+    def acquire(self) -> float:
+        """Wait until another request may be sent
+
+        Returns:
+            The time the request was admitted, to be passed to `release`
+        """
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+            return self._clock()
+
+    def release(self, admitted_at: float, throttled: bool = False):
+        """Record the outcome of a request admitted at `admitted_at`"""
+        with self._condition:
+            self._update(admitted_at, throttled)
+            self._condition.notify_all()
+
+    def _update(self, admitted_at: float, throttled: bool):
+        self.in_flight -= 1
+        if throttled:
+            if admitted_at >= self._last_decrease:
+                self.limit = max(float(self.minimum), self.limit * self.decrease_factor)
+                self._last_decrease = self._clock()
+                logger.info(f"Requests are being throttled, lowering the concurrency to {int(self.limit)}")
+        else:
+            self.limit = min(float(self.maximum), self.limit + 1 / self.limit)
+
+
+class AsyncAdaptiveConcurrencyLimit(AdaptiveConcurrencyLimit):
+    """Asynchronous version of `AdaptiveConcurrencyLimit`, for requests sent from a single event loop"""
+
+    def __init__(self, maximum: int, minimum: int = 1, decrease_factor: float = 0.5,
+                 clock: Callable[[], float] = time.monotonic):
+        super().__init__(maximum, minimum, decrease_factor, clock)
+        self._waiters: List["asyncio.Future[None]"] = []
+
+    async def acquire(self) -> float:  # type: ignore[override]
+        while self.in_flight >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            await waiter
+        self.in_flight += 1
+        return self._clock()
+
+    def release(self, admitted_at: float, throttled: bool = False):
+        self._update(admitted_at, throttled)
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+
+class RequestBudget:
+    """Token buckets tracking the ARM request budget of a subscription
+
+    Every request takes a token from the bucket of its kind (reads, writes or deletes), which refills at a constant
+    rate. If the bucket is empty, the request waits until it has been refilled. When ARM reports the number of
+    remaining requests, the bucket is lowered to match it, to account for requests made by other clients.
+
+    Args:
+        budgets: (bucket size, refill rate per second) of every kind of request
+    """
+
+    def __init__(self, budgets: Optional[Dict[str, Any]] = None, clock: Callable[[], float] = time.monotonic):
+        self.budgets = dict(budgets or DEFAULT_BUDGETS)
+        self.tokens = {kind: float(size) for kind, (size, _) in self.budgets.items()}
+        self._clock = clock
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        for kind, (size, rate) in self.budgets.items():
+            self.tokens[kind] = min(float(size), self.tokens[kind] + (now - self._updated_at) * rate)
+        self._updated_at = now
+
+    def reserve(self, kind: str) -> float:
+        """Take a token for a request of the given kind
+
+        Returns:
+            Number of seconds to wait before sending the request, 0 if it can be sent immediately
+        """
+        with self._lock:
+            self._refill()
+            self.tokens[kind] -= 1
+            if self.tokens[kind] >= 0:
+                return 0.0
+            return -self.tokens[kind] / self.budgets[kind][1]
+
+    def observe(self, kind: str, remaining: int):
+        """Lower the tokens of a kind of request to the number of remaining requests reported by ARM"""
+        with self._lock:
+            self._refill()
+            self.tokens[kind] = min(self.tokens[kind], float(remaining))
+
+
+_subscription_budgets: Dict[str, RequestBudget] = {}
+_subscription_budgets_lock = threading.Lock()
+
+
+def subscription_budget(subscription_id: str) -> RequestBudget:
+    """The RequestBudget shared by all clients of a subscription within this process"""
+    with _subscription_budgets_lock:
+        if subscription_id not in _subscription_budgets:
+            _subscription_budgets[subscription_id] = RequestBudget()
+        return _subscription_budgets[subscription_id]
+
+
+def request_kind(operation_name: str) -> str:
+    """The kind of request ("reads", "writes" or "deletes") an SDK operation sends, based on its name"""
+    if operation_name.startswith(("get", "list", "query")):
+        return "reads"
+    if operation_name.startswith(("delete", "begin_delete")):
+        return "deletes"
+    return "writes"
+
+
+class RequestScheduler:
+    """Sends all requests of a deployment, retrying throttled and failed requests
+
+    Requests are admitted by an AdaptiveConcurrencyLimit and take a token from the RequestBudget of the subscription.
+    Requests that fail with a retryable error (429, 5xx or a connection error) are retried according to the
+    RetryPolicy. Paged listings are scheduled page by page (see `iterate`). Use `ScheduledClient` to send all
+    requests of an ADF client through a scheduler.
+
+    Args:
+        max_concurrency: maximum number of requests in flight at the same time
+        retry: RetryPolicy of failed requests
+        budget: RequestBudget of the subscription. Requests are not budgeted if not provided.
+        telemetry: DeployTelemetry to record the latency and size of every request in
+
+    Attributes:
+        requests: number of requests sent, including retries
+        retries: number of requests that were retries
+        throttled: number of requests that were throttled (429)
+    """
+
+    def __init__(self,
+                 max_concurrency: int,
+                 retry: RetryPolicy = RetryPolicy(),
+                 budget: Optional[RequestBudget] = None,
+                 sleep: Callable[[float], None] = time.sleep,
+                 clock: Callable[[], float] = time.monotonic,
+                 telemetry: Optional["DeployTelemetry"] = None):
+        self.limit = AdaptiveConcurrencyLimit(max_concurrency, clock=clock)
+        self.retry = retry
+        self.budget = budget
+        self.telemetry = telemetry
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+        self._sleep = sleep
+        self._lock = threading.Lock()
+
+    def _observe_response(self, kind: str, description: str, pipeline_response: Any):
+        remaining = pipeline_response.http_response.headers.get(REMAINING_REQUESTS_HEADERS[kind])
+        if remaining is not None and self.budget is not None:
+            self.budget.observe(kind, int(remaining))
+        if self.telemetry is not None:
+            from adfpy.telemetry import request_size
+
+            self.telemetry.record_bytes_sent(description, request_size(pipeline_response.http_request))
+
+    def _describe(self, operation: Callable, description: Optional[str], kwargs: Dict[str, Any]) -> Tuple[str, str]:
+        """The description and kind of the requests of an operation
+
+        If the responses have to be observed, a hook doing so is added to the keyword arguments of the operation.
+        """
+        name = description or str(getattr(operation, "__name__", "request"))
+        kind = request_kind(name.rsplit(".", 1)[-1])
+        if self.budget is not None or self.telemetry is not None:
+            kwargs.setdefault("raw_response_hook", lambda response: self._observe_response(kind, name, response))
+        return name, kind
+
+    def call(self, operation: Callable, *args, description: Optional[str] = None, **kwargs) -> Any:
+        """Call an SDK operation, retrying it if it fails with a retryable error
+
+        Args:
+            operation: SDK operation, e.g. `client.pipelines.create_or_update`
+            description: name of the operation in log messages. Defaults to the name of the operation.
+
+        Raises: the error of the last attempt, if the request did not succeed
+
+        Returns:
+            The result of the operation
+        """
+        description, kind = self._describe(operation, description, kwargs)
+        return self._send(lambda: operation(*args, **kwargs), kind, description)
+
+    def iterate(self, operation: Callable, *args, description: Optional[str] = None, **kwargs) -> Iterator[Any]:
+        """Iterate a paged listing of an SDK operation, requesting every page like `call` does
+
+        The SDK only requests the pages of a listing (e.g. `client.pipelines.list_by_factory`) while it is iterated,
+        so every page is requested (and retried) separately. A page is retried from where the listing stopped.
+
+        Args:
+            operation: SDK operation returning a paged listing, e.g. `client.pipelines.list_by_factory`
+            description: name of the operation in log messages. Defaults to the name of the operation.
+
+        Raises: the error of the last attempt, if a page could not be requested
+
+        Returns:
+            Iterator of the listed items
+        """
+        description, kind = self._describe(operation, description, kwargs)
+        listing = operation(*args, **kwargs)
+        if not hasattr(listing, "by_page"):
+            # Not a paged listing of the SDK (e.g. of an in-memory client), so there are no requests left to send
+            return iter(listing)
+        return self._iterate_pages(listing.by_page(), kind, description)
+
+    def _iterate_pages(self, pages: Any, kind: str, description: str) -> Iterator[Any]:
+        while True:
+            yield from self._send(lambda: next(pages), kind, description)
+            if pages.continuation_token is None:
+                return
+
+    def _send(self, send: Callable[[], Any], kind: str, description: str) -> Any:
+        """Send a request, retrying it if it fails with a retryable error"""
+        for attempt in range(self.retry.max_attempts):
+            if self.budget is not None:
+                wait = self.budget.reserve(kind)
+                if wait:
+                    self._sleep(wait)
+            admitted_at = self.limit.acquire()
+            sent_at = self._sending(attempt)
+            try:
+                result = send()
+            except Exception as e:
+                delay = self._failed(e, attempt, admitted_at, sent_at, description)
+                if delay is None:
+                    raise
+                self._sleep(delay)
+            else:
+                self._succeeded(attempt, admitted_at, sent_at, description)
+                return result
+
+    def _sending(self, attempt: int) -> float:
+        """Count an attempt of a request that is about to be sent
+
+        Returns:
+            The time the attempt is sent
+        """
+        with self._lock:
+            self.requests += 1
+            if attempt:
+                self.retries += 1
+        return time.perf_counter()
+
+    def _failed(self, error: Exception, attempt: int, admitted_at: float, sent_at: float,
+                description: str) -> Optional[float]:
+        """Record a failed attempt of a request
+
+        Returns:
+            Number of seconds to wait before retrying the request, or None if it should not be retried
+        """
+        throttled = getattr(error, "status_code", None) == 429
+        self.limit.release(admitted_at, throttled)
+        if self.telemetry is not None:
+            self.telemetry.record_request(description, sent_at, time.perf_counter(), attempt > 0, throttled,
+                                          error=True)
+        if throttled:
+            with self._lock:
+                self.throttled += 1
+        if not is_retryable(error) or attempt == self.retry.max_attempts - 1:
+            return None
+        delay = self.retry.backoff(attempt, retry_after(error))
+        logger.warning(f"{description} failed ({error.__class__.__name__}: "
+                       f"{getattr(error, 'status_code', None) or error}), retrying in {delay:.1f}s "
+                       f"(attempt {attempt + 2}/{self.retry.max_attempts})")
+        return delay
+
+    def _succeeded(self, attempt: int, admitted_at: float, sent_at: float, description: str):
+        self.limit.release(admitted_at)
+        if self.telemetry is not None:
+            self.telemetry.record_request(description, sent_at, time.perf_counter(), attempt > 0)
+
+
+class AsyncRequestScheduler(RequestScheduler):
+    """Asynchronous version of `RequestScheduler`, for the operations of an asynchronous ADF client
+
+    Requests are scheduled in the same way, but waiting for the concurrency limit, the request budget or a retry does
+    not block the event loop. Use `ScheduledClient` to send all requests of an asynchronous ADF client through it.
+    """
+
+    def __init__(self,
+                 max_concurrency: int,
+                 retry: RetryPolicy = RetryPolicy(),
+                 budget: Optional[RequestBudget] = None,
+                 sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+                 clock: Callable[[], float] = time.monotonic,
+                 telemetry: Optional["DeployTelemetry"] = None):
+        super().__init__(max_concurrency, retry, budget, clock=clock, telemetry=telemetry)
+        self.limit: AsyncAdaptiveConcurrencyLimit = AsyncAdaptiveConcurrencyLimit(max_concurrency, clock=clock)
+        self._async_sleep = sleep
+
+    async def call(self, operation: Callable, *args, description: Optional[str] = None, **kwargs) -> Any:
+        """Asynchronous version of `RequestScheduler.call`, for coroutine operations"""
+        description, kind = self._describe(operation, description, kwargs)
+        return await self._send_async(lambda: operation(*args, **kwargs), kind, description)
+
+    def iterate(self, operation: Callable, *args, description: Optional[str] = None,  # type: ignore[override]
+                **kwargs) -> AsyncIterator[Any]:
+        """Asynchronous version of `RequestScheduler.iterate`, for operations returning an asynchronous listing"""
+        description, kind = self._describe(operation, description, kwargs)
+        listing = operation(*args, **kwargs)
+        if not hasattr(listing, "by_page"):
+            return listing
+        return self._iterate_pages_async(listing.by_page(), kind, description)
+
+    async def _iterate_pages_async(self, pages: Any, kind: str, description: str) -> AsyncIterator[Any]:
+        while True:
+            page = await self._send_async(lambda: pages.__anext__(), kind, description)
+            async for item in page:
+                yield item
+            if pages.continuation_token is None:
+                return
+
+    async def _send_async(self, send: Callable[[], Awaitable[Any]], kind: str, description: str) -> Any:
+        for attempt in range(self.retry.max_attempts):
+            if self.budget is not None:
+                wait = self.budget.reserve(kind)
+                if wait:
+                    await self._async_sleep(wait)
+            admitted_at = await self.limit.acquire()
+            sent_at = self._sending(attempt)
+            try:
+                result = await send()
+            except Exception as e:
+                delay = self._failed(e, attempt, admitted_at, sent_at, description)
+                if delay is None:
+                    raise
+                await self._async_sleep(delay)
+            else:
+                self._succeeded(attempt, admitted_at, sent_at, description)
+                return result
+
+
+class _ScheduledOperations:
+    def __init__(self, operations: Any, group: str, scheduler: RequestScheduler):
+        self._operations = operations
+        self._group = group
+        self._scheduler = scheduler
+
+    def _polling_method(self, kwargs: Dict[str, Any]) -> Any:
+        """Polling method of a long-running operation, polling its status with the retry policy of the client
+
+        By default, the status requests would be sent with the keyword arguments of the operation, which disable the
+        retries of the client, while they are not sent through the scheduler.
+        """
+        if isinstance(self._scheduler, AsyncRequestScheduler):
+            from azure.mgmt.core.polling.async_arm_polling import AsyncARMPolling as ARMPolling
+        else:
+            from azure.mgmt.core.polling.arm_polling import ARMPolling  # type: ignore[assignment]
+
+        return ARMPolling(kwargs.pop("polling_interval", self._operations._config.polling_interval))
+
+    def __getattr__(self, name: str) -> Any:
+        operation = getattr(self._operations, name)
+        if name.startswith("_") or not callable(operation):
+            return operation
+        description = f"{self._group}.{name}"
+
+        def call(*args, **kwargs):
+            # The scheduler retries the requests, rather than the retry policy of the client
+            kwargs.setdefault("retry_total", 0)
+            if name.startswith("list"):
+                return self._scheduler.iterate(operation, *args, description=description, **kwargs)
+            if name.startswith("begin_") and "polling" not in kwargs and hasattr(self._operations, "_config"):
+                kwargs["polling"] = self._polling_method(kwargs)
+            return self._scheduler.call(operation, *args, description=description, **kwargs)
+
+        return call
+
+
+class ScheduledClient:
+    """Wraps an ADF client, so that all its operations (e.g. `client.pipelines.create_or_update`) are sent through a
+    RequestScheduler
+
+    Every page of a paged listing is requested through the scheduler. The retry policy of the client is disabled for
+    the requests sent through the scheduler, but the status of long-running operations (e.g.
+    `client.triggers.begin_start`) is polled directly, using the retry policy of the client. Wrap an asynchronous
+    client with an AsyncRequestScheduler.
+    """
+
+    def __init__(self, client: Any, scheduler: RequestScheduler):
+        self._client = client
+        self.scheduler = scheduler
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._client, name)
+        if name.startswith("_") or inspect.isroutine(attribute):
+            return attribute
+        return _ScheduledOperations(attribute, name, self.scheduler)
@@ -0,0 +1,117 @@
+from contextvars import ContextVar
+from dataclasses import dataclass, fields, replace
+from typing import Any, Dict, Optional
+
+# Limits of the copy activity, see
+# https://learn.microsoft.com/en-us/azure/data-factory/copy-activity-performance-features
+MIN_DATA_INTEGRATION_UNITS = 4
+MAX_DATA_INTEGRATION_UNITS = 256
+
+
+@dataclass(frozen=True)
+class CopyStaging:
+    """Interim storage used by a copy activity
+
+    Attributes:
+        linked_service: name of the linked service of the (Blob or Data Lake) storage account to stage the data in
+        path: path within the storage account. Defaults to a container created by ADF.
+        enable_compression: compress the data while it is staged
+    """
+    linked_service: str
+    path: Optional[str] = None
+    enable_compression: Optional[bool] = None
+
+
+@dataclass(frozen=True)
+class CopyThroughputSettings:
+    """Settings that determine the throughput (and cost) of a copy activity
+
+    Every setting that is None is inherited: activity settings override the settings of the pipeline, which override
+    the settings of the factory (see `set_factory_copy_throughput`). Settings that are None at every level are left to
+    ADF.
+
+    Attributes:
+        parallel_copies: maximum number of threads reading from the source and writing to the sink in parallel
+        data_integration_units: compute power of the Azure integration runtime, between 4 and 256
+        enable_staging: copy the data through interim storage, configured by `staging`
+        staging: interim storage to use when staging is enabled
+        enable_skip_incompatible_row: skip rows that can not be written to the sink, rather than failing
+        write_batch_size: number of rows written to the sink per batch
+        max_concurrent_connections: maximum number of concurrent connections to the sink
+
+    Raises: ValueError if any of the settings is out of range
+    """
+    parallel_copies: Optional[int] = None
+    data_integration_units: Optional[int] = None
+    enable_staging: Optional[bool] = None
+    staging: Optional[CopyStaging] = None
+    enable_skip_incompatible_row: Optional[bool] = None
+    write_batch_size: Optional[int] = None
+    max_concurrent_connections: Optional[int] = None
+
+    def __post_init__(self):
+        for name in ("parallel_copies", "write_batch_size", "max_concurrent_connections"):
+            value = getattr(self, name)
+            if value is not None and value < 1:
+                raise ValueError(f"{name} should be at least 1, got {value}")
+        if self.data_integration_units is not None and not (
+                MIN_DATA_INTEGRATION_UNITS <= self.data_integration_units <= MAX_DATA_INTEGRATION_UNITS):
+            raise ValueError(f"data_integration_units should be between {MIN_DATA_INTEGRATION_UNITS} and "
+                             f"{MAX_DATA_INTEGRATION_UNITS}, got {self.data_integration_units}")
+
+    @classmethod
+    def from_dict(cls, settings: Dict[str, Any]) -> "CopyThroughputSettings":
+        """Create settings from a dictionary, e.g. parsed from a JSON file
+
+        Raises: ValueError if the dictionary contains unknown settings, or any of the settings is out of range
+        """
+        unknown = sorted(set(settings) - {f.name for f in fields(cls)})
+        if unknown:
+            raise ValueError(f"Unknown copy throughput settings: {unknown}")
+        staging = settings.get("staging")
+        if isinstance(staging, dict):
+            settings = {**settings, "staging": CopyStaging(**staging)}
+        return cls(**settings)
+
+    def override(self, **settings) -> "CopyThroughputSettings":
+        """Create a copy of these settings, with some of the settings replaced"""
+        return replace(self, **settings)
+
+    def inherit(self, defaults: Optional["CopyThroughputSettings"]) -> "CopyThroughputSettings":
+        """Fill in the settings that are not set, using the provided defaults"""
+        if defaults is None:
+            return self
+        return replace(self, **{
+            f.name: getattr(defaults, f.name) for f in fields(self) if getattr(self, f.name) is None
+        })
+
+
+_factory_copy_throughput: Optional[CopyThroughputSettings] = None
+# Set by AdfPipeline.to_adf, while the activities of a pipeline are converted
+pipeline_copy_throughput: ContextVar[Optional[CopyThroughputSettings]] = ContextVar("pipeline_copy_throughput",
+                                                                                    default=None)
+
+
+def set_factory_copy_throughput(settings: Optional[CopyThroughputSettings]):
+    """Set the copy throughput settings inherited by all copy activities, or None to remove them
+
+    The settings apply to all pipelines converted afterwards in this process. `adfpy-deploy` sets them using its
+    `--copy-throughput` option.
+    """
+    global _factory_copy_throughput
+    _factory_copy_throughput = settings
+
+
+def resolve_copy_throughput(settings: Optional[CopyThroughputSettings]) -> CopyThroughputSettings:
+    """Combine the settings of a copy activity with those of its pipeline and the factory
+
+    Raises: ValueError if staging is enabled without configuring the interim storage
+
+    Returns:
+        The effective CopyThroughputSettings
+    """
+    resolved = (settings or CopyThroughputSettings()).inherit(pipeline_copy_throughput.get()).inherit(
+        _factory_copy_throughput)
+    if resolved.enable_staging and resolved.staging is None:
+        raise ValueError("Staging is enabled, but no interim storage is configured")
+    return resolved
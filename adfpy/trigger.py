@@ -1,62 +1,21 @@
+from calendar import monthrange
 from dataclasses import dataclass
-from datetime import datetime
-from typing import List, Union
-
-from azure.mgmt.datafactory.models import (  # type: ignore
-    ScheduleTrigger,
-    ScheduleTriggerRecurrence,
-    PipelineReference,
-    TriggerPipelineReference,
-    TriggerResource,
-    RecurrenceSchedule,
-)
-
-from adfpy.error import NotSupportedError, InvalidCronExpressionError
-
-
-@dataclass
-class AdfCronExpression:
-    minute: Union[str, int]
-    hour: Union[str, int]
-    day_of_month: Union[str, int]
-    month: Union[str, int]
-    day_of_week: Union[str, int]
-
-    days_of_week_adf_map = {
-        "0": "Sunday",
-        "1": "Monday",
-        "2": "Tuesday",
-        "3": "Wednesday",
-        "4": "Thursday",
-        "5": "Friday",
-        "6": "Saturday"
-    }
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
 
-    def __post_init__(self):
-        # For now, we implement our own validation logic here. TODO: consider using pydantic
-        # TODO: how about pattern matching for this?
-        if self.minute != "*":
-            if not 0 <= int(self.minute) <= 59:
-                raise InvalidCronExpressionError(f"Invalid minutes specified. Value entered: {self.minute}. "
-                                                 f"Please set minutes in the range 0-59 or *")
-        if self.hour != "*":
-            if not 0 <= int(self.hour) <= 23:
-                raise InvalidCronExpressionError(f"Invalid hours specified. Value entered: {self.hour}. "
-                                                 f"Please set hours in the range 0-23 or *")
-        if self.day_of_month != "*":
-            if not 0 <= int(self.day_of_month) <= 31:
-                raise InvalidCronExpressionError(f"Invalid day_of_month specified. Value entered: {self.day_of_month}. "
-                                                 f"Please set day_of_month in the range 1-31 or *")
-        if self.month != "*":
-            if not 1 <= int(self.month) <= 12:
-                raise InvalidCronExpressionError(f"Invalid month specified. Value entered: {self.month}. "
-                                                 f"Please set month in the range 1-12 or *")
-        if self.day_of_week != "*":
-            if not 0 <= int(self.day_of_week) <= 6:
-                raise InvalidCronExpressionError(f"Invalid day_of_week specified. Value entered: {self.day_of_week}. "
-                                                 f"Please set day_of_week in the range 0-6 or *")
-            else:
-                self.day_of_week_adf = self.days_of_week_adf_map[self.day_of_week]
+from adfpy.cron import PRESETS, AdfCronExpression, compile_cron  # noqa: F401
+from adfpy.error import ScheduleMismatchError
+from adfpy.serialize import reference, serialize_datetime, serialize_object, serialize_value, without_none
+
+if TYPE_CHECKING:
+    from azure.mgmt.datafactory.models import (  # type: ignore
+        ScheduleTriggerRecurrence,
+        TriggerPipelineReference,
+        TriggerResource,
+    )
+
+    from adfpy.pipeline import AdfPipeline
+    from adfpy.simulate import SimulationReport
 
 
 class AdfScheduleTrigger:
@@ -65,19 +24,20 @@ class AdfScheduleTrigger:
         self.schedule = schedule
         self.start_time = start_time
         self.time_zone = time_zone
-        self.pipelines = [
-            TriggerPipelineReference(pipeline_reference=PipelineReference(reference_name=p)) for p in pipelines
+        self.pipeline_names = pipelines
+
+    @property
+    def pipelines(self) -> List["TriggerPipelineReference"]:
+        from azure.mgmt.datafactory.models import PipelineReference, TriggerPipelineReference  # type: ignore
+
+        return [
+            TriggerPipelineReference(pipeline_reference=PipelineReference(reference_name=p))
+            for p in self.pipeline_names
         ]
 
-        self.preset_expressions_mapping = {
-            "@hourly": "Hour",
-            "@daily": "Day",
-            "@weekly": "Week",
-            "@monthly": "Month",
-            "@yearly": None
-        }
+    def to_adf(self) -> "TriggerResource":
+        from azure.mgmt.datafactory.models import ScheduleTrigger, TriggerResource  # type: ignore
 
-    def to_adf(self):
         scheduler_recurrence = self._convert_cron_to_adf()
         tr_properties = TriggerResource(
             properties=ScheduleTrigger(recurrence=scheduler_recurrence,
@@ -88,182 +48,294 @@ class AdfScheduleTrigger:
         )
         return tr_properties
 
-    def convert_preset_expression_to_adf(self, schedule: str) -> ScheduleTriggerRecurrence:
-        if schedule not in self.preset_expressions_mapping:
+    def to_adf_json(self) -> Dict[str, Any]:
+        """Serialize this trigger directly, producing the same JSON as serializing `to_adf()` with the SDK"""
+        return {
+            "properties": {
+                "type": "ScheduleTrigger",
+                "annotations": [],
+                "pipelines": [{"pipelineReference": reference("PipelineReference", p)} for p in self.pipeline_names],
+                "typeProperties": {
+                    "recurrence": compile_cron(self.schedule).to_recurrence_json(self.start_time, self.time_zone),
+                },
+            },
+        }
+
+    def convert_preset_expression_to_adf(self, schedule: str) -> "ScheduleTriggerRecurrence":
+        if schedule not in PRESETS:
             raise ValueError(f"Expression {schedule} is not in the predefined expressions mapping")
-        mapped_frequency = self.preset_expressions_mapping[schedule]
-        if mapped_frequency:
-            return ScheduleTriggerRecurrence(frequency=mapped_frequency,
-                                             interval=1,
-                                             start_time=self.start_time,
-                                             time_zone=self.time_zone)
-        elif schedule == "@yearly":
-            return ScheduleTriggerRecurrence(frequency="Month",
-                                             interval=12,
-                                             start_time=self.start_time,
-                                             time_zone=self.time_zone)
-
-    def _convert_cron_to_adf(self) -> ScheduleTriggerRecurrence:
+        return compile_cron(schedule).to_recurrence(self.start_time, self.time_zone)
+
+    def _convert_cron_to_adf(self) -> "ScheduleTriggerRecurrence":
+        """Convert the cron expression of this trigger into the most compact equivalent ADF recurrence
+
+        Raises:
+            InvalidCronExpressionError if the expression can not be parsed
+            NotSupportedError if the expression can not be represented by an ADF schedule
         """
-        Basic recurrence options: minutes/hours
-        Advanced recurrence options: days/weeks
-        -> basic support for this kind of interval is fine. But the more advanced things like
-        running every 50 days is harder. This isn't something cron can do by default it seems.
-        Would need further investigation.
+        return compile_cron(self.schedule).to_recurrence(self.start_time, self.time_zone)
 
-            Convert a cron-like string to a set of objects understood by adf
+    def verify(self, days: int = 366) -> "SimulationReport":
+        """Check that the ADF recurrence of this trigger fires at exactly the same times as its cron expression
 
+        Both are simulated at minute resolution from the start time of the trigger. Requires numpy.
+
+        Args:
+            days: number of days to simulate
+
+        Raises: ScheduleMismatchError if the recurrence and the cron expression do not fire at the same times
 
         Returns:
+            SimulationReport of the comparison
+        """
+        from adfpy.simulate import simulate
+
+        report = simulate(self.schedule, self._convert_cron_to_adf(), window_start=self.start_time, days=days)
+        if not report.equivalent:
+            raise ScheduleMismatchError(f"The schedule of trigger {self.name} does not match its cron expression:\n"
+                                        f"{report}")
+        return report
+
+
+def _timespan(value: timedelta) -> str:
+    """Format a timedelta as an ADF timespan, e.g. `-1.02:00:00`"""
+    sign = "-" if value < timedelta(0) else ""
+    days, seconds = divmod(int(abs(value).total_seconds()), 24 * 3600)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    return f"{sign}{f'{days}.' if days else ''}{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+@dataclass(frozen=True)
+class TumblingWindowDependency:
+    """Dependency of every window of a tumbling window trigger on windows of another (or the same) trigger
+
+    A window only starts once the windows it depends on have succeeded.
+
+    Attributes:
+        pipeline: pipeline with the tumbling window trigger to depend on, or None to depend on earlier windows of the
+            trigger itself
+        offset: start of the window depended on, relative to the start of the dependent window. Must be negative
+            when depending on the trigger itself.
+        size: size of the window depended on. Defaults to the window size of the trigger depended on.
+    """
+    pipeline: Optional["AdfPipeline"] = None
+    offset: timedelta = timedelta(0)
+    size: Optional[timedelta] = None
+
+    def __post_init__(self):
+        if self.pipeline is None and self.offset >= timedelta(0):
+            raise ValueError(f"A tumbling window can only depend on earlier windows of its own trigger, got offset "
+                             f"{self.offset}")
+        if self.size is not None and self.size <= timedelta(0):
+            raise ValueError(f"The size of a dependency should be positive, got {self.size}")
+
+    def to_adf(self) -> Any:
+        from azure.mgmt.datafactory.models import (  # type: ignore
+            SelfDependencyTumblingWindowTriggerReference,
+            TriggerReference,
+            TumblingWindowTriggerDependencyReference,
+        )
+
+        size = _timespan(self.size) if self.size is not None else None
+        if self.pipeline is None:
+            return SelfDependencyTumblingWindowTriggerReference(offset=_timespan(self.offset), size=size)
+        return TumblingWindowTriggerDependencyReference(
+            reference_trigger=TriggerReference(type="TriggerReference", reference_name=self.pipeline.schedule.name),
+            offset=_timespan(self.offset),
+            size=size,
+        )
 
+    def to_adf_json(self) -> Dict[str, Any]:
+        size = _timespan(self.size) if self.size is not None else None
+        if self.pipeline is None:
+            return without_none({"type": "SelfDependencyTumblingWindowTriggerReference",
+                                 "offset": _timespan(self.offset), "size": size})
+        return without_none({
+            "type": "TumblingWindowTriggerDependencyReference",
+            "referenceTrigger": reference("TriggerReference", self.pipeline.schedule.name),
+            "offset": _timespan(self.offset),
+            "size": size,
+        })
+
+
+@dataclass(frozen=True)
+class TumblingWindow:
+    """Schedule running a pipeline once for every fixed-size, non-overlapping window from a start time
+
+    Pass it as the `schedule` of an AdfPipeline, together with an explicit `start_time`. Windows in the past are run
+    as soon as the trigger is started, at most `max_concurrency` at a time, which makes tumbling windows well-suited
+    for backfills. The start and end of every window are available to the pipeline as
+    `@trigger().outputs.windowStartTime` and `@trigger().outputs.windowEndTime`.
+
+    Attributes:
+        frequency: unit of the window size: `Minute`, `Hour`, `Day` or `Month`. ADF has no daily tumbling windows,
+            so `Day` is translated into 24 hours.
+        interval: number of frequency units per window
+        end_time: end of the last window. Without an end time, windows keep being created.
+        max_concurrency: maximum number of windows running at the same time, between 1 and 50
+        delay: time to wait after the end of a window before running it, e.g. to wait for late data
+        retry_count: number of times to retry a failed window
+        retry_interval: time between retries, at least 30 seconds
+        depends_on: windows of this or other tumbling window triggers every window depends on
+        parameters: values for the parameters of the pipeline, typically using the window start and end times
+
+    Raises: ValueError if any of the settings is not supported by ADF
+    """
+    frequency: str
+    interval: int = 1
+    end_time: Optional[datetime] = None
+    max_concurrency: int = 1
+    delay: Optional[timedelta] = None
+    retry_count: Optional[int] = None
+    retry_interval: Optional[timedelta] = None
+    depends_on: Sequence[TumblingWindowDependency] = ()
+    parameters: Optional[Dict[str, Any]] = None
+
+    FREQUENCIES = ("Minute", "Hour", "Day", "Month")
+    MAX_CONCURRENCY = 50
+    MIN_RETRY_INTERVAL = timedelta(seconds=30)
+
+    def __post_init__(self):
+        if self.frequency not in self.FREQUENCIES:
+            raise ValueError(f"Tumbling window frequency should be one of {self.FREQUENCIES}, got {self.frequency}")
+        if self.interval < 1:
+            raise ValueError(f"Tumbling window interval should be at least 1, got {self.interval}")
+        if not 1 <= self.max_concurrency <= self.MAX_CONCURRENCY:
+            raise ValueError(f"max_concurrency should be between 1 and {self.MAX_CONCURRENCY}, got "
+                             f"{self.max_concurrency}")
+        if self.retry_count is not None and self.retry_count < 0:
+            raise ValueError(f"retry_count should not be negative, got {self.retry_count}")
+        if self.retry_interval is not None and self.retry_interval < self.MIN_RETRY_INTERVAL:
+            raise ValueError(f"retry_interval should be at least {self.MIN_RETRY_INTERVAL}, got {self.retry_interval}")
+        if self.delay is not None and self.delay < timedelta(0):
+            raise ValueError(f"delay should not be negative, got {self.delay}")
+
+    @property
+    def adf_frequency(self) -> Tuple[str, int]:
+        """The frequency and interval as supported by ADF"""
+        if self.frequency == "Day":
+            return "Hour", self.interval * 24
+        return self.frequency, self.interval
+
+    def window_after(self, window_start: datetime, windows: int = 1) -> datetime:
+        """The end of the `windows`-th window starting at window_start
+
+        Monthly windows end on the day of the month of window_start, or on the last day of months that are shorter
+        (e.g. windows starting on January 31st end on February 28th, March 31st and so on).
+        """
+        frequency, interval = self.adf_frequency
+        if frequency == "Month":
+            months = window_start.month - 1 + interval * windows
+            year, month = window_start.year + months // 12, months % 12 + 1
+            return window_start.replace(year=year, month=month, day=min(window_start.day, monthrange(year, month)[1]))
+        return window_start + timedelta(minutes=interval * windows * (60 if frequency == "Hour" else 1))
+
+    @property
+    def upstream_pipelines(self) -> List["AdfPipeline"]:
+        return [dependency.pipeline for dependency in self.depends_on if dependency.pipeline is not None]
+
+
+class AdfTumblingWindowTrigger:
+    """Tumbling window trigger of a single pipeline
+
+    Args:
+        name: name of the trigger
+        window: the TumblingWindow schedule
+        start_time: start of the first window
+        pipeline: name of the pipeline to trigger
+    """
+    def __init__(self, name: str, window: TumblingWindow, start_time: datetime, pipeline: str):
+        if window.end_time is not None and window.end_time <= start_time:
+            raise ValueError(f"The end time {window.end_time} of tumbling window trigger {name} is not after its "
+                             f"start time {start_time}")
+        for dependency in window.depends_on:
+            if dependency.pipeline is not None and not isinstance(dependency.pipeline.schedule,
+                                                                  AdfTumblingWindowTrigger):
+                raise ValueError(f"Tumbling window trigger {name} can only depend on pipelines with a tumbling "
+                                 f"window schedule, which {dependency.pipeline.name} does not have")
+        self.name = name
+        self.window = window
+        self.start_time = start_time
+        self.pipeline_name = pipeline
+
+    def windows(self, until: Optional[datetime] = None) -> List[Tuple[datetime, datetime]]:
+        """The (start, end) of every window that ends before `until` (or the end time of the trigger)
+
+        Raises: ValueError if neither `until` nor the end time of the trigger is set
         """
-        if self.schedule in self.preset_expressions_mapping:
-            return self.convert_preset_expression_to_adf(self.schedule)
-        else:
-            raw_cron_components = self.schedule.split(" ")
-            if len(raw_cron_components) != 5:
-                raise InvalidCronExpressionError(f"The provided cron expression: {self.schedule} has the wrong number "
-                                                 f"of components. There should be 5")
-            cron_components = AdfCronExpression(*raw_cron_components)
-
-            if cron_components.day_of_week == "*":
-                if cron_components.day_of_month == "*":
-                    if cron_components.hour == "*":
-                        if cron_components.minute == "*":
-                            # * * * * *
-                            return ScheduleTriggerRecurrence(frequency="Day",
-                                                             interval=1,
-                                                             start_time=self.start_time,
-                                                             time_zone=self.time_zone)
-                        else:
-                            # 5 * * * *
-                            return ScheduleTriggerRecurrence(frequency="Hour",
-                                                             interval=int(cron_components.minute),
-                                                             start_time=self.start_time,
-                                                             time_zone=self.time_zone)
-                    else:
-                        if cron_components.minute == "*":
-                            # * 5 * * *
-                            return ScheduleTriggerRecurrence(frequency="Day",
-                                                             interval=1,
-                                                             start_time=self.start_time,
-                                                             time_zone=self.time_zone,
-                                                             schedule=RecurrenceSchedule(
-                                                                hours=[int(cron_components.hour)],
-                                                                minutes=[i for i in range(60)]
-                                                             ))
-                        else:
-                            # 5 5 * * *
-                            return ScheduleTriggerRecurrence(frequency="Day",
-                                                             interval=1,
-                                                             start_time=self.start_time,
-                                                             time_zone=self.time_zone,
-                                                             schedule=RecurrenceSchedule(
-                                                                 hours=[int(cron_components.hour)],
-                                                                 minutes=[int(cron_components.minute)]
-                                                             ))
-                else:
-                    if cron_components.hour == "*":
-                        if cron_components.minute == "*":
-                            # * * 5 * *
-                            return ScheduleTriggerRecurrence(frequency="Month",
-                                                             interval=1,
-                                                             start_time=self.start_time,
-                                                             time_zone=self.time_zone,
-                                                             schedule=RecurrenceSchedule(
-                                                                 hours=[i for i in range(24)],
-                                                                 minutes=[i for i in range(60)],
-                                                                 month_days=[int(cron_components.day_of_month)]
-                                                             ))
-                        else:
-                            # 5 * 5 * *
-                            return ScheduleTriggerRecurrence(frequency="Day",
-                                                             interval=1,
-                                                             start_time=self.start_time,
-                                                             time_zone=self.time_zone,
-                                                             schedule=RecurrenceSchedule(
-                                                                 hours=[i for i in range(24)],
-                                                                 minutes=[int(cron_components.minute)],
-                                                                 month_days=[int(cron_components.day_of_month)]
-                                                             ))
-                    else:
-                        if cron_components.minute == "*":
-                            # * 5 5 * *
-                            return ScheduleTriggerRecurrence(frequency="Month",
-                                                             interval=1,
-                                                             start_time=self.start_time,
-                                                             time_zone=self.time_zone,
-                                                             schedule=RecurrenceSchedule(
-                                                                 hours=[int(cron_components.hour)],
-                                                                 minutes=[i for i in range(60)],
-                                                                 month_days=[int(cron_components.day_of_month)]
-                                                             ))
-                        else:
-                            # 5 5 5 * *
-                            return ScheduleTriggerRecurrence(frequency="Month",
-                                                             interval=1,
-                                                             start_time=self.start_time,
-                                                             time_zone=self.time_zone,
-                                                             schedule=RecurrenceSchedule(
-                                                                 hours=[int(cron_components.hour)],
-                                                                 minutes=[int(cron_components.minute)],
-                                                                 month_days=[int(cron_components.day_of_month)]
-                                                             ))
-            else:
-                if cron_components.day_of_month == "*":
-                    if cron_components.hour == "*":
-                        if cron_components.minute == "*":
-                            # * * * * 5
-                            return ScheduleTriggerRecurrence(frequency="Week",
-                                                             interval=1,
-                                                             start_time=self.start_time,
-                                                             time_zone=self.time_zone,
-                                                             schedule=RecurrenceSchedule(
-                                                                 hours=[i for i in range(24)],
-                                                                 minutes=[i for i in range(60)],
-                                                                 week_days=[cron_components.day_of_week_adf]
-                                                             ))
-                        else:
-                            # 5 * * * 5
-                            return ScheduleTriggerRecurrence(frequency="Week",
-                                                             interval=1,
-                                                             start_time=self.start_time,
-                                                             time_zone=self.time_zone,
-                                                             schedule=RecurrenceSchedule(
-                                                                 hours=[i for i in range(24)],
-                                                                 minutes=[int(cron_components.minute)],
-                                                                 week_days=[cron_components.day_of_week_adf]
-                                                             ))
-                    else:
-                        if cron_components.minute == "*":
-                            # * 5 * * 5
-                            return ScheduleTriggerRecurrence(frequency="Week",
-                                                             interval=1,
-                                                             start_time=self.start_time,
-                                                             time_zone=self.time_zone,
-                                                             schedule=RecurrenceSchedule(
-                                                                 hours=[int(cron_components.hour)],
-                                                                 minutes=[i for i in range(60)],
-                                                                 week_days=[cron_components.day_of_week_adf]
-                                                             ))
-                        else:
-                            # 5 5 * * 5
-                            return ScheduleTriggerRecurrence(frequency="Week",
-                                                             interval=1,
-                                                             start_time=self.start_time,
-                                                             time_zone=self.time_zone,
-                                                             schedule=RecurrenceSchedule(
-                                                                 hours=[int(cron_components.hour)],
-                                                                 minutes=[int(cron_components.minute)],
-                                                                 week_days=[cron_components.day_of_week_adf]
-                                                             ))
-                else:
-                    unsupported_expressions = [
-                        {"* * 5 * 5": "At every minute on day-of-month 5 and on Friday."},
-                        {"5 * 5 * 5": "At minute 5 on day-of-month 5 and on Friday."},
-                        {"* 5 5 * 5": "At every minute past hour 5 on day-of-month 5 and on Friday."},
-                        {"5 5 5 * 5": "At 05:05 on day-of-month 5 and on Friday."}
-                    ]
-                    raise NotSupportedError(f"""
-                        There are a number of Cron expressions that cannot be expressed properly with ADF's scheduling
-                        logic. These are: {unsupported_expressions}""")
+        end = until or self.window.end_time
+        if end is None:
+            raise ValueError(f"Tumbling window trigger {self.name} has no end time, so `until` is required")
+        windows = []
+        window_start = self.start_time
+        window_end = self.window.window_after(window_start)
+        while window_end <= end:
+            windows.append((window_start, window_end))
+            # Windows are counted from the start time, so monthly windows return to its day after shorter months
+            window_start, window_end = window_end, self.window.window_after(self.start_time, len(windows) + 1)
+        return windows
+
+    def to_adf(self) -> "TriggerResource":
+        from azure.mgmt.datafactory.models import (  # type: ignore
+            PipelineReference,
+            RetryPolicy,
+            TriggerPipelineReference,
+            TriggerResource,
+            TumblingWindowTrigger,
+        )
+
+        retry_policy = None
+        if self.window.retry_count is not None or self.window.retry_interval is not None:
+            retry_policy = RetryPolicy(
+                count=self.window.retry_count,
+                interval_in_seconds=int(self.window.retry_interval.total_seconds())
+                if self.window.retry_interval is not None else None,
+            )
+        frequency, interval = self.window.adf_frequency
+        return TriggerResource(
+            properties=TumblingWindowTrigger(
+                pipeline=TriggerPipelineReference(pipeline_reference=PipelineReference(
+                    reference_name=self.pipeline_name), parameters=self.window.parameters),
+                frequency=frequency,
+                interval=interval,
+                start_time=self.start_time,
+                end_time=self.window.end_time,
+                delay=_timespan(self.window.delay) if self.window.delay is not None else None,
+                max_concurrency=self.window.max_concurrency,
+                retry_policy=retry_policy,
+                depends_on=[dependency.to_adf() for dependency in self.window.depends_on] or None,
+                annotations=[],
+            )
+        )
+
+    def to_adf_json(self) -> Dict[str, Any]:
+        """Serialize this trigger directly, producing the same JSON as serializing `to_adf()` with the SDK"""
+        retry_policy = None
+        if self.window.retry_count is not None or self.window.retry_interval is not None:
+            retry_policy = without_none({
+                "count": serialize_object(self.window.retry_count),
+                "intervalInSeconds": int(self.window.retry_interval.total_seconds())
+                if self.window.retry_interval is not None else None,
+            })
+        pipeline = {"pipelineReference": reference("PipelineReference", self.pipeline_name)}
+        if self.window.parameters is not None:
+            pipeline["parameters"] = serialize_value(self.window.parameters, "{object}")
+        frequency, interval = self.window.adf_frequency
+        return {
+            "properties": {
+                "type": "TumblingWindowTrigger",
+                "annotations": [],
+                "pipeline": pipeline,
+                "typeProperties": without_none({
+                    "frequency": frequency,
+                    "interval": int(interval),
+                    "startTime": serialize_datetime(self.start_time),
+                    "endTime": serialize_datetime(self.window.end_time) if self.window.end_time is not None else None,
+                    "delay": _timespan(self.window.delay) if self.window.delay is not None else None,
+                    "maxConcurrency": int(self.window.max_concurrency),
+                    "retryPolicy": retry_policy,
+                    "dependsOn": [dependency.to_adf_json() for dependency in self.window.depends_on] or None,
+                }),
+            },
+        }
@@ -0,0 +1,187 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from adfpy.deploy import ConfiguredDataFactory
+
+logger = logging.getLogger("adfPy")
+
+# Runtime state of a trigger that is firing, see
+# https://learn.microsoft.com/en-us/azure/data-factory/concepts-pipeline-execution-triggers
+STARTED = "Started"
+
+
+class TriggerController:
+    """Stop the triggers affected by a deployment, and start them again once the deployment has finished
+
+    Only triggers that are running are stopped, and started again afterwards (whether or not they could be written).
+    Triggers that are stopped on purpose are left alone. Triggers that do not exist in ADF yet are started once they
+    have been written. All triggers are stopped and started concurrently, so a deployment pauses every schedule for
+    roughly the duration of the deployment itself, regardless of the number of triggers.
+
+    Args:
+        adf: ConfiguredDataFactory object
+        dry_run: only log which triggers would be stopped and started. Defaults to False.
+        concurrency: maximum number of triggers stopped or started at the same time
+
+    Attributes:
+        downtime: number of seconds every restarted trigger was stopped, indexed by name
+        failed: mapping of trigger name to the exception raised while stopping or starting it
+    """
+
+    def __init__(self, adf: "ConfiguredDataFactory", dry_run: bool = False, concurrency: int = 8):
+        if concurrency < 1:
+            raise ValueError(f"Concurrency should be at least 1, got {concurrency}")
+        self.adf = adf
+        self.dry_run = dry_run
+        self.concurrency = concurrency
+        self.downtime: Dict[str, float] = {}
+        self.failed: Dict[str, BaseException] = {}
+        self._stopped_at: Dict[str, float] = {}
+        self._new: Set[str] = set()
+
+    def _plan_stop(self, names: Iterable[str], runtime_states: Dict[str, Optional[str]]) -> List[str]:
+        affected = set(names)
+        self._new = {name for name in affected if name not in runtime_states}
+        running = sorted(name for name in affected if runtime_states.get(name) == STARTED)
+        logger.info(f"Stopping {len(running)} running triggers before the deployment")
+        return running
+
+    def _plan_start(self, written: Iterable[str]) -> List[str]:
+        to_start = sorted(set(self._stopped_at) | (self._new & set(written)))
+        logger.info(f"Starting {len(to_start)} triggers after the deployment")
+        return to_start
+
+    def _record_stop(self, name: str, requested_at: float, error: Optional[BaseException]):
+        if error is not None:
+            logger.error(f"Failed to stop trigger {name}: {error}")
+            self.failed[name] = error
+        else:
+            self._stopped_at[name] = requested_at
+
+    def _record_start(self, name: str, started_at: float, error: Optional[BaseException]):
+        if error is not None:
+            logger.error(f"Failed to start trigger {name}: {error}")
+            self.failed[name] = error
+            return
+        stopped_at = self._stopped_at.get(name)
+        if stopped_at is not None:
+            self.downtime[name] = started_at - stopped_at
+            logger.info(f"Trigger {name} was stopped for {self.downtime[name]:.1f}s")
+
+    def _log_summary(self):
+        if self.downtime:
+            longest = max(self.downtime, key=self.downtime.__getitem__)
+            logger.info(f"Restarted {len(self.downtime)} triggers. Longest downtime: {self.downtime[longest]:.1f}s "
+                        f"({longest})")
+
+    def fetch_runtime_states(self) -> Dict[str, Optional[str]]:
+        """Fetch the runtime state (e.g. "Started" or "Stopped") of all triggers in the factory, indexed by name"""
+        # The SDK annotates `list_by_factory` as returning list responses, but it iterates the resources in them
+        return {
+            trigger.name: trigger.properties.runtime_state  # type: ignore[attr-defined]
+            for trigger in self.adf.client.triggers.list_by_factory(resource_group_name=self.adf.resource_group,
+                                                                    factory_name=self.adf.name)
+        }
+
+    def _begin(self, action: str, name: str) -> Tuple[float, Any]:
+        """Request the start or stop of a trigger, returning when it was requested and the poller of the operation"""
+        requested_at = time.monotonic()
+        logger.info(f"Starting trigger {name}" if action == "start" else f"Stopping trigger {name}")
+        if self.dry_run:
+            return requested_at, None
+        operation = getattr(self.adf.client.triggers, f"begin_{action}")
+        return requested_at, operation(self.adf.resource_group, self.adf.name, name)
+
+    def _run(self, action: str, name: str) -> float:
+        """Start or stop a trigger, and wait for the operation to finish
+
+        Returns:
+            When the trigger was stopped (when its stop was requested) or started (when its start finished)
+        """
+        requested_at, poller = self._begin(action, name)
+        if poller is not None:
+            poller.result()
+        return requested_at if action == "stop" else time.monotonic()
+
+    def _run_all(self, action: str, names: List[str], record):
+        """Run the operations using a bounded pool of workers, every worker waiting for the operations it requested
+
+        The time a trigger was started is measured by the worker starting it, so it does not include the time spent
+        waiting for the operations of other triggers.
+        """
+        if not names:
+            return
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(names)),
+                                thread_name_prefix="adfpy-triggers") as executor:
+            futures = {name: executor.submit(self._run, action, name) for name in names}
+        for name, future in futures.items():
+            try:
+                moment = future.result()
+            except Exception as e:
+                record(name, None, e)
+            else:
+                record(name, moment, None)
+
+    def stop(self, names: Iterable[str]):
+        """Stop those of the given triggers that are running
+
+        Args:
+            names: names of the triggers that are about to be written
+        """
+        self._run_all("stop", self._plan_stop(names, self.fetch_runtime_states()), self._record_stop)
+
+    def start(self, written: Iterable[str]):
+        """Start the triggers stopped by `stop`, and the new triggers that have been written
+
+        Args:
+            written: names of the triggers that were written during the deployment
+        """
+        self._run_all("start", self._plan_start(written), self._record_start)
+        self._log_summary()
+
+
+class AsyncTriggerController(TriggerController):
+    """Asynchronous version of `TriggerController`, for an ADF client from `configure_data_factory_async`
+
+    At most `concurrency` operations are started at the same time. Their pollers are awaited concurrently.
+    """
+
+    async def fetch_runtime_states(self) -> Dict[str, Optional[str]]:  # type: ignore[override]
+        # The client is the asynchronous client, while ConfiguredDataFactory annotates the synchronous one
+        return {
+            trigger.name: trigger.properties.runtime_state
+            async for trigger in self.adf.client.triggers.list_by_factory(  # type: ignore[attr-defined]
+                resource_group_name=self.adf.resource_group, factory_name=self.adf.name)
+        }
+
+    async def _run_async(self, action: str, name: str, semaphore: asyncio.Semaphore) -> float:
+        requested_at = time.monotonic()
+        logger.info(f"Starting trigger {name}" if action == "start" else f"Stopping trigger {name}")
+        if not self.dry_run:
+            operation = getattr(self.adf.client.triggers, f"begin_{action}")
+            async with semaphore:
+                poller = await operation(self.adf.resource_group, self.adf.name, name)
+            await poller.result()
+        return requested_at if action == "stop" else time.monotonic()
+
+    async def _run_all_async(self, action: str, names: List[str], record):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        outcomes = await asyncio.gather(*[self._run_async(action, name, semaphore) for name in names],
+                                        return_exceptions=True)
+        for name, outcome in zip(names, outcomes):
+            if isinstance(outcome, BaseException):
+                record(name, None, outcome)
+            else:
+                record(name, outcome, None)
+
+    async def stop(self, names: Iterable[str]):  # type: ignore[override]
+        await self._run_all_async("stop", self._plan_stop(names, await self.fetch_runtime_states()),
+                                  self._record_stop)
+
+    async def start(self, written: Iterable[str]):  # type: ignore[override]
+        await self._run_all_async("start", self._plan_start(written), self._record_start)
+        self._log_summary()
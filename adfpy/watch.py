@@ -0,0 +1,221 @@
+import importlib
+import importlib.util
+import time
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+from adfpy.deploy import (
+    DEFAULT_CONCURRENCY,
+    ConfiguredDataFactory,
+    DeploymentResult,
+    collect_pipelines,
+    deploy_pipelines,
+    fetch_remote_definitions,
+    logger,
+)
+from adfpy.diff import ChangeSet, LocalHashes, compute_change_set, compute_local_hashes
+from adfpy.error import InvalidPipelineError
+from adfpy.loader import (
+    compute_local_imports,
+    find_definition_files,
+    importing_files,
+    load_files,
+    load_pipelines_by_file,
+    unload_definition_module,
+)
+from adfpy.pipeline import AdfPipeline
+
+DEFAULT_POLL_INTERVAL = 1.0
+
+FileState = Tuple[int, int]
+
+
+def snapshot_files(path: Path) -> Dict[Path, FileState]:
+    """Record the modification time and size of every Python file in a path"""
+    snapshot = {}
+    for file_path in find_definition_files(path):
+        try:
+            stat = file_path.stat()
+        except FileNotFoundError:
+            continue
+        snapshot[file_path] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+def dependent_pipelines(names: Set[str], pipelines: Dict[str, AdfPipeline]) -> Set[str]:
+    """Determine the pipelines that (transitively) depend on any of the named pipelines, including those pipelines
+
+    Args:
+        names: names of the pipelines to start from
+        pipelines: all pipelines, indexed by name
+
+    Returns:
+        Set of pipeline names
+    """
+    dependents: Dict[str, Set[str]] = {}
+    for pipeline in pipelines.values():
+        for required_pipeline in pipeline.depends_on_pipelines:
+            dependents.setdefault(required_pipeline.name, set()).add(pipeline.name)
+    affected = set(names)
+    to_visit = list(names)
+    while to_visit:
+        for dependent in dependents.get(to_visit.pop(), ()):
+            if dependent not in affected:
+                affected.add(dependent)
+                to_visit.append(dependent)
+    return affected
+
+
+class PipelineWatcher:
+    """Keeps the loaded pipelines and a data factory client warm, and redeploys pipelines as their definitions change
+
+    Changes are detected by polling the modification times of the files in the path. For every change, only the
+    changed files, and the files importing them, are executed again. Only the pipelines and triggers whose definition
+    changed, and the pipelines that (transitively) depend on them, are redeployed.
+
+    Args:
+        path: Path containing the pipeline definitions
+        adf: ConfiguredDataFactory object, which is reused for every deployment
+        dry_run: boolean indicating whether the actions are to be executed as a dry-run. Defaults to False.
+        concurrency: maximum number of pipelines deployed at the same time
+        delete_stale_resources: remove pipelines from ADF when their definition is removed. Defaults to False.
+        load_processes: number of worker processes used for the initial load
+        cache_dir: directory of the discovery cache used for the initial load
+        manage_triggers: stop the affected triggers during every deployment, see `deploy_pipelines`
+    """
+    def __init__(self,
+                 path: Path,
+                 adf: ConfiguredDataFactory,
+                 dry_run: bool = False,
+                 concurrency: int = DEFAULT_CONCURRENCY,
+                 delete_stale_resources: bool = False,
+                 load_processes: int = 1,
+                 cache_dir: Optional[Path] = None,
+                 manage_triggers: bool = False):
+        self.path = path
+        self.adf = adf
+        self.dry_run = dry_run
+        self.concurrency = concurrency
+        self.delete_stale_resources = delete_stale_resources
+        self.load_processes = load_processes
+        self.cache_dir = cache_dir
+        self.manage_triggers = manage_triggers
+        self.snapshot: Dict[Path, FileState] = {}
+        self.pipelines_by_file: Dict[Path, Set[AdfPipeline]] = {}
+        self.deployed = LocalHashes()
+
+    @property
+    def pipelines(self) -> Dict[str, AdfPipeline]:
+        return collect_pipelines(p for pipelines in self.pipelines_by_file.values() for p in pipelines)
+
+    def start(self) -> DeploymentResult:
+        """Load all pipelines, and deploy the ones that differ from the factory"""
+        self.snapshot = snapshot_files(self.path)
+        self.pipelines_by_file = load_pipelines_by_file(self.path, self.load_processes, self.cache_dir)
+        pipelines = self.pipelines
+        local = compute_local_hashes(pipelines.values())
+        changes = compute_change_set(pipelines.values(), fetch_remote_definitions(self.adf), local)
+        return self._deploy(pipelines, local, changes)
+
+    def poll(self) -> Set[Path]:
+        """Determine which files were added, changed or removed since the previous poll"""
+        snapshot = snapshot_files(self.path)
+        changed = {f for f in snapshot.keys() | self.snapshot.keys() if snapshot.get(f) != self.snapshot.get(f)}
+        self.snapshot = snapshot
+        return changed
+
+    def reload(self, changed: Set[Path]) -> Set[Path]:
+        """Execute the changed files, and all files importing them, again
+
+        If executing any of the files fails, the previously loaded pipelines are kept.
+
+        Args:
+            changed: files that were added, changed or removed
+
+        Returns:
+            Set of files that were executed again
+        """
+        file_paths = sorted(self.snapshot)
+        affected = importing_files(changed, compute_local_imports(file_paths)) & set(file_paths)
+        for file_path in affected:
+            unload_definition_module(file_path)
+            bytecode = Path(importlib.util.cache_from_source(str(file_path)))
+            # Source changes within the same second with an unchanged size would otherwise go unnoticed
+            bytecode.unlink(missing_ok=True)
+        importlib.invalidate_caches()
+        reloaded = load_files(sorted(affected))
+        for file_path in changed - set(file_paths):
+            self.pipelines_by_file.pop(file_path, None)
+        self.pipelines_by_file.update(reloaded)
+        return affected
+
+    def redeploy(self) -> Optional[DeploymentResult]:
+        """Deploy the pipelines and triggers whose definition changed since the previous deployment
+
+        Returns:
+            DeploymentResult of the deployment, or None if nothing changed
+        """
+        pipelines = self.pipelines
+        local = compute_local_hashes(pipelines.values())
+        changes = ChangeSet(
+            pipelines={name for name, h in local.pipelines.items() if self.deployed.pipelines.get(name) != h},
+            triggers={name for name, h in local.triggers.items() if self.deployed.triggers.get(name) != h},
+        )
+        changes.pipelines = dependent_pipelines(changes.pipelines, pipelines)
+        removed = set(self.deployed.pipelines) - set(pipelines)
+        if not changes.pipelines and not changes.triggers and not removed:
+            logger.info("No pipelines or triggers changed")
+            return None
+        logger.info(f"Redeploying {len(changes.pipelines)} pipelines and {len(changes.triggers)} triggers")
+        result = self._deploy(pipelines, local, changes)
+        for name in sorted(removed):
+            del self.deployed.pipelines[name]
+            if self.delete_stale_resources:
+                logger.info(f"Deleting pipeline {name} from ADF. Pipeline {name} no longer exists in path")
+                if not self.dry_run:
+                    self.adf.client.pipelines.delete(resource_group_name=self.adf.resource_group,
+                                                     factory_name=self.adf.name,
+                                                     pipeline_name=name)
+        return result
+
+    def _deploy(self, pipelines: Dict[str, AdfPipeline], local: LocalHashes, changes: ChangeSet) -> DeploymentResult:
+        result = deploy_pipelines(pipelines.values(), self.adf, self.dry_run, self.concurrency, changes=changes,
+                                  manage_triggers=self.manage_triggers)
+        unavailable = set(result.failed) | set(result.blocked)
+        for name, pipeline in pipelines.items():
+            if name in unavailable:
+                continue
+            self.deployed.pipelines[name] = local.pipelines[name]
+            if pipeline.schedule:
+                self.deployed.triggers[pipeline.schedule.name] = local.triggers[pipeline.schedule.name]
+        if not result.succeeded:
+            logger.error(f"Deployment failed. Failed pipelines: {sorted(result.failed)}. Pipelines not deployed "
+                         f"because of failed dependencies: {sorted(result.blocked)}")
+        return result
+
+    def run(self, interval: float = DEFAULT_POLL_INTERVAL):
+        """Deploy all changes, then keep watching the path and redeploying changes until interrupted
+
+        Args:
+            interval: number of seconds between polls
+        """
+        self.start()
+        logger.info(f"Watching {self.path} for changes")
+        try:
+            while True:
+                time.sleep(interval)
+                changed = self.poll()
+                if not changed:
+                    continue
+                logger.info(f"Detected changes in {sorted(str(f) for f in changed)}")
+                try:
+                    self.reload(changed)
+                except Exception as e:
+                    logger.error(f"Failed to load the changed pipeline definitions: {e!r}")
+                    continue
+                try:
+                    self.redeploy()
+                except InvalidPipelineError as e:
+                    logger.error(f"Not redeploying, the changed pipelines are invalid: {e}")
+        except KeyboardInterrupt:
+            logger.info("Stopped watching")
@@ -0,0 +1,63 @@
+"""Memory and serialization benchmark for the activity model
+
+Builds a generated pipeline with many chained activities, and reports the memory used by the activities (measured with
+tracemalloc) and the time taken by repeated `to_adf` calls, as done when hashing and deploying pipelines.
+
+Usage:
+    python benchmarks/activity_model.py [--activities 100000] [--fan-in 3] [--repeat 5]
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from adfpy.activities.control import AdfSetVariableActivity
+
+
+def build_activities(count: int, fan_in: int):
+    activities = []
+    for i in range(count):
+        activity = AdfSetVariableActivity(f"activity_{i}", f"value_{i}")
+        for previous in activities[-fan_in:]:
+            previous >> activity
+        activities.append(activity)
+    return activities
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--activities", type=int, default=100_000)
+    parser.add_argument("--fan-in", type=int, default=3, help="Number of dependencies of every activity")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of times every activity is serialized")
+    args = parser.parse_args(argv)
+
+    # Make sure the SDK import is not part of the measurements
+    AdfSetVariableActivity("warmup", "warmup").to_adf()
+
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    activities = build_activities(args.activities, args.fan_in)
+    build_seconds = time.perf_counter() - start
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # The fastest of the repeats is the least disturbed by other processes and the garbage collector
+    serialize_seconds = float("inf")
+    gc.disable()
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        for activity in activities:
+            activity.to_adf()
+        serialize_seconds = min(serialize_seconds, time.perf_counter() - start)
+    gc.enable()
+
+    print(f"activities:        {args.activities} (fan-in {args.fan_in})")
+    print(f"build:             {build_seconds:.2f} s")
+    print(f"memory:            {memory / 2 ** 20:.1f} MiB ({memory / args.activities:.0f} bytes per activity)")
+    print(f"to_adf:            {serialize_seconds:.2f} s (best of {args.repeat}, "
+          f"{serialize_seconds / args.activities * 1e6:.1f} us per call)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""Benchmark of the load, serialize and deploy phases of adfPy on generated factories
+
+For every size, a synthetic factory is generated in a temporary directory: definition files with a mix of copy,
+ForEach, IfCondition and SetVariable activities, pipelines depending on other pipelines, and scheduled triggers. The
+following phases are timed (best of a number of repeats) and their peak memory is measured with tracemalloc:
+
+    load        `load_pipelines_from_path` on the generated directory
+    serialize   `to_adf_json()` of every pipeline and trigger, encoded as JSON
+    deploy      a full `adfpy-deploy` run (without --diff), against an in-process InMemoryDataFactoryClient
+
+The results are written as JSON. Passing the results of a previous run with --compare reports the relative change
+of every phase, and fails if any phase became slower than --max-regression allows.
+
+Usage:
+    python benchmarks/deploy_phases.py [--sizes 10,100,1000,10000] [--repeat 3] [--output results.json]
+                                       [--compare baseline.json] [--max-regression 0.2]
+"""
+import argparse
+import gc
+import json
+import logging
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+from unittest import mock
+
+from adfpy import deploy
+from adfpy.loader import find_definition_files, load_pipelines_from_path, unload_definition_module
+from adfpy.testing.client import InMemoryDataFactoryClient
+from adfpy.throttling import ScheduledClient
+
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+PIPELINES_PER_FILE = 25
+PHASES = ("load", "serialize", "deploy")
+
+FILE_HEADER = '''from azure.mgmt.datafactory.models import AzureSqlSource, ParquetSink
+
+from adfpy.activities.control import AdfForEachActivity, AdfIfConditionActivity, AdfSetVariableActivity
+from adfpy.activities.execution import AdfCopyActivity
+from adfpy.pipeline import AdfPipeline
+'''
+
+# Pipelines cycle through these shapes, so every factory has the same mix of activities
+PIPELINE_TEMPLATES = [
+    # A copy of a single table
+    '''
+{var} = AdfPipeline(name="{name}"{extra})
+AdfCopyActivity("copy", "sql_{index}", "lake_{index}", AzureSqlSource(sql_reader_query="SELECT * FROM t_{index}"),
+                ParquetSink(), pipeline={var})
+''',
+    # Copies of a list of tables, followed by a check of the result
+    '''
+{var} = AdfPipeline(name="{name}"{extra})
+tables_{index} = AdfSetVariableActivity("tables", "@pipeline().parameters.tables", pipeline={var})
+copy_tables_{index} = AdfForEachActivity("copy tables", "@variables('tables')", [
+    AdfCopyActivity("copy table", "sql_{index}", "lake_{index}",
+                    AzureSqlSource(sql_reader_query="@{{item().query}}"), ParquetSink()),
+], pipeline={var}, batch_count=8)
+check_{index} = AdfIfConditionActivity("check", "@greater(length(variables('tables')), 0)",
+                                       [AdfSetVariableActivity("empty", "true")],
+                                       [AdfSetVariableActivity("done", "true")], pipeline={var})
+tables_{index} >> copy_tables_{index} >> check_{index}
+''',
+    # A chain of copies between layers of the lake
+    '''
+{var} = AdfPipeline(name="{name}"{extra})
+raw_{index} = AdfCopyActivity("raw", "sql_{index}", "raw_{index}", AzureSqlSource(), ParquetSink(), pipeline={var})
+clean_{index} = AdfCopyActivity("clean", "raw_{index}", "clean_{index}", AzureSqlSource(), ParquetSink(),
+                                pipeline={var})
+publish_{index} = AdfCopyActivity("publish", "clean_{index}", "publish_{index}", AzureSqlSource(), ParquetSink(),
+                                  pipeline={var})
+raw_{index} >> clean_{index} >> publish_{index}
+''',
+]
+
+
+def generate_factory(path: Path, pipeline_count: int) -> Dict[str, int]:
+    """Write the definition files of a synthetic factory with the given number of pipelines
+
+    Every third pipeline has a schedule, and every fourth pipeline depends on the pipeline defined before it in the
+    same file.
+
+    Returns:
+        Dictionary with the number of files, pipelines and scheduled pipelines
+    """
+    scheduled = 0
+    files = 0
+    for start in range(0, pipeline_count, PIPELINES_PER_FILE):
+        blocks = [FILE_HEADER]
+        for index in range(start, min(start + PIPELINES_PER_FILE, pipeline_count)):
+            extra = ""
+            if index % 3 == 0:
+                extra += f', schedule="{index % 60} {index % 24} * * *"'
+                scheduled += 1
+            if index % 4 == 3 and index > start:
+                extra += f", depends_on_pipelines=[pipeline_{index - 1}]"
+            blocks.append(PIPELINE_TEMPLATES[index % len(PIPELINE_TEMPLATES)].format(
+                var=f"pipeline_{index}", name=f"pipeline_{index:05d}", index=index, extra=extra))
+        (path / f"pipelines_{start // PIPELINES_PER_FILE:04d}.py").write_text("".join(blocks))
+        files += 1
+    return {"files": files, "pipelines": pipeline_count, "scheduled_pipelines": scheduled}
+
+
+def unload(path: Path):
+    """Remove the generated definition modules from `sys.modules`, so the next load executes them again"""
+    for file_path in find_definition_files(path):
+        unload_definition_module(file_path)
+
+
+def serialize(pipelines) -> int:
+    size = 0
+    for pipeline in pipelines:
+        size += len(json.dumps(pipeline.to_adf_json()))
+        if pipeline.schedule:
+            size += len(json.dumps(pipeline.schedule.to_adf_json()))
+    return size
+
+
+def run_deployment(path: Path):
+    client = InMemoryDataFactoryClient()
+
+    def configure_data_factory(scheduler=None):
+        return deploy.ConfiguredDataFactory("benchmark", "factory",
+                                            ScheduledClient(client, scheduler) if scheduler else client)
+
+    deploy.processed_pipelines_names.clear()
+    with mock.patch.object(deploy, "configure_data_factory", configure_data_factory):
+        deploy.run_deployment.main(["--path", str(path)], standalone_mode=False)
+
+
+def measure(phase: Callable[[], Any], setup: Callable[[], Any], repeat: int, memory: bool) -> Dict[str, float]:
+    """Time a phase (best of `repeat`), and measure its peak memory in a separate run"""
+    seconds = float("inf")
+    for _ in range(repeat):
+        setup()
+        gc.collect()
+        start = time.perf_counter()
+        phase()
+        seconds = min(seconds, time.perf_counter() - start)
+    result = {"seconds": seconds}
+    if memory:
+        setup()
+        gc.collect()
+        tracemalloc.start()
+        phase()
+        result["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+def benchmark_size(pipeline_count: int, repeat: int, memory: bool) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix="adfpy-benchmark-") as directory:
+        path = Path(directory)
+        factory = generate_factory(path, pipeline_count)
+        pipelines = load_pipelines_from_path(path)
+        factory["activities"] = sum(len(p.activities) for p in pipelines)
+        phases = {
+            "load": measure(lambda: load_pipelines_from_path(path), lambda: unload(path), repeat, memory),
+            "serialize": measure(lambda: serialize(pipelines), lambda: None, repeat, memory),
+            "deploy": measure(lambda: run_deployment(path), lambda: unload(path), repeat, memory),
+        }
+        unload(path)
+    for result in phases.values():
+        result["seconds_per_pipeline"] = result["seconds"] / pipeline_count
+    return {**factory, "phases": phases}
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """Print the relative change of every phase compared with a baseline
+
+    Returns:
+        Descriptions of the phases that regressed by more than `max_regression`
+    """
+    baseline_sizes = {size["pipelines"]: size for size in baseline["sizes"]}
+    regressions = []
+    print(f"\nCompared with {baseline['timestamp']} (version {baseline['adfpy_version']}, "
+          f"commit {baseline.get('git_commit', 'unknown')}):")
+    for size in results["sizes"]:
+        previous = baseline_sizes.get(size["pipelines"])
+        if previous is None:
+            continue
+        for phase in PHASES:
+            change = size["phases"][phase]["seconds"] / previous["phases"][phase]["seconds"] - 1
+            print(f"{size['pipelines']:>7} pipelines  {phase:<10} {change:+7.1%}")
+            if change > max_regression:
+                regressions.append(f"{phase} of {size['pipelines']} pipelines ({change:+.1%})")
+    return regressions
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=Path(__file__).parent, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _version() -> str:
+    try:
+        from importlib.metadata import version
+
+        return version("adfpy")
+    except Exception:
+        return "unknown"
+
+
+def parse_sizes(value: str) -> List[int]:
+    return [int(size) for size in value.split(",") if size]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=parse_sizes, default=DEFAULT_SIZES,
+                        help="Comma separated numbers of pipelines of the generated factories")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of times every phase is timed")
+    parser.add_argument("--no-memory", action="store_true", help="Skip measuring the peak memory of every phase")
+    parser.add_argument("--output", type=Path, help="File to write the results to, as JSON")
+    parser.add_argument("--compare", type=Path, help="Results of a previous run to compare with")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="Maximum relative slowdown of any phase compared with --compare")
+    args = parser.parse_args(argv)
+
+    # Logging every deployed pipeline would dominate the deploy phase, and the output of the benchmark
+    logging.getLogger("adfPy").setLevel(logging.WARNING)
+    # Make sure importing the SDK is not part of the first measurement
+    InMemoryDataFactoryClient().pipelines._deserialize({})
+
+    results: Dict[str, Any] = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "adfpy_version": _version(),
+        "git_commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "sizes": [],
+    }
+    print(f"{'pipelines':>9} {'activities':>10}  " + "  ".join(f"{phase:>18}" for phase in PHASES))
+    for pipeline_count in args.sizes:
+        size = benchmark_size(pipeline_count, args.repeat, not args.no_memory)
+        results["sizes"].append(size)
+        columns: List[Tuple[float, str]] = [
+            (size["phases"][phase]["seconds"],
+             f"{size['phases'][phase]['peak_memory_bytes'] / 2 ** 20:.1f}MiB" if not args.no_memory else "-")
+            for phase in PHASES
+        ]
+        print(f"{pipeline_count:>9} {size['activities']:>10}  " +
+              "  ".join(f"{seconds:>8.3f}s {memory:>9}" for seconds, memory in columns))
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+        print(f"\nResults written to {args.output}")
+    if args.compare:
+        regressions = compare(results, json.loads(args.compare.read_text()), args.max_regression)
+        if regressions:
+            print(f"FAIL: slower than {args.max_regression:.0%} allows: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
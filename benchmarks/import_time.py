@@ -0,0 +1,86 @@
+"""Import time benchmark for the adfPy modules used by short-lived processes (e.g. `adfpy-deploy --help`)
+
+Every module is imported in a fresh interpreter started with `python -X importtime`, and the cumulative import time
+reported by the interpreter is recorded. The median over a number of runs is compared with a budget, and the
+benchmark fails if the budget is exceeded or if any of the Azure SDK packages is imported eagerly.
+
+Usage:
+    python benchmarks/import_time.py [--repeat 5] [--budget-ms 250] [--top 10] [module ...]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+DEFAULT_MODULES = [
+    "adfpy.deploy",
+    "adfpy.pipeline",
+    "adfpy.activities.control",
+    "adfpy.activities.execution",
+]
+# Packages that should only be imported when serializing to, or talking with, ADF
+LAZY_PACKAGES = ("azure", "aiohttp", "isodate", "msrest")
+
+
+def measure_import(module: str) -> Tuple[int, Dict[str, Tuple[int, int]]]:
+    """Import a module in a fresh interpreter
+
+    Args:
+        module: dotted name of the module to import
+
+    Returns:
+        Tuple of the cumulative import time of the module in microseconds, and a dictionary mapping every imported
+        module to its own and cumulative import time in microseconds
+    """
+    output = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            check=True, capture_output=True, text=True).stderr
+    # Nested imports are reported (indented) before the module importing them. Only the imports triggered by the
+    # module itself are kept, not those of the interpreter startup.
+    timings: Dict[str, Tuple[int, int]] = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, raw_name = line[len("import time:"):].split("|")
+        name = raw_name.strip()
+        timings[name] = (int(own), int(cumulative))
+        if raw_name.startswith("  ") or name == module:
+            continue
+        timings = {}
+    return timings[module][1], timings
+
+
+def eager_imports(timings: Dict[str, Tuple[int, int]]) -> List[str]:
+    return sorted(name for name in timings if name.split(".")[0] in LAZY_PACKAGES)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=5, help="Number of fresh interpreters per module")
+    parser.add_argument("--budget-ms", type=float, default=250.0,
+                        help="Maximum median cumulative import time per module, in milliseconds")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest dependencies to show per module")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in args.modules:
+        runs = [measure_import(module) for _ in range(args.repeat)]
+        median_ms = statistics.median(total for total, _ in runs) / 1000
+        timings = runs[-1][1]
+        print(f"{module}: {median_ms:.1f} ms (median of {args.repeat})")
+        slowest = sorted(timings.items(), key=lambda item: item[1][1], reverse=True)[1:args.top + 1]
+        for name, (own, cumulative) in slowest:
+            print(f"    {cumulative / 1000:8.1f} ms  {name}")
+        eager = eager_imports(timings)
+        if eager:
+            print(f"  FAIL: {module} eagerly imports {', '.join(eager[:5])}{'...' if len(eager) > 5 else ''}")
+            failed = True
+        if median_ms > args.budget_ms:
+            print(f"  FAIL: {module} exceeds the import time budget of {args.budget_ms:.0f} ms")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -26,28 +26,32 @@ parent_pipeline = AdfPipeline(
     schedule="@daily"
 )
 
+if_foo = AdfIfConditionActivity(
+    name="if_foo",
+    expression="",
+    if_false_activities=[
+        AdfExecutePipelineActivity(
+            name="run_no_watermark",
+            pipeline_name="complex_extraction_ingestion_flow_no_watermark",
+        )
+    ],
+    if_true_activities=[
+        AdfExecutePipelineActivity(
+            name="run_watermark",
+            pipeline_name="complex_extraction_ingestion_flow_watermark",
+        )
+    ],
+)
+
+set_foo = AdfSetVariableActivity("foo", "bar")
+
+# Activities in a ForEach run in parallel, unless they depend on each other
+if_foo >> set_foo
+
 fetch = AdfForEachActivity(
     name="fetch",
     items="@variables('foo')",
-    activities=[
-        AdfIfConditionActivity(
-            name="if_foo",
-            expression="",
-            if_false_activities=[
-                AdfExecutePipelineActivity(
-                    name="run_no_watermark",
-                    pipeline_name="complex_extraction_ingestion_flow_no_watermark",
-                )
-            ],
-            if_true_activities=[
-                AdfExecutePipelineActivity(
-                    name="run_watermark",
-                    pipeline_name="complex_extraction_ingestion_flow_watermark",
-                )
-            ],
-        ),
-        AdfSetVariableActivity("foo", "bar"),
-    ],
+    activities=[if_foo, set_foo],
     pipeline=parent_pipeline,
 )
 
@@ -1,3 +1,5 @@
+import pytest
+
 from adfpy.activities import control as victim
 
 from azure.mgmt.datafactory.models import ForEachActivity, SetVariableActivity, Expression, ActivityDependency
@@ -21,13 +23,13 @@ class TestForEachActivity:
         assert adf_activity == expected_result
 
     def test_multiple_activities(self):
+        foo = victim.AdfSetVariableActivity("foo", "bar")
+        baz = victim.AdfSetVariableActivity("baz", "qux")
+        foo >> baz
         activity = victim.AdfForEachActivity(
             name="foobar",
             items="@variables('foo')",
-            activities=[
-                victim.AdfSetVariableActivity("foo", "bar"),
-                victim.AdfSetVariableActivity("baz", "qux"),
-            ],
+            activities=[foo, baz],
         )
 
         adf_activity = activity.to_adf()
@@ -46,3 +48,55 @@ class TestForEachActivity:
         )
 
         assert adf_activity == expected_result
+
+    def test_activities_are_not_chained(self):
+        extract = victim.AdfSetVariableActivity("extract", "foo")
+        load = victim.AdfSetVariableActivity("load", "foo")
+        check = victim.AdfSetVariableActivity("check", "foo")
+        extract >> [load, check]
+
+        activity = victim.AdfForEachActivity(
+            name="foobar",
+            items="@variables('foo')",
+            activities=[extract, load, check],
+        )
+
+        adf_activity = activity.to_adf()
+        assert [[d.activity for d in a.depends_on] for a in adf_activity.activities] == [[], ["extract"], ["extract"]]
+
+    def test_batch_count(self):
+        activity = victim.AdfForEachActivity(
+            name="foobar",
+            items="@variables('foo')",
+            activities=[victim.AdfSetVariableActivity("foo", "bar")],
+            batch_count=50,
+        )
+
+        adf_activity = activity.to_adf()
+        assert adf_activity.batch_count == 50
+        assert adf_activity.is_sequential is None
+        assert activity.parallelism == 50
+
+    def test_sequential(self):
+        activity = victim.AdfForEachActivity(
+            name="foobar",
+            items="@variables('foo')",
+            activities=[victim.AdfSetVariableActivity("foo", "bar")],
+            is_sequential=True,
+        )
+
+        adf_activity = activity.to_adf()
+        assert adf_activity.is_sequential is True
+        assert adf_activity.batch_count is None
+        assert activity.parallelism == 1
+
+    @pytest.mark.parametrize("batch_count, is_sequential", [(0, False), (51, False), (10, True)])
+    def test_invalid_batch_count(self, batch_count, is_sequential):
+        with pytest.raises(ValueError):
+            victim.AdfForEachActivity(
+                name="foobar",
+                items="@variables('foo')",
+                activities=[],
+                batch_count=batch_count,
+                is_sequential=is_sequential,
+            )
@@ -0,0 +1,100 @@
+import pytest
+from azure.mgmt.datafactory.models import (
+    AzureSqlSink,
+    AzureSqlSource,
+    BlobSource,
+    DatasetReference,
+    LinkedServiceReference,
+    StagingSettings,
+)
+
+from adfpy.activities import execution as victim
+from adfpy.activities.control import AdfForEachActivity
+from adfpy.pipeline import AdfPipeline
+from adfpy.throughput import CopyStaging, CopyThroughputSettings, set_factory_copy_throughput
+
+
+@pytest.fixture
+def factory_copy_throughput():
+    set_factory_copy_throughput(CopyThroughputSettings(data_integration_units=8, parallel_copies=2))
+    yield
+    set_factory_copy_throughput(None)
+
+
+class TestCopyActivity:
+    def _copy(self, name="copy", sink=None, throughput=None):
+        return victim.AdfCopyActivity(name, "input", "output", BlobSource(), sink or AzureSqlSink(),
+                                      throughput=throughput)
+
+    def test_without_throughput_settings(self):
+        adf_activity = self._copy().to_adf()
+
+        assert adf_activity.parallel_copies is None
+        assert adf_activity.data_integration_units is None
+        assert adf_activity.staging_settings is None
+        assert adf_activity.sink.write_batch_size is None
+
+    def test_throughput_settings(self):
+        sink = AzureSqlSink()
+        activity = self._copy(sink=sink, throughput=CopyThroughputSettings(
+            parallel_copies=8,
+            data_integration_units=32,
+            enable_staging=True,
+            staging=CopyStaging("staging", "adf/staging", enable_compression=True),
+            enable_skip_incompatible_row=True,
+            write_batch_size=10000,
+            max_concurrent_connections=4,
+        ))
+
+        adf_activity = activity.to_adf()
+
+        assert adf_activity.parallel_copies == 8
+        assert adf_activity.data_integration_units == 32
+        assert adf_activity.enable_staging is True
+        assert adf_activity.staging_settings == StagingSettings(
+            linked_service_name=LinkedServiceReference(reference_name="staging"),
+            path="adf/staging",
+            enable_compression=True,
+        )
+        assert adf_activity.enable_skip_incompatible_row is True
+        assert adf_activity.sink.write_batch_size == 10000
+        assert adf_activity.sink.max_concurrent_connections == 4
+        # the sink passed to the activity is not modified
+        assert sink.write_batch_size is None
+
+    def test_settings_are_inherited_from_pipeline_and_factory(self, factory_copy_throughput):
+        nested = self._copy("nested")
+        loop = AdfForEachActivity("loop", "@variables('items')", [nested])
+        activity = self._copy(throughput=CopyThroughputSettings(parallel_copies=16))
+        pipeline = AdfPipeline("pipeline", [activity, loop],
+                               copy_throughput=CopyThroughputSettings(data_integration_units=64, write_batch_size=500))
+
+        adf_activity, adf_loop = pipeline.to_adf().activities
+
+        assert (adf_activity.parallel_copies, adf_activity.data_integration_units) == (16, 64)
+        assert adf_activity.sink.write_batch_size == 500
+        assert (adf_loop.activities[0].parallel_copies, adf_loop.activities[0].data_integration_units) == (2, 64)
+        # outside of the pipeline, only the factory settings apply
+        assert (activity.to_adf().parallel_copies, activity.to_adf().data_integration_units) == (16, 8)
+
+    def test_references_can_be_assigned(self):
+        copy = self._copy()
+        lookup = victim.AdfLookupActivity("lookup", "dataset", AzureSqlSource())
+        procedure = victim.AdfSqlServerStoredProcedureActivity("procedure", "sp_refresh", "sql")
+
+        copy.input_dataset = DatasetReference(reference_name="staging", parameters={"path": "foo"})
+        assert (copy.input_dataset_name, copy.input_dataset_parameters) == ("staging", {"path": "foo"})
+        assert copy.to_adf().inputs == [DatasetReference(reference_name="staging", parameters={"path": "foo"})]
+
+        copy.output_dataset = DatasetReference(reference_name="landing")
+        assert (copy.output_dataset_name, copy.output_dataset_parameters) == ("landing", None)
+        assert copy.to_adf().outputs == [DatasetReference(reference_name="landing")]
+
+        lookup.dataset = DatasetReference(reference_name="lookups", parameters={"table": "bar"})
+        assert lookup.to_adf().dataset == DatasetReference(reference_name="lookups", parameters={"table": "bar"})
+        assert lookup.to_adf_json() == lookup.to_adf().serialize()
+
+        procedure.linked_service = LinkedServiceReference(reference_name="warehouse", parameters={"db": "baz"})
+        assert procedure.to_adf().linked_service_name == LinkedServiceReference(reference_name="warehouse",
+                                                                                parameters={"db": "baz"})
+        assert procedure.to_adf_json() == procedure.to_adf().serialize()
@@ -0,0 +1,80 @@
+import json
+
+import pytest
+from azure.mgmt.datafactory.models import BlobSink, BlobSource, OracleSource, SqlPartitionSettings, SqlServerSource
+
+from adfpy.activities import partitioning as victim
+from adfpy.activities.control import AdfForEachActivity
+from adfpy.activities.execution import AdfCopyActivity
+
+
+def test_split_range():
+    assert victim.split_range(1, 10, 3) == [
+        victim.PartitionRange(1, 4),
+        victim.PartitionRange(5, 7),
+        victim.PartitionRange(8, 10),
+    ]
+    assert victim.split_range(1, 2, 4) == [victim.PartitionRange(1, 1), victim.PartitionRange(2, 2)]
+
+
+def test_native_partitioning():
+    source = SqlServerSource()
+    activity = victim.build_partitioned_copy(
+        "copy orders", "sales.orders", "order_id", "orders", "landing", source, BlobSink(),
+        partition_count=8, lower_bound=1, upper_bound=1000000, strategy=victim.PartitionStrategy.NATIVE,
+    )
+
+    adf_activity = activity.to_adf()
+    assert isinstance(activity, AdfCopyActivity)
+    assert adf_activity.parallel_copies == 8
+    assert adf_activity.source.partition_option == "DynamicRange"
+    assert adf_activity.source.partition_settings == SqlPartitionSettings(
+        partition_column_name="order_id", partition_lower_bound="1", partition_upper_bound="1000000")
+    assert adf_activity.source.sql_reader_query == "SELECT * FROM sales.orders WHERE ?AdfDynamicRangePartitionCondition"
+    # the source passed in is not modified
+    assert source.partition_option is None
+
+
+def test_for_each_partitioning():
+    activity = victim.build_partitioned_copy(
+        "copy orders", "SALES.ORDERS", "ORDER_DATE", "orders", "landing", OracleSource(), BlobSink(),
+        ranges=[("2021-01-01", "2021-12-31"), ("2022-01-01", "2022-12-31")], sink_path="landing/orders/",
+    )
+
+    adf_activity = activity.to_adf()
+    assert isinstance(activity, AdfForEachActivity)
+    assert adf_activity.batch_count == 2
+    assert json.loads(adf_activity.items.value[len("@json('"):-len("')")]) == [
+        {"index": 0, "lower": "2021-01-01", "upper": "2021-12-31"},
+        {"index": 1, "lower": "2022-01-01", "upper": "2022-12-31"},
+    ]
+    partition_copy = adf_activity.activities[0]
+    assert partition_copy.source.oracle_reader_query["value"] == (
+        "SELECT * FROM SALES.ORDERS WHERE ORDER_DATE >= '@{item().lower}' AND ORDER_DATE <= '@{item().upper}'")
+    assert partition_copy.outputs[0].parameters == {
+        "path": {"value": "@concat('landing/orders/partition=', string(item().index))", "type": "Expression"},
+    }
+
+
+def test_for_each_batch_count_is_bounded():
+    activity = victim.build_partitioned_copy(
+        "copy orders", "orders", "id", "orders", "landing", SqlServerSource(), BlobSink(),
+        partition_count=200, lower_bound=0, upper_bound=10 ** 6, sink_path="landing/orders",
+    )
+
+    assert activity.batch_count == AdfForEachActivity.MAX_BATCH_COUNT
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"source_type": BlobSource(), "partition_count": 2, "lower_bound": 0, "upper_bound": 10},
+    {"partition_count": 2, "ranges": [(0, 10)]},
+    {"ranges": [(0, 10), (5, 20)]},
+    {"partition_count": 2},
+    {"ranges": [(0, 10)], "strategy": victim.PartitionStrategy.NATIVE},
+    {"ranges": [(0, 10)], "sink_path": None},
+])
+def test_invalid_partitioning(kwargs):
+    arguments = {"source_type": SqlServerSource(), "sink_path": "landing/orders", **kwargs}
+    with pytest.raises(ValueError):
+        victim.build_partitioned_copy("copy orders", "orders", "id", "orders", "landing", sink_type=BlobSink(),
+                                      **arguments)
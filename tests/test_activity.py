@@ -1,4 +1,7 @@
-from adfpy.activity import AdfActivity
+import pytest
+
+from adfpy.activity import AdfActivity, DependencyCondition
+from adfpy.activities.control import AdfSetVariableActivity
 
 
 class TestAdfActivity:
@@ -8,7 +11,7 @@ class TestAdfActivity:
 
         act1 >> act2
 
-        assert act2.depends_on == {"act1": ["Succeeded"]}
+        assert act2.depends_on == {"act1": ("Succeeded",)}
 
     def test_left_shift(self):
         act1 = AdfActivity("act1")
@@ -16,7 +19,7 @@ class TestAdfActivity:
 
         act1 << act2
 
-        assert act1.depends_on == {"act2": ["Succeeded"]}
+        assert act1.depends_on == {"act2": ("Succeeded",)}
 
     def test_left_shift_list(self):
         act1 = AdfActivity("act1")
@@ -24,7 +27,7 @@ class TestAdfActivity:
 
         act1 << [act2]
 
-        assert act1.depends_on == {"act2": ["Succeeded"]}
+        assert act1.depends_on == {"act2": ("Succeeded",)}
 
     def test_right_shift_list(self):
         act1 = AdfActivity("act1")
@@ -32,16 +35,56 @@ class TestAdfActivity:
 
         act1 >> [act2]
 
-        assert act2.depends_on == {"act1": ["Succeeded"]}
+        assert act2.depends_on == {"act1": ("Succeeded",)}
 
     def test_adding_dependency_default_conditions(self):
         act = AdfActivity("act")
         act.add_dependency("foo")
 
-        assert act.depends_on == {"foo": ["Succeeded"]}
+        assert act.depends_on == {"foo": ("Succeeded",)}
 
     def test_adding_dependency_custom_conditions(self):
         act = AdfActivity("act")
         act.add_dependency("foo", ["Failed"])
 
-        assert act.depends_on == {"foo": ["Failed"]}
+        assert act.depends_on == {"foo": ("Failed",)}
+
+    def test_dependency_conditions_are_interned(self):
+        act1 = AdfActivity("act1")
+        act2 = AdfActivity("act2")
+        act1.add_dependency("foo", ["Failed", "Skipped"])
+        act2.add_dependency("foo", [DependencyCondition.FAILED, DependencyCondition.SKIPPED])
+
+        assert act1.depends_on["foo"] is act2.depends_on["foo"]
+
+    def test_adding_dependency_invalid_condition(self):
+        act = AdfActivity("act")
+
+        with pytest.raises(ValueError):
+            act.add_dependency("foo", ["Finished"])
+
+    def test_depends_on_is_read_only(self):
+        act = AdfActivity("act")
+
+        with pytest.raises(TypeError):
+            act.depends_on["foo"] = ("Succeeded",)
+
+    def test_dependencies_to_adf_is_cached_until_dependencies_change(self):
+        act1 = AdfSetVariableActivity("act1", "foo")
+        act2 = AdfSetVariableActivity("act2", "bar")
+        act3 = AdfSetVariableActivity("act3", "baz")
+        act1 >> act3
+
+        first = act3.dependencies_to_adf()
+        assert [d.activity for d in first] == ["act1"]
+        assert first[0] is act3.dependencies_to_adf()[0]
+        assert first[0].dependency_conditions == ["Succeeded"]
+
+        act2 >> act3
+
+        assert [d.activity for d in act3.to_adf().depends_on] == ["act1", "act2"]
+
+    def test_activities_have_no_instance_dict(self):
+        act = AdfSetVariableActivity("act", "foo")
+
+        assert not hasattr(act, "__dict__")
@@ -0,0 +1,102 @@
+from datetime import datetime
+
+import pytest
+
+from adfpy import cron as victim
+from adfpy.error import InvalidCronExpressionError, NotSupportedError
+
+
+class TestAdfCronExpression:
+    @pytest.mark.parametrize("expression, attribute, expected", [
+        ("*/15 * * * *", "minutes", {0, 15, 30, 45}),
+        ("0,30 * * * *", "minutes", {0, 30}),
+        ("5-50/15 * * * *", "minutes", {5, 20, 35, 50}),
+        ("0 1-5 * * *", "hours", {1, 2, 3, 4, 5}),
+        ("0 0 * jan,JUL *", "months", {1, 7}),
+        ("0 0 * * MON-FRI", "days_of_week", {1, 2, 3, 4, 5}),
+        ("0 0 * * 5-7", "days_of_week", {5, 6, 0}),
+    ])
+    def test_parse(self, expression, attribute, expected):
+        assert getattr(victim.AdfCronExpression.parse(expression), attribute) == expected
+
+    @pytest.mark.parametrize("expression", [
+        "* * * *", "60 * * * *", "*/0 * * * *", "0 5-1 * * *", "0 0 0 * *", "0 0 * * FOO", "a * * * *",
+    ])
+    def test_invalid(self, expression):
+        with pytest.raises(InvalidCronExpressionError):
+            victim.AdfCronExpression.parse(expression)
+
+    def test_day_of_month_or_week(self):
+        cron = victim.AdfCronExpression.parse("0 0 1 * MON")
+
+        assert cron.matches(datetime(2022, 5, 1))  # a Sunday, but the first of the month
+        assert cron.matches(datetime(2022, 5, 2))  # a Monday
+        assert not cron.matches(datetime(2022, 5, 3))
+
+
+class TestCompileCron:
+    start_time = datetime(2022, 4, 27, 21, 18, 30)
+
+    @pytest.mark.parametrize("expression, frequency, interval, start_time", [
+        ("*/15 * * * *", "Minute", 15, datetime(2022, 4, 27, 21, 30)),
+        ("10/20 * * * *", "Minute", 20, datetime(2022, 4, 27, 21, 30)),
+        ("@hourly", "Hour", 1, datetime(2022, 4, 27, 22, 0)),
+        ("30 */6 * * *", "Hour", 6, datetime(2022, 4, 28, 0, 30)),
+    ])
+    def test_interval(self, expression, frequency, interval, start_time):
+        recurrence = victim.compile_cron(expression).to_recurrence(self.start_time)
+
+        assert (recurrence.frequency, recurrence.interval, recurrence.start_time) == (frequency, interval, start_time)
+        assert recurrence.schedule is None
+
+    def test_daily(self):
+        recurrence = victim.compile_cron("0,30 6-8 * * *").to_recurrence(self.start_time)
+
+        assert (recurrence.frequency, recurrence.interval) == ("Day", 1)
+        assert (recurrence.schedule.hours, recurrence.schedule.minutes) == ([6, 7, 8], [0, 30])
+
+    def test_weekly(self):
+        recurrence = victim.compile_cron("0 8 * * MON-FRI").to_recurrence(self.start_time)
+
+        assert recurrence.frequency == "Week"
+        assert recurrence.schedule.week_days == ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+
+    def test_every_quarter(self):
+        recurrence = victim.compile_cron("0 0 1 */3 *").to_recurrence(datetime(2022, 5, 12, 9, 0))
+
+        assert (recurrence.frequency, recurrence.interval) == ("Month", 3)
+        assert recurrence.schedule.month_days == [1]
+        assert recurrence.start_time == datetime(2022, 7, 1)
+
+    def test_week_days_in_some_months(self):
+        recurrence = victim.compile_cron("0 0 * 1,7 MON").to_recurrence(self.start_time)
+
+        assert (recurrence.frequency, recurrence.interval) == ("Month", 6)
+        assert [(o.day, o.occurrence) for o in recurrence.schedule.monthly_occurrences] == [
+            ("Monday", i) for i in range(1, 6)
+        ]
+
+    def test_stepped_days_of_week(self):
+        # a field starting with `*` still restricts the days
+        recurrence = victim.compile_cron("0 0 * * */2").to_recurrence(self.start_time)
+
+        assert recurrence.frequency == "Week"
+        assert recurrence.schedule.week_days == ["Sunday", "Tuesday", "Thursday", "Saturday"]
+
+    def test_day_of_month_or_every_day_of_week(self):
+        recurrence = victim.compile_cron("0 0 1 1 0-6").to_recurrence(self.start_time)
+
+        assert (recurrence.frequency, recurrence.interval) == ("Month", 12)
+        assert recurrence.schedule.month_days == list(range(1, 32))
+
+    @pytest.mark.parametrize("expression, reason", [
+        ("0 0 1 * MON", "either the day of the month or the day of the week"),
+        ("0 0 1 1,2 *", "evenly spaced"),
+        ("0 0 */2 * */2", "both the day of the month and the day of the week"),
+    ])
+    def test_not_supported(self, expression, reason):
+        with pytest.raises(NotSupportedError, match=reason):
+            victim.compile_cron(expression)
+
+    def test_memoized(self):
+        assert victim.compile_cron("0  5 * * *") is victim.compile_cron("0 5 * * *")
@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+
+import hypothesis
+from hypothesis import strategies as st
+
+from adfpy.cron import AdfCronExpression, compile_cron
+from adfpy.error import NotSupportedError
+from adfpy.simulate import Calendar, cron_mask, simulate
+
+
+def cron_field(minimum, maximum):
+    values = st.integers(minimum, maximum)
+    return st.one_of(
+        st.just("*"),
+        values.map(str),
+        st.integers(1, maximum - minimum).map(lambda step: f"*/{step}"),
+        st.lists(values, min_size=1, max_size=4, unique=True).map(lambda v: ",".join(map(str, sorted(v)))),
+        st.tuples(values, values, st.integers(1, 10)).map(
+            lambda t: f"{min(t[0], t[1])}-{max(t[0], t[1])}" + (f"/{t[2]}" if t[2] > 1 else "")),
+    )
+
+
+cron_expressions = st.tuples(
+    cron_field(0, 59), cron_field(0, 23), cron_field(1, 31), cron_field(1, 12), cron_field(0, 6),
+).map(" ".join)
+start_times = st.datetimes(min_value=datetime(2020, 1, 1), max_value=datetime(2030, 1, 1))
+
+
+@hypothesis.settings(max_examples=200, deadline=None)
+@hypothesis.given(expression=cron_expressions, start_time=start_times)
+def test_compiled_recurrence_fires_at_the_same_times(expression, start_time):
+    try:
+        compiled = compile_cron(expression)
+    except NotSupportedError:
+        hypothesis.assume(False)
+        return
+
+    report = simulate(expression, compiled.to_recurrence(start_time), window_start=start_time, days=400)
+
+    assert report.equivalent, str(report)
+
+
+@hypothesis.settings(max_examples=50, deadline=None)
+@hypothesis.given(expression=cron_expressions, start_time=start_times)
+def test_cron_mask_matches_cron_expression(expression, start_time):
+    cron = AdfCronExpression.parse(expression)
+    calendar = Calendar.build(start_time, start_time + timedelta(days=3))
+
+    mask = cron_mask(cron, calendar)
+
+    for index in range(0, calendar.length, 37):
+        assert mask[index] == cron.matches(calendar.start + timedelta(minutes=index))
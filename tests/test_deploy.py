@@ -1,7 +1,19 @@
+import asyncio
 from unittest import mock
 
+import pytest
+from azure.core.exceptions import ResourceNotFoundError
+from azure.mgmt.datafactory.models import PipelineResource
+
 from adfpy import deploy as victim
+from adfpy.activities.control import AdfSetVariableActivity
+from adfpy.diff import ChangeSet, compute_local_hashes
+from adfpy.error import DeploymentError, InvalidPipelineError, PipelineDependencyError
+from adfpy.manifest import DeployManifest, ManifestEntry
 from adfpy.pipeline import AdfPipeline
+from adfpy.selection import PipelineSelection
+from adfpy.telemetry import DeployTelemetry
+from adfpy.testing.factory import LocalDataFactory
 
 
 @mock.patch("adfpy.deploy.fetch_existing_pipelines", return_value=["foo"])
@@ -60,3 +72,207 @@ def test_create_or_update_pipeline_preset_definition_schedule():
     m_adf_client.pipelines.create_or_update.assert_called_once_with("foo", "bar", "foo", pipeline.to_adf())
 
     m_adf_client.triggers.create_or_update.assert_called_with("foo", "bar", "foo-trigger", pipeline.schedule.to_adf())
+
+
+def test_compute_deployment_waves():
+    child = AdfPipeline(name="child")
+    other_child = AdfPipeline(name="other_child")
+    parent = AdfPipeline(name="parent", depends_on_pipelines=[child, other_child])
+    grand_parent = AdfPipeline(name="grand_parent", depends_on_pipelines=[parent])
+
+    waves = victim.compute_deployment_waves({grand_parent, AdfPipeline(name="standalone")})
+
+    assert [[p.name for p in wave] for wave in waves] == [
+        ["child", "other_child", "standalone"],
+        ["parent"],
+        ["grand_parent"],
+    ]
+
+
+def test_compute_deployment_waves_cycle():
+    first = AdfPipeline(name="first", depends_on_pipelines=[])
+    second = AdfPipeline(name="second", depends_on_pipelines=[first])
+    first.depends_on_pipelines = [second]
+
+    with pytest.raises(PipelineDependencyError):
+        victim.compute_deployment_waves([first])
+
+
+@mock.patch("adfpy.deploy.processed_pipelines_names", [])
+def test_deploy_pipelines_failure_only_blocks_dependents():
+    m_adf_client = mock.Mock()
+
+    def fail_on_broken(resource_group, factory, name, resource):
+        if name == "broken":
+            raise RuntimeError("boom")
+
+    m_adf_client.pipelines.create_or_update.side_effect = fail_on_broken
+    conf_adf_client = victim.ConfiguredDataFactory(resource_group="foo", name="bar", client=m_adf_client)
+    broken = AdfPipeline(name="broken")
+    healthy = AdfPipeline(name="healthy")
+    parent = AdfPipeline(name="parent", depends_on_pipelines=[broken, healthy], schedule="@daily")
+
+    result = victim.deploy_pipelines({parent, healthy}, conf_adf_client, concurrency=4)
+
+    assert result.deployed == ["healthy"]
+    assert list(result.failed) == ["broken"]
+    assert result.blocked == ["parent"]
+    m_adf_client.triggers.create_or_update.assert_not_called()
+    with pytest.raises(DeploymentError):
+        victim.ensure_all_pipelines_up_to_date({parent}, conf_adf_client)
+
+
+@mock.patch("adfpy.deploy.processed_pipelines_names", [])
+def test_deploy_pipelines_writes_trigger_after_pipeline():
+    m_adf_client = mock.Mock()
+    conf_adf_client = victim.ConfiguredDataFactory(resource_group="foo", name="bar", client=m_adf_client)
+    pipeline = AdfPipeline(name="foo", schedule="@daily")
+
+    victim.deploy_pipelines([pipeline], conf_adf_client)
+
+    assert [c[0] for c in m_adf_client.method_calls] == ["pipelines.create_or_update", "triggers.create_or_update"]
+
+
+@mock.patch("adfpy.deploy.processed_pipelines_names", [])
+def test_deploy_pipelines_only_writes_changes():
+    m_adf_client = mock.Mock()
+    conf_adf_client = victim.ConfiguredDataFactory(resource_group="foo", name="bar", client=m_adf_client)
+    unchanged = AdfPipeline(name="unchanged", schedule="@daily")
+    changed_trigger = AdfPipeline(name="changed_trigger", schedule="@daily")
+    changed = AdfPipeline(name="changed", depends_on_pipelines=[unchanged])
+
+    result = victim.deploy_pipelines([changed, changed_trigger], conf_adf_client,
+                                     changes=ChangeSet(pipelines={"changed"}, triggers={"changed_trigger-trigger"}))
+
+    assert sorted(result.deployed) == ["changed", "changed_trigger"]
+    m_adf_client.pipelines.create_or_update.assert_called_once_with("foo", "bar", "changed", changed.to_adf())
+    m_adf_client.triggers.create_or_update.assert_called_once_with("foo", "bar", "changed_trigger-trigger",
+                                                                   changed_trigger.schedule.to_adf())
+    assert sorted(victim.processed_pipelines_names) == ["changed", "changed_trigger", "unchanged"]
+
+
+def test_compute_change_set_from_manifest():
+    m_adf_client = mock.Mock()
+    conf_adf_client = victim.ConfiguredDataFactory(resource_group="foo", name="bar", client=m_adf_client)
+    unchanged = AdfPipeline(name="unchanged")
+    changed = AdfPipeline(name="changed", activities=[AdfSetVariableActivity("foo", "bar")])
+    deployed_elsewhere = AdfPipeline(name="deployed_elsewhere", activities=[AdfSetVariableActivity("foo", "bar")])
+    new = AdfPipeline(name="new")
+    local = compute_local_hashes([unchanged, changed, deployed_elsewhere, new])
+    manifest = DeployManifest(factory="foo/bar", pipelines={
+        "unchanged": ManifestEntry(local.pipelines["unchanged"], "1"),
+        "changed": ManifestEntry("outdated", "2"),
+        "deployed_elsewhere": ManifestEntry("outdated", "3"),
+    })
+
+    def get(resource_group, factory, name, if_none_match):
+        if name == "new":
+            raise ResourceNotFoundError("not found")
+        if name == "changed":
+            # ETag still matches, so the pipeline is unchanged since the last deployment
+            return None
+        remote = deployed_elsewhere.to_adf()
+        remote.etag = "4"
+        return remote
+
+    m_adf_client.pipelines.get.side_effect = get
+
+    changes, pipeline_etags, _ = victim.compute_change_set_from_manifest(
+        [unchanged, changed, deployed_elsewhere, new], conf_adf_client, manifest, local)
+
+    assert changes.pipelines == {"changed", "new"}
+    assert pipeline_etags == {"unchanged": "1", "deployed_elsewhere": "4"}
+    assert m_adf_client.pipelines.get.call_count == 3
+
+
+def test_deploy_pipelines_rejects_invalid_pipelines_before_writing():
+    m_adf_client = mock.Mock()
+    conf_adf_client = victim.ConfiguredDataFactory(resource_group="foo", name="bar", client=m_adf_client)
+    activity = AdfSetVariableActivity("set", "foo")
+    activity.add_dependency("missing")
+    valid = AdfPipeline(name="valid")
+    invalid = AdfPipeline(name="invalid", activities=[activity], depends_on_pipelines=[valid])
+
+    with pytest.raises(InvalidPipelineError, match="Pipeline invalid is invalid"):
+        victim.deploy_pipelines([valid, invalid], conf_adf_client)
+
+    m_adf_client.pipelines.create_or_update.assert_not_called()
+
+
+@mock.patch("adfpy.deploy.processed_pipelines_names", [])
+def test_deploy_pipelines_manages_triggers():
+    m_adf_client = mock.Mock()
+    running = mock.Mock(properties=mock.Mock(runtime_state="Started"))
+    running.name = "foo-trigger"
+    m_adf_client.triggers.list_by_factory.return_value = [running]
+    conf_adf_client = victim.ConfiguredDataFactory(resource_group="foo", name="bar", client=m_adf_client)
+    pipeline = AdfPipeline(name="foo", schedule="@daily")
+    new = AdfPipeline(name="new", schedule="@daily")
+    unchanged = AdfPipeline(name="unchanged", schedule="@daily")
+
+    result = victim.deploy_pipelines([pipeline, new, unchanged], conf_adf_client, concurrency=1,
+                                     changes=ChangeSet(pipelines={"foo", "new"},
+                                                       triggers={"foo-trigger", "new-trigger"}),
+                                     manage_triggers=True)
+
+    calls = [(c[0], c[1][2]) for c in m_adf_client.method_calls if c[0] != "triggers.list_by_factory"]
+    assert calls[0] == ("triggers.begin_stop", "foo-trigger")
+    assert sorted(calls[-2:]) == [("triggers.begin_start", "foo-trigger"), ("triggers.begin_start", "new-trigger")]
+    assert ("triggers.create_or_update", "foo-trigger") in calls[1:-2]
+    assert list(result.trigger_downtime) == ["foo-trigger"]
+    assert result.succeeded
+
+
+@mock.patch("adfpy.deploy.processed_pipelines_names", [])
+def test_deploy_pipelines_restarts_triggers_after_failure():
+    m_adf_client = mock.Mock()
+    running = mock.Mock(properties=mock.Mock(runtime_state="Started"))
+    running.name = "foo-trigger"
+    m_adf_client.triggers.list_by_factory.return_value = [running]
+    m_adf_client.pipelines.create_or_update.side_effect = RuntimeError("boom")
+    conf_adf_client = victim.ConfiguredDataFactory(resource_group="foo", name="bar", client=m_adf_client)
+
+    result = victim.deploy_pipelines([AdfPipeline(name="foo", schedule="@daily")], conf_adf_client,
+                                     manage_triggers=True)
+
+    assert list(result.failed) == ["foo"]
+    m_adf_client.triggers.begin_start.assert_called_once_with("foo", "bar", "foo-trigger")
+
+
+@mock.patch("adfpy.deploy.processed_pipelines_names", [])
+def test_run_deployment_with_manifest_removes_pipelines_created_outside_adfpy(tmp_path):
+    pipelines = {tmp_path / "pipelines.py": {AdfPipeline(name="foo")}}
+    manifest = str(tmp_path / "manifest.json")
+
+    with LocalDataFactory() as factory:
+        adf = factory.configured_data_factory()
+        with mock.patch("adfpy.deploy.configure_data_factory", return_value=adf):
+            for _ in range(2):
+                adf.client.pipelines.create_or_update("adfpy", "local", "portal", PipelineResource(activities=[]))
+                victim._run_deployment(tmp_path, True, False, 1, False, manifest, False, 1, None, False, 1.0,
+                                       PipelineSelection(), False, 0, DeployTelemetry(),
+                                       load=lambda *args: pipelines)
+
+                assert set(factory.resources("pipelines")) == {"foo"}
+
+
+def test_run_deployment_async_records_requests(tmp_path, monkeypatch):
+    pipelines = {tmp_path / "pipelines.py": {AdfPipeline(name="foo")}}
+    telemetry = DeployTelemetry()
+
+    with LocalDataFactory() as factory:
+        for variable, value in {"AZURE_SUBSCRIPTION_ID": factory.subscription_id,
+                                "AZURE_RESOURCE_GROUP_NAME": "adfpy",
+                                "AZURE_DATA_FACTORY_NAME": "local",
+                                "AZURE_SERVICE_PRINCIPAL_CLIENT_ID": "client",
+                                "AZURE_SERVICE_PRINCIPAL_SECRET": "secret",
+                                "AZURE_TENANT_ID": "tenant",
+                                "ADFPY_ARM_ENDPOINT": factory.url}.items():
+            monkeypatch.setenv(variable, value)
+        asyncio.run(victim._run_deployment_async(tmp_path, True, False, 1, False, 1, None, PipelineSelection(),
+                                                 telemetry=telemetry, load=lambda *args: pipelines))
+
+        assert set(factory.resources("pipelines")) == {"foo"}
+    assert telemetry.operations["pipelines.create_or_update"].requests == 1
+    assert telemetry.operations["pipelines.create_or_update"].bytes_sent > 0
+    assert telemetry.operations["pipelines.list_by_factory"].requests == 1
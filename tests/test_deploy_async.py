@@ -0,0 +1,90 @@
+import asyncio
+import sys
+from unittest import mock
+
+import pytest
+
+from adfpy import deploy_async as victim
+from adfpy.deploy import ConfiguredDataFactory
+from adfpy.error import DeploymentError
+from adfpy.pipeline import AdfPipeline
+
+
+class AsyncPager:
+    def __init__(self, items):
+        self.items = items
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for item in self.items:
+            yield item
+
+
+def _async_adf_client():
+    m_adf_client = mock.Mock()
+    m_adf_client.pipelines.create_or_update = mock.AsyncMock()
+    m_adf_client.pipelines.delete = mock.AsyncMock()
+    m_adf_client.triggers.create_or_update = mock.AsyncMock()
+    return m_adf_client
+
+
+def test_deploy_async_writes_dependencies_first():
+    m_adf_client = _async_adf_client()
+    conf_adf_client = ConfiguredDataFactory(resource_group="foo", name="bar", client=m_adf_client)
+    child = AdfPipeline(name="child")
+    parent = AdfPipeline(name="parent", depends_on_pipelines=[child], schedule="@daily")
+
+    result = asyncio.run(victim.deploy_async({parent}, conf_adf_client, concurrency=2))
+
+    assert result.deployed == ["child", "parent"]
+    assert [c[0][2] for c in m_adf_client.pipelines.create_or_update.call_args_list] == ["child", "parent"]
+    m_adf_client.triggers.create_or_update.assert_awaited_once_with("foo", "bar", "parent-trigger",
+                                                                    parent.schedule.to_adf())
+
+
+def test_deploy_async_failure_blocks_dependents_and_deletion():
+    m_adf_client = _async_adf_client()
+
+    async def fail_on_broken(resource_group, factory, name, resource):
+        if name == "broken":
+            raise RuntimeError("boom")
+        return mock.Mock(etag="1")
+
+    m_adf_client.pipelines.create_or_update.side_effect = fail_on_broken
+    conf_adf_client = ConfiguredDataFactory(resource_group="foo", name="bar", client=m_adf_client)
+    broken = AdfPipeline(name="broken")
+    healthy = AdfPipeline(name="healthy")
+    parent = AdfPipeline(name="parent", depends_on_pipelines=[broken])
+
+    result = asyncio.run(victim.deploy_pipelines_async({parent, healthy}, conf_adf_client))
+
+    assert result.deployed == ["healthy"]
+    assert result.pipeline_etags == {"healthy": "1"}
+    assert list(result.failed) == ["broken"]
+    assert result.blocked == ["parent"]
+    with pytest.raises(DeploymentError):
+        asyncio.run(victim.deploy_async({parent}, conf_adf_client, delete_stale_resources=True))
+    m_adf_client.pipelines.list_by_factory.assert_not_called()
+    m_adf_client.pipelines.delete.assert_not_called()
+
+
+def test_remove_stale_pipelines_async():
+    m_adf_client = _async_adf_client()
+    m_adf_client.pipelines.list_by_factory.return_value = AsyncPager([mock.Mock(), mock.Mock()])
+    m_adf_client.pipelines.list_by_factory.return_value.items[0].name = "foo"
+    m_adf_client.pipelines.list_by_factory.return_value.items[1].name = "stale"
+    conf_adf_client = ConfiguredDataFactory(resource_group="foo", name="bar", client=m_adf_client)
+
+    asyncio.run(victim.remove_stale_pipelines_async(conf_adf_client, {"foo"}))
+
+    m_adf_client.pipelines.delete.assert_awaited_once_with(resource_group_name="foo",
+                                                           factory_name="bar",
+                                                           pipeline_name="stale")
+
+
+def test_configure_data_factory_async_requires_aiohttp():
+    with mock.patch.dict(sys.modules, {"aiohttp": None}):
+        with pytest.raises(ImportError, match=r"adfpy\[async\]"):
+            victim.configure_data_factory_async()
@@ -0,0 +1,94 @@
+from datetime import datetime, timezone
+
+from azure.mgmt.datafactory.models import PipelineResource, TriggerResource
+
+from adfpy import diff as victim
+from adfpy.activities.control import AdfSetVariableActivity
+from adfpy.pipeline import AdfPipeline
+from adfpy.trigger import TumblingWindow
+
+
+def _remote(resource_type, resource, name):
+    serialized = resource.serialize()
+    serialized.update({"id": f"/factories/bar/{name}", "name": name, "etag": "0100", "type": "foo"})
+    return resource_type.deserialize(serialized)
+
+
+def _pipeline(name="foo", **kwargs):
+    pipeline = AdfPipeline(name=name, **kwargs)
+    first = AdfSetVariableActivity("first", "foo", pipeline=pipeline)
+    second = AdfSetVariableActivity("second", "bar", pipeline=pipeline)
+    first >> second
+    return pipeline
+
+
+def test_normalize_definition():
+    definition = {"b": None, "a": {"c": [], "d": {}, "e": [{"f": None, "g": 1}]}}
+
+    assert victim.normalize_definition(definition) == {"a": {"e": [{"g": 1}]}}
+
+
+def test_definition_hash_matches_remote():
+    pipeline = _pipeline()
+    remote = _remote(PipelineResource, pipeline.to_adf(), pipeline.name)
+
+    assert victim.definition_hash(remote) == victim.definition_hash(pipeline.to_adf())
+
+
+def test_definition_hash_detects_change():
+    pipeline = _pipeline()
+    remote = _remote(PipelineResource, pipeline.to_adf(), pipeline.name)
+    pipeline.activities[1].value = "baz"
+
+    assert victim.definition_hash(remote) != victim.definition_hash(pipeline.to_adf())
+
+
+def test_trigger_definition_hash_ignore_start_time():
+    first = _pipeline(schedule="@daily", start_time=datetime(2022, 1, 1, tzinfo=timezone.utc))
+    second = _pipeline(schedule="@daily", start_time=datetime(2023, 1, 1, tzinfo=timezone.utc))
+
+    assert victim.trigger_definition_hash(first.schedule.to_adf()) != victim.trigger_definition_hash(
+        second.schedule.to_adf())
+    assert victim.trigger_definition_hash(first.schedule.to_adf(), ignore_start_time=True) == \
+        victim.trigger_definition_hash(second.schedule.to_adf(), ignore_start_time=True)
+
+
+def test_compute_change_set():
+    unchanged = _pipeline("unchanged", schedule="@daily")
+    changed = _pipeline("changed")
+    new = _pipeline("new", schedule="@hourly")
+    remote_trigger = _remote(TriggerResource, unchanged.schedule.to_adf(), unchanged.schedule.name)
+    remote = victim.RemoteDefinitions(
+        pipelines={
+            "unchanged": victim.RemoteResource(victim.definition_hash(unchanged.to_adf())),
+            "changed": victim.RemoteResource(victim.definition_hash(AdfPipeline("changed").to_adf())),
+        },
+        triggers={
+            unchanged.schedule.name: victim.RemoteResource(
+                victim.trigger_definition_hash(remote_trigger),
+                hash_without_start_time=victim.trigger_definition_hash(remote_trigger, ignore_start_time=True),
+            )
+        },
+    )
+
+    changes = victim.compute_change_set([unchanged, changed, new], remote)
+
+    assert changes.pipelines == {"changed", "new"}
+    assert changes.triggers == {"new-trigger"}
+
+
+def test_tumbling_window_trigger_definition_hash_normalizes_times():
+    window = TumblingWindow("Hour", end_time=datetime(2023, 1, 1, tzinfo=timezone.utc))
+    local = _pipeline(schedule=window, start_time=datetime(2022, 1, 1, tzinfo=timezone.utc))
+    remote = local.schedule.to_adf().serialize()
+    remote["properties"]["typeProperties"]["startTime"] = "2022-01-01T01:00:00+01:00"
+
+    assert victim.trigger_definition_hash(remote) == victim.trigger_definition_hash(local.schedule.to_adf())
+
+
+def test_trigger_definition_hash_normalizes_adf_timestamps():
+    local = _pipeline(schedule="@daily", start_time=datetime(2022, 1, 1, 0, 30, 0, 100000, tzinfo=timezone.utc))
+    remote = local.schedule.to_adf().serialize()
+    remote["properties"]["typeProperties"]["recurrence"]["startTime"] = "2022-01-01T00:30:00.1000000Z"
+
+    assert victim.trigger_definition_hash(remote) == victim.trigger_definition_hash(local.schedule.to_adf())
@@ -0,0 +1,138 @@
+import json
+from unittest import mock
+
+import pytest
+from click.testing import CliRunner
+
+from adfpy import estimate as victim
+from adfpy.activities.control import (
+    AdfExecutePipelineActivity,
+    AdfForEachActivity,
+    AdfIfConditionActivity,
+    AdfSetVariableActivity,
+)
+from adfpy.error import InvalidPipelineError, PipelineDependencyError
+from adfpy.pipeline import AdfPipeline
+
+DEFINITION = """
+from adfpy.activities.control import AdfSetVariableActivity
+from adfpy.pipeline import AdfPipeline
+
+extract = AdfSetVariableActivity("extract", "foo")
+load = AdfSetVariableActivity("load", "foo")
+check = AdfSetVariableActivity("check", "foo")
+extract >> [load, check]
+pipeline = AdfPipeline(name="etl", activities=[extract, load, check])
+"""
+
+
+def _activities(*names):
+    return [AdfSetVariableActivity(name, "foo") for name in names]
+
+
+def test_summarize_samples():
+    assert victim.summarize_samples([30, 10, 20]) == 20
+    assert victim.summarize_samples([10, 20], quantile=0.9) == pytest.approx(19)
+    with pytest.raises(ValueError):
+        victim.summarize_samples([])
+
+
+def test_critical_path_makespan_and_slack():
+    a, b, c, d = _activities("a", "b", "c", "d")
+    a >> [b, c] >> d
+    pipeline = AdfPipeline("pipeline", [a, b, c, d])
+
+    estimate = pipeline.estimate_runtime({"a": 10, "b": 30, "c": [5, 10, 100], "d": 5})
+
+    assert estimate.makespan == 45
+    assert estimate.critical_path == ["a", "b", "d"]
+    assert estimate.activities["c"].duration == 10
+    assert estimate.activities["c"].slack == 20
+    assert estimate.activities["b"].slack == 0
+    assert estimate.max_parallelism == 2
+    assert estimate.bottlenecks() == [("b", 30), ("a", 10), ("d", 5)]
+
+
+def test_parallel_critical_paths_are_not_bottlenecks():
+    a, b, c, d = _activities("a", "b", "c", "d")
+    a >> [b, c] >> d
+    pipeline = AdfPipeline("pipeline", [a, b, c, d])
+
+    estimate = pipeline.estimate_runtime({"a": 10, "b": 30, "c": 30, "d": 5})
+
+    # Speeding up only b or only c does not shorten the pipeline
+    assert estimate.bottlenecks() == [("a", 10), ("d", 5)]
+
+
+def test_for_each_batches_and_if_condition_branches():
+    x, y, short, long = _activities("x", "y", "short", "long")
+    x >> y
+    loop = AdfForEachActivity("loop", "@variables('items')", [x, y])
+    branch = AdfIfConditionActivity("branch", "@true", if_false_activities=[short], if_true_activities=[long])
+    loop >> branch
+    pipeline = AdfPipeline("pipeline", [loop, branch])
+
+    estimate = pipeline.estimate_runtime({"x": 1, "y": 2, "short": 5, "long": 10}, iterations={"loop": 45})
+
+    # 45 iterations in rounds of 20 take 3 rounds of 3 seconds
+    assert estimate.makespan == 9 + 10
+    assert estimate.critical_path == ["loop", "x", "y", "branch", "long"]
+    assert estimate.max_parallelism == 20
+    assert estimate.bottlenecks() == [("long", 10), ("y", 6), ("x", 3)]
+
+
+def test_executed_pipelines_are_resolved_through_dependencies():
+    child_activity, = _activities("work")
+    child = AdfPipeline("child", [child_activity])
+    prepare, = _activities("prepare")
+    run_child = AdfExecutePipelineActivity("run_child", "child")
+    prepare >> run_child
+    parent = AdfPipeline("parent", [prepare, run_child], depends_on_pipelines=[child])
+
+    estimate = parent.estimate_runtime({"prepare": 5, "child.work": 60})
+
+    assert estimate.makespan == 65
+    assert estimate.critical_path == ["prepare", "run_child", "child.work"]
+    assert estimate.bottlenecks() == [("child.work", 60), ("prepare", 5)]
+
+
+def test_pipelines_executing_themselves():
+    first = AdfPipeline("first", [AdfExecutePipelineActivity("run_second", "second")])
+    second = AdfPipeline("second", [AdfExecutePipelineActivity("run_first", "first")], depends_on_pipelines=[first])
+    first.depends_on_pipelines = [second]
+
+    with pytest.raises(PipelineDependencyError):
+        first.estimate_runtime()
+
+
+def test_failed_estimates_can_be_retried():
+    pipeline = AdfPipeline("etl", _activities("extract"))
+    estimator = victim._Estimator(pipeline, {}, {}, 60.0, 0.5)
+    with mock.patch.object(AdfPipeline, "validate", side_effect=InvalidPipelineError("invalid")):
+        with pytest.raises(InvalidPipelineError):
+            estimator.estimate_pipeline(pipeline)
+
+    assert estimator.estimate_pipeline(pipeline).makespan == 60
+
+
+def test_run_estimate(tmp_path):
+    (tmp_path / "etl.py").write_text(DEFINITION)
+    durations = tmp_path / "durations.json"
+    durations.write_text(json.dumps({"durations": {"etl.extract": 60, "etl.load": [600, 900, 1200], "etl.check": 30}}))
+
+    result = CliRunner().invoke(victim.run_estimate, ["--path", str(tmp_path), "--durations", str(durations)])
+
+    assert result.exit_code == 0, result.output
+    assert "estimated runtime: 0:16:00" in result.output
+    assert "critical path:     extract > load" in result.output
+    assert "0:15:00  93.8%  load" in result.output
+
+
+def test_for_each_batch_count():
+    x, = _activities("x")
+    loop = AdfForEachActivity("loop", "@variables('items')", [x], batch_count=50)
+    sequential_y, = _activities("y")
+    sequential = AdfForEachActivity("sequential", "@variables('items')", [sequential_y], is_sequential=True)
+
+    assert AdfPipeline("parallel", [loop]).estimate_runtime({"x": 10}, {"loop": 200}).makespan == 40
+    assert AdfPipeline("sequential", [sequential]).estimate_runtime({"y": 10}, {"sequential": 20}).makespan == 200
@@ -0,0 +1,33 @@
+from pathlib import Path
+
+from adfpy.activities.control import AdfForEachActivity
+from adfpy.loader import load_pipelines_from_path
+
+EXAMPLES = Path(__file__).parent.parent / "examples"
+
+
+def _load_example(name):
+    return {pipeline.name: pipeline for pipeline in load_pipelines_from_path(EXAMPLES / name)}
+
+
+def test_complex_extraction_ingestion_flow():
+    pipelines = _load_example("complex_extraction_ingestion_flow")
+    assert set(pipelines) == {
+        "complex_extraction_ingestion_flow",
+        "complex_extraction_ingestion_flow_no_watermark",
+        "complex_extraction_ingestion_flow_watermark",
+    }
+
+    fetch = next(a for a in pipelines["complex_extraction_ingestion_flow"].activities if a.name == "fetch")
+    assert isinstance(fetch, AdfForEachActivity)
+    assert not fetch.is_sequential
+    activities = {a.name: a for a in fetch.to_adf().activities}
+    assert activities["if_foo"].depends_on == []
+    assert [(d.activity, d.dependency_conditions) for d in activities["foo"].depends_on] == [("if_foo", ["Succeeded"])]
+
+
+def test_simple_copy_pipeline():
+    pipelines = _load_example("simple_copy_pipeline")
+
+    assert set(pipelines) == {"copyPipeline"}
+    assert all(pipeline.to_adf().activities for pipeline in pipelines.values())
@@ -0,0 +1,95 @@
+import pytest
+
+from adfpy import graph as victim
+from adfpy.activities.control import AdfForEachActivity, AdfIfConditionActivity, AdfSetVariableActivity
+from adfpy.error import InvalidPipelineError
+from adfpy.pipeline import AdfPipeline
+
+
+def _activities(*names):
+    return [AdfSetVariableActivity(name, "foo") for name in names]
+
+
+def test_graph_index_and_adjacency():
+    a, b, c = _activities("a", "b", "c")
+    a >> [b, c]
+
+    graph = victim.ActivityGraph([a, b, c])
+
+    assert graph["b"] is b
+    assert "c" in graph and "d" not in graph
+    assert len(graph) == 3
+    assert graph.upstream("b") == [a]
+    assert graph.downstream("a") == [b, c]
+
+
+def test_graph_includes_nested_scopes():
+    x, y, z = _activities("x", "y", "z")
+    x >> y
+    loop = AdfForEachActivity("loop", "@variables('items')", [x, y])
+    branch = AdfIfConditionActivity("branch", "@true", if_false_activities=[], if_true_activities=[z])
+
+    graph = victim.ActivityGraph([loop, branch])
+
+    assert [scope.path for scope in graph.scopes] == [
+        "", "branch.ifFalseActivities", "branch.ifTrueActivities", "loop.activities"
+    ]
+    assert graph.scope_of["y"].container is loop
+    assert graph.upstream("y") == [x]
+    graph.validate()
+
+
+def test_topological_order_depth_and_width():
+    a, b, c, d, x, y = _activities("a", "b", "c", "d", "x", "y")
+    x >> y
+    loop = AdfForEachActivity("loop", "@variables('items')", [x, y])
+    d >> a >> [b, c]
+    loop << b
+
+    graph = victim.ActivityGraph([a, b, c, d, loop])
+
+    assert graph.topological_order() == ["d", "a", "b", "c", "loop"]
+    # d -> a -> b -> loop (x -> y)
+    assert graph.depth == 5
+    assert graph.width == 2
+
+
+def test_validate_reports_all_problems():
+    a, b, c, x = _activities("a", "b", "c", "x")
+    duplicate, = _activities("a")
+    loop = AdfForEachActivity("loop", "@variables('items')", [x])
+    a >> b >> a
+    c.add_dependency("missing")
+    x.add_dependency("c")
+    pipeline = AdfPipeline("pipeline", [a, b, c, duplicate, loop])
+
+    with pytest.raises(InvalidPipelineError) as e:
+        pipeline.validate()
+
+    problems = str(e.value).splitlines()
+    assert problems[0] == "Pipeline pipeline is invalid:"
+    assert problems[1:] == [
+        "Activity name 'a' is used more than once",
+        "Activity 'c' depends on activity 'missing', which does not exist",
+        "Activity 'x' depends on activity 'c', which is not in the same scope",
+        "The dependencies between activities ['a', 'b'] in scope '<pipeline>' contain a cycle",
+    ]
+
+
+def test_validate_self_dependency():
+    a, = _activities("a")
+    a.add_dependency("a")
+
+    with pytest.raises(InvalidPipelineError, match="depends on itself"):
+        AdfPipeline("pipeline", [a]).validate()
+
+
+def test_validate_large_chain_is_linear():
+    activities = _activities(*[f"activity_{i}" for i in range(20000)])
+    for previous, activity in zip(activities, activities[1:]):
+        previous >> activity
+
+    graph = AdfPipeline("pipeline", activities).validate()
+
+    assert graph.depth == 20000
+    assert graph.width == 1
@@ -0,0 +1,21 @@
+import subprocess
+import sys
+
+import pytest
+
+LAZY_PACKAGES = ("azure", "aiohttp", "isodate")
+
+
+@pytest.mark.parametrize("module", [
+    "adfpy.deploy",
+    "adfpy.pipeline",
+    "adfpy.activities.control",
+    "adfpy.activities.execution",
+])
+def test_sdk_is_imported_lazily(module):
+    # A fresh interpreter is needed, as the test session itself has imported the SDK already
+    code = (f"import sys, {module}; "
+            f"print(sorted({{m.split('.')[0] for m in sys.modules}} & {set(LAZY_PACKAGES)!r}))")
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+
+    assert output.strip() == "[]"
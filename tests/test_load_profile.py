@@ -0,0 +1,107 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+from adfpy import load_profile as victim
+from adfpy.loader import load_pipelines_by_file
+
+HELPER_MODULE = """
+import time
+
+time.sleep(0.05)
+"""
+
+CHILD_DEFINITION = """
+from adfpy.activities.control import AdfForEachActivity, AdfSetVariableActivity
+from adfpy.pipeline import AdfPipeline
+
+child = AdfPipeline(name="child", activities=[
+    AdfForEachActivity("loop", "@x", [AdfSetVariableActivity("a", "1"), AdfSetVariableActivity("b", "2")]),
+])
+"""
+
+PARENT_DEFINITION = """
+import {helper}
+from adfpy.pipeline import AdfPipeline
+from {package}.child import child
+
+parents = [AdfPipeline(name=f"parent_{{i}}", depends_on_pipelines=[child]) for i in range(3)]
+parent_0, parent_1, parent_2 = parents
+"""
+
+
+def _write_definitions(root: Path, package: str) -> Path:
+    (root / f"{package}_helper.py").write_text(HELPER_MODULE)
+    definitions = root / package
+    definitions.mkdir()
+    (definitions / "child.py").write_text(CHILD_DEFINITION)
+    (definitions / "parent.py").write_text(PARENT_DEFINITION.format(package=package, helper=f"{package}_helper"))
+    return definitions
+
+
+def test_profile_modules(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    definitions = _write_definitions(tmp_path, "profile_modules")
+
+    with victim.LoadProfiler(definitions, cprofile_dir=tmp_path / "cprofile") as profiler:
+        load_pipelines_by_file(definitions)
+
+    modules = {m.name: m for m in profiler.modules}
+    child, parent = modules["profile_modules.child"], modules["profile_modules.parent"]
+    helper = modules["profile_modules_helper"]
+    assert child.definition and parent.definition and not helper.definition
+    assert (child.pipelines, child.activities) == (1, 3)
+    assert (parent.pipelines, parent.activities) == (3, 0)
+    # Files are loaded in order, so the child was loaded before the parent imported it
+    assert child.parent is None
+    assert helper.parent == "profile_modules.parent"
+    assert helper.seconds >= 0.05
+    assert parent.self_seconds == pytest.approx(parent.seconds - helper.seconds)
+    assert profiler.import_seconds(parent) >= helper.seconds
+    assert profiler.top(1, definitions=False)[0] is helper
+    assert parent.cprofile_file == tmp_path / "cprofile" / "profile_modules.parent.prof"
+    assert parent.cprofile_file.exists() and child.cprofile_file.exists()
+    assert not any(isinstance(finder, victim._ProfilingFinder) for finder in sys.meta_path)
+    assert type(sys.modules["profile_modules.child"].__loader__).__name__ == "SourceFileLoader"
+
+
+def test_profile_not_importable_definitions(tmp_path):
+    definitions = tmp_path / "not-importable"
+    definitions.mkdir()
+    (definitions / "child.py").write_text(CHILD_DEFINITION)
+
+    with victim.LoadProfiler(definitions, trace_memory=False) as profiler:
+        load_pipelines_by_file(definitions)
+
+    (child,) = [m for m in profiler.modules if m.definition]
+    assert child.file == (definitions / "child.py").resolve()
+    assert child.pipelines == 1
+    assert child.allocated_bytes == 0
+
+
+def test_profile_failing_definition(tmp_path):
+    definitions = tmp_path / "failing"
+    definitions.mkdir()
+    (definitions / "broken.py").write_text("raise ValueError('broken')")
+
+    with victim.LoadProfiler(definitions) as profiler:
+        with pytest.raises(ValueError):
+            load_pipelines_by_file(definitions)
+
+    (broken,) = profiler.modules
+    assert broken.failed
+
+
+def test_report(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    definitions = _write_definitions(tmp_path, "profile_report")
+
+    with victim.LoadProfiler(definitions) as profiler:
+        load_pipelines_by_file(definitions)
+
+    report = profiler.format_report()
+    assert report.startswith("Loaded 2 definition files")
+    assert "producing 4 pipelines with 3 activities" in report
+    assert "profile_report_helper (profile_report.parent)" in report
+    assert profiler.to_dict()["pipelines"] == 4
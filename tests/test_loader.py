@@ -0,0 +1,104 @@
+from pathlib import Path
+
+from adfpy import loader as victim
+
+CHILD_DEFINITION = """
+from pathlib import Path
+
+from adfpy.pipeline import AdfPipeline
+
+counter = Path(__file__).with_suffix(".count")
+counter.write_text(str(int(counter.read_text()) + 1) if counter.exists() else "1")
+
+child = AdfPipeline(name="child")
+"""
+
+PARENT_DEFINITION = """
+from adfpy.pipeline import AdfPipeline
+from {package}.child import child
+
+parent = AdfPipeline(name="parent", depends_on_pipelines=[child])
+"""
+
+
+def _write_definitions(root: Path, package: str) -> Path:
+    definitions = root / package
+    definitions.mkdir()
+    (definitions / "child.py").write_text(CHILD_DEFINITION)
+    (definitions / "parent.py").write_text(PARENT_DEFINITION.format(package=package))
+    return definitions
+
+
+def test_load_pipelines_from_path_imports_modules_once(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    definitions = _write_definitions(tmp_path, "loader_once")
+
+    pipelines_by_file = victim.load_pipelines_by_file(definitions)
+
+    assert (definitions / "child.count").read_text() == "1"
+    (child,) = pipelines_by_file[definitions / "child.py"]
+    parent = next(p for p in pipelines_by_file[definitions / "parent.py"] if p.name == "parent")
+    assert parent.depends_on_pipelines == [child]
+    assert parent.depends_on_pipelines[0] is child
+    assert victim.load_pipelines_from_path(definitions) == {child, parent}
+
+
+def test_load_pipelines_from_path_not_importable(tmp_path):
+    definitions = tmp_path / "not-importable"
+    definitions.mkdir()
+    (definitions / "child.py").write_text(CHILD_DEFINITION)
+
+    first = victim.import_definition_module(definitions / "child.py")
+    second = victim.import_definition_module(definitions / "child.py")
+
+    assert first is second
+    assert first.__name__.startswith(victim.UNIQUE_MODULE_PREFIX)
+    assert (definitions / "child.count").read_text() == "1"
+    assert {p.name for p in victim.load_pipelines_from_path(definitions / "child.py")} == {"child"}
+
+
+def test_load_pipelines_from_path_process_pool(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    definitions = _write_definitions(tmp_path, "loader_pool")
+    # Workers may both execute the child module, so it should not write to a shared counter
+    (definitions / "child.py").write_text(
+        "from adfpy.pipeline import AdfPipeline\n\nchild = AdfPipeline(name='child')\n")
+    for i in range(4):
+        (definitions / f"standalone_{i}.py").write_text(
+            f"from adfpy.pipeline import AdfPipeline\n\npipeline = AdfPipeline(name='standalone_{i}')\n")
+
+    pipelines = victim.load_pipelines_from_path(definitions, processes=2)
+
+    assert sorted(p.name for p in pipelines) == ["child", "parent", "standalone_0", "standalone_1", "standalone_2",
+                                                 "standalone_3"]
+
+
+def test_compute_cache_keys(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    definitions = _write_definitions(tmp_path, "loader_keys")
+    (definitions / "standalone.py").write_text("from .child import child\n")
+    files = victim.find_definition_files(definitions)
+
+    keys = victim.compute_cache_keys(files)
+    (definitions / "child.py").write_text(CHILD_DEFINITION + "\n# changed\n")
+    changed_keys = victim.compute_cache_keys(files)
+
+    assert all(keys[f] != changed_keys[f] for f in files)
+    (definitions / "unrelated.py").write_text("")
+    assert victim.compute_cache_keys(files + [definitions / "unrelated.py"])[definitions / "parent.py"] == \
+        changed_keys[definitions / "parent.py"]
+
+
+def test_load_pipelines_from_path_cache(tmp_path, monkeypatch, caplog):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    definitions = _write_definitions(tmp_path, "loader_cache")
+    cache_dir = tmp_path / "cache"
+
+    first = victim.load_pipelines_by_file(definitions, cache_dir=cache_dir)
+    with caplog.at_level("INFO", logger="adfPy"):
+        second = victim.load_pipelines_by_file(definitions, cache_dir=cache_dir)
+
+    assert "2 hits, 0 misses" in caplog.text
+    assert {f: {p.name for p in ps} for f, ps in first.items()} == \
+        {f: {p.name for p in ps} for f, ps in second.items()}
+    assert (definitions / "child.count").read_text() == "1"
@@ -0,0 +1,27 @@
+from adfpy import manifest as victim
+from adfpy.diff import LocalHashes
+
+
+def test_build_manifest():
+    local = LocalHashes(pipelines={"foo": "abc"}, triggers={"foo-trigger": "def"})
+
+    result = victim.build_manifest("rg/factory", local, {"foo": "1"}, {})
+
+    assert result == victim.DeployManifest(
+        factory="rg/factory",
+        pipelines={"foo": victim.ManifestEntry("abc", "1")},
+        triggers={"foo-trigger": victim.ManifestEntry("def", None)},
+    )
+
+
+def test_save_and_load_manifest(tmp_path):
+    location = str(tmp_path / "state" / "manifest.json")
+    manifest = victim.DeployManifest(factory="rg/factory", pipelines={"foo": victim.ManifestEntry("abc", "1")})
+
+    victim.save_manifest(manifest, location)
+
+    assert victim.load_manifest(location) == manifest
+
+
+def test_load_missing_manifest(tmp_path):
+    assert victim.load_manifest(str(tmp_path / "manifest.json")) is None
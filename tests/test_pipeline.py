@@ -0,0 +1,10 @@
+from adfpy import pipeline as victim
+
+
+def test_pipeline_tags_are_deployed_as_annotations():
+    tagged = victim.AdfPipeline(name="tagged", tags=["ingestion", "daily"])
+    untagged = victim.AdfPipeline(name="untagged")
+
+    assert tagged.to_adf().annotations == ["ingestion", "daily"]
+    assert untagged.tags == []
+    assert untagged.to_adf().annotations is None
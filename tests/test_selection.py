@@ -0,0 +1,99 @@
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from adfpy import selection as victim
+from adfpy.error import InvalidSelectionError
+from adfpy.pipeline import AdfPipeline
+
+SHARED_DEFINITION = """
+VALUE = "foo"
+"""
+
+INGEST_DEFINITION = """
+from adfpy.pipeline import AdfPipeline
+import shared
+
+ingest = AdfPipeline(name="ingest_sales")
+"""
+
+REPORT_DEFINITION = """
+from adfpy.pipeline import AdfPipeline
+
+report = AdfPipeline(name="report")
+"""
+
+
+@pytest.fixture
+def pipelines_by_file():
+    base = AdfPipeline(name="base")
+    ingest_sales = AdfPipeline(name="ingest_sales", depends_on_pipelines=[base])
+    ingest_stock = AdfPipeline(name="ingest_stock", tags=["stock"])
+    report = AdfPipeline(name="report", depends_on_pipelines=[ingest_sales], tags=["reporting"])
+    return {
+        Path("base.py"): {base},
+        Path("ingest.py"): {ingest_sales, ingest_stock},
+        Path("report.py"): {report},
+    }
+
+
+def _names(pipelines):
+    return sorted(p.name for p in pipelines)
+
+
+def test_no_selectors_selects_everything(pipelines_by_file):
+    selection = victim.PipelineSelection()
+
+    assert not selection.active
+    assert _names(selection.apply(pipelines_by_file, Path("."))) == ["base", "ingest_sales", "ingest_stock", "report"]
+
+
+def test_select_by_pattern_includes_dependencies(pipelines_by_file):
+    selection = victim.PipelineSelection(patterns=["ingest_*"])
+
+    assert _names(selection.apply(pipelines_by_file, Path("."))) == ["base", "ingest_sales", "ingest_stock"]
+
+
+def test_select_by_tag_includes_dependencies(pipelines_by_file):
+    selection = victim.PipelineSelection(tags=["reporting"])
+
+    assert _names(selection.apply(pipelines_by_file, Path("."))) == ["base", "ingest_sales", "report"]
+
+
+def test_stale_candidates():
+    existing = ["base", "ingest_old", "report_old"]
+    local = {"base"}
+
+    assert victim.PipelineSelection().stale_candidates(existing, local) == ["ingest_old", "report_old"]
+    assert victim.PipelineSelection(patterns=["ingest_*"]).stale_candidates(existing, local) == ["ingest_old"]
+    assert victim.PipelineSelection(tags=["reporting"]).stale_candidates(existing, local) == []
+
+
+def _git(args, cwd):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+def test_select_changed_since(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    (tmp_path / "shared.py").write_text(SHARED_DEFINITION)
+    (tmp_path / "ingest.py").write_text(INGEST_DEFINITION)
+    (tmp_path / "report.py").write_text(REPORT_DEFINITION)
+    _git(["init", "-q"], tmp_path)
+    _git(["add", "."], tmp_path)
+    _git(["-c", "user.name=test", "-c", "user.email=test@example.com", "commit", "-q", "-m", "initial"], tmp_path)
+    (tmp_path / "shared.py").write_text('VALUE = "bar"\n')
+    ingest = AdfPipeline(name="ingest_sales")
+    report = AdfPipeline(name="report")
+    pipelines_by_file = {tmp_path / "ingest.py": {ingest}, tmp_path / "report.py": {report}}
+
+    selected = victim.PipelineSelection(changed_since="HEAD").apply(pipelines_by_file, tmp_path)
+
+    assert _names(selected) == ["ingest_sales"]
+
+
+def test_select_changed_since_unknown_reference(tmp_path):
+    _git(["init", "-q"], tmp_path)
+
+    with pytest.raises(InvalidSelectionError):
+        victim.changed_files_since("does-not-exist", tmp_path)
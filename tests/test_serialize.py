@@ -0,0 +1,184 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import pytest
+from azure.mgmt.datafactory import models
+from azure.mgmt.datafactory.aio.operations import PipelinesOperations as AsyncPipelinesOperations
+from azure.mgmt.datafactory.models import (
+    AzureBlobFSWriteSettings,
+    AzureSqlSource,
+    OracleSource,
+    ParquetSink,
+    SetVariableActivity,
+    SqlServerSource,
+)
+from azure.mgmt.datafactory.operations import PipelinesOperations, TriggersOperations
+from msrest import Serializer
+
+from adfpy import serialize as victim
+from adfpy.activities.control import (
+    AdfExecutePipelineActivity,
+    AdfForEachActivity,
+    AdfIfConditionActivity,
+    AdfSetVariableActivity,
+)
+from adfpy.activities.execution import (
+    AdfCopyActivity,
+    AdfDatabricksSparkPythonActivity,
+    AdfDeleteActivity,
+    AdfLookupActivity,
+    AdfSqlServerStoredProcedureActivity,
+)
+from adfpy.activities.partitioning import PartitionStrategy, build_partitioned_copy
+from adfpy.deploy import deploy_pipelines
+from adfpy.pipeline import AdfPipeline
+from adfpy.testing.factory import LocalDataFactory
+from adfpy.throughput import CopyStaging, CopyThroughputSettings
+from adfpy.trigger import TumblingWindow, TumblingWindowDependency
+
+# The serializer the SDK operations use for request bodies
+SDK_SERIALIZER = Serializer({k: v for k, v in vars(models).items() if isinstance(v, type)})
+START_TIME = datetime(2022, 3, 4, 5, 6, 7, 123456, tzinfo=timezone(timedelta(hours=2)))
+
+
+def _assert_same_json(resource, data_type: str):
+    serialized = json.dumps(resource.to_adf_json())
+
+    assert serialized == json.dumps(resource.to_adf().serialize())
+    assert serialized == json.dumps(SDK_SERIALIZER.body(resource.to_adf(), data_type))
+
+
+def _activities():
+    copy = AdfCopyActivity(
+        "copy", "input", "output", AzureSqlSource(sql_reader_query="SELECT 1", query_timeout="02:00:00"),
+        ParquetSink(store_settings=AzureBlobFSWriteSettings(copy_behavior="FlattenHierarchy")),
+        input_dataset_parameters={"table": "t", "schema": None},
+        throughput=CopyThroughputSettings(parallel_copies=4, data_integration_units=8, enable_staging=True,
+                                          staging=CopyStaging("staging", "adf/staging"), write_batch_size=100),
+    )
+    if_condition = AdfIfConditionActivity("if", "@true", [AdfDeleteActivity("delete", "dataset", True, "*.csv")],
+                                          [AdfDatabricksSparkPythonActivity("python", "dbfs:/main.py", ["--x", 1])])
+    if_condition.add_dependency("copy", ["Failed", "Completed"])
+    copy >> if_condition
+    return [
+        copy,
+        if_condition,
+        AdfForEachActivity("for each", "@items", [AdfSetVariableActivity("nested", {"values": [1, 2]}),
+                                                  AdfExecutePipelineActivity("execute", "other")], batch_count=5),
+        AdfForEachActivity("sequential", "@items", [], is_sequential=True),
+        AdfSetVariableActivity("set", "value"),
+        AdfLookupActivity("lookup", "dataset", AzureSqlSource()),
+        AdfSqlServerStoredProcedureActivity("procedure", "sp_refresh", "sql"),
+        AdfDeleteActivity("delete everything", "dataset"),
+        build_partitioned_copy("for each partition", "t", "id", "input", "output", OracleSource(), ParquetSink(),
+                               partition_count=4, lower_bound=1, upper_bound=100, sink_path="lake/'t'"),
+        build_partitioned_copy("native partitions", "t", "id", "input", "output", SqlServerSource(), ParquetSink(),
+                               partition_count=4, lower_bound=1, upper_bound=100, strategy=PartitionStrategy.NATIVE),
+    ]
+
+
+@pytest.mark.parametrize("activity", _activities(), ids=lambda a: a.name)
+def test_activity_json(activity):
+    _assert_same_json(activity, "Activity")
+
+
+def test_pipeline_json():
+    pipeline = AdfPipeline("pipeline", activities=_activities(), tags=["sales", "daily"],
+                           copy_throughput=CopyThroughputSettings(max_concurrent_connections=2))
+
+    _assert_same_json(pipeline, "PipelineResource")
+    _assert_same_json(AdfPipeline("empty"), "PipelineResource")
+
+
+@pytest.mark.parametrize("schedule", ["@daily", "*/15 * * * *", "0 3 * * 1-5", "0 0 1,15 * *", "0 6 * 1,7 1"])
+@pytest.mark.parametrize("start_time", [START_TIME, datetime(2022, 1, 1), None])
+def test_schedule_trigger_json(schedule, start_time):
+    _assert_same_json(AdfPipeline("pipeline", schedule=schedule, start_time=start_time).schedule, "TriggerResource")
+
+
+def test_tumbling_window_trigger_json():
+    upstream = AdfPipeline("upstream", schedule=TumblingWindow("Hour"), start_time=START_TIME)
+    window = TumblingWindow("Day", 2, end_time=datetime(2023, 1, 1, tzinfo=timezone.utc), max_concurrency=4,
+                            delay=timedelta(minutes=30), retry_count=3, retry_interval=timedelta(minutes=1),
+                            depends_on=[TumblingWindowDependency(upstream, timedelta(hours=-1), timedelta(hours=2)),
+                                        TumblingWindowDependency(offset=timedelta(days=-1))],
+                            parameters={"start": "@trigger().outputs.windowStartTime", "unset": None})
+
+    _assert_same_json(upstream.schedule, "TriggerResource")
+    _assert_same_json(AdfPipeline("downstream", schedule=window, start_time=START_TIME).schedule, "TriggerResource")
+
+
+def test_serialize_model():
+    source = AzureSqlSource(sql_reader_query={"value": "SELECT 1", "type": "Expression"}, query_timeout="02:00:00",
+                            additional_properties={"custom": [1, None]})
+    activity = SetVariableActivity(name="set", variable_name="x", value=datetime(2022, 1, 1, tzinfo=timezone.utc))
+
+    assert json.dumps(victim.serialize_model(source)) == json.dumps(source.serialize())
+    assert json.dumps(victim.serialize_model(activity)) == json.dumps(activity.serialize())
+
+
+def test_activities_overriding_to_adf_are_serialized_from_their_model():
+    class DescribedActivity(AdfSetVariableActivity):
+        def to_adf(self):
+            activity = super().to_adf()
+            activity.description = "described"
+            return activity
+
+    assert DescribedActivity("set", "value").to_adf_json()["description"] == "described"
+
+
+def test_request_body():
+    pipeline = AdfPipeline("pipeline", activities=[AdfSetVariableActivity("set", "value")])
+    operations = mock.Mock()
+
+    assert victim.request_body(pipeline, operations) == pipeline.to_adf()
+    operations.accepts_json_payloads = True
+    assert victim.request_body(pipeline, operations) == victim.JsonPayload(pipeline.to_adf_json())
+
+
+def test_client_sends_json_payloads():
+    pipeline = AdfPipeline("pipeline", activities=_activities(), schedule="@daily", start_time=START_TIME)
+
+    with LocalDataFactory() as factory:
+        adf = factory.configured_data_factory()
+        with mock.patch.object(Serializer, "body", side_effect=AssertionError("serialized by the SDK")):
+            deploy_pipelines([pipeline], adf)
+        written = adf.client.pipelines.create_or_update("adfpy", "local", "model", pipeline.to_adf())
+
+        assert factory.resources("pipelines")["pipeline"]["properties"] == pipeline.to_adf_json()["properties"]
+        assert factory.resources("pipelines")["model"]["properties"] == pipeline.to_adf_json()["properties"]
+        assert factory.resources("triggers")["pipeline-trigger"]["properties"]["typeProperties"] == \
+            pipeline.schedule.to_adf_json()["properties"]["typeProperties"]
+        assert written.name == "model"
+
+
+def test_sdk_operations_use_the_payload_serializer():
+    pipeline = AdfPipeline("pipeline", activities=_activities(), schedule="@daily", start_time=START_TIME)
+
+    with LocalDataFactory() as factory:
+        client = factory.client()
+        assert type(client.pipelines) is PipelinesOperations
+        assert type(client.triggers) is TriggersOperations
+        with mock.patch.object(victim.PayloadSerializer, "body", autospec=True,
+                               side_effect=victim.PayloadSerializer.body) as body:
+            client.pipelines.create_or_update("adfpy", "local", "pipeline",
+                                              victim.request_body(pipeline, client.pipelines))
+            client.triggers.create_or_update("adfpy", "local", "trigger",
+                                             victim.request_body(pipeline.schedule, client.triggers))
+
+            async def create_async():
+                async with factory.async_client() as async_client:
+                    assert type(async_client.pipelines) is AsyncPipelinesOperations
+                    await async_client.pipelines.create_or_update("adfpy", "local", "async",
+                                                                  victim.request_body(pipeline, async_client.pipelines))
+
+            asyncio.run(create_async())
+
+        assert [call.args[1] for call in body.call_args_list] == [
+            victim.JsonPayload(pipeline.to_adf_json()),
+            victim.JsonPayload(pipeline.schedule.to_adf_json()),
+            victim.JsonPayload(pipeline.to_adf_json()),
+        ]
+        assert factory.resources("pipelines")["async"]["properties"] == pipeline.to_adf_json()["properties"]
@@ -0,0 +1,63 @@
+from datetime import datetime
+from unittest import mock
+
+import pytest
+from azure.mgmt.datafactory.models import RecurrenceSchedule, ScheduleTriggerRecurrence
+
+from adfpy import simulate as victim
+from adfpy.error import ScheduleMismatchError
+from adfpy.trigger import AdfScheduleTrigger
+
+start_time = datetime(2022, 4, 27, 21, 18, 30)
+
+
+@pytest.mark.parametrize("schedule", [
+    "* * * * *", "*/15 * * * *", "25 * * * *", "30 */6 * * *", "0,30 6-8 * * *", "0 8 * * MON-FRI", "* * 15 * *",
+    "0 0 1 */3 *", "0 0 * 1,7 MON", "0 0 31 * *", "@yearly",
+])
+def test_compiled_schedules_are_equivalent(schedule):
+    report = AdfScheduleTrigger("foo", schedule, start_time, []).verify()
+
+    assert report.equivalent
+    assert report.cron_fire_count == report.recurrence_fire_count > 0
+
+
+def test_differences_are_reported():
+    recurrence = ScheduleTriggerRecurrence(frequency="Hour", interval=5, start_time=datetime(2022, 1, 1))
+
+    report = victim.simulate("5 * * * *", recurrence, days=1)
+
+    assert not report.equivalent
+    assert (report.cron_fire_count, report.recurrence_fire_count) == (24, 5)
+    assert report.missing[:2] == [datetime(2022, 1, 1, 0, 5), datetime(2022, 1, 1, 1, 5)]
+    assert report.extra[:2] == [datetime(2022, 1, 1, 0, 0), datetime(2022, 1, 1, 5, 0)]
+    assert report.missing_count == 24
+
+
+def test_recurrence_without_start_time():
+    with pytest.raises(ValueError, match="without a start time"):
+        victim.simulate("5 * * * *", ScheduleTriggerRecurrence(frequency="Hour", interval=5), days=1)
+
+
+def test_verify_raises_on_mismatch():
+    trigger = AdfScheduleTrigger("foo", "5 * * * *", start_time, [])
+    recurrence = ScheduleTriggerRecurrence(frequency="Hour", interval=5, start_time=start_time)
+
+    with mock.patch.object(trigger, "_convert_cron_to_adf", return_value=recurrence):
+        with pytest.raises(ScheduleMismatchError, match="does not match"):
+            trigger.verify()
+
+
+def test_recurrence_last_day_of_month_and_end_time():
+    recurrence = ScheduleTriggerRecurrence(
+        frequency="Month",
+        interval=1,
+        start_time=datetime(2022, 1, 1),
+        end_time=datetime(2022, 4, 1),
+        schedule=RecurrenceSchedule(hours=[0], minutes=[0], month_days=[-1]),
+    )
+    calendar = victim.Calendar.build(datetime(2022, 1, 1), datetime(2023, 1, 1))
+
+    mask = victim.recurrence_mask(recurrence, calendar)
+
+    assert calendar.to_datetimes(mask) == [datetime(2022, 1, 31), datetime(2022, 2, 28), datetime(2022, 3, 31)]
@@ -0,0 +1,145 @@
+import json
+import sys
+from unittest import mock
+
+import pytest
+from azure.core.exceptions import HttpResponseError
+
+from adfpy import telemetry as victim
+from adfpy.deploy import ConfiguredDataFactory, deploy_pipelines
+from adfpy.pipeline import AdfPipeline
+from adfpy.testing.client import InMemoryDataFactoryClient
+from adfpy.throttling import RequestScheduler, RetryPolicy, ScheduledClient
+
+
+def _throttled():
+    response = mock.Mock(status_code=429, headers={}, reason="Too Many Requests")
+    response.text.return_value = ""
+    return HttpResponseError(response=response)
+
+
+def test_histogram():
+    histogram = victim.LatencyHistogram(buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.05, 0.5, 2.0):
+        histogram.observe(seconds)
+
+    assert histogram.cumulative_counts() == [("0.1", 2), ("1.0", 3), ("+Inf", 4)]
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(0.75) == 1.0
+    assert histogram.quantile(1.0) == 2.0
+    assert histogram.to_dict()["mean"] == pytest.approx(0.65)
+
+
+def test_phases_and_requests():
+    telemetry = victim.DeployTelemetry("rg/factory")
+    with telemetry.phase("load"):
+        pass
+    for _ in range(2):
+        with telemetry.phase("serialize"):
+            pass
+    telemetry.record_request("pipelines.create_or_update", 1.0, 1.2, throttled=True, error=True)
+    telemetry.record_request("pipelines.create_or_update", 1.5, 1.6, retry=True)
+    telemetry.record_bytes_sent("pipelines.create_or_update", 100)
+    telemetry.finish(succeeded=True)
+
+    summary = telemetry.to_dict()
+
+    assert list(summary["phases"]) == ["load", "serialize"]
+    assert summary["phases"]["serialize"]["count"] == 2
+    assert summary["requests"] == {"requests": 2, "retries": 1, "throttled": 1, "errors": 1, "bytes_sent": 100}
+    assert summary["operations"]["pipelines.create_or_update"]["latency"]["count"] == 2
+    assert summary["succeeded"] is True
+    json.dumps(summary)
+
+
+def test_prometheus_text():
+    telemetry = victim.DeployTelemetry('rg/"factory"', buckets=(0.5,))
+    with telemetry.phase("write"):
+        pass
+    telemetry.record_request("pipelines.get", 0.0, 0.1)
+    telemetry.finish(succeeded=False)
+
+    lines = telemetry.prometheus_text().splitlines()
+
+    assert "# TYPE adfpy_deploy_request_duration_seconds histogram" in lines
+    assert 'adfpy_deploy_requests_total{factory="rg/\\"factory\\"",operation="pipelines.get"} 1' in lines
+    assert 'adfpy_deploy_request_duration_seconds_bucket{factory="rg/\\"factory\\"",operation="pipelines.get",' \
+           'le="+Inf"} 1' in lines
+    assert 'adfpy_deploy_success{factory="rg/\\"factory\\""} 0.0' in lines
+    assert any(line.startswith('adfpy_deploy_phase_seconds{factory="rg/\\"factory\\"",phase="write"}')
+               for line in lines)
+
+
+def test_write_files(tmp_path):
+    telemetry = victim.DeployTelemetry()
+    telemetry.finish()
+
+    telemetry.write_json(tmp_path / "telemetry" / "deploy.json")
+    telemetry.write_prometheus(tmp_path / "deploy.prom")
+
+    assert json.loads((tmp_path / "telemetry" / "deploy.json").read_text())["phases"] == {}
+    assert (tmp_path / "deploy.prom").read_text().startswith("# HELP adfpy_deploy_last_run_timestamp_seconds")
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["deploy.prom", "telemetry"]
+
+
+def test_deploy_phase_records_in_active_telemetry():
+    telemetry = victim.DeployTelemetry()
+
+    with victim.deploy_phase("load"):
+        pass
+    with telemetry.activate():
+        with victim.deploy_phase("write"):
+            pass
+
+    assert [span.name for span in telemetry.spans] == ["write"]
+
+
+def test_export_opentelemetry_requires_the_api():
+    with mock.patch.dict(sys.modules, {"opentelemetry": None}):
+        with pytest.raises(ImportError, match="opentelemetry-api"):
+            victim.DeployTelemetry().export_opentelemetry()
+
+
+def test_export_opentelemetry():
+    trace = mock.Mock()
+    tracer = mock.Mock()
+    telemetry = victim.DeployTelemetry("rg/factory")
+    with telemetry.phase("write"):
+        telemetry.record_request("pipelines.get", telemetry._start, telemetry._start + 0.1)
+    telemetry.finish(succeeded=True)
+
+    with mock.patch.dict(sys.modules, {"opentelemetry": mock.Mock(trace=trace), "opentelemetry.trace": trace}):
+        telemetry.export_opentelemetry(tracer)
+
+    names = [c.args[0] for c in tracer.start_span.call_args_list]
+    assert names == ["adfpy.deploy", "adfpy.request pipelines.get", "adfpy.write"]
+    assert tracer.start_span.call_args_list[0].kwargs["attributes"]["adfpy.requests"] == 1
+    assert tracer.start_span.return_value.end.call_count == 3
+
+
+def test_scheduler_records_requests():
+    telemetry = victim.DeployTelemetry()
+    operation = mock.Mock(__name__="get", side_effect=[_throttled(), "fetched"])
+    scheduler = RequestScheduler(4, RetryPolicy(), sleep=lambda _: None, telemetry=telemetry)
+
+    scheduler.call(operation, description="pipelines.get")
+
+    stats = telemetry.operations["pipelines.get"]
+    assert (stats.requests, stats.retries, stats.throttled, stats.errors) == (2, 1, 1, 1)
+
+
+def test_deployment_phases():
+    telemetry = victim.DeployTelemetry()
+    client = InMemoryDataFactoryClient()
+    adf = ConfiguredDataFactory("rg", "factory", ScheduledClient(client, RequestScheduler(4, telemetry=telemetry)))
+    pipelines = [AdfPipeline(name=f"pipeline_{i}", schedule="@daily") for i in range(3)]
+
+    with telemetry.activate():
+        deploy_pipelines(pipelines, adf, manage_triggers=True)
+
+    summary = telemetry.to_dict()
+    assert summary["phases"]["serialize"]["count"] == 6
+    assert summary["phases"]["trigger"]["count"] == 2
+    assert summary["phases"]["write"]["count"] == 1
+    assert summary["operations"]["pipelines.create_or_update"]["requests"] == 3
+    assert summary["operations"]["triggers.begin_start"]["requests"] == 3
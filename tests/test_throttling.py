@@ -0,0 +1,228 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+from unittest import mock
+
+import pytest
+from azure.core.exceptions import HttpResponseError, ResourceNotFoundError, ServiceRequestError
+
+from adfpy import throttling as victim
+from adfpy.deploy import ConfiguredDataFactory, deploy_pipelines
+from adfpy.pipeline import AdfPipeline
+
+
+def _http_error(status_code, headers=None):
+    response = mock.Mock(status_code=status_code, headers=headers or {}, reason="Error")
+    response.text.return_value = ""
+    return HttpResponseError(response=response)
+
+
+class FakePipelines:
+    """Pipeline operations of a factory that throttles when more than `capacity` requests are in flight"""
+
+    def __init__(self, capacity, latency):
+        self.capacity = capacity
+        self.latency = latency
+        self.in_flight = 0
+        self.written = set()
+        self.throttled = 0
+        self._lock = threading.Lock()
+
+    def create_or_update(self, resource_group, factory, name, pipeline, **kwargs):
+        with self._lock:
+            if self.in_flight >= self.capacity:
+                self.throttled += 1
+                raise _http_error(429, {"Retry-After": "0"})
+            self.in_flight += 1
+        time.sleep(self.latency)
+        with self._lock:
+            self.in_flight -= 1
+            self.written.add(name)
+        return mock.Mock(etag=name)
+
+
+class FakeClient:
+    def __init__(self, capacity, latency):
+        self.pipelines = FakePipelines(capacity, latency)
+
+    def close(self):
+        pass
+
+
+@pytest.mark.parametrize("error,expected", [
+    (_http_error(429), True),
+    (_http_error(503), True),
+    (_http_error(400), False),
+    (ServiceRequestError("connection refused"), True),
+    (ResourceNotFoundError("gone"), False),
+    (RuntimeError("boom"), False),
+])
+def test_is_retryable(error, expected):
+    assert victim.is_retryable(error) == expected
+
+
+def test_retry_after():
+    now = datetime(2022, 1, 1, tzinfo=timezone.utc)
+
+    assert victim.retry_after(_http_error(429, {"Retry-After": "7"})) == 7
+    assert victim.retry_after(_http_error(429, {"Retry-After": "Sat, 01 Jan 2022 00:00:30 GMT"}), now) == 30
+    assert victim.retry_after(_http_error(429)) is None
+    assert victim.retry_after(RuntimeError("boom")) is None
+
+
+def test_backoff_honours_retry_after_and_caps_the_jitter():
+    policy = victim.RetryPolicy(initial_backoff=1, max_backoff=10)
+
+    assert policy.backoff(2, uniform=lambda low, high: high) == 4
+    assert policy.backoff(10, uniform=lambda low, high: high) == 10
+    assert policy.backoff(0, retry_after=30, uniform=lambda low, high: high) == 30
+
+
+def test_adaptive_concurrency_limit_increases_additively_and_decreases_multiplicatively():
+    clock = iter(range(100)).__next__
+    limit = victim.AdaptiveConcurrencyLimit(maximum=8, clock=clock)
+    first, second = limit.acquire(), limit.acquire()
+
+    limit.release(first, throttled=True)
+    limit.release(second, throttled=True)
+
+    # The second request was admitted before the limit was decreased, so it does not decrease the limit again
+    assert limit.limit == 4
+    for _ in range(4):
+        limit.release(limit.acquire())
+    assert 4.9 < limit.limit < 5
+    limit.release(limit.acquire())
+    assert int(limit.limit) == 5
+
+
+def test_request_budget_waits_for_refill():
+    now = [0.0]
+    budget = victim.RequestBudget({"writes": (2, 10.0)}, clock=lambda: now[0])
+
+    assert budget.reserve("writes") == 0
+    assert budget.reserve("writes") == 0
+    assert budget.reserve("writes") == pytest.approx(0.1)
+    now[0] = 1.0
+    budget.observe("writes", 1)
+    assert budget.tokens["writes"] == 1
+
+
+def test_subscription_budget_is_shared():
+    assert victim.subscription_budget("sub") is victim.subscription_budget("sub")
+    assert victim.subscription_budget("sub") is not victim.subscription_budget("other")
+
+
+def test_scheduler_retries_throttled_requests():
+    sleeps = []
+    operation = mock.Mock(__name__="create_or_update",
+                          side_effect=[_http_error(429, {"Retry-After": "3"}), _http_error(500), "written"])
+    scheduler = victim.RequestScheduler(4, victim.RetryPolicy(initial_backoff=0.5), sleep=sleeps.append)
+
+    assert scheduler.call(operation, "foo") == "written"
+    assert sleeps[0] == 3
+    assert 0 <= sleeps[1] <= 1
+    assert (scheduler.requests, scheduler.retries, scheduler.throttled) == (3, 2, 1)
+
+
+def test_scheduler_gives_up():
+    operation = mock.Mock(__name__="create_or_update", side_effect=_http_error(503))
+    scheduler = victim.RequestScheduler(4, victim.RetryPolicy(max_attempts=3), sleep=lambda _: None)
+
+    with pytest.raises(HttpResponseError):
+        scheduler.call(operation)
+    assert operation.call_count == 3
+
+
+def test_scheduler_does_not_retry_client_errors():
+    operation = mock.Mock(__name__="get", side_effect=_http_error(400))
+    scheduler = victim.RequestScheduler(4, sleep=lambda _: None)
+
+    with pytest.raises(HttpResponseError):
+        scheduler.call(operation)
+    operation.assert_called_once()
+
+
+def test_scheduler_observes_remaining_requests():
+    budget = victim.RequestBudget()
+
+    def operation(*args, raw_response_hook):
+        raw_response_hook(mock.Mock(http_response=mock.Mock(headers={
+            "x-ms-ratelimit-remaining-subscription-reads": "3"})))
+
+    victim.RequestScheduler(4, budget=budget).call(operation, description="pipelines.get")
+
+    assert budget.tokens["reads"] < 4
+
+
+def test_scheduled_client_leaves_polling_to_the_retry_policy_of_the_client():
+    triggers = mock.Mock(_config=mock.Mock(polling_interval=5))
+    client = victim.ScheduledClient(mock.Mock(triggers=triggers), victim.RequestScheduler(4))
+
+    client.triggers.begin_start("foo", "bar", "baz")
+    client.triggers.get("foo", "bar", "baz")
+
+    _, kwargs = triggers.begin_start.call_args
+    assert kwargs["retry_total"] == 0
+    assert kwargs["polling"]._timeout == 5
+    assert kwargs["polling"]._operation_config == {}
+    triggers.get.assert_called_once_with("foo", "bar", "baz", retry_total=0)
+
+
+def test_async_adaptive_concurrency_limit_waits_for_a_release():
+    limit = victim.AsyncAdaptiveConcurrencyLimit(maximum=1)
+
+    async def acquire_twice():
+        first = await limit.acquire()
+        second = asyncio.ensure_future(limit.acquire())
+        await asyncio.sleep(0)
+        assert not second.done()
+        limit.release(first)
+        await second
+        return limit.in_flight
+
+    assert asyncio.run(acquire_twice()) == 1
+
+
+def test_async_scheduler_retries_throttled_requests():
+    sleeps = []
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+
+    operation = mock.AsyncMock(__name__="create_or_update",
+                               side_effect=[_http_error(429, {"Retry-After": "3"}), _http_error(500), "written"])
+    scheduler = victim.AsyncRequestScheduler(4, victim.RetryPolicy(initial_backoff=0.5), sleep=sleep)
+
+    assert asyncio.run(scheduler.call(operation, "foo")) == "written"
+    assert sleeps[0] == 3
+    assert 0 <= sleeps[1] <= 1
+    assert (scheduler.requests, scheduler.retries, scheduler.throttled) == (3, 2, 1)
+
+
+def test_async_scheduled_client_polls_asynchronously():
+    from azure.mgmt.core.polling.async_arm_polling import AsyncARMPolling
+
+    triggers = mock.AsyncMock(_config=mock.Mock(polling_interval=5))
+    client = victim.ScheduledClient(mock.Mock(triggers=triggers), victim.AsyncRequestScheduler(4))
+
+    asyncio.run(client.triggers.begin_start("foo", "bar", "baz"))
+
+    _, kwargs = triggers.begin_start.call_args
+    assert kwargs["retry_total"] == 0
+    assert isinstance(kwargs["polling"], AsyncARMPolling)
+
+
+def test_deploy_through_scheduled_client_survives_throttling():
+    client = FakeClient(capacity=3, latency=0.005)
+    scheduler = victim.RequestScheduler(16, victim.RetryPolicy(max_attempts=20, initial_backoff=0.005))
+    adf = ConfiguredDataFactory(resource_group="foo", name="bar", client=victim.ScheduledClient(client, scheduler))
+    pipelines = [AdfPipeline(name=f"pipeline_{i}") for i in range(60)]
+
+    result = deploy_pipelines(pipelines, adf, concurrency=16)
+
+    assert result.succeeded
+    assert len(client.pipelines.written) == 60
+    assert scheduler.throttled == client.pipelines.throttled > 0
+    assert scheduler.limit.limit < 16
+    adf.client.close()
@@ -0,0 +1,36 @@
+import pytest
+
+from adfpy import throughput as victim
+
+
+def test_settings_are_validated():
+    with pytest.raises(ValueError):
+        victim.CopyThroughputSettings(parallel_copies=0)
+    with pytest.raises(ValueError):
+        victim.CopyThroughputSettings(data_integration_units=512)
+    with pytest.raises(ValueError):
+        victim.CopyThroughputSettings.from_dict({"parallel_copy": 4})
+
+
+def test_inherit():
+    defaults = victim.CopyThroughputSettings(parallel_copies=4, data_integration_units=8)
+    settings = victim.CopyThroughputSettings(parallel_copies=16)
+
+    assert settings.inherit(defaults) == victim.CopyThroughputSettings(parallel_copies=16, data_integration_units=8)
+    assert settings.inherit(None) is settings
+
+
+def test_from_dict():
+    settings = victim.CopyThroughputSettings.from_dict({
+        "data_integration_units": 32,
+        "enable_staging": True,
+        "staging": {"linked_service": "staging", "path": "adf/staging"},
+    })
+
+    assert settings.data_integration_units == 32
+    assert settings.staging == victim.CopyStaging("staging", "adf/staging")
+
+
+def test_resolve_requires_staging_storage():
+    with pytest.raises(ValueError):
+        victim.resolve_copy_throughput(victim.CopyThroughputSettings(enable_staging=True))
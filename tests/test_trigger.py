@@ -1,10 +1,11 @@
 import pytest
 
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from azure.mgmt.datafactory.models import ScheduleTriggerRecurrence, RecurrenceSchedule
 
 from adfpy import trigger as victim
 from adfpy.error import InvalidCronExpressionError, NotSupportedError
+from adfpy.pipeline import AdfPipeline
 
 
 class TestAdfScheduleTrigger:
@@ -13,12 +14,15 @@ class TestAdfScheduleTrigger:
         (
             "* * * * *",
             start_time,
-            ScheduleTriggerRecurrence(frequency="Day", interval=1, start_time=start_time, time_zone="UTC"),
+            ScheduleTriggerRecurrence(frequency="Minute", interval=1, start_time=start_time, time_zone="UTC"),
         ),
         (
             "25 * * * *",
             start_time,
-            ScheduleTriggerRecurrence(frequency="Hour", interval=25, start_time=start_time, time_zone="UTC"),
+            # the start time is moved to the first run, as ADF counts hours from the start time
+            ScheduleTriggerRecurrence(
+                frequency="Hour", interval=1, start_time=datetime(2022, 4, 27, 21, 25), time_zone="UTC"
+            ),
         ),
         (
             "* 8 * * *",
@@ -59,7 +63,7 @@ class TestAdfScheduleTrigger:
             "5 * 25 * *",
             start_time,
             ScheduleTriggerRecurrence(
-                frequency="Day",
+                frequency="Month",
                 interval=1,
                 start_time=start_time,
                 time_zone="UTC",
@@ -189,3 +193,110 @@ class TestAdfCronExpression:
     def test_invalid_day_of_week_cron_expression(self):
         with pytest.raises(InvalidCronExpressionError):
             victim.AdfCronExpression(minute=22, hour=12, day_of_month=5, month=5, day_of_week=13)
+
+
+class TestAdfTumblingWindowTrigger:
+    start_time = datetime(2022, 1, 1, tzinfo=timezone.utc)
+
+    def test_to_adf(self):
+        upstream = AdfPipeline("upstream", schedule=victim.TumblingWindow("Hour"), start_time=self.start_time)
+        window = victim.TumblingWindow(
+            "Day",
+            end_time=datetime(2023, 1, 1, tzinfo=timezone.utc),
+            max_concurrency=20,
+            delay=timedelta(minutes=15),
+            retry_count=3,
+            retry_interval=timedelta(minutes=5),
+            depends_on=[
+                victim.TumblingWindowDependency(upstream, offset=timedelta(0), size=timedelta(days=1)),
+                victim.TumblingWindowDependency(offset=timedelta(days=-1)),
+            ],
+            parameters={"windowStart": "@trigger().outputs.windowStartTime"},
+        )
+        trigger = victim.AdfTumblingWindowTrigger("foo-trigger", window, self.start_time, "foo")
+
+        definition = trigger.to_adf().serialize()["properties"]
+        assert definition["type"] == "TumblingWindowTrigger"
+        assert definition["pipeline"] == {
+            "pipelineReference": {"type": "PipelineReference", "referenceName": "foo"},
+            "parameters": {"windowStart": "@trigger().outputs.windowStartTime"},
+        }
+        type_properties = definition["typeProperties"]
+        assert (type_properties["frequency"], type_properties["interval"]) == ("Hour", 24)
+        assert type_properties["maxConcurrency"] == 20
+        assert type_properties["delay"] == "00:15:00"
+        assert type_properties["retryPolicy"] == {"count": 3, "intervalInSeconds": 300}
+        assert type_properties["dependsOn"] == [
+            {
+                "type": "TumblingWindowTriggerDependencyReference",
+                "referenceTrigger": {"type": "TriggerReference", "referenceName": "upstream-trigger"},
+                "offset": "00:00:00",
+                "size": "1.00:00:00",
+            },
+            {"type": "SelfDependencyTumblingWindowTriggerReference", "offset": "-1.00:00:00"},
+        ]
+
+    def test_windows(self):
+        window = victim.TumblingWindow("Day", end_time=datetime(2023, 1, 1, tzinfo=timezone.utc), max_concurrency=20)
+        trigger = victim.AdfTumblingWindowTrigger("foo-trigger", window, self.start_time, "foo")
+
+        windows = trigger.windows()
+        assert len(windows) == 365
+        assert windows[-1] == (datetime(2022, 12, 31, tzinfo=timezone.utc), datetime(2023, 1, 1, tzinfo=timezone.utc))
+
+        monthly = victim.AdfTumblingWindowTrigger("foo-trigger", victim.TumblingWindow("Month", interval=5),
+                                                  self.start_time, "foo")
+        assert [end.month for _, end in monthly.windows(until=datetime(2023, 1, 1, tzinfo=timezone.utc))] == [6, 11]
+
+    @pytest.mark.parametrize("start_time, ends", [
+        (datetime(2022, 1, 31), [datetime(2022, 2, 28), datetime(2022, 3, 31), datetime(2022, 4, 30)]),
+        (datetime(2024, 2, 29), [datetime(2024, 3, 29), datetime(2024, 4, 29), datetime(2024, 5, 29)]),
+        (datetime(2023, 12, 31, 6), [datetime(2024, 1, 31, 6), datetime(2024, 2, 29, 6), datetime(2024, 3, 31, 6)]),
+    ])
+    def test_monthly_windows_on_days_missing_from_later_months(self, start_time, ends):
+        trigger = victim.AdfTumblingWindowTrigger("foo-trigger", victim.TumblingWindow("Month"), start_time, "foo")
+
+        windows = trigger.windows(until=ends[-1])
+
+        assert [end for _, end in windows] == ends
+        assert [start for start, _ in windows] == [start_time] + ends[:-1]
+
+    @pytest.mark.parametrize("kwargs", [
+        {"frequency": "Week"},
+        {"frequency": "Hour", "interval": 0},
+        {"frequency": "Hour", "max_concurrency": 51},
+        {"frequency": "Hour", "retry_interval": timedelta(seconds=10)},
+    ])
+    def test_invalid_window(self, kwargs):
+        with pytest.raises(ValueError):
+            victim.TumblingWindow(**kwargs)
+
+    def test_self_dependency_on_later_window(self):
+        with pytest.raises(ValueError):
+            victim.TumblingWindowDependency(offset=timedelta(hours=1))
+
+    def test_pipeline_with_tumbling_window(self):
+        upstream = AdfPipeline("upstream", schedule=victim.TumblingWindow("Hour"), start_time=self.start_time)
+        pipeline = AdfPipeline(
+            "foo",
+            schedule=victim.TumblingWindow("Hour", depends_on=[victim.TumblingWindowDependency(upstream)]),
+            start_time=self.start_time,
+        )
+
+        assert isinstance(pipeline.schedule, victim.AdfTumblingWindowTrigger)
+        assert pipeline.schedule.name == "foo-trigger"
+        # the trigger depended on has to be deployed first
+        assert list(pipeline.depends_on_pipelines) == [upstream]
+
+    def test_pipeline_with_tumbling_window_requires_start_time(self):
+        with pytest.raises(ValueError):
+            AdfPipeline("foo", schedule=victim.TumblingWindow("Hour"))
+
+    def test_depends_on_tumbling_window_trigger_only(self):
+        upstream = AdfPipeline("upstream", schedule="@daily")
+        with pytest.raises(ValueError):
+            AdfPipeline(
+                "foo",
+                schedule=victim.TumblingWindow("Hour", depends_on=[victim.TumblingWindowDependency(upstream)]),
+                start_time=self.start_time,
+            )
@@ -0,0 +1,123 @@
+import asyncio
+import time
+from unittest import mock
+
+from adfpy import trigger_control as victim
+from adfpy.deploy import ConfiguredDataFactory
+
+
+def _trigger(name, runtime_state):
+    trigger = mock.Mock(properties=mock.Mock(runtime_state=runtime_state))
+    trigger.name = name
+    return trigger
+
+
+def _adf(*triggers):
+    m_adf_client = mock.Mock()
+    m_adf_client.triggers.list_by_factory.return_value = list(triggers)
+    return ConfiguredDataFactory(resource_group="foo", name="bar", client=m_adf_client)
+
+
+def test_stop_only_stops_running_triggers():
+    adf = _adf(_trigger("running", "Started"), _trigger("stopped", "Stopped"), _trigger("other", "Started"))
+    controller = victim.TriggerController(adf)
+
+    controller.stop(["running", "stopped", "new"])
+
+    adf.client.triggers.begin_stop.assert_called_once_with("foo", "bar", "running")
+    adf.client.triggers.begin_stop.return_value.result.assert_called_once_with()
+
+
+def test_start_restarts_stopped_and_new_written_triggers():
+    adf = _adf(_trigger("running", "Started"), _trigger("stopped", "Stopped"))
+    controller = victim.TriggerController(adf)
+    controller.stop(["running", "stopped", "new", "new_unwritten"])
+
+    controller.start(["running", "stopped", "new"])
+
+    assert sorted(c.args[2] for c in adf.client.triggers.begin_start.call_args_list) == ["new", "running"]
+    assert list(controller.downtime) == ["running"]
+    assert controller.downtime["running"] >= 0
+    assert not controller.failed
+
+
+def test_start_restarts_stopped_triggers_that_were_not_written():
+    adf = _adf(_trigger("running", "Started"))
+    controller = victim.TriggerController(adf)
+    controller.stop(["running"])
+
+    controller.start([])
+
+    adf.client.triggers.begin_start.assert_called_once_with("foo", "bar", "running")
+
+
+def test_failures_are_recorded():
+    adf = _adf(_trigger("a", "Started"), _trigger("b", "Started"))
+    adf.client.triggers.begin_stop.side_effect = lambda rg, factory, name: mock.Mock(
+        result=mock.Mock(side_effect=RuntimeError("boom") if name == "a" else None))
+    controller = victim.TriggerController(adf)
+
+    controller.stop(["a", "b"])
+    controller.start(["a", "b"])
+
+    assert list(controller.failed) == ["a"]
+    adf.client.triggers.begin_start.assert_called_once_with("foo", "bar", "b")
+    assert list(controller.downtime) == ["b"]
+
+
+def test_downtime_does_not_include_waiting_for_other_triggers():
+    adf = _adf(_trigger("a_slow", "Started"), _trigger("b_fast", "Started"))
+    adf.client.triggers.begin_start.side_effect = lambda rg, factory, name: mock.Mock(
+        result=mock.Mock(side_effect=lambda: time.sleep(0.5 if name == "a_slow" else 0)))
+    controller = victim.TriggerController(adf)
+
+    controller.stop(["a_slow", "b_fast"])
+    controller.start(["a_slow", "b_fast"])
+
+    assert controller.downtime["a_slow"] >= 0.5
+    assert controller.downtime["b_fast"] < 0.25
+
+
+def test_dry_run_does_not_stop_or_start():
+    adf = _adf(_trigger("running", "Started"))
+    controller = victim.TriggerController(adf, dry_run=True)
+
+    controller.stop(["running", "new"])
+    controller.start(["running", "new"])
+
+    adf.client.triggers.begin_stop.assert_not_called()
+    adf.client.triggers.begin_start.assert_not_called()
+    assert list(controller.downtime) == ["running"]
+
+
+class AsyncPager:
+    def __init__(self, items):
+        self.items = items
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for item in self.items:
+            yield item
+
+
+def test_async_controller_stops_and_starts_triggers():
+    m_adf_client = mock.Mock()
+    triggers = [_trigger("running", "Started"), _trigger("stopped", "Stopped")]
+    m_adf_client.triggers.list_by_factory.return_value = AsyncPager(triggers)
+    poller = mock.Mock(result=mock.AsyncMock())
+    m_adf_client.triggers.begin_stop = mock.AsyncMock(return_value=poller)
+    m_adf_client.triggers.begin_start = mock.AsyncMock(return_value=poller)
+    adf = ConfiguredDataFactory(resource_group="foo", name="bar", client=m_adf_client)
+    controller = victim.AsyncTriggerController(adf)
+
+    async def deploy():
+        await controller.stop(["running", "stopped", "new"])
+        await controller.start(["running", "stopped", "new"])
+
+    asyncio.run(deploy())
+
+    m_adf_client.triggers.begin_stop.assert_awaited_once_with("foo", "bar", "running")
+    assert sorted(c.args[2] for c in m_adf_client.triggers.begin_start.await_args_list) == ["new", "running"]
+    assert list(controller.downtime) == ["running"]
@@ -0,0 +1,75 @@
+import os
+from unittest import mock
+
+from adfpy import watch as victim
+from adfpy.deploy import ConfiguredDataFactory
+
+CHILD_DEFINITION = """
+from adfpy.activities.control import AdfSetVariableActivity
+from adfpy.pipeline import AdfPipeline
+
+child = AdfPipeline(name="child", activities=[AdfSetVariableActivity("set", "{value}")])
+"""
+
+PARENT_DEFINITION = """
+from adfpy.pipeline import AdfPipeline
+from {package}.child import child
+
+parent = AdfPipeline(name="parent", depends_on_pipelines=[child], schedule="@daily")
+"""
+
+UNRELATED_DEFINITION = """
+from adfpy.pipeline import AdfPipeline
+
+unrelated = AdfPipeline(name="unrelated")
+"""
+
+
+def _write(file_path, content):
+    file_path.write_text(content)
+    # make sure the change is detected, even on file systems with a coarse timestamp resolution
+    stat = file_path.stat()
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def test_watcher_redeploys_changed_pipelines_and_dependents(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    definitions = tmp_path / "watched"
+    definitions.mkdir()
+    _write(definitions / "child.py", CHILD_DEFINITION.format(value="foo"))
+    _write(definitions / "parent.py", PARENT_DEFINITION.format(package="watched"))
+    _write(definitions / "unrelated.py", UNRELATED_DEFINITION)
+    m_adf_client = mock.Mock()
+    m_adf_client.pipelines.list_by_factory.return_value = []
+    m_adf_client.triggers.list_by_factory.return_value = []
+    watcher = victim.PipelineWatcher(definitions, ConfiguredDataFactory("foo", "bar", m_adf_client))
+
+    initial = watcher.start()
+    assert sorted(initial.deployed) == ["child", "parent", "unrelated"]
+    assert watcher.poll() == set()
+
+    m_adf_client.reset_mock()
+    _write(definitions / "child.py", CHILD_DEFINITION.format(value="bar"))
+    changed = watcher.poll()
+    reloaded = watcher.reload(changed)
+    result = watcher.redeploy()
+
+    assert changed == {definitions / "child.py"}
+    assert reloaded == {definitions / "child.py", definitions / "parent.py"}
+    assert sorted(result.deployed) == ["child", "parent"]
+    assert sorted(c[0][2] for c in m_adf_client.pipelines.create_or_update.call_args_list) == ["child", "parent"]
+    m_adf_client.triggers.create_or_update.assert_not_called()
+    assert watcher.redeploy() is None
+
+
+def test_dependent_pipelines():
+    child = mock.Mock(depends_on_pipelines=[])
+    child.name = "child"
+    parent = mock.Mock(depends_on_pipelines=[child])
+    parent.name = "parent"
+    other = mock.Mock(depends_on_pipelines=[])
+    other.name = "other"
+
+    result = victim.dependent_pipelines({"child"}, {"child": child, "parent": parent, "other": other})
+
+    assert result == {"child", "parent"}
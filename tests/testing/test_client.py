@@ -0,0 +1,42 @@
+import pytest
+from azure.core.exceptions import HttpResponseError, ResourceNotFoundError
+
+from adfpy.deploy import ConfiguredDataFactory, deploy_pipelines, fetch_remote_definitions
+from adfpy.pipeline import AdfPipeline
+from adfpy.testing.client import InMemoryDataFactoryClient
+
+
+def test_deploy_to_in_memory_client():
+    client = InMemoryDataFactoryClient()
+    adf = ConfiguredDataFactory(resource_group="foo", name="bar", client=client)
+    pipeline = AdfPipeline(name="foo", schedule="@daily")
+
+    result = deploy_pipelines([pipeline], adf, manage_triggers=True)
+
+    assert result.succeeded
+    fetched = client.pipelines.get("foo", "bar", "foo")
+    assert fetched.etag == result.pipeline_etags["foo"]
+    assert client.pipelines.get("foo", "bar", "foo", if_none_match=fetched.etag) is None
+    assert client.triggers.get("foo", "bar", "foo-trigger").properties.runtime_state == "Started"
+    remote = fetch_remote_definitions(adf)
+    assert set(remote.pipelines) == {"foo"}
+    assert set(remote.triggers) == {"foo-trigger"}
+
+
+def test_started_triggers_can_not_be_updated():
+    client = InMemoryDataFactoryClient()
+    trigger = AdfPipeline(name="foo", schedule="@daily").schedule.to_adf()
+    client.triggers.create_or_update("foo", "bar", "foo-trigger", trigger)
+    client.triggers.begin_start("foo", "bar", "foo-trigger").result()
+
+    with pytest.raises(HttpResponseError):
+        client.triggers.create_or_update("foo", "bar", "foo-trigger", trigger)
+
+
+def test_missing_resources():
+    client = InMemoryDataFactoryClient()
+
+    with pytest.raises(ResourceNotFoundError):
+        client.pipelines.get("foo", "bar", "missing")
+    with pytest.raises(ResourceNotFoundError):
+        client.triggers.begin_start("foo", "bar", "missing")
@@ -0,0 +1,170 @@
+import asyncio
+
+import pytest
+from azure.core.exceptions import HttpResponseError, ResourceNotFoundError
+from azure.mgmt.datafactory.models import PipelineResource
+
+from adfpy.deploy import deploy_pipelines, fetch_remote_definitions
+from adfpy.deploy_async import deploy_async, deploy_pipelines_async
+from adfpy.pipeline import AdfPipeline
+from adfpy.telemetry import DeployTelemetry
+from adfpy.testing.factory import LocalDataFactory
+from adfpy.throttling import AsyncRequestScheduler, RequestScheduler, RetryPolicy, ScheduledClient
+
+
+@pytest.fixture
+def factory():
+    with LocalDataFactory() as local_factory:
+        yield local_factory
+
+
+def test_pipelines_round_trip(factory):
+    client = factory.client()
+
+    written = client.pipelines.create_or_update("adfpy", "local", "foo", PipelineResource(activities=[]))
+    fetched = client.pipelines.get("adfpy", "local", "foo")
+
+    assert fetched.name == "foo"
+    assert fetched.etag == written.etag
+    assert client.pipelines.get("adfpy", "local", "foo", if_none_match=written.etag) is None
+    rewritten = client.pipelines.create_or_update("adfpy", "local", "foo", PipelineResource(activities=[]))
+    assert rewritten.etag != written.etag
+    client.pipelines.delete("adfpy", "local", "foo")
+    with pytest.raises(ResourceNotFoundError):
+        client.pipelines.get("adfpy", "local", "foo")
+
+
+def test_listing_is_paged():
+    with LocalDataFactory(page_size=3) as factory:
+        client = factory.client()
+        for i in range(8):
+            client.pipelines.create_or_update("adfpy", "local", f"pipeline_{i}", PipelineResource(activities=[]))
+
+        names = [p.name for p in client.pipelines.list_by_factory("adfpy", "local")]
+
+        assert names == [f"pipeline_{i}" for i in range(8)]
+        assert sum(r.method == "GET" for r in factory.requests) == 3
+
+
+def test_started_triggers_can_not_be_updated(factory):
+    client = factory.client()
+    trigger = AdfPipeline(name="foo", schedule="@daily").schedule.to_adf()
+    client.triggers.create_or_update("adfpy", "local", "foo", trigger)
+    assert client.triggers.get("adfpy", "local", "foo").properties.runtime_state == "Stopped"
+
+    client.triggers.begin_start("adfpy", "local", "foo").result()
+
+    with pytest.raises(HttpResponseError) as error:
+        client.triggers.create_or_update("adfpy", "local", "foo", trigger)
+    assert error.value.error.code == "TriggerEnabledCannotUpdate"
+    client.triggers.begin_stop("adfpy", "local", "foo").result()
+    client.triggers.create_or_update("adfpy", "local", "foo", trigger)
+
+
+def test_deploy_with_managed_triggers(factory):
+    adf = factory.configured_data_factory()
+    pipeline = AdfPipeline(name="foo", schedule="@daily")
+    deploy_pipelines([pipeline], adf, manage_triggers=True)
+    assert factory.resources("triggers")["foo-trigger"]["properties"]["runtimeState"] == "Started"
+
+    result = deploy_pipelines([pipeline], adf, manage_triggers=True)
+
+    assert result.succeeded
+    assert list(result.trigger_downtime) == ["foo-trigger"]
+    assert factory.resources("triggers")["foo-trigger"]["properties"]["runtimeState"] == "Started"
+    remote = fetch_remote_definitions(adf)
+    assert set(remote.pipelines) == {"foo"}
+    assert set(remote.triggers) == {"foo-trigger"}
+
+
+def test_deploy_async(factory):
+    adf = factory.configured_data_factory()
+
+    async def deploy():
+        adf.client = factory.async_client()
+        async with adf.client:
+            return await deploy_pipelines_async([AdfPipeline(name="foo")], adf)
+
+    assert asyncio.run(deploy()).succeeded
+    assert set(factory.resources("pipelines")) == {"foo"}
+
+
+def test_injected_throttling_is_retried():
+    with LocalDataFactory(latency=0.01, max_concurrent_requests=2, retry_after=0) as factory:
+        scheduler = RequestScheduler(8, RetryPolicy(max_attempts=30, initial_backoff=0.01))
+        adf = factory.configured_data_factory()
+        adf.client = ScheduledClient(factory.client(retry_total=0), scheduler)
+
+        result = deploy_pipelines([AdfPipeline(name=f"pipeline_{i}") for i in range(20)], adf, concurrency=8)
+
+        assert result.succeeded
+        assert len(factory.resources("pipelines")) == 20
+        assert scheduler.throttled == sum(r.status == 429 for r in factory.requests) > 0
+
+
+def test_async_injected_throttling_is_retried():
+    with LocalDataFactory(latency=0.01, max_concurrent_requests=2, retry_after=0, page_size=4) as factory:
+        scheduler = AsyncRequestScheduler(8, RetryPolicy(max_attempts=30, initial_backoff=0.01))
+        adf = factory.configured_data_factory()
+        pipelines = [AdfPipeline(name=f"pipeline_{i}", schedule="@daily") for i in range(10)]
+
+        async def deploy():
+            adf.client = ScheduledClient(factory.async_client(), scheduler)
+            try:
+                await deploy_async(pipelines, adf, concurrency=8, manage_triggers=True)
+                return await deploy_async(pipelines, adf, concurrency=8, diff=True, delete_stale_resources=True,
+                                          manage_triggers=True)
+            finally:
+                await adf.client.close()
+
+        assert asyncio.run(deploy()).succeeded
+        assert len(factory.resources("pipelines")) == 10
+        assert {t["properties"]["runtimeState"] for t in factory.resources("triggers").values()} == {"Started"}
+        assert scheduler.throttled == sum(r.status == 429 for r in factory.requests) > 0
+        assert scheduler.requests == len(factory.requests)
+
+
+def test_paged_listings_are_retried_page_by_page():
+    with LocalDataFactory(page_size=2, requests_per_second=2, retry_after=0) as factory:
+        factory.restore({"adfpy/local/pipelines": {
+            f"pipeline_{i}": {"name": f"pipeline_{i}", "etag": str(i), "properties": {"activities": []}}
+            for i in range(5)
+        }})
+        telemetry = DeployTelemetry()
+        scheduler = RequestScheduler(4, RetryPolicy(max_attempts=30, initial_backoff=0.01), telemetry=telemetry)
+        adf = factory.configured_data_factory()
+        adf.client = ScheduledClient(factory.client(), scheduler)
+
+        remote = fetch_remote_definitions(adf)
+
+        assert set(remote.pipelines) == {f"pipeline_{i}" for i in range(5)}
+        assert scheduler.retries == scheduler.throttled == sum(r.status == 429 for r in factory.requests) > 0
+        assert scheduler.requests == len(factory.requests) == 4 + scheduler.retries
+        assert telemetry.operations["pipelines.list_by_factory"].requests == 3 + sum(
+            r.status == 429 and "pipelines" in r.path for r in factory.requests)
+
+
+def test_injected_errors():
+    with LocalDataFactory(error_rate=1.0) as factory:
+        with pytest.raises(HttpResponseError) as error:
+            factory.client(retry_total=0).pipelines.get("adfpy", "local", "foo")
+        assert error.value.status_code == 503
+
+
+def test_snapshot_and_restore(factory):
+    factory.client().pipelines.create_or_update("adfpy", "local", "foo", PipelineResource(activities=[]))
+
+    with LocalDataFactory(state=factory.snapshot()) as restored:
+        assert restored.client().pipelines.get("adfpy", "local", "foo").name == "foo"
+
+
+def test_telemetry_of_requests(factory):
+    telemetry = DeployTelemetry()
+    adf = factory.configured_data_factory()
+    adf.client = ScheduledClient(factory.client(retry_total=0), RequestScheduler(4, telemetry=telemetry))
+
+    deploy_pipelines([AdfPipeline(name="foo")], adf)
+
+    stats = telemetry.operations["pipelines.create_or_update"]
+    assert stats.requests == 1
+    assert stats.bytes_sent > 0